@@ -1803,6 +1803,8 @@ export interface components {
         EditorRunDetails: {
             /** Artifacts */
             artifacts: components["schemas"]["ArtifactEntry"][];
+            /** Artifacts Expired At */
+            artifacts_expired_at?: string | null;
             /** Error Summary */
             error_summary: string | null;
             /** Finished At */
@@ -2047,6 +2049,8 @@ export interface components {
         ListArtifactsResult: {
             /** Artifacts */
             artifacts: components["schemas"]["RunArtifact"][];
+            /** Artifacts Expired At */
+            artifacts_expired_at?: string | null;
             /**
              * Run Id
              * Format: uuid
@@ -2240,6 +2244,8 @@ export interface components {
         };
         /** MyRunItem */
         MyRunItem: {
+            /** Artifacts Expired At */
+            artifacts_expired_at?: string | null;
             /** Finished At */
             finished_at: string | null;
             /** Input Files */
@@ -2434,6 +2440,8 @@ export interface components {
         RunDetails: {
             /** Artifacts */
             artifacts?: components["schemas"]["RunArtifact"][];
+            /** Artifacts Expired At */
+            artifacts_expired_at?: string | null;
             /** Error Summary */
             error_summary?: string | null;
             /**
@@ -0,0 +1,44 @@
+"""Add tool_versions.deterministic and tool_runs.result_cache.
+
+Revision ID: 0028_deterministic_result_cache
+Revises: 0027_tool_run_jobs_execution_queue
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+revision: str = "0028_deterministic_result_cache"
+down_revision: str | None = "0027_tool_run_jobs_execution_queue"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Make idempotent: check if columns exist before adding
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    version_columns = {c["name"] for c in inspector.get_columns("tool_versions")}
+    if "deterministic" not in version_columns:
+        op.add_column(
+            "tool_versions",
+            sa.Column("deterministic", sa.Boolean(), server_default="false", nullable=False),
+        )
+
+    run_columns = {c["name"] for c in inspector.get_columns("tool_runs")}
+    if "result_cache" not in run_columns:
+        op.add_column(
+            "tool_runs",
+            sa.Column("result_cache", sa.String(length=16), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("tool_runs", "result_cache")
+    op.drop_column("tool_versions", "deterministic")
@@ -0,0 +1,37 @@
+"""Add resource_usage column to tool_runs.
+
+Revision ID: 0029_tool_runs_resource_usage
+Revises: 0028_deterministic_result_cache
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0029_tool_runs_resource_usage"
+down_revision: str | None = "0028_deterministic_result_cache"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Make idempotent: check if column exists before adding
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    columns = {c["name"] for c in inspector.get_columns("tool_runs")}
+
+    if "resource_usage" not in columns:
+        op.add_column(
+            "tool_runs",
+            sa.Column("resource_usage", postgresql.JSONB(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("tool_runs", "resource_usage")
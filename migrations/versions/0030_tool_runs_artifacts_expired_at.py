@@ -0,0 +1,49 @@
+"""Add artifacts_expired_at tombstone and retention index to tool_runs.
+
+Revision ID: 0030_tool_runs_artifacts_expired_at
+Revises: 0029_tool_runs_resource_usage
+Create Date: 2026-10-17
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+revision: str = "0030_tool_runs_artifacts_expired_at"
+down_revision: str | None = "0029_tool_runs_resource_usage"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_INDEX_NAME = "ix_tool_runs_artifacts_retention"
+
+
+def upgrade() -> None:
+    # Make idempotent: check if column/index exist before adding
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    columns = {c["name"] for c in inspector.get_columns("tool_runs")}
+    indexes = {i["name"] for i in inspector.get_indexes("tool_runs")}
+
+    if "artifacts_expired_at" not in columns:
+        op.add_column(
+            "tool_runs",
+            sa.Column("artifacts_expired_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+    # Artifact retention pages through finished runs whose files are still on disk, oldest first.
+    if _INDEX_NAME not in indexes:
+        op.create_index(
+            _INDEX_NAME,
+            "tool_runs",
+            ["finished_at", "id"],
+            postgresql_where=sa.text("artifacts_expired_at IS NULL AND finished_at IS NOT NULL"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(_INDEX_NAME, table_name="tool_runs")
+    op.drop_column("tool_runs", "artifacts_expired_at")
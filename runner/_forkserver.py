@@ -0,0 +1,127 @@
+"""Fork-server entrypoint for pre-started (warm pool) runner containers.
+
+Imports an allowlist of heavy modules once, waits until the app has copied the run's workdir
+(signalled by the trigger file, the last member of the workdir archive) and then forks a child
+that runs `_runner.main()` under the unchanged env/`result.json` contract. The container still
+serves exactly one run: the server exits with the child's exit status.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import gc
+import importlib
+import os
+import select
+import sys
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+import _runner
+
+DEFAULT_PRELOAD_MODULES: tuple[str, ...] = ("weasyprint", "openpyxl", "docx", "pypandoc")
+# Upper bound on one wait: a safety net while inotify is watching, the backoff cap otherwise.
+TRIGGER_POLL_SECONDS = 0.05
+_FIRST_POLL_SECONDS = 0.005
+
+# <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+
+
+def preload_module_names() -> list[str]:
+    raw = os.getenv("SKRIPTOTEKET_PRELOAD_MODULES")
+    if raw is None:
+        return list(DEFAULT_PRELOAD_MODULES)
+    return [name.strip() for name in raw.split(",") if name.strip()]
+
+
+def preload(module_names: Iterable[str]) -> list[str]:
+    """Import modules best-effort and return the ones that loaded."""
+    loaded: list[str] = []
+    for name in module_names:
+        try:
+            importlib.import_module(name)
+        except Exception:  # noqa: BLE001 - a missing library only costs the preload
+            continue
+        loaded.append(name)
+    return loaded
+
+
+def _watch_directory(path: Path) -> int | None:
+    """An inotify fd watching `path` for new files, or None where inotify is unavailable."""
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = int(libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC))
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    mask = _IN_CREATE | _IN_MOVED_TO | _IN_CLOSE_WRITE
+    if libc.inotify_add_watch(fd, os.fsencode(path), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def wait_for_trigger(*, trigger_path: Path, poll_seconds: float = TRIGGER_POLL_SECONDS) -> None:
+    """Block until `trigger_path` exists.
+
+    Sleeps on inotify events for the trigger's directory (the check after each event keeps it
+    correct); without inotify it polls with a backoff from 5 ms up to `poll_seconds`.
+    """
+    watch_fd = _watch_directory(trigger_path.parent)
+    delay = min(_FIRST_POLL_SECONDS, poll_seconds)
+    try:
+        while not trigger_path.exists():
+            if watch_fd is None:
+                time.sleep(delay)
+                delay = min(delay * 2, poll_seconds)
+                continue
+            readable, _, _ = select.select([watch_fd], [], [], poll_seconds)
+            if readable:
+                try:
+                    os.read(watch_fd, 64 * 1024)
+                except BlockingIOError:
+                    pass
+    finally:
+        if watch_fd is not None:
+            os.close(watch_fd)
+
+
+def run_forked(*, timings: dict[str, float]) -> int:
+    """Run `_runner.main()` in a forked child and return its exit code (128 + signal if killed)."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 1
+        try:
+            exit_code = _runner.main(timings=timings)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+
+    _pid, wait_status = os.waitpid(pid, 0)
+    exit_code = os.waitstatus_to_exitcode(wait_status)
+    return exit_code if exit_code >= 0 else 128 - exit_code
+
+
+def main() -> int:
+    started = time.perf_counter()
+    preload(preload_module_names())
+    # Keep preloaded objects out of the collector so the child does not dirty shared pages.
+    gc.freeze()
+    preload_seconds = round(time.perf_counter() - started, 6)
+
+    wait_for_trigger(
+        trigger_path=Path(os.getenv("SKRIPTOTEKET_RUN_TRIGGER_PATH", "/work/.run")),
+    )
+    return run_forked(timings={"preload_seconds": preload_seconds})
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
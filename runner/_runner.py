@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import json
+import marshal
 import os
 import sys
+import time
 import traceback
-from importlib.util import module_from_spec, spec_from_file_location
+from importlib.util import MAGIC_NUMBER, module_from_spec, source_hash, spec_from_file_location
 from pathlib import Path
+from types import CodeType
 from typing import Literal, TypedDict
 
 from tool_errors import ToolUserError
@@ -31,6 +34,7 @@ class RunnerResultPayloadV2(TypedDict):
     next_actions: list[RunnerUiObject]
     state: dict[str, JsonValue] | None
     artifacts: list[RunnerArtifact]
+    timings: dict[str, float]
 
 
 def _stable_json_sort_key(value: JsonValue) -> str:
@@ -119,12 +123,44 @@ def _to_contract_v2_ui_fields(
     raise TypeError("Entrypoint must return a str (HTML) or a dict (contract v2 payload)")
 
 
-def _load_module_from_path(*, module_path: Path) -> object:
+def _load_cached_code(*, script_path: Path, code_path: Path) -> CodeType | None:
+    """Return precompiled code for the script if `code_path` is a matching hash-based `.pyc`.
+
+    Anything unexpected (missing file, other interpreter version, stale source hash) falls back to
+    compiling the source, so the shipped bytecode is purely an optimization.
+    """
+    try:
+        data = code_path.read_bytes()
+        source = script_path.read_bytes()
+    except OSError:
+        return None
+    if len(data) < 16 or data[:4] != MAGIC_NUMBER:
+        return None
+    if not int.from_bytes(data[4:8], "little") & 0b01:
+        return None
+    if data[8:16] != source_hash(source):
+        return None
+    try:
+        code = marshal.loads(data[16:])
+    except (EOFError, TypeError, ValueError):
+        return None
+    return code if isinstance(code, CodeType) else None
+
+
+def _load_module_from_path(*, module_path: Path, code_path: Path | None = None) -> object:
     spec = spec_from_file_location("tool_script", module_path)
     if spec is None or spec.loader is None:
         raise RuntimeError("Failed to load tool script (invalid spec)")
     module = module_from_spec(spec)
-    spec.loader.exec_module(module)
+    code = (
+        None
+        if code_path is None
+        else _load_cached_code(script_path=module_path, code_path=code_path)
+    )
+    if code is None:
+        spec.loader.exec_module(module)
+    else:
+        exec(code, module.__dict__)
     return module
 
 
@@ -145,10 +181,38 @@ def _collect_artifacts(*, work_dir: Path, output_dir: Path) -> list[RunnerArtifa
     return artifacts
 
 
-def main() -> int:
+def _apply_run_env_overrides() -> None:
+    """Apply per-run env shipped as JSON (warm-pool containers are created before the run)."""
+    run_env_path = os.getenv("SKRIPTOTEKET_RUN_ENV_PATH", "").strip()
+    if not run_env_path:
+        return
+    path = Path(run_env_path)
+    if not path.is_file():
+        return
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(payload, dict):
+        raise RuntimeError("Invalid run env payload")
+    for key, value in payload.items():
+        if isinstance(key, str) and key.startswith("SKRIPTOTEKET_") and isinstance(value, str):
+            os.environ[key] = value
+
+
+def _elapsed_seconds(started: float) -> float:
+    return round(time.perf_counter() - started, 6)
+
+
+def main(*, timings: dict[str, float] | None = None) -> int:
+    """Run the tool once and write `result.json`.
+
+    `timings` carries phases measured before `main()` (e.g. the fork server's preload); the
+    runner adds its own phases and reports them all under `timings` in `result.json`.
+    """
+    _apply_run_env_overrides()
+
     work_dir = Path("/work")
 
     script_path = Path(os.getenv("SKRIPTOTEKET_SCRIPT_PATH", "/work/script.py"))
+    script_code_path = Path(os.getenv("SKRIPTOTEKET_SCRIPT_CODE_PATH", "/work/script.pyc"))
     entrypoint = os.getenv("SKRIPTOTEKET_ENTRYPOINT", "run_tool").strip()
     input_dir = Path(os.getenv("SKRIPTOTEKET_INPUT_DIR", "/work/input"))
     output_dir = Path(os.getenv("SKRIPTOTEKET_OUTPUT_DIR", "/work/output"))
@@ -160,20 +224,27 @@ def main() -> int:
     outputs: list[RunnerUiObject] = []
     next_actions: list[RunnerUiObject] = []
     state: dict[str, JsonValue] | None = None
+    phase_timings = dict(timings or {})
 
     try:
         output_dir.mkdir(parents=True, exist_ok=True)
-        module = _load_module_from_path(module_path=script_path)
+        phase_started = time.perf_counter()
+        module = _load_module_from_path(module_path=script_path, code_path=script_code_path)
+        phase_timings["import_seconds"] = _elapsed_seconds(phase_started)
 
         func = getattr(module, entrypoint, None)
         if func is None or not callable(func):
             raise RuntimeError(f"Entrypoint not found: {entrypoint}")
 
+        phase_started = time.perf_counter()
         result = func(str(input_dir), str(output_dir))
 
         outputs, next_actions, state = _to_contract_v2_ui_fields(result)
+        phase_timings["user_code_seconds"] = _elapsed_seconds(phase_started)
         status = "succeeded"
+        phase_started = time.perf_counter()
         artifacts = _collect_artifacts(work_dir=work_dir, output_dir=output_dir)
+        phase_timings["artifacts_seconds"] = _elapsed_seconds(phase_started)
 
     except BaseException as e:  # noqa: BLE001 - runner boundary; writes a safe result.json
         error_summary = _safe_error_summary(error=e)
@@ -187,6 +258,7 @@ def main() -> int:
         "next_actions": next_actions,
         "state": state,
         "artifacts": artifacts,
+        "timings": phase_timings,
     }
     result_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
     return 0
@@ -5,12 +5,11 @@ from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field, JsonValue
 
+from skriptoteket.domain.scripting.input_files import RunnerInputFile
 from skriptoteket.domain.scripting.models import RunContext, ToolRun, ToolVersion
 from skriptoteket.domain.scripting.tool_inputs import ToolInputSchema
 from skriptoteket.domain.scripting.tool_settings import ToolSettingsSchema
 
-type InputFile = tuple[str, bytes]
-
 
 class SessionFilesMode(StrEnum):
     NONE = "none"
@@ -61,7 +60,7 @@ class ExecuteToolVersionCommand(BaseModel):
     context: RunContext
     settings_context: str | None = None
     version_override: ToolVersionOverride | None = None
-    input_files: list[InputFile] = Field(default_factory=list)
+    input_files: list[RunnerInputFile] = Field(default_factory=list)
     input_values: dict[str, JsonValue] = Field(default_factory=dict)
     action_payload: dict[str, JsonValue] | None = None
 
@@ -83,6 +82,7 @@ class CreateDraftVersionCommand(BaseModel):
     settings_schema: ToolSettingsSchema | None = None
     input_schema: ToolInputSchema = Field(default_factory=list)
     usage_instructions: str | None = None
+    deterministic: bool = False
     change_summary: str | None = None
 
 
@@ -101,6 +101,7 @@ class SaveDraftVersionCommand(BaseModel):
     settings_schema: ToolSettingsSchema | None = None
     input_schema: ToolInputSchema = Field(default_factory=list)
     usage_instructions: str | None = None
+    deterministic: bool = False
     change_summary: str | None = None
     expected_parent_version_id: UUID
 
@@ -159,7 +160,7 @@ class RunSandboxCommand(BaseModel):
     tool_id: UUID
     version_id: UUID
     snapshot_payload: SandboxSnapshotPayload
-    input_files: list[InputFile] = Field(default_factory=list)
+    input_files: list[RunnerInputFile] = Field(default_factory=list)
     input_values: dict[str, JsonValue] = Field(default_factory=dict)
     session_context: str | None = None
     session_files_mode: SessionFilesMode = SessionFilesMode.NONE
@@ -179,7 +180,7 @@ class RunActiveToolCommand(BaseModel):
     model_config = ConfigDict(frozen=True)
 
     tool_slug: str
-    input_files: list[InputFile] = Field(default_factory=list)
+    input_files: list[RunnerInputFile] = Field(default_factory=list)
     input_values: dict[str, JsonValue] = Field(default_factory=dict)
     session_context: str = "default"
     session_files_mode: SessionFilesMode = SessionFilesMode.NONE
@@ -125,6 +125,11 @@ class CreateDraftVersionHandler(CreateDraftVersionHandlerProtocol):
                 if "usage_instructions" in command.model_fields_set
                 else (derived_from.usage_instructions if derived_from is not None else None)
             )
+            effective_deterministic = (
+                command.deterministic
+                if "deterministic" in command.model_fields_set
+                else (derived_from.deterministic if derived_from is not None else False)
+            )
             draft = create_draft_version(
                 version_id=self._id_generator.new_uuid(),
                 tool_id=tool.id,
@@ -134,6 +139,7 @@ class CreateDraftVersionHandler(CreateDraftVersionHandlerProtocol):
                 settings_schema=effective_settings_schema,
                 input_schema=effective_input_schema,
                 usage_instructions=effective_usage_instructions,
+                deterministic=effective_deterministic,
                 created_by_user_id=actor.id,
                 derived_from_version_id=command.derived_from_version_id,
                 change_summary=command.change_summary,
@@ -13,7 +13,13 @@ from skriptoteket.application.scripting.handlers.execute_tool_version_pipeline i
 from skriptoteket.config import Settings
 from skriptoteket.domain.errors import DomainError, ErrorCode, not_found
 from skriptoteket.domain.identity.models import User
-from skriptoteket.domain.scripting.input_files import InputManifest, normalize_input_files
+from skriptoteket.domain.scripting.input_files import (
+    InputManifest,
+    RunnerInputFile,
+    input_file_name,
+    input_file_size,
+    normalize_input_files,
+)
 from skriptoteket.domain.scripting.models import (
     ToolVersion,
     compute_content_hash,
@@ -33,7 +39,7 @@ from skriptoteket.protocols.clock import ClockProtocol
 from skriptoteket.protocols.execution_queue import ToolRunJobRepositoryProtocol
 from skriptoteket.protocols.id_generator import IdGeneratorProtocol
 from skriptoteket.protocols.run_inputs import RunInputStorageProtocol
-from skriptoteket.protocols.runner import ToolRunnerProtocol
+from skriptoteket.protocols.runner import ToolCodeCacheProtocol, ToolRunnerProtocol
 from skriptoteket.protocols.scripting import (
     ExecuteToolVersionHandlerProtocol,
     ToolRunRepositoryProtocol,
@@ -105,6 +111,7 @@ class ExecuteToolVersionHandler(ExecuteToolVersionHandlerProtocol):
         run_inputs: RunInputStorageProtocol,
         sessions: ToolSessionRepositoryProtocol,
         runner: ToolRunnerProtocol,
+        code_cache: ToolCodeCacheProtocol,
         ui_policy_provider: UiPolicyProviderProtocol,
         backend_actions: BackendActionProviderProtocol,
         ui_normalizer: UiPayloadNormalizerProtocol,
@@ -119,6 +126,7 @@ class ExecuteToolVersionHandler(ExecuteToolVersionHandlerProtocol):
         self._run_inputs = run_inputs
         self._sessions = sessions
         self._runner = runner
+        self._code_cache = code_cache
         self._ui_policy_provider = ui_policy_provider
         self._backend_actions = backend_actions
         self._ui_normalizer = ui_normalizer
@@ -170,15 +178,17 @@ class ExecuteToolVersionHandler(ExecuteToolVersionHandlerProtocol):
                 values=command.input_values,
             )
 
-            normalized_input_files: list[tuple[str, bytes]] = []
+            normalized_input_files: list[RunnerInputFile] = []
             input_manifest = InputManifest()
             if command.input_files:
                 normalized_input_files, input_manifest = normalize_input_files(
                     input_files=command.input_files
                 )
 
-            primary_filename = normalized_input_files[0][0] if normalized_input_files else None
-            total_size_bytes = sum(len(content) for _, content in normalized_input_files)
+            primary_filename = (
+                input_file_name(normalized_input_files[0]) if normalized_input_files else None
+            )
+            total_size_bytes = sum(input_file_size(item) for item in normalized_input_files)
 
             queued_run = enqueue_tool_version_run(
                 run_id=run_id,
@@ -252,6 +262,7 @@ class ExecuteToolVersionHandler(ExecuteToolVersionHandlerProtocol):
                 runs=self._runs,
                 sessions=self._sessions,
                 runner=self._runner,
+                code_cache=self._code_cache,
                 ui_normalizer=self._ui_normalizer,
                 clock=self._clock,
                 id_generator=self._id_generator,
@@ -17,7 +17,13 @@ from skriptoteket.domain.errors import DomainError, ErrorCode
 from skriptoteket.domain.identity.models import User
 from skriptoteket.domain.scripting.artifacts import ArtifactsManifest
 from skriptoteket.domain.scripting.execution import ToolExecutionResult
-from skriptoteket.domain.scripting.input_files import InputManifest, normalize_input_files
+from skriptoteket.domain.scripting.input_files import (
+    InputManifest,
+    RunnerInputFile,
+    input_file_name,
+    input_file_size,
+    normalize_input_files,
+)
 from skriptoteket.domain.scripting.models import (
     RunStatus,
     ToolVersion,
@@ -38,7 +44,7 @@ from skriptoteket.domain.scripting.ui.normalization import UiNormalizationResult
 from skriptoteket.domain.scripting.ui.policy import UiPolicy
 from skriptoteket.protocols.clock import ClockProtocol
 from skriptoteket.protocols.id_generator import IdGeneratorProtocol
-from skriptoteket.protocols.runner import ToolRunnerProtocol
+from skriptoteket.protocols.runner import ToolCodeCacheProtocol, ToolRunnerProtocol
 from skriptoteket.protocols.scripting import ToolRunRepositoryProtocol
 from skriptoteket.protocols.scripting_ui import UiPayloadNormalizerProtocol
 from skriptoteket.protocols.tool_sessions import ToolSessionRepositoryProtocol
@@ -86,13 +92,14 @@ async def execute_tool_version_pipeline(
     runs: ToolRunRepositoryProtocol,
     sessions: ToolSessionRepositoryProtocol,
     runner: ToolRunnerProtocol,
+    code_cache: ToolCodeCacheProtocol,
     ui_normalizer: UiPayloadNormalizerProtocol,
     clock: ClockProtocol,
     id_generator: IdGeneratorProtocol,
 ) -> ExecuteToolVersionResult:
     """Execute a tool version and persist run/session state."""
     normalized_input_values: dict[str, JsonValue] = {}
-    normalized_input_files: list[tuple[str, bytes]] = []
+    normalized_input_files: list[RunnerInputFile] = []
     input_manifest = InputManifest()
 
     input_schema = normalize_tool_input_schema(input_schema=version.input_schema)
@@ -110,8 +117,10 @@ async def execute_tool_version_pipeline(
             input_files=command.input_files
         )
 
-    primary_filename = normalized_input_files[0][0] if normalized_input_files else None
-    total_size_bytes = sum(len(content) for _, content in normalized_input_files)
+    primary_filename = (
+        input_file_name(normalized_input_files[0]) if normalized_input_files else None
+    )
+    total_size_bytes = sum(input_file_size(item) for item in normalized_input_files)
 
     run = start_tool_version_run(
         run_id=run_id,
@@ -190,7 +199,7 @@ async def execute_tool_version_pipeline(
     fallback_raw_result: ToolUiContractV2Result | None = None
 
     try:
-        compile(version.source_code, "<tool_version>", "exec")
+        compiled = code_cache.compile(version=version)
         execution_result = await runner.execute(
             run_id=run_id,
             version=version,
@@ -199,6 +208,8 @@ async def execute_tool_version_pipeline(
             input_values=normalized_input_values,
             memory_json=memory_json,
             action_payload=command.action_payload,
+            requested_by_user_id=actor.id,
+            script_bytecode=compiled.pyc,
         )
     except SyntaxError as exc:
         logger.warning(
@@ -353,6 +364,8 @@ async def execute_tool_version_pipeline(
             artifacts_manifest=execution_result.artifacts_manifest.model_dump(),
             error_summary=execution_result.ui_result.error_summary,
             ui_payload=normalization_result.ui_payload,
+            result_cache=execution_result.result_cache,
+            resource_usage=execution_result.resource_usage,
         )
 
     async with uow:
@@ -97,5 +97,7 @@ class GetRunHandler(GetRunHandlerProtocol):
                 artifacts=_artifacts_for_run(
                     run_id=run.id, artifacts_manifest=run.artifacts_manifest
                 ),
+                artifacts_expired_at=run.artifacts_expired_at,
+                result_cache=run.result_cache,
             )
         )
@@ -80,7 +80,7 @@ class RunActiveToolHandler(RunActiveToolHandlerProtocol):
         input_files = list(command.input_files)
 
         if not input_files and command.session_files_mode is SessionFilesMode.REUSE:
-            input_files = await self._session_files.get_files(
+            input_files = await self._session_files.get_stored_files(
                 tool_id=tool.id,
                 user_id=actor.id,
                 context=session_context,
@@ -37,7 +37,7 @@ from skriptoteket.protocols.scripting import (
     RunSandboxHandlerProtocol,
     ToolVersionRepositoryProtocol,
 )
-from skriptoteket.protocols.session_files import SessionFileStorageProtocol
+from skriptoteket.protocols.session_files import RunnerInputFile, SessionFileStorageProtocol
 from skriptoteket.protocols.tool_sessions import ToolSessionRepositoryProtocol
 from skriptoteket.protocols.uow import UnitOfWorkProtocol
 
@@ -260,10 +260,10 @@ class RunSandboxHandler(RunSandboxHandlerProtocol):
             await self._snapshots.create(snapshot=snapshot)
 
         input_files = list(command.input_files)
-        reuse_files: list[tuple[str, bytes]] = []
+        reuse_files: list[RunnerInputFile] = []
         if not input_files and command.session_files_mode is SessionFilesMode.REUSE:
             reuse_context = _require_sandbox_session_context(command.session_context)
-            reuse_files = await self._session_files.get_files(
+            reuse_files = await self._session_files.get_stored_files(
                 tool_id=command.tool_id,
                 user_id=actor.id,
                 context=reuse_context,
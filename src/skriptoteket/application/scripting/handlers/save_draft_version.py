@@ -141,6 +141,11 @@ class SaveDraftVersionHandler(SaveDraftVersionHandlerProtocol):
                 if "usage_instructions" in command.model_fields_set
                 else previous.usage_instructions
             )
+            effective_deterministic = (
+                command.deterministic
+                if "deterministic" in command.model_fields_set
+                else previous.deterministic
+            )
             saved = save_draft_snapshot(
                 previous_version=previous,
                 new_version_id=self._id_generator.new_uuid(),
@@ -150,6 +155,7 @@ class SaveDraftVersionHandler(SaveDraftVersionHandlerProtocol):
                 settings_schema=effective_settings_schema,
                 input_schema=effective_input_schema,
                 usage_instructions=effective_usage_instructions,
+                deterministic=effective_deterministic,
                 saved_by_user_id=actor.id,
                 change_summary=command.change_summary,
                 now=now,
@@ -312,7 +312,7 @@ class StartActionHandler(StartActionHandlerProtocol):
                     code=ErrorCode.INTERNAL_ERROR,
                     message="Internal error (missing active_version_id).",
                 )
-            persisted_files = await self._session_files.get_files(
+            persisted_files = await self._session_files.get_stored_files(
                 tool_id=command.tool_id,
                 user_id=actor.id,
                 context=context,
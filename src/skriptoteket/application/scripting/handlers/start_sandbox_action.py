@@ -215,7 +215,7 @@ class StartSandboxActionHandler(StartSandboxActionHandlerProtocol):
             "state": current_state,
         }
 
-        persisted_files = await self._session_files.get_files(
+        persisted_files = await self._session_files.get_stored_files(
             tool_id=command.tool_id,
             user_id=actor.id,
             context=context,
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from uuid import UUID
+
+from skriptoteket.application.scripting.interactive_tools import (
+    RunOutputChunkData,
+    RunOutputChunkEvent,
+    RunOutputDoneData,
+    RunOutputDoneEvent,
+    RunOutputStatusData,
+    RunOutputStatusEvent,
+    RunOutputStreamEvent,
+    StreamRunOutputQuery,
+)
+from skriptoteket.domain.errors import not_found
+from skriptoteket.domain.identity.models import User
+from skriptoteket.domain.scripting.models import RunStatus, ToolRun
+from skriptoteket.protocols.interactive_tools import StreamRunOutputHandlerProtocol
+from skriptoteket.protocols.run_logs import RunLogBufferProtocol, RunLogChunk, RunLogTail
+from skriptoteket.protocols.scripting import ToolRunRepositoryProtocol
+from skriptoteket.protocols.sleeper import SleeperProtocol
+from skriptoteket.protocols.uow import UnitOfWorkProtocol
+
+_ACTIVE_STATUSES = frozenset({RunStatus.QUEUED, RunStatus.RUNNING})
+# While output is still flowing, re-check the run row only every N polls.
+_STATUS_CHECK_EVERY_POLLS = 4
+
+
+def _merge_chunks(tail: RunLogTail) -> list[RunOutputChunkEvent]:
+    """Coalesce consecutive chunks of the same stream into one event per poll."""
+    events: list[RunOutputChunkEvent] = []
+    pending: list[RunLogChunk] = []
+
+    def flush() -> None:
+        if not pending:
+            return
+        events.append(
+            RunOutputChunkEvent(
+                data=RunOutputChunkData(
+                    seq=pending[-1].seq,
+                    stream=pending[-1].stream,
+                    text="".join(chunk.text for chunk in pending),
+                    dropped=tail.dropped and not events,
+                )
+            )
+        )
+        pending.clear()
+
+    for chunk in tail.chunks:
+        if pending and pending[-1].stream != chunk.stream:
+            flush()
+        pending.append(chunk)
+    flush()
+    return events
+
+
+class StreamRunOutputHandler(StreamRunOutputHandlerProtocol):
+    """Live stdout/stderr of a queued/running run, read from the runner's ring buffer.
+
+    Emits a `status` event as soon as the run is resolved, `output` events while the run
+    executes and a final `done` event once the run row is terminal; the persisted
+    (truncated) output on the run remains the source of truth.
+    """
+
+    def __init__(
+        self,
+        *,
+        uow: UnitOfWorkProtocol,
+        runs: ToolRunRepositoryProtocol,
+        run_logs: RunLogBufferProtocol,
+        sleeper: SleeperProtocol,
+        poll_interval_seconds: float,
+    ) -> None:
+        self._uow = uow
+        self._runs = runs
+        self._run_logs = run_logs
+        self._sleeper = sleeper
+        self._poll_interval_seconds = poll_interval_seconds
+
+    async def stream(
+        self,
+        *,
+        actor: User,
+        query: StreamRunOutputQuery,
+    ) -> AsyncIterator[RunOutputStreamEvent]:
+        run = await self._load_run(actor=actor, run_id=query.run_id)
+        yield RunOutputStatusEvent(data=RunOutputStatusData(status=run.status))
+        after_seq = 0
+        output_finished = False
+        polls = 0
+
+        while True:
+            if not output_finished:
+                tail = self._run_logs.read(run_id=run.id, after_seq=after_seq)
+                if tail is not None:
+                    for event in _merge_chunks(tail):
+                        yield event
+                    if tail.chunks:
+                        after_seq = tail.chunks[-1].seq
+                    output_finished = tail.finished
+
+            if run.status not in _ACTIVE_STATUSES:
+                yield RunOutputDoneEvent(data=RunOutputDoneData(status=run.status))
+                return
+
+            await self._sleeper.sleep(self._poll_interval_seconds)
+            polls += 1
+            if output_finished or polls % _STATUS_CHECK_EVERY_POLLS == 0:
+                run = await self._load_run(actor=actor, run_id=run.id)
+
+    async def _load_run(self, *, actor: User, run_id: UUID) -> ToolRun:
+        async with self._uow:
+            run = await self._runs.get_by_id(run_id=run_id)
+        if run is None or run.requested_by_user_id != actor.id:
+            raise not_found("ToolRun", str(run_id))
+        return run
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+from datetime import datetime
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field, JsonValue, field_validator
 
-from skriptoteket.domain.scripting.models import RunStatus
+from skriptoteket.domain.scripting.models import ResultCacheStatus, RunStatus
 from skriptoteket.domain.scripting.ui.contract_v2 import UiPayloadV2
 
 
@@ -80,6 +82,9 @@ class RunDetails(BaseModel):
     error_summary: str | None = None
     ui_payload: UiPayloadV2 | None = None
     artifacts: list[RunArtifact] = Field(default_factory=list)
+    # Set once retention deleted the files; `artifacts` still lists them for display.
+    artifacts_expired_at: datetime | None = None
+    result_cache: ResultCacheStatus | None = None
 
 
 class GetRunQuery(BaseModel):
@@ -94,6 +99,57 @@ class GetRunResult(BaseModel):
     run: RunDetails
 
 
+class StreamRunOutputQuery(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    run_id: UUID
+
+
+class RunOutputChunkData(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    seq: int
+    stream: Literal["stdout", "stderr"]
+    text: str
+    dropped: bool = False
+
+
+class RunOutputChunkEvent(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    event: Literal["output"] = "output"
+    data: RunOutputChunkData
+
+
+class RunOutputDoneData(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    status: RunStatus
+
+
+class RunOutputDoneEvent(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    event: Literal["done"] = "done"
+    data: RunOutputDoneData
+
+
+class RunOutputStatusData(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    status: RunStatus
+
+
+class RunOutputStatusEvent(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    event: Literal["status"] = "status"
+    data: RunOutputStatusData
+
+
+RunOutputStreamEvent = RunOutputStatusEvent | RunOutputChunkEvent | RunOutputDoneEvent
+
+
 class ListArtifactsQuery(BaseModel):
     model_config = ConfigDict(frozen=True)
 
@@ -105,3 +161,4 @@ class ListArtifactsResult(BaseModel):
 
     run_id: UUID
     artifacts: list[RunArtifact]
+    artifacts_expired_at: datetime | None = None
@@ -10,22 +10,32 @@ from skriptoteket.infrastructure.clock import UTCClock
 from skriptoteket.infrastructure.session_files.local_session_file_storage import (
     LocalSessionFileStorage,
 )
+from skriptoteket.infrastructure.session_files.usage_index import session_file_usage_index
 
 
 def cleanup_session_files(
     artifacts_root: Path | None = typer.Option(None, help="Override ARTIFACTS_ROOT"),
+    reconcile: bool = typer.Option(
+        False,
+        "--reconcile",
+        help="Rebuild the session index from disk first (picks up sessions it missed)",
+    ),
 ) -> None:
     """Delete expired session file directories based on TTL (cron-friendly)."""
-    asyncio.run(_cleanup_session_files_async(artifacts_root=artifacts_root))
+    asyncio.run(_cleanup_session_files_async(artifacts_root=artifacts_root, reconcile=reconcile))
 
 
-async def _cleanup_session_files_async(*, artifacts_root: Path | None) -> None:
+async def _cleanup_session_files_async(*, artifacts_root: Path | None, reconcile: bool) -> None:
     settings = Settings()
     effective_root = settings.ARTIFACTS_ROOT if artifacts_root is None else artifacts_root
+    if reconcile:
+        session_file_usage_index(effective_root).reconcile()
     storage = LocalSessionFileStorage(
         sessions_root=effective_root,
         ttl_seconds=settings.SESSION_FILES_TTL_SECONDS,
         clock=UTCClock(),
+        cleanup_batch_size=settings.SESSION_FILES_CLEANUP_BATCH_SIZE,
+        cleanup_max_sessions_per_second=settings.SESSION_FILES_CLEANUP_MAX_SESSIONS_PER_SECOND,
     )
     result = await storage.cleanup_expired()
     typer.echo(
@@ -1,45 +1,152 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
 from pathlib import Path
 
 import typer
 
+from skriptoteket.cli._db import open_session
 from skriptoteket.config import Settings
+from skriptoteket.infrastructure.db.uow import SQLAlchemyUnitOfWork
+from skriptoteket.infrastructure.repositories.tool_run_repository import (
+    PostgreSQLToolRunRepository,
+)
 from skriptoteket.infrastructure.runner.retention import (
+    LocalRunStoragePurger,
+    RunArtifactExpiry,
     prune_artifacts_root,
     prune_llm_captures_root,
+    prune_run_logs_root,
+    prune_upload_spool_root,
 )
+from skriptoteket.infrastructure.runner.s3_retention import S3RunStoragePurger
+from skriptoteket.infrastructure.storage.blob_store import LocalBlobStore
+from skriptoteket.infrastructure.storage.s3 import S3ObjectStore, s3_client_factory
+from skriptoteket.protocols.runner import RunStoragePurgerProtocol
 
 
 def prune_artifacts(
     retention_days: int | None = typer.Option(None, help="Override ARTIFACTS_RETENTION_DAYS"),
     artifacts_root: Path | None = typer.Option(None, help="Override ARTIFACTS_ROOT"),
     dry_run: bool = typer.Option(False),
+    sweep_untracked: bool = typer.Option(
+        False,
+        "--sweep-untracked",
+        help="Also walk ARTIFACTS_ROOT and delete run dirs older than N days by mtime "
+        "(catches directories without a tool_runs row)",
+    ),
 ) -> None:
-    """Delete artifact run directories and LLM captures older than N days (cron-friendly)."""
+    """Expire run artifacts/inputs finished more than N days ago; prune LLM captures and run logs.
+
+    Cron-friendly. Expired runs keep their row with `artifacts_expired_at` set. Finally removes
+    upload spool directories left by crashed requests and deletes blobs that no run input or
+    session file links to any more.
+    """
     settings = Settings()
     effective_root = settings.ARTIFACTS_ROOT if artifacts_root is None else artifacts_root
     effective_days = settings.ARTIFACTS_RETENTION_DAYS if retention_days is None else retention_days
 
     if dry_run:
         typer.echo(
-            "Dry run: would prune artifact directories and LLM captures under "
-            f"{effective_root} older than {effective_days} days."
+            "Dry run: would expire artifacts and run inputs of runs finished more than "
+            f"{effective_days} days ago, and prune LLM captures and run logs under "
+            f"{effective_root} older than {effective_days} days, then delete stale upload spools "
+            "and unreferenced blobs."
         )
         raise SystemExit(0)
 
+    asyncio.run(
+        _prune_artifacts_async(
+            settings=settings,
+            artifacts_root=effective_root,
+            retention_days=effective_days,
+            sweep_untracked=sweep_untracked,
+        )
+    )
+
+
+def _build_purger(*, settings: Settings, artifacts_root: Path) -> RunStoragePurgerProtocol:
+    local = LocalRunStoragePurger(artifacts_root=artifacts_root)
+    if settings.STORAGE_BACKEND != "s3":
+        return local
+    if not settings.STORAGE_S3_BUCKET:
+        raise ValueError("STORAGE_BACKEND=s3 requires STORAGE_S3_BUCKET")
+    store = S3ObjectStore(
+        client_factory=s3_client_factory(
+            endpoint_url=settings.STORAGE_S3_ENDPOINT_URL,
+            region=settings.STORAGE_S3_REGION,
+            access_key_id=settings.STORAGE_S3_ACCESS_KEY_ID,
+            secret_access_key=settings.STORAGE_S3_SECRET_ACCESS_KEY,
+        ),
+        bucket=settings.STORAGE_S3_BUCKET,
+        prefix=settings.STORAGE_S3_PREFIX,
+        part_size_bytes=settings.STORAGE_S3_MULTIPART_PART_BYTES,
+    )
+    return S3RunStoragePurger(store=store, local=local)
+
+
+async def _prune_artifacts_async(
+    *,
+    settings: Settings,
+    artifacts_root: Path,
+    retention_days: int,
+    sweep_untracked: bool,
+) -> None:
     now = datetime.now(timezone.utc)
-    deleted_runs = prune_artifacts_root(
-        artifacts_root=effective_root,
-        retention_days=effective_days,
-        now=now,
+    async with open_session(settings) as session:
+        expiry = RunArtifactExpiry(
+            uow=SQLAlchemyUnitOfWork(session),
+            runs=PostgreSQLToolRunRepository(session),
+            purger=_build_purger(settings=settings, artifacts_root=artifacts_root),
+            batch_size=settings.ARTIFACTS_RETENTION_BATCH_SIZE,
+            concurrency=settings.ARTIFACTS_RETENTION_CONCURRENCY,
+        )
+        result = await expiry.expire(retention_days=retention_days, now=now)
+
+    typer.echo(
+        "Expired run artifacts: "
+        f"runs={result.expired_runs} "
+        f"failed={result.failed_runs} "
+        f"bytes={result.bytes_deleted} "
+        f"seconds={result.elapsed_seconds:.2f} "
+        f"runs_per_second={result.runs_per_second:.1f} "
+        f"bytes_per_second={result.bytes_per_second:.0f}"
     )
+
+    if sweep_untracked:
+        swept = await asyncio.to_thread(
+            prune_artifacts_root,
+            artifacts_root=artifacts_root,
+            retention_days=retention_days,
+            now=now,
+        )
+        typer.echo(f"Deleted {swept} untracked artifact run directories from {artifacts_root}.")
+
     deleted_llm_captures = prune_llm_captures_root(
-        artifacts_root=effective_root,
-        retention_days=effective_days,
+        artifacts_root=artifacts_root,
+        retention_days=retention_days,
+        now=now,
+    )
+    deleted_run_logs = prune_run_logs_root(
+        artifacts_root=artifacts_root,
+        retention_days=retention_days,
         now=now,
     )
-    llm_captures_root = effective_root / "llm-captures"
-    typer.echo(f"Deleted {deleted_runs} artifact run directories from {effective_root}.")
+    llm_captures_root = artifacts_root / "llm-captures"
     typer.echo(f"Deleted {deleted_llm_captures} LLM capture directories from {llm_captures_root}.")
+    typer.echo(f"Deleted {deleted_run_logs} live run logs from {artifacts_root / 'run-logs'}.")
+
+    # Before blob GC, so files a stale spool directory still links to can be collected.
+    deleted_spools = await asyncio.to_thread(
+        prune_upload_spool_root, artifacts_root=artifacts_root, now=now
+    )
+    typer.echo(f"Deleted {deleted_spools} stale upload spool directories.")
+
+    blobs = await asyncio.to_thread(
+        LocalBlobStore(artifacts_root=artifacts_root).collect_garbage, now=now
+    )
+    typer.echo(
+        f"Deleted {blobs.deleted_blobs} of {blobs.scanned_blobs} blobs "
+        f"({blobs.deleted_bytes} bytes) no longer referenced."
+    )
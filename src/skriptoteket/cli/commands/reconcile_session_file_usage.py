@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import typer
+
+from skriptoteket.config import Settings
+from skriptoteket.infrastructure.session_files.usage_index import session_file_usage_index
+
+
+def reconcile_session_file_usage(
+    artifacts_root: Path | None = typer.Option(None, help="Override ARTIFACTS_ROOT"),
+) -> None:
+    """Rebuild the session file usage index from a directory walk (repairs drift)."""
+    settings = Settings()
+    effective_root = settings.ARTIFACTS_ROOT if artifacts_root is None else artifacts_root
+    before, after = session_file_usage_index(effective_root).reconcile()
+    typer.echo(
+        "Reconcile session file usage complete: "
+        f"sessions={after.sessions} (was {before.sessions}) "
+        f"files={after.files} (was {before.files}) "
+        f"bytes_total={after.bytes_total} (was {before.bytes_total}) "
+        f"artifacts_root={effective_root}"
+    )
@@ -11,6 +11,18 @@ def run_execution_worker(
     queue: str = typer.Option("default", help="Queue name to consume from"),
     worker_id: str | None = typer.Option(None, help="Override worker identity"),
     once: bool = typer.Option(False, help="Process at most one job and exit"),
+    concurrency: int = typer.Option(
+        1,
+        min=1,
+        help="Max claimed jobs in flight in this process (capped at RUNNER_MAX_CONCURRENCY)",
+    ),
 ) -> None:
     """Run the Postgres execution-queue worker loop (ADR-0062)."""
-    asyncio.run(run_execution_queue_worker(queue=queue, worker_id=worker_id, once=once))
+    asyncio.run(
+        run_execution_queue_worker(
+            queue=queue,
+            worker_id=worker_id,
+            once=once,
+            concurrency=concurrency,
+        )
+    )
@@ -417,6 +417,7 @@ async def _seed_one_entry(
                     settings_schema=entry.settings_schema,
                     input_schema=entry.input_schema,
                     usage_instructions=entry.usage_instructions,
+                    deterministic=entry.deterministic,
                     change_summary="Seed: initial version från repo",
                 ),
             )
@@ -440,6 +441,7 @@ async def _seed_one_entry(
         or active_version.usage_instructions != entry.usage_instructions
         or active_version.settings_schema != entry.settings_schema
         or active_version.input_schema != entry.input_schema
+        or active_version.deterministic != entry.deterministic
     ):
         if dry_run:
             typer.echo(f"[dry-run] Create + publish updated version: {entry.slug}")
@@ -462,6 +464,7 @@ async def _seed_one_entry(
                     settings_schema=entry.settings_schema,
                     input_schema=entry.input_schema,
                     usage_instructions=entry.usage_instructions,
+                    deterministic=entry.deterministic,
                     change_summary="Seed: uppdaterad version från repo",
                 ),
             )
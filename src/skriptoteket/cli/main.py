@@ -9,6 +9,7 @@ from skriptoteket.cli.commands.cleanup_session_files import cleanup_session_file
 from skriptoteket.cli.commands.clear_all_session_files import clear_all_session_files
 from skriptoteket.cli.commands.provision_user import provision_user
 from skriptoteket.cli.commands.prune_artifacts import prune_artifacts
+from skriptoteket.cli.commands.reconcile_session_file_usage import reconcile_session_file_usage
 from skriptoteket.cli.commands.run_execution_worker import run_execution_worker
 from skriptoteket.cli.commands.seed_script_bank import seed_script_bank
 
@@ -21,5 +22,6 @@ app.command()(cleanup_session_files)
 app.command()(cleanup_sandbox_snapshots)
 app.command()(cleanup_login_events)
 app.command()(clear_all_session_files)
+app.command()(reconcile_session_file_usage)
 app.command()(seed_script_bank)
 app.command()(run_execution_worker)
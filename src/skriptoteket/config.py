@@ -39,22 +39,81 @@ class Settings(BaseSettings):
     # Runner (ST-04-02)
     RUNNER_IMAGE: str = "skriptoteket-runner:latest"
     RUNNER_MAX_CONCURRENCY: int = 1
+    # Opt-in admission queue (0 = ADR-0016 cap + reject). Bounded FIFO with per-user limit.
+    RUNNER_ADMISSION_QUEUE_MAX_LENGTH: int = 0
+    RUNNER_ADMISSION_QUEUE_MAX_WAIT_SECONDS: float = 10.0
+    RUNNER_ADMISSION_QUEUE_MAX_PER_USER: int = 1
     RUNNER_QUEUE_ENABLED: bool = True
     RUNNER_QUEUE_MAX_ATTEMPTS: int = 1
     RUNNER_QUEUE_LEASE_TTL_SECONDS: int = 60
     RUNNER_QUEUE_HEARTBEAT_INTERVAL_SECONDS: int = 15
     RUNNER_QUEUE_REAPER_INTERVAL_SECONDS: int = 15
     RUNNER_QUEUE_POLL_INTERVAL_SECONDS: float = 1.0
+    # Workers LISTEN for enqueue NOTIFYs; while listening, polling is only a slow safety net.
+    RUNNER_QUEUE_LISTEN_ENABLED: bool = True
+    RUNNER_QUEUE_LISTEN_FALLBACK_POLL_SECONDS: float = 15.0
     RUNNER_QUEUE_ADOPT_MISSING_BACKOFF_SECONDS: int = 5
+    # Claim order: users take turns within a priority (their running jobs count against them)
+    # instead of strict FIFO, so one batch submission cannot starve everyone else.
+    RUNNER_QUEUE_FAIR_SHARE_ENABLED: bool = True
+    # Max running jobs per tool across all workers of a queue (0 = unlimited). Soft under
+    # concurrent claims: workers claiming at the same instant may each take the last slot.
+    RUNNER_QUEUE_MAX_RUNNING_PER_TOOL: int = 0
     RUNNER_TIMEOUT_SANDBOX_SECONDS: int = 60
     RUNNER_TIMEOUT_PRODUCTION_SECONDS: int = 120
     RUNNER_CPU_LIMIT: float = 1.0
     RUNNER_MEMORY_LIMIT: str = "1g"
     RUNNER_PIDS_LIMIT: int = 256
     RUNNER_TMPFS_TMP: str = "rw,noexec,nosuid,nodev,size=256m,mode=1777"
+    # `docker_sdk`: docker-py, one thread per run. `async`: Engine API coroutines (no warm pool).
+    RUNNER_ENGINE: Literal["docker_sdk", "async"] = "docker_sdk"
+    # Shared Docker client: ping at most this often; reconnect when the ping fails.
+    RUNNER_DOCKER_HEALTH_CHECK_INTERVAL_SECONDS: float = 30.0
+    # docker_sdk engine: schedule runs across Docker daemons, comma-separated `<url>=<capacity>`
+    # (e.g. `unix:///var/run/docker.sock=2,tcp://runner-2:2376=4`). Empty = one endpoint from the
+    # environment. RUNNER_MAX_CONCURRENCY stays the process-wide cap.
+    RUNNER_DOCKER_ENDPOINTS: str = ""
+    # A failing endpoint is taken out of rotation for this long.
+    RUNNER_DOCKER_ENDPOINT_COOLDOWN_SECONDS: float = 30.0
+    # Warm pool: pre-created (not started) runner containers per process (off by default).
+    RUNNER_WARM_POOL_ENABLED: bool = False
+    RUNNER_WARM_POOL_SIZE: int = 2
+    # Fork-server mode (warm pool only): pool containers start immediately, import these modules
+    # while idle and fork the run once its workdir is copied in.
+    RUNNER_FORK_SERVER_ENABLED: bool = False
+    RUNNER_FORK_SERVER_PRELOAD_MODULES: str = "weasyprint,openpyxl,docx,pypandoc"
+    # Compiled tool scripts (.pyc) kept per process, keyed by tool version content hash.
+    RUNNER_CODE_CACHE_MAX_ENTRIES: int = 256
+    # Sample container stats (memory/CPU/block IO/pids) per run into tool_runs.resource_usage.
+    RUNNER_RESOURCE_STATS_ENABLED: bool = True
+    # Worker-only Prometheus exporter (0 = disabled); the web app serves `/metrics` itself.
+    RUNNER_WORKER_METRICS_PORT: int = 0
 
     ARTIFACTS_ROOT: Path = Path("/var/lib/skriptoteket/artifacts")
     ARTIFACTS_RETENTION_DAYS: int = 7
+    # `prune-artifacts` expires runs by `tool_runs.finished_at` in batches, deleting up to
+    # ARTIFACTS_RETENTION_CONCURRENCY runs' files at a time.
+    ARTIFACTS_RETENTION_BATCH_SIZE: int = 500
+    ARTIFACTS_RETENTION_CONCURRENCY: int = 8
+    # Store gzip (and zstd on Python 3.14+) copies of text-like artifacts next to the run output so
+    # downloads can serve them as-is to clients that accept the encoding.
+    ARTIFACTS_PRECOMPRESS_ENABLED: bool = False
+    ARTIFACTS_PRECOMPRESS_MIN_BYTES: int = 4096
+
+    # Where run artifacts, run inputs and session files live. `s3` needs the `s3` extra (boto3)
+    # and works with any S3-compatible store (MinIO, Ceph, ...); downloads redirect to presigned
+    # URLs. Run logs, the result cache and LLM captures stay under ARTIFACTS_ROOT either way.
+    STORAGE_BACKEND: Literal["filesystem", "s3"] = "filesystem"
+    STORAGE_S3_BUCKET: str = ""
+    STORAGE_S3_PREFIX: str = ""
+    STORAGE_S3_ENDPOINT_URL: str = ""
+    STORAGE_S3_REGION: str = ""
+    # Empty = the standard AWS credential chain (environment, instance profile, ...).
+    STORAGE_S3_ACCESS_KEY_ID: str = ""
+    STORAGE_S3_SECRET_ACCESS_KEY: str = ""
+    STORAGE_S3_PRESIGNED_URL_TTL_SECONDS: int = 300
+    # Multipart part size for streamed uploads (S3 minimum: 5 MiB).
+    STORAGE_S3_MULTIPART_PART_BYTES: int = 8 * 1024 * 1024
 
     # Platform-only debug capture (OFF by default; see ADR-0051).
     # Captures are written under ARTIFACTS_ROOT and may contain tool code/model output.
@@ -68,12 +127,22 @@ class Settings(BaseSettings):
     RUN_OUTPUT_MAX_STDERR_BYTES: int = 200_000
     RUN_OUTPUT_MAX_HTML_BYTES: int = 500_000
     RUN_OUTPUT_MAX_ERROR_SUMMARY_BYTES: int = 20_000
+    # Live stdout/stderr ring buffer per run (ARTIFACTS_ROOT/run-logs), read by the SSE endpoint.
+    RUN_OUTPUT_LIVE_STREAM_ENABLED: bool = True
+    RUN_OUTPUT_LIVE_BUFFER_BYTES: int = 256_000
+    RUN_OUTPUT_LIVE_POLL_INTERVAL_SECONDS: float = 0.5
+    # Results of `deterministic` tool versions, reused across runs (ARTIFACTS_ROOT/run-cache, LRU).
+    RUN_RESULT_CACHE_ENABLED: bool = True
+    RUN_RESULT_CACHE_MAX_BYTES: int = 1_000_000_000
 
     UPLOAD_MAX_FILES: int = 20
     UPLOAD_MAX_FILE_BYTES: int = 20_000_000
     UPLOAD_MAX_TOTAL_BYTES: int = 50_000_000
 
     SESSION_FILES_TTL_SECONDS: int = 60 * 60 * 24  # 24 hours (ADR-0039)
+    # TTL cleanup deletes expired sessions in batches; 0 = no rate limit.
+    SESSION_FILES_CLEANUP_BATCH_SIZE: int = 500
+    SESSION_FILES_CLEANUP_MAX_SESSIONS_PER_SECOND: float = 200.0
     SANDBOX_SNAPSHOT_TTL_SECONDS: int = 60 * 60 * 24  # 24 hours (ADR-0044)
     SANDBOX_SNAPSHOT_MAX_BYTES: int = 2_000_000  # 2 MB (ADR-0044)
 
@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Callable
+from functools import partial
 
 from dishka import Provider, Scope, provide
 from sqlalchemy.ext.asyncio import (
@@ -20,6 +21,10 @@ from skriptoteket.infrastructure.curated_apps.registry import InMemoryCuratedApp
 from skriptoteket.infrastructure.db.uow import SQLAlchemyUnitOfWork
 from skriptoteket.infrastructure.email.smtp_sender import SmtpEmailSender
 from skriptoteket.infrastructure.email.template_renderer import Jinja2EmailTemplateRenderer
+from skriptoteket.infrastructure.execution_queue_notifications import (
+    PostgresExecutionQueueListener,
+    asyncpg_dsn,
+)
 from skriptoteket.infrastructure.id_generator import UUID4Generator
 from skriptoteket.infrastructure.repositories.category_repository import (
     PostgreSQLCategoryRepository,
@@ -78,14 +83,41 @@ from skriptoteket.infrastructure.repositories.user_favorite_repository import (
 from skriptoteket.infrastructure.repositories.user_repository import PostgreSQLUserRepository
 from skriptoteket.infrastructure.runner.artifact_manager import FilesystemArtifactManager
 from skriptoteket.infrastructure.runner.capacity import RunnerCapacityLimiter
+from skriptoteket.infrastructure.runner.code_cache import InMemoryToolCodeCache
+from skriptoteket.infrastructure.runner.docker.async_client import HttpxDockerClient
+from skriptoteket.infrastructure.runner.docker.async_runner import AsyncDockerToolRunner
+from skriptoteket.infrastructure.runner.docker.endpoints import (
+    LOCAL_ENDPOINT_NAME,
+    DockerEndpoint,
+    DockerEndpointPool,
+    docker_client_for_endpoint,
+    parse_docker_endpoints,
+)
+from skriptoteket.infrastructure.runner.docker.protocols import DockerClientProtocol
+from skriptoteket.infrastructure.runner.docker.shared_client import (
+    PersistentDockerClient,
+    docker_client_from_env,
+)
+from skriptoteket.infrastructure.runner.docker.warm_pool import DockerWarmPool
 from skriptoteket.infrastructure.runner.docker_runner import DockerRunnerLimits, DockerToolRunner
+from skriptoteket.infrastructure.runner.result_cache import (
+    FilesystemToolResultCache,
+    MemoizingToolRunner,
+)
 from skriptoteket.infrastructure.runner.run_input_storage import LocalRunInputStorage
+from skriptoteket.infrastructure.runner.run_log_buffer import LocalRunLogBuffer
+from skriptoteket.infrastructure.runner.s3_artifact_manager import S3ArtifactManager
+from skriptoteket.infrastructure.runner.s3_run_input_storage import S3RunInputStorage
 from skriptoteket.infrastructure.scripting_ui.backend_actions import NoopBackendActionProvider
 from skriptoteket.infrastructure.scripting_ui.policy_provider import DefaultUiPolicyProvider
 from skriptoteket.infrastructure.security.password_hasher import Argon2PasswordHasher
 from skriptoteket.infrastructure.session_files.local_session_file_storage import (
     LocalSessionFileStorage,
 )
+from skriptoteket.infrastructure.session_files.s3_session_file_storage import (
+    S3SessionFileStorage,
+)
+from skriptoteket.infrastructure.storage.s3 import S3ObjectStore, s3_client_factory
 from skriptoteket.infrastructure.time.asyncio_sleeper import AsyncioSleeper
 from skriptoteket.infrastructure.token_generator import SecureTokenGenerator
 from skriptoteket.protocols.catalog import (
@@ -103,7 +135,10 @@ from skriptoteket.protocols.curated_apps import (
 from skriptoteket.protocols.draft_locks import DraftLockRepositoryProtocol
 from skriptoteket.protocols.email import EmailSenderProtocol, EmailTemplateRendererProtocol
 from skriptoteket.protocols.email_verification import EmailVerificationTokenRepositoryProtocol
-from skriptoteket.protocols.execution_queue import ToolRunJobRepositoryProtocol
+from skriptoteket.protocols.execution_queue import (
+    ExecutionQueueNotificationListenerProtocol,
+    ToolRunJobRepositoryProtocol,
+)
 from skriptoteket.protocols.favorites import FavoritesRepositoryProtocol
 from skriptoteket.protocols.id_generator import IdGeneratorProtocol
 from skriptoteket.protocols.identity import (
@@ -114,8 +149,10 @@ from skriptoteket.protocols.identity import (
 )
 from skriptoteket.protocols.login_events import LoginEventRepositoryProtocol
 from skriptoteket.protocols.run_inputs import RunInputStorageProtocol
+from skriptoteket.protocols.run_logs import RunLogBufferProtocol
 from skriptoteket.protocols.runner import (
     ArtifactManagerProtocol,
+    ToolCodeCacheProtocol,
     ToolRunnerAdoptionProtocol,
     ToolRunnerProtocol,
 )
@@ -141,6 +178,57 @@ from skriptoteket.protocols.tool_session_turns import ToolSessionTurnRepositoryP
 from skriptoteket.protocols.tool_sessions import ToolSessionRepositoryProtocol
 from skriptoteket.protocols.uow import UnitOfWorkProtocol
 
+# Docker API connections one run can hold at once: the blocking `wait`, the live-output
+# follower, the resource-stats stream and short API calls (archive copy, inspect).
+_DOCKER_CONNECTIONS_PER_RUN = 4
+
+
+def _docker_endpoint(
+    *,
+    settings: Settings,
+    limits: DockerRunnerLimits,
+    name: str,
+    client_factory: Callable[[], DockerClientProtocol],
+    capacity: int | None,
+) -> DockerEndpoint:
+    client = PersistentDockerClient(
+        client_factory=client_factory,
+        health_check_interval_seconds=settings.RUNNER_DOCKER_HEALTH_CHECK_INTERVAL_SECONDS,
+    )
+    warm_pool: DockerWarmPool | None = None
+    if settings.RUNNER_WARM_POOL_ENABLED:
+        warm_pool = DockerWarmPool(
+            client_provider=client.get,
+            runner_image=settings.RUNNER_IMAGE,
+            limits=limits,
+            size=settings.RUNNER_WARM_POOL_SIZE,
+            fork_server=settings.RUNNER_FORK_SERVER_ENABLED,
+            preload_modules=[
+                module.strip()
+                for module in settings.RUNNER_FORK_SERVER_PRELOAD_MODULES.split(",")
+                if module.strip()
+            ],
+        )
+    return DockerEndpoint(name=name, client=client, capacity=capacity, warm_pool=warm_pool)
+
+
+def _with_result_cache(
+    *,
+    settings: Settings,
+    runner: AsyncDockerToolRunner | DockerToolRunner,
+) -> ToolRunnerProtocol:
+    # Cached results are restored into ARTIFACTS_ROOT/{run_id}, which the S3 backend never reads.
+    if not settings.RUN_RESULT_CACHE_ENABLED or settings.STORAGE_BACKEND == "s3":
+        return runner
+    return MemoizingToolRunner(
+        runner=runner,
+        cache=FilesystemToolResultCache(
+            artifacts_root=settings.ARTIFACTS_ROOT,
+            max_bytes=settings.RUN_RESULT_CACHE_MAX_BYTES,
+        ),
+        runner_image=settings.RUNNER_IMAGE,
+    )
+
 
 class InfrastructureProvider(Provider):
     """Provides database, repositories, and core infrastructure services."""
@@ -203,42 +291,174 @@ class InfrastructureProvider(Provider):
 
     @provide(scope=Scope.APP)
     def runner_capacity(self, settings: Settings) -> RunnerCapacityLimiter:
-        return RunnerCapacityLimiter(max_concurrency=settings.RUNNER_MAX_CONCURRENCY)
+        return RunnerCapacityLimiter(
+            max_concurrency=settings.RUNNER_MAX_CONCURRENCY,
+            max_queue_length=settings.RUNNER_ADMISSION_QUEUE_MAX_LENGTH,
+            max_wait_seconds=settings.RUNNER_ADMISSION_QUEUE_MAX_WAIT_SECONDS,
+            max_queued_per_owner=settings.RUNNER_ADMISSION_QUEUE_MAX_PER_USER,
+        )
 
     @provide(scope=Scope.APP)
-    def artifact_manager(self, settings: Settings) -> ArtifactManagerProtocol:
-        return FilesystemArtifactManager(artifacts_root=settings.ARTIFACTS_ROOT)
+    def object_store(self, settings: Settings) -> S3ObjectStore:
+        # The boto3 client is created on first use, so this is free for the filesystem backend.
+        return S3ObjectStore(
+            client_factory=s3_client_factory(
+                endpoint_url=settings.STORAGE_S3_ENDPOINT_URL,
+                region=settings.STORAGE_S3_REGION,
+                access_key_id=settings.STORAGE_S3_ACCESS_KEY_ID,
+                secret_access_key=settings.STORAGE_S3_SECRET_ACCESS_KEY,
+            ),
+            bucket=settings.STORAGE_S3_BUCKET,
+            prefix=settings.STORAGE_S3_PREFIX,
+            part_size_bytes=settings.STORAGE_S3_MULTIPART_PART_BYTES,
+        )
+
+    @provide(scope=Scope.APP)
+    def artifact_manager(
+        self,
+        settings: Settings,
+        object_store: S3ObjectStore,
+    ) -> ArtifactManagerProtocol:
+        local = FilesystemArtifactManager(
+            artifacts_root=settings.ARTIFACTS_ROOT,
+            precompress_min_bytes=(
+                settings.ARTIFACTS_PRECOMPRESS_MIN_BYTES
+                if settings.ARTIFACTS_PRECOMPRESS_ENABLED
+                else None
+            ),
+        )
+        if settings.STORAGE_BACKEND != "s3":
+            return local
+        if not settings.STORAGE_S3_BUCKET:
+            raise ValueError("STORAGE_BACKEND=s3 requires STORAGE_S3_BUCKET")
+        return S3ArtifactManager(
+            store=object_store,
+            local=local,
+            presigned_url_ttl_seconds=settings.STORAGE_S3_PRESIGNED_URL_TTL_SECONDS,
+        )
 
     @provide(scope=Scope.APP)
     def session_file_storage(
         self,
         settings: Settings,
         clock: ClockProtocol,
+        sleeper: SleeperProtocol,
+        object_store: S3ObjectStore,
     ) -> SessionFileStorageProtocol:
+        if settings.STORAGE_BACKEND == "s3":
+            return S3SessionFileStorage(
+                store=object_store,
+                ttl_seconds=settings.SESSION_FILES_TTL_SECONDS,
+                clock=clock,
+            )
         return LocalSessionFileStorage(
             sessions_root=settings.ARTIFACTS_ROOT,
             ttl_seconds=settings.SESSION_FILES_TTL_SECONDS,
             clock=clock,
+            cleanup_batch_size=settings.SESSION_FILES_CLEANUP_BATCH_SIZE,
+            cleanup_max_sessions_per_second=settings.SESSION_FILES_CLEANUP_MAX_SESSIONS_PER_SECOND,
+            sleeper=sleeper,
         )
 
     @provide(scope=Scope.APP)
-    def run_input_storage(self, settings: Settings) -> RunInputStorageProtocol:
+    def run_input_storage(
+        self,
+        settings: Settings,
+        object_store: S3ObjectStore,
+    ) -> RunInputStorageProtocol:
+        if settings.STORAGE_BACKEND == "s3":
+            return S3RunInputStorage(store=object_store, spool_root=settings.ARTIFACTS_ROOT)
         return LocalRunInputStorage(artifacts_root=settings.ARTIFACTS_ROOT)
 
     @provide(scope=Scope.APP)
-    def tool_runner(
+    def run_log_buffer(self, settings: Settings) -> RunLogBufferProtocol:
+        return LocalRunLogBuffer(
+            artifacts_root=settings.ARTIFACTS_ROOT,
+            max_bytes=settings.RUN_OUTPUT_LIVE_BUFFER_BYTES,
+        )
+
+    @provide(scope=Scope.APP)
+    def tool_code_cache(self, settings: Settings) -> ToolCodeCacheProtocol:
+        return InMemoryToolCodeCache(max_entries=settings.RUNNER_CODE_CACHE_MAX_ENTRIES)
+
+    @provide(scope=Scope.APP)
+    async def tool_runner(
         self,
         settings: Settings,
         capacity: RunnerCapacityLimiter,
         artifacts: ArtifactManagerProtocol,
-    ) -> ToolRunnerProtocol:
+        run_log_buffer: RunLogBufferProtocol,
+    ) -> AsyncIterator[ToolRunnerProtocol]:
         limits = DockerRunnerLimits(
             cpu_limit=settings.RUNNER_CPU_LIMIT,
             memory_limit=settings.RUNNER_MEMORY_LIMIT,
             pids_limit=settings.RUNNER_PIDS_LIMIT,
             tmpfs_tmp=settings.RUNNER_TMPFS_TMP,
         )
-        return DockerToolRunner(
+        run_logs = run_log_buffer if settings.RUN_OUTPUT_LIVE_STREAM_ENABLED else None
+        endpoint_configs = parse_docker_endpoints(settings.RUNNER_DOCKER_ENDPOINTS)
+        if settings.RUNNER_ENGINE == "async":
+            if endpoint_configs:
+                raise ValueError("RUNNER_DOCKER_ENDPOINTS requires RUNNER_ENGINE=docker_sdk")
+            async_client = HttpxDockerClient.from_env(
+                max_connections=_DOCKER_CONNECTIONS_PER_RUN * settings.RUNNER_MAX_CONCURRENCY + 1
+            )
+            async_runner = AsyncDockerToolRunner(
+                runner_image=settings.RUNNER_IMAGE,
+                sandbox_timeout_seconds=settings.RUNNER_TIMEOUT_SANDBOX_SECONDS,
+                production_timeout_seconds=settings.RUNNER_TIMEOUT_PRODUCTION_SECONDS,
+                limits=limits,
+                output_max_stdout_bytes=settings.RUN_OUTPUT_MAX_STDOUT_BYTES,
+                output_max_stderr_bytes=settings.RUN_OUTPUT_MAX_STDERR_BYTES,
+                output_max_error_summary_bytes=settings.RUN_OUTPUT_MAX_ERROR_SUMMARY_BYTES,
+                capacity=capacity,
+                artifacts=artifacts,
+                client=async_client,
+                run_logs=run_logs,
+                resource_stats=settings.RUNNER_RESOURCE_STATS_ENABLED,
+            )
+            yield _with_result_cache(settings=settings, runner=async_runner)
+            await async_client.close()
+            return
+
+        # Connections for every concurrent run, plus one for warm-pool refills and health checks.
+        if endpoint_configs:
+            endpoints = [
+                _docker_endpoint(
+                    settings=settings,
+                    limits=limits,
+                    name=config.url,
+                    client_factory=partial(
+                        docker_client_for_endpoint,
+                        url=config.url,
+                        max_pool_size=_DOCKER_CONNECTIONS_PER_RUN * config.capacity + 1,
+                    ),
+                    capacity=config.capacity,
+                )
+                for config in endpoint_configs
+            ]
+        else:
+            endpoints = [
+                _docker_endpoint(
+                    settings=settings,
+                    limits=limits,
+                    name=LOCAL_ENDPOINT_NAME,
+                    client_factory=partial(
+                        docker_client_from_env,
+                        max_pool_size=(
+                            _DOCKER_CONNECTIONS_PER_RUN * settings.RUNNER_MAX_CONCURRENCY + 1
+                        ),
+                    ),
+                    capacity=None,
+                )
+            ]
+        endpoint_pool = DockerEndpointPool(
+            endpoints=endpoints,
+            cooldown_seconds=settings.RUNNER_DOCKER_ENDPOINT_COOLDOWN_SECONDS,
+        )
+        endpoint_pool.start()
+
+        runner = DockerToolRunner(
             runner_image=settings.RUNNER_IMAGE,
             sandbox_timeout_seconds=settings.RUNNER_TIMEOUT_SANDBOX_SECONDS,
             production_timeout_seconds=settings.RUNNER_TIMEOUT_PRODUCTION_SECONDS,
@@ -248,7 +468,12 @@ class InfrastructureProvider(Provider):
             output_max_error_summary_bytes=settings.RUN_OUTPUT_MAX_ERROR_SUMMARY_BYTES,
             capacity=capacity,
             artifacts=artifacts,
+            endpoints=endpoint_pool,
+            run_logs=run_logs,
+            resource_stats=settings.RUNNER_RESOURCE_STATS_ENABLED,
         )
+        yield _with_result_cache(settings=settings, runner=runner)
+        endpoint_pool.close()
 
     @provide(scope=Scope.APP)
     def tool_runner_adoption(self, runner: ToolRunnerProtocol) -> ToolRunnerAdoptionProtocol:
@@ -330,6 +555,17 @@ class InfrastructureProvider(Provider):
     def tool_run_job_repo(self, session: AsyncSession) -> ToolRunJobRepositoryProtocol:
         return PostgreSQLToolRunJobRepository(session)
 
+    @provide(scope=Scope.APP)
+    async def execution_queue_listener(
+        self,
+        settings: Settings,
+    ) -> AsyncIterator[ExecutionQueueNotificationListenerProtocol]:
+        listener = PostgresExecutionQueueListener(dsn=asyncpg_dsn(settings.DATABASE_URL))
+        try:
+            yield listener
+        finally:
+            await listener.close()
+
     @provide(scope=Scope.REQUEST)
     def tool_session_repo(self, session: AsyncSession) -> ToolSessionRepositoryProtocol:
         return PostgreSQLToolSessionRepository(session)
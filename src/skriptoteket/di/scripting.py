@@ -28,6 +28,9 @@ from skriptoteket.application.scripting.handlers.list_session_files import (
 )
 from skriptoteket.application.scripting.handlers.run_active_tool import RunActiveToolHandler
 from skriptoteket.application.scripting.handlers.start_action import StartActionHandler
+from skriptoteket.application.scripting.handlers.stream_run_output import (
+    StreamRunOutputHandler,
+)
 from skriptoteket.application.scripting.handlers.update_tool_session_state import (
     UpdateToolSessionStateHandler,
 )
@@ -49,9 +52,11 @@ from skriptoteket.protocols.interactive_tools import (
     ListArtifactsHandlerProtocol,
     ListSessionFilesHandlerProtocol,
     StartActionHandlerProtocol,
+    StreamRunOutputHandlerProtocol,
 )
 from skriptoteket.protocols.run_inputs import RunInputStorageProtocol
-from skriptoteket.protocols.runner import ToolRunnerProtocol
+from skriptoteket.protocols.run_logs import RunLogBufferProtocol
+from skriptoteket.protocols.runner import ToolCodeCacheProtocol, ToolRunnerProtocol
 from skriptoteket.protocols.scripting import (
     ExecuteToolVersionHandlerProtocol,
     RunActiveToolHandlerProtocol,
@@ -64,6 +69,7 @@ from skriptoteket.protocols.scripting_ui import (
     UiPolicyProviderProtocol,
 )
 from skriptoteket.protocols.session_files import SessionFileStorageProtocol
+from skriptoteket.protocols.sleeper import SleeperProtocol
 from skriptoteket.protocols.tool_sessions import (
     ClearToolSessionStateHandlerProtocol,
     GetToolSessionStateHandlerProtocol,
@@ -147,6 +153,23 @@ class ScriptingProvider(Provider):
             curated_apps=curated_apps,
         )
 
+    @provide(scope=Scope.REQUEST)
+    def stream_run_output_handler(
+        self,
+        settings: Settings,
+        uow: UnitOfWorkProtocol,
+        runs: ToolRunRepositoryProtocol,
+        run_logs: RunLogBufferProtocol,
+        sleeper: SleeperProtocol,
+    ) -> StreamRunOutputHandlerProtocol:
+        return StreamRunOutputHandler(
+            uow=uow,
+            runs=runs,
+            run_logs=run_logs,
+            sleeper=sleeper,
+            poll_interval_seconds=settings.RUN_OUTPUT_LIVE_POLL_INTERVAL_SECONDS,
+        )
+
     @provide(scope=Scope.REQUEST)
     def list_interactive_artifacts_handler(
         self,
@@ -254,6 +277,7 @@ class ScriptingProvider(Provider):
         run_inputs: RunInputStorageProtocol,
         sessions: ToolSessionRepositoryProtocol,
         runner: ToolRunnerProtocol,
+        code_cache: ToolCodeCacheProtocol,
         ui_policy_provider: UiPolicyProviderProtocol,
         backend_actions: BackendActionProviderProtocol,
         ui_normalizer: UiPayloadNormalizerProtocol,
@@ -269,6 +293,7 @@ class ScriptingProvider(Provider):
             run_inputs=run_inputs,
             sessions=sessions,
             runner=runner,
+            code_cache=code_cache,
             ui_policy_provider=ui_policy_provider,
             backend_actions=backend_actions,
             ui_normalizer=ui_normalizer,
@@ -27,6 +27,9 @@ class ErrorCode(StrEnum):
     USER_NOT_FOUND = "USER_NOT_FOUND"
     SESSION_NOT_FOUND = "SESSION_NOT_FOUND"
 
+    # Gone (410)
+    ARTIFACTS_EXPIRED = "ARTIFACTS_EXPIRED"
+
     # Conflict (409)
     CONFLICT = "CONFLICT"
     DUPLICATE_ENTRY = "DUPLICATE_ENTRY"
@@ -35,6 +35,8 @@ class StoredArtifact(BaseModel):
     artifact_id: str
     path: str
     bytes: int
+    # Hex digest of the stored file; None for manifests written before hashes were recorded.
+    sha256: str | None = None
 
     @field_validator("artifact_id")
     @classmethod
@@ -59,6 +61,15 @@ class StoredArtifact(BaseModel):
             raise ValueError("bytes must be >= 0")
         return value
 
+    @field_validator("sha256")
+    @classmethod
+    def _validate_sha256(cls, value: str | None) -> str | None:
+        if value is None:
+            return None
+        if len(value) != 64 or any(char not in "0123456789abcdef" for char in value):
+            raise ValueError("sha256 must be a lowercase hex digest")
+        return value
+
 
 class ArtifactsManifest(BaseModel):
     """Manifest stored in DB; binaries live on disk (ADR-0012)."""
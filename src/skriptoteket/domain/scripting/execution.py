@@ -3,7 +3,11 @@ from __future__ import annotations
 from pydantic import BaseModel, ConfigDict
 
 from skriptoteket.domain.scripting.artifacts import ArtifactsManifest
-from skriptoteket.domain.scripting.models import RunStatus
+from skriptoteket.domain.scripting.models import (
+    ResultCacheStatus,
+    RunResourceUsage,
+    RunStatus,
+)
 from skriptoteket.domain.scripting.ui.contract_v2 import ToolUiContractV2Result
 
 
@@ -17,3 +21,5 @@ class ToolExecutionResult(BaseModel):
     stderr: str
     ui_result: ToolUiContractV2Result
     artifacts_manifest: ArtifactsManifest
+    result_cache: ResultCacheStatus | None = None
+    resource_usage: RunResourceUsage | None = None
@@ -1,11 +1,39 @@
 from __future__ import annotations
 
-from pathlib import PurePosixPath
+from collections.abc import Sequence
+from pathlib import Path, PurePosixPath
 
 from pydantic import BaseModel, ConfigDict, Field
 
 from skriptoteket.domain.errors import ErrorDetails, validation_error
 
+type InputFile = tuple[str, bytes]
+
+
+class StoredInputFile(BaseModel):
+    """A normalized input file left on disk; runners stream it instead of loading it.
+
+    `sha256` is set when the digest was computed while the file was written (uploads).
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    path: Path
+    bytes: int
+    sha256: str | None = None
+
+
+type RunnerInputFile = InputFile | StoredInputFile
+
+
+def input_file_name(item: RunnerInputFile) -> str:
+    return item.name if isinstance(item, StoredInputFile) else item[0]
+
+
+def input_file_size(item: RunnerInputFile) -> int:
+    return item.bytes if isinstance(item, StoredInputFile) else len(item[1])
+
 
 class InputFileEntry(BaseModel):
     model_config = ConfigDict(frozen=True)
@@ -36,27 +64,21 @@ def sanitize_input_filename(*, input_filename: str) -> str:
     return normalized
 
 
-def normalize_input_files(
-    *, input_files: list[tuple[str, bytes]]
-) -> tuple[list[tuple[str, bytes]], InputManifest]:
-    if not input_files:
-        raise validation_error("input_files is required")
-
-    normalized_files: list[tuple[str, bytes]] = []
-    manifest_entries: list[InputFileEntry] = []
+def normalize_input_filenames(*, filenames: Sequence[str]) -> list[str]:
+    """Sanitize filenames; raises when two names collide after sanitization."""
+    safe_names: list[str] = []
 
     seen: set[str] = set()
     collisions: dict[str, list[str]] = {}
 
-    for original_name, content in input_files:
+    for original_name in filenames:
         safe_name = sanitize_input_filename(input_filename=original_name)
         if safe_name in seen:
             collisions.setdefault(safe_name, []).append(original_name)
             continue
 
         seen.add(safe_name)
-        normalized_files.append((safe_name, content))
-        manifest_entries.append(InputFileEntry(name=safe_name, bytes=len(content)))
+        safe_names.append(safe_name)
 
     if collisions:
         details: ErrorDetails = {
@@ -69,4 +91,28 @@ def normalize_input_files(
             details=details,
         )
 
+    return safe_names
+
+
+def normalize_input_files(
+    *, input_files: Sequence[RunnerInputFile]
+) -> tuple[list[RunnerInputFile], InputManifest]:
+    """Sanitize names (stored files keep their path) and build the input manifest."""
+    if not input_files:
+        raise validation_error("input_files is required")
+
+    safe_names = normalize_input_filenames(
+        filenames=[input_file_name(item) for item in input_files]
+    )
+    normalized_files: list[RunnerInputFile] = [
+        item.model_copy(update={"name": safe_name})
+        if isinstance(item, StoredInputFile)
+        else (safe_name, item[1])
+        for safe_name, item in zip(safe_names, input_files, strict=True)
+    ]
+    manifest_entries = [
+        InputFileEntry(name=input_file_name(item), bytes=input_file_size(item))
+        for item in normalized_files
+    ]
+
     return normalized_files, InputManifest(files=manifest_entries)
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from skriptoteket.domain.scripting.tool_run_jobs import ToolRunJob
 from skriptoteket.domain.scripting.tool_runs import (
+    ResultCacheStatus,
     RunContext,
+    RunResourceUsage,
     RunSourceKind,
     RunStatus,
     ToolRun,
@@ -26,7 +28,9 @@ from skriptoteket.domain.scripting.tool_versions import (
 )
 
 __all__ = [
+    "ResultCacheStatus",
     "RunContext",
+    "RunResourceUsage",
     "RunSourceKind",
     "RunStatus",
     "ToolRun",
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 from datetime import datetime, timedelta
 from uuid import UUID
 
@@ -8,6 +9,19 @@ from pydantic import BaseModel, ConfigDict, model_validator
 from skriptoteket.domain.errors import DomainError, ErrorCode, validation_error
 from skriptoteket.domain.scripting.tool_runs import RunStatus
 
+EXECUTION_QUEUE_CHANNEL_PREFIX = "skriptoteket_run_jobs_"
+_MAX_CHANNEL_BYTES = 63  # Postgres NAMEDATALEN - 1
+
+
+def execution_queue_channel(queue: str) -> str:
+    """NOTIFY channel for a queue; long queue names are hashed to fit an identifier."""
+    normalized_queue = queue.strip() or "default"
+    channel = f"{EXECUTION_QUEUE_CHANNEL_PREFIX}{normalized_queue}"
+    if len(channel.encode("utf-8")) <= _MAX_CHANNEL_BYTES:
+        return channel
+    digest = hashlib.sha256(normalized_queue.encode("utf-8")).hexdigest()[:32]
+    return f"{EXECUTION_QUEUE_CHANNEL_PREFIX}{digest}"
+
 
 class ToolRunJob(BaseModel):
     model_config = ConfigDict(frozen=True, from_attributes=True)
@@ -30,6 +30,27 @@ class RunStatus(StrEnum):
     CANCELLED = "cancelled"
 
 
+class ResultCacheStatus(StrEnum):
+    """Whether a deterministic tool run was served from the result cache."""
+
+    HIT = "hit"
+    MISS = "miss"
+
+
+class RunResourceUsage(BaseModel):
+    """Container resource usage sampled while a run executed (`None` = not observed)."""
+
+    model_config = ConfigDict(frozen=True)
+
+    memory_peak_bytes: int | None = None
+    cpu_seconds: float | None = None
+    cpu_throttled_seconds: float | None = None
+    block_read_bytes: int | None = None
+    block_write_bytes: int | None = None
+    pids_peak: int | None = None
+    samples: int = 0
+
+
 class ToolRun(BaseModel):
     model_config = ConfigDict(frozen=True, from_attributes=True)
 
@@ -59,6 +80,9 @@ class ToolRun(BaseModel):
     artifacts_manifest: dict[str, object]
     error_summary: str | None = None
     ui_payload: UiPayloadV2 | None = None
+    result_cache: ResultCacheStatus | None = None
+    resource_usage: RunResourceUsage | None = None
+    artifacts_expired_at: datetime | None = None
 
     @model_validator(mode="after")
     def _validate_source_fields(self) -> "ToolRun":
@@ -236,6 +260,8 @@ def finish_run(
     artifacts_manifest: dict[str, object],
     error_summary: str | None,
     ui_payload: UiPayloadV2 | None,
+    result_cache: ResultCacheStatus | None = None,
+    resource_usage: RunResourceUsage | None = None,
 ) -> ToolRun:
     if run.status is not RunStatus.RUNNING:
         raise DomainError(
@@ -266,6 +292,8 @@ def finish_run(
             "artifacts_manifest": artifacts_manifest,
             "error_summary": _normalize_optional_text(error_summary),
             "ui_payload": ui_payload,
+            "result_cache": result_cache,
+            "resource_usage": resource_usage,
         }
     )
 
@@ -40,6 +40,8 @@ class ToolVersion(BaseModel):
     settings_schema: list[UiActionField] | None = None
     input_schema: ToolInputSchema = Field(default_factory=list)
     usage_instructions: str | None = None
+    # Output is a pure function of inputs/settings: runs may be served from the result cache.
+    deterministic: bool = False
     derived_from_version_id: UUID | None = None
 
     created_by_user_id: UUID
@@ -121,6 +123,7 @@ def create_draft_version(
     settings_schema: ToolSettingsSchema | None = None,
     input_schema: ToolInputSchema,
     usage_instructions: str | None = None,
+    deterministic: bool = False,
     created_by_user_id: UUID,
     derived_from_version_id: UUID | None,
     change_summary: str | None,
@@ -144,6 +147,7 @@ def create_draft_version(
         settings_schema=normalize_tool_settings_schema(settings_schema=settings_schema),
         input_schema=normalize_tool_input_schema(input_schema=input_schema),
         usage_instructions=_normalize_optional_text(usage_instructions),
+        deterministic=deterministic,
         derived_from_version_id=derived_from_version_id,
         created_by_user_id=created_by_user_id,
         created_at=now,
@@ -161,6 +165,7 @@ def save_draft_snapshot(
     settings_schema: ToolSettingsSchema | None = None,
     input_schema: ToolInputSchema,
     usage_instructions: str | None = None,
+    deterministic: bool = False,
     saved_by_user_id: UUID,
     change_summary: str | None,
     now: datetime,
@@ -198,6 +203,7 @@ def save_draft_snapshot(
         settings_schema=normalize_tool_settings_schema(settings_schema=settings_schema),
         input_schema=normalize_tool_input_schema(input_schema=input_schema),
         usage_instructions=_normalize_optional_text(usage_instructions),
+        deterministic=deterministic,
         derived_from_version_id=previous_version.id,
         created_by_user_id=saved_by_user_id,
         created_at=now,
@@ -293,6 +299,7 @@ def publish_version(
         settings_schema=reviewed_version.settings_schema,
         input_schema=reviewed_version.input_schema,
         usage_instructions=reviewed_version.usage_instructions,
+        deterministic=reviewed_version.deterministic,
         derived_from_version_id=reviewed_version.id,
         created_by_user_id=published_by_user_id,
         created_at=now,
@@ -357,6 +364,7 @@ def rollback_to_version(
         settings_schema=archived_version.settings_schema,
         input_schema=archived_version.input_schema,
         usage_instructions=archived_version.usage_instructions,
+        deterministic=archived_version.deterministic,
         derived_from_version_id=archived_version.id,
         created_by_user_id=published_by_user_id,
         created_at=now,
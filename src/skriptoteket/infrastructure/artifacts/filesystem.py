@@ -1,44 +1,82 @@
 from __future__ import annotations
 
 import re
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 
 from skriptoteket.domain.scripting.artifacts import ArtifactsManifest, StoredArtifact
 from skriptoteket.infrastructure.runner.path_safety import validate_output_path
 
 
-def build_artifacts_manifest(*, run_dir: Path) -> ArtifactsManifest:
+class ArtifactsManifestBuilder:
+    """Collects stored artifact files and assigns artifact ids.
+
+    Ids are assigned in path order when the manifest is built, so the same files yield the same
+    manifest whether they were recorded while extracting an archive or by walking a directory.
+    Recording a path twice keeps the last entry (a later tar member overwrites the file).
+    """
+
+    def __init__(self) -> None:
+        self._files: dict[str, tuple[int, str | None]] = {}
+
+    def add(self, *, path: str, size: int, sha256: str | None) -> None:
+        self._files[path] = (size, sha256)
+
+    def build(self) -> ArtifactsManifest:
+        artifacts: list[StoredArtifact] = []
+        used_ids: set[str] = set()
+
+        for relative_path in sorted(self._files, key=lambda path: PurePosixPath(path).parts):
+            size, sha256 = self._files[relative_path]
+            artifact_id = _slugify_artifact_id(relative_path)
+            if artifact_id in used_ids:
+                suffix = 2
+                while f"{artifact_id}_{suffix}" in used_ids:
+                    suffix += 1
+                artifact_id = f"{artifact_id}_{suffix}"
+            used_ids.add(artifact_id)
+
+            artifacts.append(
+                StoredArtifact(
+                    artifact_id=artifact_id,
+                    path=relative_path,
+                    bytes=size,
+                    sha256=sha256,
+                )
+            )
+
+        return ArtifactsManifest(artifacts=artifacts)
+
+
+def build_artifacts_manifest(
+    *, run_dir: Path, known: ArtifactsManifest | None = None
+) -> ArtifactsManifest:
+    """Build a manifest by walking `run_dir/output`, without reading the files.
+
+    Used where files were not written through `ArtifactsManifestBuilder`, e.g. a run dir that
+    already existed or artifacts materialized from the result cache. Digests are reused from
+    `known` (recorded when the files were first stored) where path and size still match; other
+    artifacts get no digest and downloads fall back to mtime/size ETags.
+    """
     output_dir = run_dir / "output"
     if not output_dir.exists():
         return ArtifactsManifest(artifacts=[])
 
-    artifacts: list[StoredArtifact] = []
-    used_ids: set[str] = set()
-
-    for file_path in sorted(output_dir.rglob("*")):
+    known_by_path = (
+        {} if known is None else {artifact.path: artifact for artifact in known.artifacts}
+    )
+    builder = ArtifactsManifestBuilder()
+    for file_path in output_dir.rglob("*"):
         if not file_path.is_file():
             continue
 
         relative_path = file_path.relative_to(run_dir).as_posix()
         validate_output_path(path=relative_path)
+        size = file_path.stat().st_size
+        recorded = known_by_path.get(relative_path)
+        sha256 = recorded.sha256 if recorded is not None and recorded.bytes == size else None
+        builder.add(path=relative_path, size=size, sha256=sha256)
 
-        artifact_id = _slugify_artifact_id(relative_path)
-        if artifact_id in used_ids:
-            suffix = 2
-            while f"{artifact_id}_{suffix}" in used_ids:
-                suffix += 1
-            artifact_id = f"{artifact_id}_{suffix}"
-        used_ids.add(artifact_id)
-
-        artifacts.append(
-            StoredArtifact(
-                artifact_id=artifact_id,
-                path=relative_path,
-                bytes=file_path.stat().st_size,
-            )
-        )
-
-    return ArtifactsManifest(artifacts=artifacts)
+    return builder.build()
 
 
 def _slugify_artifact_id(path: str) -> str:
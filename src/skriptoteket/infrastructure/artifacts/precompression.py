@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import gzip
+import mimetypes
+from pathlib import Path
+from typing import Protocol
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+try:  # Python 3.14+
+    from compression import zstd as _zstd  # type: ignore[import-not-found,unused-ignore]
+except ImportError:  # pragma: no cover - depends on the interpreter
+    _zstd = None
+
+PRECOMPRESSED_DIRNAME = "precompressed"
+
+
+class _CompressedOutput(Protocol):
+    def write(self, data: bytes, /) -> int: ...
+
+    def close(self) -> None: ...
+
+
+# Content-Encoding -> file suffix, in server preference order.
+_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+PRECOMPRESSED_ENCODINGS: tuple[str, ...] = ("zstd", "gzip") if _zstd is not None else ("gzip",)
+
+_TEXT_LIKE_MEDIA_TYPES = frozenset(
+    {
+        "application/javascript",
+        "application/json",
+        "application/ld+json",
+        "application/x-ndjson",
+        "application/xml",
+        "image/svg+xml",
+    }
+)
+_TEXT_LIKE_SUFFIXES = frozenset({".csv", ".md", ".ndjson", ".tsv", ".txt", ".yaml", ".yml"})
+
+# Sidecars that do not save at least this share of the original are discarded.
+_MIN_SAVINGS_RATIO = 0.1
+
+
+def artifact_media_type(filename: str) -> str:
+    media_type, _ = mimetypes.guess_type(filename, strict=False)
+    return media_type or "application/octet-stream"
+
+
+def is_text_like(filename: str) -> bool:
+    media_type = artifact_media_type(filename)
+    return (
+        media_type.startswith("text/")
+        or media_type in _TEXT_LIKE_MEDIA_TYPES
+        or Path(filename).suffix.lower() in _TEXT_LIKE_SUFFIXES
+    )
+
+
+def precompressed_artifact_path(*, run_dir: Path, artifact_path: str, encoding: str) -> Path:
+    """Sidecar location for an artifact (`artifact_path` is relative to the run dir).
+
+    Sidecars live outside `output/` so manifests and archives only ever see the original files.
+    """
+    return run_dir / PRECOMPRESSED_DIRNAME / f"{artifact_path}{_SUFFIXES[encoding]}"
+
+
+class ArtifactPrecompressor:
+    """Writes compressed sidecars of one artifact while it is being extracted."""
+
+    def __init__(self, *, run_dir: Path, artifact_path: str) -> None:
+        self._outputs: dict[str, tuple[Path, _CompressedOutput]] = {}
+        for encoding in PRECOMPRESSED_ENCODINGS:
+            path = precompressed_artifact_path(
+                run_dir=run_dir, artifact_path=artifact_path, encoding=encoding
+            )
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._outputs[encoding] = (path, _open_compressed(encoding=encoding, path=path))
+
+    def write(self, chunk: bytes) -> None:
+        for _path, output in self._outputs.values():
+            output.write(chunk)
+
+    def finish(self, *, original_size: int) -> None:
+        for encoding, (path, output) in self._outputs.items():
+            output.close()
+            compressed_size = path.stat().st_size
+            if compressed_size > original_size * (1 - _MIN_SAVINGS_RATIO):
+                path.unlink(missing_ok=True)
+                continue
+            logger.debug(
+                "Stored precompressed artifact",
+                path=str(path),
+                encoding=encoding,
+                original_bytes=original_size,
+                compressed_bytes=compressed_size,
+            )
+
+    def abort(self) -> None:
+        for path, output in self._outputs.values():
+            output.close()
+            path.unlink(missing_ok=True)
+
+
+def _open_compressed(*, encoding: str, path: Path) -> _CompressedOutput:
+    if encoding == "gzip":
+        # mtime=0 keeps the bytes (and so the ETag) stable for identical content.
+        return gzip.GzipFile(filename=str(path), mode="wb", mtime=0)
+    if encoding == "zstd" and _zstd is not None:
+        return _zstd.ZstdFile(path, mode="w")  # type: ignore[no-any-return,unused-ignore]
+    raise ValueError(f"Unsupported precompression encoding: {encoding}")
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, String, Text, func, text
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String, Text, func, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column
@@ -13,6 +13,14 @@ from skriptoteket.infrastructure.db.base import Base
 
 class ToolRunModel(Base):
     __tablename__ = "tool_runs"
+    __table_args__ = (
+        Index(
+            "ix_tool_runs_artifacts_retention",
+            "finished_at",
+            "id",
+            postgresql_where=text("artifacts_expired_at IS NULL AND finished_at IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), primary_key=True, default=uuid4)
 
@@ -87,3 +95,9 @@ class ToolRunModel(Base):
     )
     error_summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     ui_payload: Mapped[dict[str, object] | None] = mapped_column(JSONB, nullable=True)
+    result_cache: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    resource_usage: Mapped[dict[str, object] | None] = mapped_column(JSONB, nullable=True)
+    # Set when retention deleted the run's artifacts and input files (the row itself is kept).
+    artifacts_expired_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func, text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column
@@ -36,6 +36,7 @@ class ToolVersionModel(Base):
         server_default=text("'[]'::jsonb"),
     )
     usage_instructions: Mapped[str | None] = mapped_column(Text, nullable=True)
+    deterministic: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default="false")
 
     derived_from_version_id: Mapped[UUID | None] = mapped_column(
         PGUUID(as_uuid=True),
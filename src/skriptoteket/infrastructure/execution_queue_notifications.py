@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any, Protocol, cast
+
+import asyncpg
+import structlog
+from sqlalchemy.engine import make_url
+
+from skriptoteket.domain.scripting.tool_run_jobs import execution_queue_channel
+from skriptoteket.protocols.execution_queue import ExecutionQueueNotificationListenerProtocol
+
+logger = structlog.get_logger(__name__)
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    """Turn the SQLAlchemy `postgresql+asyncpg://` URL into a plain libpq DSN for asyncpg."""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class _ListenConnection(Protocol):
+    async def add_listener(self, channel: str, callback: Callable[..., Any]) -> None: ...
+
+    def add_termination_listener(self, callback: Callable[..., Any]) -> None: ...
+
+    def is_closed(self) -> bool: ...
+
+    async def close(self) -> None: ...
+
+
+class PostgresExecutionQueueListener(ExecutionQueueNotificationListenerProtocol):
+    """Dedicated asyncpg connection that LISTENs on the worker's queue channel.
+
+    Each NOTIFY sets a wakeup flag consumed by `wait()`. When the connection drops the worker is
+    woken once (to poll), and the next `wait()` reconnects; until then callers fall back to polling.
+    """
+
+    def __init__(
+        self,
+        *,
+        dsn: str,
+        connect: Callable[[str], Awaitable[_ListenConnection]] | None = None,
+    ) -> None:
+        self._dsn = dsn
+        self._connect = connect or _asyncpg_connect
+        self._channel: str | None = None
+        self._connection: _ListenConnection | None = None
+        self._wakeup = asyncio.Event()
+
+    @property
+    def is_listening(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def listen(self, *, queue: str) -> bool:
+        self._channel = execution_queue_channel(queue)
+        return await self._ensure_connected()
+
+    async def wait(self) -> None:
+        """Return on the next NOTIFY (or right away if one arrived since the last call)."""
+        if self._channel is None:
+            raise RuntimeError("listen() must be called before wait()")
+        if not self.is_listening and await self._ensure_connected():
+            # Notifications sent while disconnected were lost: let the caller poll once.
+            return
+        await self._wakeup.wait()
+        self._wakeup.clear()
+
+    async def close(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+
+    async def _ensure_connected(self) -> bool:
+        assert self._channel is not None
+        try:
+            connection = await self._connect(self._dsn)
+        except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+            logger.warning(
+                "Execution queue LISTEN connection failed; polling",
+                channel=self._channel,
+                exc_info=True,
+            )
+            return False
+        try:
+            await connection.add_listener(self._channel, self._on_notification)
+        except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+            logger.warning(
+                "Execution queue LISTEN failed; polling",
+                channel=self._channel,
+                exc_info=True,
+            )
+            await connection.close()
+            return False
+        connection.add_termination_listener(self._on_termination)
+        self._connection = connection
+        logger.info("Listening for execution queue notifications", channel=self._channel)
+        return True
+
+    def _on_notification(
+        self, _connection: object, _pid: int, _channel: str, _payload: str
+    ) -> None:
+        self._wakeup.set()
+
+    def _on_termination(self, connection: object) -> None:
+        if connection is not self._connection:
+            return
+        self._connection = None
+        logger.warning("Execution queue LISTEN connection lost; polling", channel=self._channel)
+        self._wakeup.set()
+
+
+async def _asyncpg_connect(dsn: str) -> _ListenConnection:
+    return cast(_ListenConnection, await asyncpg.connect(dsn))
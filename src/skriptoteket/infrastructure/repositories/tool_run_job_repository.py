@@ -1,15 +1,17 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from datetime import datetime, timedelta
 from typing import cast
 from uuid import UUID
 
-from sqlalchemy import and_, select, update
+from sqlalchemy import CTE, and_, func, select, true, update
 from sqlalchemy.engine import CursorResult
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from skriptoteket.domain.errors import not_found
 from skriptoteket.domain.scripting.models import RunStatus, ToolRunJob
+from skriptoteket.domain.scripting.tool_run_jobs import execution_queue_channel
 from skriptoteket.infrastructure.db.models.tool_run import ToolRunModel
 from skriptoteket.infrastructure.db.models.tool_run_job import ToolRunJobModel
 from skriptoteket.protocols.execution_queue import (
@@ -54,13 +56,22 @@ class PostgreSQLToolRunJobRepository(ToolRunJobRepositoryProtocol):
         self._session.add(model)
         await self._session.flush()
         await self._session.refresh(model)
+        if job.status == RunStatus.QUEUED:
+            await self._notify_claimable(queue=job.queue, payload=str(job.id))
         return ToolRunJob.model_validate(model)
 
+    async def _notify_claimable(self, *, queue: str, payload: str) -> None:
+        # NOTIFY is transactional: listening workers wake on commit, once the job is visible.
+        await self._session.execute(select(func.pg_notify(execution_queue_channel(queue), payload)))
+
     async def update(self, *, job: ToolRunJob) -> ToolRunJob:
         model = await self._session.get(ToolRunJobModel, job.id)
         if model is None:
             raise not_found("ToolRunJob", str(job.id))
 
+        became_claimable = job.status == RunStatus.QUEUED and (
+            model.status != RunStatus.QUEUED.value or model.available_at != job.available_at
+        )
         model.status = job.status
         model.queue = job.queue
         model.priority = job.priority
@@ -76,6 +87,10 @@ class PostgreSQLToolRunJobRepository(ToolRunJobRepositoryProtocol):
 
         await self._session.flush()
         await self._session.refresh(model)
+        if became_claimable:
+            # Requeued (possibly with a backoff: workers cap their idle wait at the next
+            # `available_at`, see `next_available_at`).
+            await self._notify_claimable(queue=job.queue, payload=str(job.id))
         return ToolRunJob.model_validate(model)
 
     async def claim_next(
@@ -86,66 +101,124 @@ class PostgreSQLToolRunJobRepository(ToolRunJobRepositoryProtocol):
         lease_ttl: timedelta,
         queue: str = "default",
     ) -> ToolRunJobClaim | None:
+        claims = await self.claim_batch(
+            worker_id=worker_id,
+            now=now,
+            lease_ttl=lease_ttl,
+            queue=queue,
+            max_jobs=1,
+        )
+        return claims[0] if claims else None
+
+    async def claim_batch(
+        self,
+        *,
+        worker_id: str,
+        now: datetime,
+        lease_ttl: timedelta,
+        queue: str = "default",
+        max_jobs: int = 1,
+        fair_share: bool = False,
+        max_running_per_tool: int = 0,
+    ) -> list[ToolRunJobClaim]:
         normalized_worker_id = worker_id.strip()
         if not normalized_worker_id:
             raise ValueError("worker_id is required")
+        if max_jobs < 1:
+            raise ValueError("max_jobs must be >= 1")
+        if max_running_per_tool < 0:
+            raise ValueError("max_running_per_tool must be >= 0")
         normalized_queue = queue.strip() or "default"
 
         locked_until = now + lease_ttl
 
         # 1) Adopt-first: running jobs that have had their lease cleared (locked_until is NULL).
-        adopt_stmt = (
-            select(ToolRunJobModel)
+        adoptable = (
+            select(ToolRunJobModel.id)
             .where(ToolRunJobModel.queue == normalized_queue)
             .where(ToolRunJobModel.status == RunStatus.RUNNING.value)
             .where(ToolRunJobModel.locked_until.is_(None))
             .order_by(ToolRunJobModel.priority.desc(), ToolRunJobModel.created_at.asc())
             .with_for_update(skip_locked=True)
-            .limit(1)
-        )
-        adopt_result = await self._session.execute(adopt_stmt)
-        adopt_model = adopt_result.scalar_one_or_none()
-        if adopt_model is not None:
-            adopt_model.locked_by = normalized_worker_id
-            adopt_model.locked_until = locked_until
-            adopt_model.updated_at = now
-            await self._session.flush()
-            await self._session.refresh(adopt_model)
-            return ToolRunJobClaim(job=ToolRunJob.model_validate(adopt_model), is_adoption=True)
-
-        # 2) Otherwise, claim queued jobs.
-        queued_stmt = (
-            select(ToolRunJobModel)
-            .where(ToolRunJobModel.queue == normalized_queue)
-            .where(ToolRunJobModel.status == RunStatus.QUEUED.value)
-            .where(ToolRunJobModel.available_at <= now)
-            .where(ToolRunJobModel.attempts < ToolRunJobModel.max_attempts)
-            .order_by(ToolRunJobModel.priority.desc(), ToolRunJobModel.created_at.asc())
-            .with_for_update(skip_locked=True)
-            .limit(1)
-        )
-        queued_result = await self._session.execute(queued_stmt)
-        queued_model = queued_result.scalar_one_or_none()
-        if queued_model is None:
-            return None
-
-        queued_model.status = RunStatus.RUNNING.value
-        queued_model.locked_by = normalized_worker_id
-        queued_model.locked_until = locked_until
-        queued_model.updated_at = now
-        queued_model.attempts = (queued_model.attempts or 0) + 1
-        if queued_model.started_at is None:
-            queued_model.started_at = now
-
-        run_model = await self._session.get(ToolRunModel, queued_model.run_id)
-        if run_model is not None:
-            run_model.status = RunStatus.RUNNING.value
-            if run_model.started_at is None:
-                run_model.started_at = now
+            .limit(max_jobs)
+            .cte("adoptable")
+        )
+        adopt_stmt = (
+            update(ToolRunJobModel)
+            .where(ToolRunJobModel.id.in_(select(adoptable.c.id)))
+            .values(
+                locked_by=normalized_worker_id,
+                locked_until=locked_until,
+                updated_at=now,
+            )
+            .returning(ToolRunJobModel)
+            .execution_options(populate_existing=True)
+        )
+        adopted = (await self._session.scalars(adopt_stmt)).all()
+        claims = [
+            ToolRunJobClaim(job=ToolRunJob.model_validate(model), is_adoption=True)
+            for model in _in_claim_order(adopted)
+        ]
 
-        await self._session.flush()
-        await self._session.refresh(queued_model)
-        return ToolRunJobClaim(job=ToolRunJob.model_validate(queued_model), is_adoption=False)
+        remaining = max_jobs - len(claims)
+        if remaining <= 0:
+            return claims
+
+        # 2) Fill the rest of the batch with queued jobs.
+        if fair_share or max_running_per_tool > 0:
+            claimable = _fair_share_claimable(
+                queue=normalized_queue,
+                now=now,
+                limit=remaining,
+                fair_share=fair_share,
+                max_running_per_tool=max_running_per_tool,
+            )
+        else:
+            claimable = (
+                select(ToolRunJobModel.id)
+                .where(ToolRunJobModel.queue == normalized_queue)
+                .where(ToolRunJobModel.status == RunStatus.QUEUED.value)
+                .where(ToolRunJobModel.available_at <= now)
+                .where(ToolRunJobModel.attempts < ToolRunJobModel.max_attempts)
+                .order_by(ToolRunJobModel.priority.desc(), ToolRunJobModel.created_at.asc())
+                .with_for_update(skip_locked=True)
+                .limit(remaining)
+                .cte("claimable")
+            )
+        claim_stmt = (
+            update(ToolRunJobModel)
+            .where(ToolRunJobModel.id.in_(select(claimable.c.id)))
+            .values(
+                status=RunStatus.RUNNING.value,
+                locked_by=normalized_worker_id,
+                locked_until=locked_until,
+                updated_at=now,
+                attempts=ToolRunJobModel.attempts + 1,
+                started_at=func.coalesce(ToolRunJobModel.started_at, now),
+            )
+            .returning(ToolRunJobModel)
+            .execution_options(populate_existing=True)
+        )
+        claimed = (await self._session.scalars(claim_stmt)).all()
+        if not claimed:
+            return claims
+
+        runs_stmt = (
+            update(ToolRunModel)
+            .where(ToolRunModel.id.in_([model.run_id for model in claimed]))
+            .values(
+                status=RunStatus.RUNNING.value,
+                started_at=func.coalesce(ToolRunModel.started_at, now),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self._session.execute(runs_stmt)
+
+        claims.extend(
+            ToolRunJobClaim(job=ToolRunJob.model_validate(model), is_adoption=False)
+            for model in _in_claim_order(claimed)
+        )
+        return claims
 
     async def heartbeat(
         self,
@@ -188,8 +261,173 @@ class PostgreSQLToolRunJobRepository(ToolRunJobRepositoryProtocol):
                 locked_until=None,
                 updated_at=now,
             )
+            .returning(ToolRunJobModel.queue)
         )
-        result = await self._session.execute(stmt)
-        cursor_result = cast(CursorResult, result)
+        queues = list((await self._session.scalars(stmt)).all())
         await self._session.flush()
-        return int(cursor_result.rowcount or 0)
+        # Released leases are adoptable right away: wake the queues' workers.
+        for queue in sorted(set(queues)):
+            await self._notify_claimable(queue=queue, payload="adoptable")
+        return len(queues)
+
+    async def next_available_at(self, *, queue: str, now: datetime) -> datetime | None:
+        stmt = (
+            select(func.min(ToolRunJobModel.available_at))
+            .where(ToolRunJobModel.queue == (queue.strip() or "default"))
+            .where(ToolRunJobModel.status == RunStatus.QUEUED.value)
+            .where(ToolRunJobModel.available_at > now)
+        )
+        return (await self._session.execute(stmt)).scalar_one_or_none()
+
+
+# Extra groups and jobs per group ranked beyond the batch size when claiming in fair-share order.
+_FAIR_SHARE_CANDIDATE_SLACK = 8
+
+
+def _fair_share_claimable(
+    *,
+    queue: str,
+    now: datetime,
+    limit: int,
+    fair_share: bool,
+    max_running_per_tool: int,
+) -> CTE:
+    """Queued jobs in fair-share order, as a `FOR UPDATE SKIP LOCKED` CTE (same round-trip).
+
+    Fair share: within a priority, users take turns. A job's turn is its position in its user's
+    queue plus the jobs that user already has running on this queue, so a user with 40 queued
+    jobs gets one slot per round while everyone else's first job goes ahead of their second.
+
+    `max_running_per_tool > 0` caps running jobs per tool across all workers of the queue; jobs
+    beyond a tool's free slots are left queued.
+
+    Only a bounded candidate set is ranked: the first groups (users with fair share, otherwise
+    tools) by their best priority and oldest job, and each group's first jobs, found per group
+    through the `tool_runs` user/tool index. A batch of `limit` claims comes from at most `limit`
+    groups and `limit` jobs per group; `_FAIR_SHARE_CANDIDATE_SLACK` more of each leaves room
+    for rows other workers hold locked. The queued jobs are aggregated once per group instead of
+    being sorted into two windows, which now cover at most (limit + slack)² rows. Tools already
+    at the cap are left out up front; one with fewer free slots than queued jobs can still make
+    a batch come up short, and the rest is claimed on the next poll.
+    """
+    running = (
+        select(ToolRunModel.requested_by_user_id, ToolRunModel.tool_id)
+        .join(ToolRunJobModel, ToolRunJobModel.run_id == ToolRunModel.id)
+        .where(ToolRunJobModel.queue == queue)
+        .where(ToolRunJobModel.status == RunStatus.RUNNING.value)
+        .cte("running_jobs")
+    )
+    user_running = (
+        select(running.c.requested_by_user_id, func.count().label("running"))
+        .group_by(running.c.requested_by_user_id)
+        .cte("user_running")
+    )
+    tool_running = (
+        select(running.c.tool_id, func.count().label("running"))
+        .group_by(running.c.tool_id)
+        .cte("tool_running")
+    )
+    queue_order = (ToolRunJobModel.priority.desc(), ToolRunJobModel.created_at.asc())
+    eligible = [
+        ToolRunJobModel.queue == queue,
+        ToolRunJobModel.status == RunStatus.QUEUED.value,
+        ToolRunJobModel.available_at <= now,
+        ToolRunJobModel.attempts < ToolRunJobModel.max_attempts,
+    ]
+    if max_running_per_tool > 0:
+        eligible.append(
+            ToolRunModel.tool_id.not_in(
+                select(tool_running.c.tool_id).where(tool_running.c.running >= max_running_per_tool)
+            )
+        )
+    group_key = ToolRunModel.requested_by_user_id if fair_share else ToolRunModel.tool_id
+
+    heads = (
+        select(
+            group_key.label("group_key"),
+            func.max(ToolRunJobModel.priority).label("priority"),
+            func.min(ToolRunJobModel.created_at).label("created_at"),
+        )
+        .select_from(ToolRunJobModel)
+        .join(ToolRunModel, ToolRunModel.id == ToolRunJobModel.run_id)
+        .where(*eligible)
+        .group_by(group_key)
+        .subquery("group_heads")
+    )
+    groups = select(heads.c.group_key)
+    if fair_share:
+        groups = groups.outerjoin(
+            user_running, user_running.c.requested_by_user_id == heads.c.group_key
+        ).order_by(
+            heads.c.priority.desc(),
+            func.coalesce(user_running.c.running, 0).asc(),
+            heads.c.created_at.asc(),
+        )
+    else:
+        groups = groups.order_by(heads.c.priority.desc(), heads.c.created_at.asc())
+    candidate_limit = limit + _FAIR_SHARE_CANDIDATE_SLACK
+    head_groups = groups.limit(candidate_limit).cte("head_groups")
+    group_jobs = (
+        select(ToolRunJobModel.id)
+        .select_from(ToolRunJobModel)
+        .join(ToolRunModel, ToolRunModel.id == ToolRunJobModel.run_id)
+        .where(*eligible)
+        .where(group_key == head_groups.c.group_key)
+        .order_by(*queue_order)
+        .limit(candidate_limit)
+        .lateral("group_jobs")
+    )
+    candidates = (
+        select(group_jobs.c.id)
+        .select_from(head_groups)
+        .join(group_jobs, true())
+        .cte("candidate_jobs")
+    )
+
+    ranked = (
+        select(
+            ToolRunJobModel.id,
+            ToolRunJobModel.priority,
+            ToolRunJobModel.created_at,
+            (
+                func.row_number().over(
+                    partition_by=ToolRunModel.requested_by_user_id, order_by=queue_order
+                )
+                + func.coalesce(user_running.c.running, 0)
+            ).label("user_turn"),
+            (
+                func.row_number().over(partition_by=ToolRunModel.tool_id, order_by=queue_order)
+                + func.coalesce(tool_running.c.running, 0)
+            ).label("tool_slot"),
+        )
+        .join(candidates, candidates.c.id == ToolRunJobModel.id)
+        .join(ToolRunModel, ToolRunModel.id == ToolRunJobModel.run_id)
+        .outerjoin(
+            user_running,
+            user_running.c.requested_by_user_id == ToolRunModel.requested_by_user_id,
+        )
+        .outerjoin(tool_running, tool_running.c.tool_id == ToolRunModel.tool_id)
+        .cte("ranked_jobs")
+    )
+
+    # Window functions cannot be combined with FOR UPDATE, so lock the ranked rows in a second
+    # step joined back to the table.
+    claimable = select(ToolRunJobModel.id).join(ranked, ranked.c.id == ToolRunJobModel.id)
+    if max_running_per_tool > 0:
+        claimable = claimable.where(ranked.c.tool_slot <= max_running_per_tool)
+    if fair_share:
+        claimable = claimable.order_by(
+            ranked.c.priority.desc(), ranked.c.user_turn.asc(), ranked.c.created_at.asc()
+        )
+    else:
+        claimable = claimable.order_by(ranked.c.priority.desc(), ranked.c.created_at.asc())
+    return (
+        claimable.with_for_update(skip_locked=True, of=ToolRunJobModel)
+        .limit(limit)
+        .cte("claimable")
+    )
+
+
+def _in_claim_order(models: Sequence[ToolRunJobModel]) -> list[ToolRunJobModel]:
+    # UPDATE ... RETURNING does not preserve the candidate ORDER BY.
+    return sorted(models, key=lambda model: (-model.priority, model.created_at))
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import cast
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import func, literal, select, tuple_, update
+from sqlalchemy.engine import CursorResult
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from skriptoteket.domain.errors import not_found
 from skriptoteket.domain.scripting.models import RunContext, RunSourceKind, ToolRun
 from skriptoteket.infrastructure.db.models.tool_run import ToolRunModel
-from skriptoteket.protocols.scripting import RecentRunRow, ToolRunRepositoryProtocol
+from skriptoteket.protocols.scripting import (
+    ArtifactExpiryCandidate,
+    RecentRunRow,
+    ToolRunRepositoryProtocol,
+)
 
 
 class PostgreSQLToolRunRepository(ToolRunRepositoryProtocol):
@@ -53,6 +59,10 @@ class PostgreSQLToolRunRepository(ToolRunRepositoryProtocol):
             artifacts_manifest=run.artifacts_manifest,
             error_summary=run.error_summary,
             ui_payload=None if run.ui_payload is None else run.ui_payload.model_dump(),
+            result_cache=run.result_cache,
+            resource_usage=(
+                None if run.resource_usage is None else run.resource_usage.model_dump()
+            ),
         )
         self._session.add(model)
         await self._session.flush()
@@ -74,6 +84,10 @@ class PostgreSQLToolRunRepository(ToolRunRepositoryProtocol):
         model.artifacts_manifest = run.artifacts_manifest
         model.error_summary = run.error_summary
         model.ui_payload = None if run.ui_payload is None else run.ui_payload.model_dump()
+        model.result_cache = run.result_cache
+        model.resource_usage = (
+            None if run.resource_usage is None else run.resource_usage.model_dump()
+        )
 
         await self._session.flush()
         await self._session.refresh(model)
@@ -176,3 +190,46 @@ class PostgreSQLToolRunRepository(ToolRunRepositoryProtocol):
             )
             for row in result.all()
         ]
+
+    async def list_pending_artifact_expiry(
+        self,
+        *,
+        finished_before: datetime,
+        limit: int,
+        after: ArtifactExpiryCandidate | None = None,
+    ) -> list[ArtifactExpiryCandidate]:
+        # Matches the partial index ix_tool_runs_artifacts_retention (finished_at, id).
+        stmt = (
+            select(ToolRunModel.id, ToolRunModel.finished_at)
+            .where(ToolRunModel.artifacts_expired_at.is_(None))
+            .where(ToolRunModel.finished_at.is_not(None))
+            .where(ToolRunModel.finished_at < finished_before)
+            .order_by(ToolRunModel.finished_at, ToolRunModel.id)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(ToolRunModel.finished_at, ToolRunModel.id)
+                > tuple_(
+                    literal(after.finished_at, ToolRunModel.finished_at.type),
+                    literal(after.run_id, ToolRunModel.id.type),
+                )
+            )
+        result = await self._session.execute(stmt)
+        return [
+            ArtifactExpiryCandidate(run_id=row.id, finished_at=row.finished_at)
+            for row in result.all()
+        ]
+
+    async def mark_artifacts_expired(self, *, run_ids: list[UUID], expired_at: datetime) -> int:
+        if not run_ids:
+            return 0
+        stmt = (
+            update(ToolRunModel)
+            .where(ToolRunModel.id.in_(run_ids))
+            .where(ToolRunModel.artifacts_expired_at.is_(None))
+            .values(artifacts_expired_at=expired_at)
+        )
+        result = await self._session.execute(stmt)
+        await self._session.flush()
+        return int(cast(CursorResult[object], result).rowcount or 0)
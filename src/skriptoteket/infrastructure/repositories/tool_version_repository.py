@@ -163,6 +163,7 @@ class PostgreSQLToolVersionRepository(ToolVersionRepositoryProtocol):
             settings_schema=settings_schema,
             input_schema=input_schema,
             usage_instructions=version.usage_instructions,
+            deterministic=version.deterministic,
             derived_from_version_id=version.derived_from_version_id,
             created_by_user_id=version.created_by_user_id,
             created_at=version.created_at,
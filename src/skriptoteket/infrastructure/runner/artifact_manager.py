@@ -1,15 +1,27 @@
 from __future__ import annotations
 
-import shutil
+import hashlib
 import tarfile
 from collections.abc import Iterable, Iterator
 from io import RawIOBase
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+from typing import IO
 from uuid import UUID
 
 from skriptoteket.domain.errors import DomainError, ErrorCode
-from skriptoteket.domain.scripting.artifacts import ArtifactsManifest, RunnerArtifact
-from skriptoteket.infrastructure.artifacts.filesystem import build_artifacts_manifest
+from skriptoteket.domain.scripting.artifacts import (
+    ArtifactsManifest,
+    RunnerArtifact,
+    StoredArtifact,
+)
+from skriptoteket.infrastructure.artifacts.filesystem import (
+    ArtifactsManifestBuilder,
+    build_artifacts_manifest,
+)
+from skriptoteket.infrastructure.artifacts.precompression import (
+    ArtifactPrecompressor,
+    is_text_like,
+)
 from skriptoteket.infrastructure.runner.path_safety import validate_output_path
 from skriptoteket.protocols.runner import ArtifactManagerProtocol
 
@@ -17,9 +29,16 @@ _TAR_READ_CHUNK_BYTES = 1024 * 64
 
 
 class _IterableReader(RawIOBase):
+    """File-like view of a chunk iterator.
+
+    Tracks an offset into the current chunk instead of re-slicing it on every read: Docker yields
+    archive chunks of up to 2 MiB while tarfile reads 512-byte headers and 64 KiB blocks.
+    """
+
     def __init__(self, data: Iterable[bytes]) -> None:
         self._iterator: Iterator[bytes] = iter(data)
-        self._buffer = b""
+        self._chunk = b""
+        self._offset = 0
 
     def readable(self) -> bool:  # noqa: D102
         return True
@@ -28,46 +47,44 @@ class _IterableReader(RawIOBase):
         if size == 0:
             return b""
         if size < 0:
-            chunks = [self._buffer]
-            self._buffer = b""
+            chunks = [self._chunk[self._offset :]]
+            self._chunk, self._offset = b"", 0
             chunks.extend(self._iterator)
             return b"".join(chunks)
 
-        while len(self._buffer) < size:
-            try:
-                self._buffer += next(self._iterator)
-            except StopIteration:
-                break
+        parts: list[bytes] = []
+        remaining = size
+        while remaining > 0:
+            if self._offset >= len(self._chunk):
+                try:
+                    self._chunk, self._offset = next(self._iterator), 0
+                except StopIteration:
+                    break
+                continue
+            part = self._chunk[self._offset : self._offset + remaining]
+            self._offset += len(part)
+            remaining -= len(part)
+            parts.append(part)
 
-        result = self._buffer[:size]
-        self._buffer = self._buffer[size:]
-        return result
+        return b"".join(parts)
 
 
-def _safe_extract_tar(
-    *,
+def iter_output_archive(
     tar_stream: Iterable[bytes],
-    destination_dir: Path,
-) -> None:
-    destination_dir.mkdir(parents=True, exist_ok=True)
-    destination_root = destination_dir.resolve()
+) -> Iterator[tuple[PurePosixPath, int, IO[bytes] | None]]:
+    """Validated members of a runner output archive as `(path, size, content)`.
 
+    Paths are normalized and under `output/`; `content` is None for directories and must be read
+    before advancing (the archive is streamed). `size` is the size declared in the tar header.
+    """
     with tarfile.open(fileobj=_IterableReader(tar_stream), mode="r|*") as tar:
         for member in tar:
             if member.name in {"", "."}:
                 continue
 
             relative_path = validate_output_path(path=member.name)
-            target_path = (destination_dir / relative_path).resolve()
-            if destination_root not in target_path.parents and destination_root != target_path:
-                raise DomainError(
-                    code=ErrorCode.INTERNAL_ERROR,
-                    message="Runner contract violation: unsafe artifact path",
-                    details={"path": member.name},
-                )
-
             if member.isdir():
-                target_path.mkdir(parents=True, exist_ok=True)
+                yield relative_path, 0, None
                 continue
 
             if not member.isreg():
@@ -84,16 +101,79 @@ def _safe_extract_tar(
                     message="Runner contract violation: failed to read artifact content",
                     details={"path": member.name},
                 )
+            with extracted:
+                yield relative_path, member.size, extracted
+
 
-            target_path.parent.mkdir(parents=True, exist_ok=True)
+def _safe_extract_tar(
+    *,
+    tar_stream: Iterable[bytes],
+    destination_dir: Path,
+    precompress_min_bytes: int | None = None,
+) -> ArtifactsManifest:
+    """Extract the output archive and build its manifest (sizes + sha256) in the same pass.
+
+    With `precompress_min_bytes` set, text-like files of at least that size also get compressed
+    sidecars (see `precompression`), written from the same chunks.
+    """
+    manifest = ArtifactsManifestBuilder()
+    destination_dir.mkdir(parents=True, exist_ok=True)
+    destination_root = destination_dir.resolve()
+
+    for relative_path, declared_size, content in iter_output_archive(tar_stream):
+        target_path = (destination_dir / relative_path).resolve()
+        if destination_root not in target_path.parents and destination_root != target_path:
+            raise DomainError(
+                code=ErrorCode.INTERNAL_ERROR,
+                message="Runner contract violation: unsafe artifact path",
+                details={"path": relative_path.as_posix()},
+            )
+
+        if content is None:
+            target_path.mkdir(parents=True, exist_ok=True)
+            continue
+
+        artifact_path = relative_path.as_posix()
+        precompressor = (
+            ArtifactPrecompressor(run_dir=destination_dir, artifact_path=artifact_path)
+            if precompress_min_bytes is not None
+            and declared_size >= precompress_min_bytes
+            and is_text_like(artifact_path)
+            else None
+        )
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        try:
             with target_path.open("wb") as out_file:
-                with extracted:
-                    shutil.copyfileobj(extracted, out_file, length=_TAR_READ_CHUNK_BYTES)
+                while chunk := content.read(_TAR_READ_CHUNK_BYTES):
+                    digest.update(chunk)
+                    out_file.write(chunk)
+                    if precompressor is not None:
+                        precompressor.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            if precompressor is not None:
+                precompressor.abort()
+            raise
+        if precompressor is not None:
+            precompressor.finish(original_size=size)
+        manifest.add(path=artifact_path, size=size, sha256=digest.hexdigest())
+
+    return manifest.build()
 
 
 class FilesystemArtifactManager(ArtifactManagerProtocol):
-    def __init__(self, *, artifacts_root: Path) -> None:
+    def __init__(
+        self,
+        *,
+        artifacts_root: Path,
+        precompress_min_bytes: int | None = None,
+    ) -> None:
+        if precompress_min_bytes is not None and precompress_min_bytes < 0:
+            raise ValueError("precompress_min_bytes must be >= 0")
         self._artifacts_root = artifacts_root
+        self._precompress_min_bytes = precompress_min_bytes
 
     def store_output_archive(
         self,
@@ -110,5 +190,24 @@ class FilesystemArtifactManager(ArtifactManagerProtocol):
             return build_artifacts_manifest(run_dir=run_dir)
         run_dir.mkdir(parents=True, exist_ok=False)
 
-        _safe_extract_tar(tar_stream=output_archive, destination_dir=run_dir)
-        return build_artifacts_manifest(run_dir=run_dir)
+        return _safe_extract_tar(
+            tar_stream=output_archive,
+            destination_dir=run_dir,
+            precompress_min_bytes=self._precompress_min_bytes,
+        )
+
+    def download_url(self, *, run_id: UUID, artifact: StoredArtifact) -> str | None:
+        return None
+
+    def open_artifact(self, *, run_id: UUID, artifact: StoredArtifact) -> Iterator[bytes] | None:
+        run_dir = (self._artifacts_root / str(run_id)).resolve()
+        path = (run_dir / validate_output_path(path=artifact.path)).resolve()
+        if run_dir not in path.parents or not path.is_file():
+            return None
+        return _iter_file(path)
+
+
+def _iter_file(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := file.read(_TAR_READ_CHUNK_BYTES):
+            yield chunk
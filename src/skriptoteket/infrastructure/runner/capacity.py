@@ -1,31 +1,168 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+
+from skriptoteket.domain.scripting.models import RunContext
+from skriptoteket.observability.metrics import get_metrics
+
+
+@dataclass(slots=True, eq=False)
+class _Waiter:
+    future: asyncio.Future[bool]
+    context: RunContext | None
+    owner_key: str | None
 
 
 class RunnerCapacityLimiter:
-    """Concurrency limiter with immediate rejection (ADR-0016: cap + reject, no queue)."""
+    """Concurrency limiter (ADR-0016: cap + reject).
 
-    def __init__(self, *, max_concurrency: int) -> None:
+    With `max_queue_length > 0` (opt-in), callers that find every slot busy wait in a bounded FIFO
+    queue for up to `max_wait_seconds` instead of being rejected. Each `owner_key` (user) may hold
+    at most `max_queued_per_owner` queue entries so one user cannot fill the queue. A released
+    slot is handed directly to the oldest waiter, so newcomers never overtake the queue.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        max_queue_length: int = 0,
+        max_wait_seconds: float = 0.0,
+        max_queued_per_owner: int = 1,
+    ) -> None:
         if max_concurrency < 1:
             raise ValueError("max_concurrency must be >= 1")
+        if max_queue_length < 0:
+            raise ValueError("max_queue_length must be >= 0")
+        if max_queue_length > 0 and max_wait_seconds <= 0:
+            raise ValueError("max_wait_seconds must be > 0 when the queue is enabled")
+        if max_queued_per_owner < 1:
+            raise ValueError("max_queued_per_owner must be >= 1")
         self._max_concurrency = max_concurrency
+        self._max_queue_length = max_queue_length
+        self._max_wait_seconds = max_wait_seconds
+        self._max_queued_per_owner = max_queued_per_owner
         self._available = max_concurrency
         self._lock = asyncio.Lock()
+        self._waiters: deque[_Waiter] = deque()
+        self._queued_per_owner: Counter[str] = Counter()
 
     @property
     def max_concurrency(self) -> int:
         return self._max_concurrency
 
-    async def try_acquire(self) -> bool:
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def try_acquire(
+        self,
+        *,
+        context: RunContext | None = None,
+        owner_key: str | None = None,
+    ) -> bool:
+        """Take a slot; in queue mode wait up to `max_wait_seconds` before giving up."""
+        started = time.monotonic()
         async with self._lock:
-            if self._available <= 0:
+            if self._available > 0 and not self._waiters:
+                self._available -= 1
+                _observe_wait(context=context, outcome="admitted", started=started)
+                return True
+            if not self._can_enqueue(owner_key=owner_key):
+                _observe_wait(context=context, outcome="rejected", started=started)
                 return False
-            self._available -= 1
-            return True
+            waiter = _Waiter(
+                future=asyncio.get_running_loop().create_future(),
+                context=context,
+                owner_key=owner_key,
+            )
+            self._enqueue(waiter)
+
+        try:
+            async with asyncio.timeout(self._max_wait_seconds):
+                await waiter.future
+        except TimeoutError:
+            admitted = await self._abandon(waiter)
+            _observe_wait(
+                context=context,
+                outcome="admitted" if admitted else "timed_out",
+                started=started,
+            )
+            return admitted
+        except asyncio.CancelledError:
+            if await self._abandon(waiter):
+                await self.release()
+            raise
+
+        _observe_wait(context=context, outcome="admitted", started=started)
+        return True
 
     async def release(self) -> None:
         async with self._lock:
+            while self._waiters:
+                waiter = self._dequeue()
+                if not waiter.future.done():
+                    # Hand the slot straight to the oldest waiter (FIFO; no barging).
+                    waiter.future.set_result(True)
+                    return
             self._available += 1
             if self._available > self._max_concurrency:
                 raise RuntimeError("RunnerCapacityLimiter released too many times")
+
+    def _can_enqueue(self, *, owner_key: str | None) -> bool:
+        if len(self._waiters) >= self._max_queue_length:
+            return False
+        if owner_key is None:
+            return True
+        return self._queued_per_owner[owner_key] < self._max_queued_per_owner
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        self._waiters.append(waiter)
+        if waiter.owner_key is not None:
+            self._queued_per_owner[waiter.owner_key] += 1
+        _set_queue_depth(waiters=self._waiters, context=waiter.context)
+
+    def _dequeue(self) -> _Waiter:
+        waiter = self._waiters.popleft()
+        self._forget_owner(waiter)
+        _set_queue_depth(waiters=self._waiters, context=waiter.context)
+        return waiter
+
+    def _forget_owner(self, waiter: _Waiter) -> None:
+        if waiter.owner_key is None:
+            return
+        self._queued_per_owner[waiter.owner_key] -= 1
+        if self._queued_per_owner[waiter.owner_key] <= 0:
+            del self._queued_per_owner[waiter.owner_key]
+
+    async def _abandon(self, waiter: _Waiter) -> bool:
+        """Leave the queue; returns True when a slot was handed over before we gave up."""
+        async with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._forget_owner(waiter)
+                _set_queue_depth(waiters=self._waiters, context=waiter.context)
+            future = waiter.future
+            if future.done() and not future.cancelled():
+                return future.result()
+            future.cancel()
+            return False
+
+
+def _context_label(context: RunContext | None) -> str:
+    return "unknown" if context is None else context.value
+
+
+def _set_queue_depth(*, waiters: deque[_Waiter], context: RunContext | None) -> None:
+    depth = sum(1 for waiter in waiters if waiter.context is context)
+    get_metrics()["runner_admission_queue_depth"].labels(context=_context_label(context)).set(depth)
+
+
+def _observe_wait(*, context: RunContext | None, outcome: str, started: float) -> None:
+    get_metrics()["runner_admission_wait_seconds"].labels(
+        context=_context_label(context),
+        outcome=outcome,
+    ).observe(time.monotonic() - started)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import importlib.util
+import marshal
+import threading
+from collections import OrderedDict
+
+from skriptoteket.domain.scripting.models import ToolVersion
+from skriptoteket.observability.metrics import get_metrics
+from skriptoteket.protocols.runner import CompiledToolCode, ToolCodeCacheProtocol
+
+from .docker.container_spec import RUNNER_SCRIPT_PATH
+
+# PEP 552 hash-based pyc, unchecked: the runner verifies the source hash itself.
+_PYC_FLAGS_UNCHECKED_HASH = 0b01
+
+
+def build_hash_based_pyc(*, source: bytes, filename: str) -> bytes:
+    """Compile `source` and serialize it as a hash-based `.pyc` (raises `SyntaxError`)."""
+    code = compile(source, filename, "exec", dont_inherit=True, optimize=0)
+    return b"".join(
+        (
+            importlib.util.MAGIC_NUMBER,
+            _PYC_FLAGS_UNCHECKED_HASH.to_bytes(4, "little"),
+            importlib.util.source_hash(source),
+            marshal.dumps(code),
+        )
+    )
+
+
+class InMemoryToolCodeCache(ToolCodeCacheProtocol):
+    """Process-local LRU of compiled tool scripts keyed by `ToolVersion.content_hash`.
+
+    Entries are also checked against the source hash, so a stale or reused content hash can never
+    serve bytecode for different source.
+    """
+
+    def __init__(self, *, max_entries: int) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, CompiledToolCode] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compile(self, *, version: ToolVersion) -> CompiledToolCode:
+        source = version.source_code.encode("utf-8")
+        source_hash = importlib.util.source_hash(source)
+        lookups = get_metrics()["tool_code_cache_lookups_total"]
+
+        with self._lock:
+            cached = self._entries.get(version.content_hash)
+            if cached is not None and cached.pyc[8:16] == source_hash:
+                self._entries.move_to_end(version.content_hash)
+                lookups.labels(result="hit").inc()
+                return cached
+
+        lookups.labels(result="miss").inc()
+        compiled = CompiledToolCode(
+            content_hash=version.content_hash,
+            pyc=build_hash_based_pyc(source=source, filename=RUNNER_SCRIPT_PATH),
+        )
+        with self._lock:
+            self._entries[version.content_hash] = compiled
+            self._entries.move_to_end(version.content_hash)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return compiled
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from skriptoteket.observability.metrics import get_metrics
+
+
+@contextmanager
+def observe_api_call(operation: str) -> Iterator[None]:
+    """Record Docker API round-trip latency for one call (success or failure).
+
+    Shared by the docker-py adapter and the async httpx engine so both report the same metric.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        get_metrics()["docker_api_call_duration_seconds"].labels(operation=operation).observe(
+            time.perf_counter() - started
+        )
@@ -0,0 +1,412 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import struct
+from collections.abc import AsyncIterable, AsyncIterator, Mapping
+from urllib.parse import quote
+
+import httpx
+from docker.errors import APIError, DockerException, NotFound
+from docker.utils import parse_bytes
+
+from .api_metrics import observe_api_call
+from .protocols import (
+    AsyncDockerClientProtocol,
+    AsyncDockerContainerProtocol,
+    AsyncDockerContainersClientProtocol,
+    AsyncDockerVolumeProtocol,
+    AsyncDockerVolumesClientProtocol,
+)
+
+DOCKER_API_VERSION = "1.41"
+DEFAULT_DOCKER_SOCKET = "/var/run/docker.sock"
+
+_STREAM_HEADER = struct.Struct(">BxxxL")
+
+
+def _raise_for_status(response: httpx.Response, *, body: bytes | None = None) -> None:
+    if response.is_success:
+        return
+    raw = response.content if body is None else body
+    try:
+        explanation = str(json.loads(raw).get("message", ""))
+    except (ValueError, AttributeError):
+        explanation = raw.decode("utf-8", errors="replace")
+    message = f"{response.status_code} {response.reason_phrase}: {explanation}"
+    if response.status_code == 404:
+        raise NotFound(message, explanation=explanation)
+    raise APIError(message, explanation=explanation)
+
+
+def demultiplex_log_stream(data: bytes) -> bytes:
+    """Strip Docker's 8-byte stdout/stderr frame headers (non-TTY containers)."""
+    chunks: list[bytes] = []
+    offset = 0
+    while offset + _STREAM_HEADER.size <= len(data):
+        _stream, size = _STREAM_HEADER.unpack_from(data, offset)
+        offset += _STREAM_HEADER.size
+        chunks.append(data[offset : offset + size])
+        offset += size
+    return b"".join(chunks)
+
+
+def _split_log_frames(data: bytes) -> tuple[bytes, bytes]:
+    """Demultiplex the complete frames in `data`; return (payload, incomplete remainder)."""
+    chunks: list[bytes] = []
+    offset = 0
+    while offset + _STREAM_HEADER.size <= len(data):
+        _stream, size = _STREAM_HEADER.unpack_from(data, offset)
+        end = offset + _STREAM_HEADER.size + size
+        if end > len(data):
+            break
+        chunks.append(data[offset + _STREAM_HEADER.size : end])
+        offset = end
+    return b"".join(chunks), data[offset:]
+
+
+def _encode_filters(filters: Mapping[str, object]) -> str:
+    encoded: dict[str, list[str]] = {}
+    for key, value in filters.items():
+        values = value if isinstance(value, list) else [value]
+        encoded[key] = [str(item) for item in values]
+    return json.dumps(encoded)
+
+
+def engine_create_container_body(kwargs: Mapping[str, object]) -> dict[str, object]:
+    """Translate docker-py `containers.create` kwargs (see `container_spec`) to the Engine API."""
+    environment = kwargs.get("environment") or {}
+    assert isinstance(environment, Mapping)
+    volumes = kwargs.get("volumes") or {}
+    assert isinstance(volumes, Mapping)
+    mem_limit = kwargs.get("mem_limit")
+
+    host_config: dict[str, object] = {
+        "NetworkMode": kwargs.get("network_mode"),
+        "CapDrop": kwargs.get("cap_drop"),
+        "PidsLimit": kwargs.get("pids_limit"),
+        "ReadonlyRootfs": bool(kwargs.get("read_only", False)),
+        "Tmpfs": kwargs.get("tmpfs"),
+        "Binds": [f"{name}:{spec['bind']}:{spec['mode']}" for name, spec in volumes.items()],
+        "NanoCpus": kwargs.get("nano_cpus"),
+    }
+    if mem_limit is not None:
+        host_config["Memory"] = parse_bytes(mem_limit) if isinstance(mem_limit, str) else mem_limit
+
+    return {
+        "Image": kwargs["image"],
+        "Env": [f"{key}={value}" for key, value in environment.items()],
+        "Cmd": kwargs.get("command"),
+        "WorkingDir": kwargs.get("working_dir"),
+        "User": kwargs.get("user"),
+        "Labels": kwargs.get("labels") or {},
+        "HostConfig": {key: value for key, value in host_config.items() if value is not None},
+    }
+
+
+class HttpxDockerVolume(AsyncDockerVolumeProtocol):
+    def __init__(self, *, http: httpx.AsyncClient, name: str) -> None:
+        self._http = http
+        self._name = name
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    async def remove(self, *, force: bool) -> None:
+        with observe_api_call("volume.remove"):
+            response = await self._http.delete(
+                f"/volumes/{quote(self._name)}", params={"force": str(force).lower()}
+            )
+        _raise_for_status(response)
+
+
+class HttpxDockerContainer(AsyncDockerContainerProtocol):
+    def __init__(
+        self,
+        *,
+        http: httpx.AsyncClient,
+        container_id: str,
+        status: str = "created",
+        labels: dict[str, str] | None = None,
+    ) -> None:
+        self._http = http
+        self._id = container_id
+        self._status = status
+        self._labels = labels or {}
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @property
+    def labels(self) -> dict[str, str]:
+        return dict(self._labels)
+
+    async def reload(self) -> None:
+        with observe_api_call("container.reload"):
+            response = await self._http.get(f"/containers/{self._id}/json")
+        _raise_for_status(response)
+        payload = response.json()
+        self._status = str(payload.get("State", {}).get("Status", self._status))
+        self._labels = dict((payload.get("Config") or {}).get("Labels") or {})
+
+    async def put_archive(self, *, path: str, data: bytes | AsyncIterable[bytes]) -> None:
+        with observe_api_call("container.put_archive"):
+            response = await self._http.put(
+                f"/containers/{self._id}/archive",
+                params={"path": path},
+                content=data,
+                headers={"Content-Type": "application/x-tar"},
+            )
+        _raise_for_status(response)
+
+    async def start(self) -> None:
+        with observe_api_call("container.start"):
+            response = await self._http.post(f"/containers/{self._id}/start")
+        _raise_for_status(response)
+        self._status = "running"
+
+    async def wait(self, *, timeout: float) -> int:
+        filters = _encode_filters({"type": "container", "container": self._id, "event": "die"})
+        async with asyncio.timeout(timeout):
+            async with self._http.stream(
+                "GET", "/events", params={"filters": filters}, timeout=None
+            ) as response:
+                if not response.is_success:
+                    _raise_for_status(response, body=await response.aread())
+                # Subscribe first, then inspect: a container that exited before the subscription
+                # was established would otherwise never produce a `die` event for us.
+                exit_code = await self._exit_code_if_stopped()
+                if exit_code is not None:
+                    return exit_code
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    if event.get("Action") != "die":
+                        continue
+                    self._status = "exited"
+                    attributes = (event.get("Actor") or {}).get("Attributes") or {}
+                    return int(attributes.get("exitCode", -1))
+        raise APIError("Docker events stream ended before the container exited")
+
+    async def _exit_code_if_stopped(self) -> int | None:
+        with observe_api_call("container.reload"):
+            response = await self._http.get(f"/containers/{self._id}/json")
+        _raise_for_status(response)
+        state = response.json().get("State", {})
+        self._status = str(state.get("Status", self._status))
+        if self._status in {"created", "running", "restarting", "paused"}:
+            return None
+        return int(state.get("ExitCode", -1))
+
+    async def kill(self) -> None:
+        with observe_api_call("container.kill"):
+            response = await self._http.post(f"/containers/{self._id}/kill")
+        _raise_for_status(response)
+
+    async def logs(self, *, stdout: bool, stderr: bool) -> bytes:
+        with observe_api_call("container.logs"):
+            response = await self._http.get(
+                f"/containers/{self._id}/logs",
+                params={"stdout": int(stdout), "stderr": int(stderr)},
+            )
+        _raise_for_status(response)
+        return demultiplex_log_stream(response.content)
+
+    async def follow_logs(self, *, stdout: bool, stderr: bool) -> AsyncIterator[bytes]:
+        # Not timed: streams for the container's runtime.
+        async with self._http.stream(
+            "GET",
+            f"/containers/{self._id}/logs",
+            params={"stdout": int(stdout), "stderr": int(stderr), "follow": 1},
+            timeout=None,
+        ) as response:
+            if not response.is_success:
+                _raise_for_status(response, body=await response.aread())
+            pending = b""
+            async for data in response.aiter_bytes():
+                pending += data
+                payload, pending = _split_log_frames(pending)
+                if payload:
+                    yield payload
+
+    async def follow_stats(self) -> AsyncIterator[dict[str, object]]:
+        # Not timed: streams for the container's runtime.
+        async with self._http.stream(
+            "GET",
+            f"/containers/{self._id}/stats",
+            params={"stream": 1},
+            timeout=None,
+        ) as response:
+            if not response.is_success:
+                _raise_for_status(response, body=await response.aread())
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield dict(json.loads(line))
+
+    async def get_archive(self, *, path: str) -> AsyncIterator[bytes]:
+        with observe_api_call("container.get_archive"):
+            request = self._http.build_request(
+                "GET", f"/containers/{self._id}/archive", params={"path": path}
+            )
+            response = await self._http.send(request, stream=True)
+        try:
+            if not response.is_success:
+                _raise_for_status(response, body=await response.aread())
+            async for chunk in response.aiter_bytes():
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def remove(self, *, force: bool) -> None:
+        with observe_api_call("container.remove"):
+            response = await self._http.delete(
+                f"/containers/{self._id}", params={"force": str(force).lower()}
+            )
+        _raise_for_status(response)
+
+
+class HttpxDockerVolumesClient(AsyncDockerVolumesClientProtocol):
+    def __init__(self, http: httpx.AsyncClient) -> None:
+        self._http = http
+
+    async def create(self, **kwargs: object) -> AsyncDockerVolumeProtocol:
+        body: dict[str, object] = {"Labels": kwargs.get("labels") or {}}
+        if "name" in kwargs:
+            body["Name"] = kwargs["name"]
+        with observe_api_call("volumes.create"):
+            response = await self._http.post("/volumes/create", json=body)
+        _raise_for_status(response)
+        return HttpxDockerVolume(http=self._http, name=str(response.json()["Name"]))
+
+    async def list(self, **kwargs: object) -> list[AsyncDockerVolumeProtocol]:
+        params: dict[str, str] = {}
+        filters = kwargs.get("filters")
+        if isinstance(filters, Mapping):
+            params["filters"] = _encode_filters(filters)
+        with observe_api_call("volumes.list"):
+            response = await self._http.get("/volumes", params=params)
+        _raise_for_status(response)
+        return [
+            HttpxDockerVolume(http=self._http, name=str(item["Name"]))
+            for item in response.json().get("Volumes") or []
+        ]
+
+
+class HttpxDockerContainersClient(AsyncDockerContainersClientProtocol):
+    def __init__(self, http: httpx.AsyncClient) -> None:
+        self._http = http
+
+    async def create(self, **kwargs: object) -> AsyncDockerContainerProtocol:
+        params: dict[str, str] = {}
+        name = kwargs.get("name")
+        if name is not None:
+            params["name"] = str(name)
+        body = engine_create_container_body(kwargs)
+        with observe_api_call("containers.create"):
+            response = await self._http.post("/containers/create", params=params, json=body)
+        _raise_for_status(response)
+        labels = body["Labels"]
+        assert isinstance(labels, dict)
+        return HttpxDockerContainer(
+            http=self._http,
+            container_id=str(response.json()["Id"]),
+            labels={str(key): str(value) for key, value in labels.items()},
+        )
+
+    async def list(self, **kwargs: object) -> list[AsyncDockerContainerProtocol]:
+        params: dict[str, str] = {"all": str(bool(kwargs.get("all", False))).lower()}
+        filters = kwargs.get("filters")
+        if isinstance(filters, Mapping):
+            params["filters"] = _encode_filters(filters)
+        with observe_api_call("containers.list"):
+            response = await self._http.get("/containers/json", params=params)
+        _raise_for_status(response)
+        return [
+            HttpxDockerContainer(
+                http=self._http,
+                container_id=str(item["Id"]),
+                status=str(item.get("State", "")),
+                labels=dict(item.get("Labels") or {}),
+            )
+            for item in response.json()
+        ]
+
+
+class HttpxDockerClient(AsyncDockerClientProtocol):
+    """Docker Engine API client on `httpx.AsyncClient` (unix socket or plain-TCP DOCKER_HOST).
+
+    Transport failures surface as `DockerException` so callers keep the docker-py error contract.
+    TLS-protected TCP daemons are not supported.
+    """
+
+    def __init__(self, *, http: httpx.AsyncClient) -> None:
+        self._http = http
+        self._containers = HttpxDockerContainersClient(http)
+        self._volumes = HttpxDockerVolumesClient(http)
+
+    @classmethod
+    def from_env(cls, *, max_connections: int) -> HttpxDockerClient:
+        """Connect to DOCKER_HOST with a pool of `max_connections`, all of which may stay alive.
+
+        Size the pool from runner capacity: concurrent runs each hold several connections and
+        would otherwise queue on the pool or reconnect for every call.
+        """
+        docker_host = os.environ.get("DOCKER_HOST", f"unix://{DEFAULT_DOCKER_SOCKET}")
+        limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        if docker_host.startswith("unix://"):
+            transport = httpx.AsyncHTTPTransport(uds=docker_host[len("unix://") :], limits=limits)
+            base_url = f"http://docker/v{DOCKER_API_VERSION}"
+        elif docker_host.startswith("tcp://"):
+            transport = httpx.AsyncHTTPTransport(limits=limits)
+            base_url = f"http://{docker_host[len('tcp://') :]}/v{DOCKER_API_VERSION}"
+        else:
+            raise DockerException(f"Unsupported DOCKER_HOST for the async engine: {docker_host}")
+
+        http = httpx.AsyncClient(
+            transport=_DockerExceptionTransport(transport),
+            base_url=base_url,
+            timeout=httpx.Timeout(60.0),
+        )
+        return cls(http=http)
+
+    @property
+    def containers(self) -> AsyncDockerContainersClientProtocol:
+        return self._containers
+
+    @property
+    def volumes(self) -> AsyncDockerVolumesClientProtocol:
+        return self._volumes
+
+    async def ping(self) -> bool:
+        with observe_api_call("ping"):
+            response = await self._http.get("/_ping")
+        return response.is_success
+
+    async def close(self) -> None:
+        await self._http.aclose()
+
+
+class _DockerExceptionTransport(httpx.AsyncBaseTransport):
+    """Map connection-level failures (daemon down, socket missing) to `DockerException`."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport) -> None:
+        self._inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            return await self._inner.handle_async_request(request)
+        except httpx.TransportError as exc:
+            raise DockerException(f"Docker is not reachable: {exc}") from exc
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
@@ -0,0 +1,684 @@
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import IO, TYPE_CHECKING
+from uuid import UUID
+
+import structlog
+from docker.errors import APIError, DockerException
+from pydantic import JsonValue
+
+from skriptoteket.domain.errors import DomainError, ErrorCode
+from skriptoteket.domain.scripting.artifacts import ArtifactsManifest, RunnerArtifact
+from skriptoteket.domain.scripting.execution import ToolExecutionResult
+from skriptoteket.domain.scripting.models import (
+    RunContext,
+    RunResourceUsage,
+    RunStatus,
+    ToolVersion,
+)
+from skriptoteket.domain.scripting.ui.contract_v2 import ToolUiContractV2Result
+from skriptoteket.infrastructure.runner.capacity import RunnerCapacityLimiter
+from skriptoteket.infrastructure.runner.result_contract import (
+    parse_runner_result_json,
+    parse_runner_timings,
+)
+from skriptoteket.observability.tracing import get_tracer, trace_operation
+from skriptoteket.protocols.run_logs import RunLogBufferProtocol
+from skriptoteket.protocols.runner import ArtifactManagerProtocol, ToolRunnerProtocol
+from skriptoteket.protocols.session_files import RunnerInputFile
+
+from .container_io import extract_first_file_from_tar_bytes, truncate_utf8_bytes, truncate_utf8_str
+from .container_spec import (
+    RUNNER_WORK_DIR,
+    DockerRunnerLimits,
+    build_base_environment,
+    build_run_environment,
+    build_run_labels,
+    build_sandbox_container_kwargs,
+)
+from .errors import raise_docker_client_unavailable
+from .live_output import AsyncLiveOutputFollower
+from .phase_timings import RunnerPhase, RunPhaseTimer
+from .protocols import (
+    AsyncDockerClientProtocol,
+    AsyncDockerContainerProtocol,
+    AsyncDockerVolumeProtocol,
+)
+from .resource_stats import AsyncResourceStatsSampler, observe_resource_usage
+from .workdir_archive import iter_workdir_archive, normalize_workdir_input_files
+
+if TYPE_CHECKING:
+    from opentelemetry.trace import Span
+
+logger = structlog.get_logger(__name__)
+
+_ARCHIVE_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+_ARCHIVE_READ_CHUNK_BYTES = 64 * 1024
+_KILL_GRACE_SECONDS = 10.0
+
+
+class AsyncDockerToolRunner(ToolRunnerProtocol):
+    """Docker runner driven entirely by coroutines (no OS thread held per run).
+
+    Same sandbox spec, workdir contract and result handling as `DockerToolRunner`, but every
+    Docker Engine call is awaited on the event loop and container exit is observed via the
+    events stream. Only artifact persistence (local filesystem writes) is offloaded to a thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        runner_image: str,
+        sandbox_timeout_seconds: int,
+        production_timeout_seconds: int,
+        limits: DockerRunnerLimits,
+        output_max_stdout_bytes: int,
+        output_max_stderr_bytes: int,
+        output_max_error_summary_bytes: int,
+        capacity: RunnerCapacityLimiter,
+        artifacts: ArtifactManagerProtocol,
+        client: AsyncDockerClientProtocol,
+        run_logs: RunLogBufferProtocol | None = None,
+        resource_stats: bool = False,
+    ) -> None:
+        self._runner_image = runner_image
+        self._sandbox_timeout_seconds = sandbox_timeout_seconds
+        self._production_timeout_seconds = production_timeout_seconds
+        self._limits = limits
+        self._output_max_stdout_bytes = output_max_stdout_bytes
+        self._output_max_stderr_bytes = output_max_stderr_bytes
+        self._output_max_error_summary_bytes = output_max_error_summary_bytes
+        self._capacity = capacity
+        self._artifacts = artifacts
+        self._client = client
+        self._run_logs = run_logs
+        self._resource_stats = resource_stats
+
+    async def execute(
+        self,
+        *,
+        run_id: UUID,
+        version: ToolVersion,
+        context: RunContext,
+        input_files: Sequence[RunnerInputFile],
+        input_values: dict[str, JsonValue],
+        memory_json: bytes,
+        action_payload: dict[str, JsonValue] | None,
+        requested_by_user_id: UUID | None = None,
+        script_bytecode: bytes | None = None,
+    ) -> ToolExecutionResult:
+        owner_key = None if requested_by_user_id is None else str(requested_by_user_id)
+        if not await self._capacity.try_acquire(context=context, owner_key=owner_key):
+            logger.warning(
+                "Runner at capacity",
+                run_id=str(run_id),
+                tool_id=str(version.tool_id),
+                tool_version_id=str(version.id),
+                context=context.value,
+            )
+            raise DomainError(
+                code=ErrorCode.SERVICE_UNAVAILABLE,
+                message="Runner is at capacity; retry.",
+            )
+
+        try:
+            return await self._execute(
+                run_id=run_id,
+                version=version,
+                context=context,
+                input_files=input_files,
+                input_values=input_values,
+                memory_json=memory_json,
+                action_payload=action_payload,
+                script_bytecode=script_bytecode,
+            )
+        finally:
+            await self._capacity.release()
+
+    async def try_adopt(
+        self,
+        *,
+        run_id: UUID,
+        version: ToolVersion,
+        context: RunContext,
+    ) -> ToolExecutionResult | None:
+        if not await self._capacity.try_acquire(context=context):
+            logger.warning(
+                "Runner at capacity (adopt)",
+                run_id=str(run_id),
+                tool_id=str(version.tool_id),
+                tool_version_id=str(version.id),
+                context=context.value,
+            )
+            raise DomainError(
+                code=ErrorCode.SERVICE_UNAVAILABLE,
+                message="Runner is at capacity; retry.",
+            )
+
+        try:
+            return await self._try_adopt(run_id=run_id, version=version, context=context)
+        finally:
+            await self._capacity.release()
+
+    def _timeout_seconds(self, context: RunContext) -> int:
+        return (
+            self._sandbox_timeout_seconds
+            if context is RunContext.SANDBOX
+            else self._production_timeout_seconds
+        )
+
+    async def _execute(
+        self,
+        *,
+        run_id: UUID,
+        version: ToolVersion,
+        context: RunContext,
+        input_files: Sequence[RunnerInputFile],
+        input_values: dict[str, JsonValue],
+        memory_json: bytes,
+        action_payload: dict[str, JsonValue] | None,
+        script_bytecode: bytes | None,
+    ) -> ToolExecutionResult:
+        tracer = get_tracer("skriptoteket")
+        start_time = time.monotonic()
+        timeout_seconds = self._timeout_seconds(context)
+        workdir_input_files, input_manifest = normalize_workdir_input_files(input_files=input_files)
+
+        logger.info(
+            "Runner execution start",
+            run_id=str(run_id),
+            tool_id=str(version.tool_id),
+            tool_version_id=str(version.id),
+            context=context.value,
+            timeout_seconds=timeout_seconds,
+            input_files_count=len(workdir_input_files),
+            cpu_limit=self._limits.cpu_limit,
+            memory_limit=self._limits.memory_limit,
+            pids_limit=self._limits.pids_limit,
+            engine="async",
+        )
+
+        run_env = build_run_environment(
+            entrypoint=version.entrypoint,
+            input_manifest=input_manifest,
+            input_values=input_values,
+            action_payload=action_payload,
+        )
+        run_labels = build_run_labels(run_id=run_id, version=version)
+
+        container: AsyncDockerContainerProtocol | None = None
+        work_volume: AsyncDockerVolumeProtocol | None = None
+        live_output: AsyncLiveOutputFollower | None = None
+        stats_sampler: AsyncResourceStatsSampler | None = None
+        phases = RunPhaseTimer()
+
+        try:
+            with trace_operation(
+                tracer,
+                "docker_runner.execute",
+                {
+                    "run.id": str(run_id),
+                    "tool.id": str(version.tool_id),
+                    "version.id": str(version.id),
+                    "run.context": context.value,
+                    "runner.engine": "async",
+                },
+            ) as span:
+                try:
+                    with phases.phase(RunnerPhase.VOLUME_CREATE):
+                        work_volume = await self._client.volumes.create(labels=run_labels)
+                except APIError:
+                    raise
+                except DockerException as exc:
+                    raise_docker_client_unavailable(exc=exc)
+                span.add_event("volume_created")
+
+                workdir_archive = iter_workdir_archive(
+                    version=version,
+                    input_files=workdir_input_files,
+                    memory_json=memory_json,
+                    script_bytecode=script_bytecode,
+                )
+                with phases.phase(RunnerPhase.CONTAINER_CREATE):
+                    container = await self._client.containers.create(
+                        name=f"skriptoteket-run-{run_id}",
+                        **build_sandbox_container_kwargs(
+                            image=self._runner_image,
+                            limits=self._limits,
+                            environment={**build_base_environment(), **run_env},
+                            volume_name=work_volume.name,
+                            labels=run_labels,
+                        ),
+                    )
+                with phases.phase(RunnerPhase.PUT_ARCHIVE):
+                    await container.put_archive(
+                        path=RUNNER_WORK_DIR, data=_aiter_in_thread(workdir_archive)
+                    )
+                with phases.phase(RunnerPhase.START):
+                    await container.start()
+                span.add_event("container_started")
+                live_output = self._start_live_output(run_id=run_id, container=container)
+                if self._resource_stats:
+                    stats_sampler = AsyncResourceStatsSampler(run_id=run_id, container=container)
+                    stats_sampler.start()
+
+                with phases.phase(RunnerPhase.CONTAINER_WAIT):
+                    timed_out = await self._wait_or_kill(
+                        container=container, timeout_seconds=timeout_seconds
+                    )
+                if live_output is not None:
+                    await live_output.stop()
+                resource_usage = await stats_sampler.stop() if stats_sampler is not None else None
+                if resource_usage is not None:
+                    observe_resource_usage(tool_id=version.tool_id, usage=resource_usage)
+                    if resource_usage.memory_peak_bytes is not None:
+                        span.set_attribute(
+                            "runner.memory_peak_bytes", resource_usage.memory_peak_bytes
+                        )
+                    if resource_usage.cpu_seconds is not None:
+                        span.set_attribute("runner.cpu_seconds", resource_usage.cpu_seconds)
+                span.add_event("container_finished", {"timed_out": str(timed_out)})
+
+                return await self._collect_result(
+                    container=container,
+                    run_id=run_id,
+                    version=version,
+                    context=context,
+                    timed_out=timed_out,
+                    timeout_seconds=timeout_seconds,
+                    start_time=start_time,
+                    span=span,
+                    phases=phases,
+                    resource_usage=resource_usage,
+                )
+        finally:
+            if stats_sampler is not None:
+                await stats_sampler.stop()
+            if container is not None:
+                try:
+                    await container.remove(force=True)
+                except DockerException:
+                    pass
+            if work_volume is not None:
+                try:
+                    await work_volume.remove(force=True)
+                except DockerException:
+                    pass
+            if live_output is not None:
+                # No-op after a normal run; on errors the streams end once the container is gone.
+                await live_output.stop()
+
+    def _start_live_output(
+        self,
+        *,
+        run_id: UUID,
+        container: AsyncDockerContainerProtocol,
+    ) -> AsyncLiveOutputFollower | None:
+        if self._run_logs is None:
+            return None
+        try:
+            writer = self._run_logs.open_writer(run_id=run_id)
+        except OSError:
+            logger.warning("Live output buffer unavailable", run_id=str(run_id), exc_info=True)
+            return None
+        follower = AsyncLiveOutputFollower(run_id=run_id, container=container, writer=writer)
+        follower.start()
+        return follower
+
+    async def _try_adopt(
+        self,
+        *,
+        run_id: UUID,
+        version: ToolVersion,
+        context: RunContext,
+    ) -> ToolExecutionResult | None:
+        container: AsyncDockerContainerProtocol | None = None
+
+        try:
+            containers = await self._client.containers.list(
+                all=True,
+                filters={"label": f"skriptoteket.run_id={run_id}"},
+            )
+            if not containers:
+                return None
+
+            # Prefer adopting a running container when multiple exist (defense-in-depth).
+            for candidate in containers:
+                try:
+                    await candidate.reload()
+                except DockerException:
+                    continue
+                if candidate.status == "running":
+                    container = candidate
+                    break
+            if container is None:
+                container = containers[0]
+
+            if container.status == "created":
+                return None
+
+            start_time = time.monotonic()
+            timeout_seconds = self._timeout_seconds(context)
+            tracer = get_tracer("skriptoteket")
+            with trace_operation(
+                tracer,
+                "docker_runner.adopt",
+                {
+                    "run.id": str(run_id),
+                    "tool.id": str(version.tool_id),
+                    "version.id": str(version.id),
+                    "run.context": context.value,
+                    "runner.engine": "async",
+                },
+            ) as span:
+                timed_out = await self._wait_or_kill(
+                    container=container, timeout_seconds=timeout_seconds
+                )
+                span.add_event("container_finished", {"timed_out": str(timed_out)})
+                return await self._collect_result(
+                    container=container,
+                    run_id=run_id,
+                    version=version,
+                    context=context,
+                    timed_out=timed_out,
+                    timeout_seconds=timeout_seconds,
+                    start_time=start_time,
+                    span=span,
+                    phases=RunPhaseTimer(),
+                )
+        finally:
+            if container is not None:
+                try:
+                    await container.remove(force=True)
+                except DockerException:
+                    pass
+            try:
+                volumes = await self._client.volumes.list(
+                    filters={"label": f"skriptoteket.run_id={run_id}"}
+                )
+                for volume in volumes:
+                    try:
+                        await volume.remove(force=True)
+                    except DockerException:
+                        pass
+            except DockerException:
+                pass
+
+    async def _wait_or_kill(
+        self,
+        *,
+        container: AsyncDockerContainerProtocol,
+        timeout_seconds: float,
+    ) -> bool:
+        try:
+            await container.wait(timeout=timeout_seconds)
+            return False
+        except TimeoutError:
+            try:
+                await container.kill()
+            except DockerException:
+                pass
+            try:
+                await container.wait(timeout=_KILL_GRACE_SECONDS)
+            except TimeoutError:
+                pass
+            return True
+
+    async def _collect_result(
+        self,
+        *,
+        container: AsyncDockerContainerProtocol,
+        run_id: UUID,
+        version: ToolVersion,
+        context: RunContext,
+        timed_out: bool,
+        timeout_seconds: int,
+        start_time: float,
+        span: Span,
+        phases: RunPhaseTimer,
+        resource_usage: RunResourceUsage | None = None,
+    ) -> ToolExecutionResult:
+        with phases.phase(RunnerPhase.LOGS):
+            stdout = truncate_utf8_bytes(
+                data=await container.logs(stdout=True, stderr=False),
+                max_bytes=self._output_max_stdout_bytes,
+            )
+            stderr = truncate_utf8_bytes(
+                data=await container.logs(stdout=False, stderr=True),
+                max_bytes=self._output_max_stderr_bytes,
+            )
+        with phases.phase(RunnerPhase.RESULT_JSON):
+            result_json_bytes = await self._fetch_result_json_bytes(container=container)
+
+        if timed_out:
+            with phases.phase(RunnerPhase.ARTIFACTS):
+                artifacts_manifest = await self._store_output_archive_safely(
+                    container=container, run_id=run_id
+                )
+            span.set_attribute("run.status", RunStatus.TIMED_OUT.value)
+            span.set_attribute("run.duration_seconds", round(time.monotonic() - start_time, 6))
+            span.set_attribute("run.artifacts_count", len(artifacts_manifest.artifacts))
+            logger.warning(
+                "Runner execution timed out",
+                run_id=str(run_id),
+                tool_id=str(version.tool_id),
+                tool_version_id=str(version.id),
+                context=context.value,
+                timeout_seconds=timeout_seconds,
+                duration_seconds=round(time.monotonic() - start_time, 6),
+                phase_seconds=phases.durations(),
+            )
+            ui_result = ToolUiContractV2Result(
+                status="timed_out",
+                error_summary=truncate_utf8_str(
+                    value="Execution timed out.",
+                    max_bytes=self._output_max_error_summary_bytes,
+                ),
+                outputs=[],
+                next_actions=[],
+                state=None,
+                artifacts=[],
+            )
+            return ToolExecutionResult(
+                status=RunStatus.TIMED_OUT,
+                stdout=stdout,
+                stderr=stderr,
+                ui_result=ui_result,
+                artifacts_manifest=artifacts_manifest,
+                resource_usage=resource_usage,
+            )
+
+        if result_json_bytes is None:
+            artifacts_manifest = await self._store_output_archive_safely(
+                container=container, run_id=run_id
+            )
+            logger.warning(
+                "Runner contract violation (missing result.json)",
+                run_id=str(run_id),
+                tool_id=str(version.tool_id),
+                tool_version_id=str(version.id),
+                context=context.value,
+                duration_seconds=round(time.monotonic() - start_time, 6),
+            )
+            raise DomainError(
+                code=ErrorCode.INTERNAL_ERROR,
+                message="Execution failed (runner contract violation).",
+                details={
+                    "reason": "missing result.json",
+                    "stdout": stdout,
+                    "stderr": stderr,
+                    "artifacts_manifest": artifacts_manifest.model_dump(),
+                },
+            )
+
+        try:
+            runner_payload = parse_runner_result_json(result_json_bytes=result_json_bytes)
+        except DomainError as exc:
+            artifacts_manifest = await self._store_output_archive_safely(
+                container=container, run_id=run_id
+            )
+            logger.warning(
+                "Runner contract violation (invalid result.json)",
+                run_id=str(run_id),
+                tool_id=str(version.tool_id),
+                tool_version_id=str(version.id),
+                context=context.value,
+                duration_seconds=round(time.monotonic() - start_time, 6),
+            )
+            raise DomainError(
+                code=ErrorCode.INTERNAL_ERROR,
+                message="Execution failed (runner contract violation).",
+                details={
+                    "reason": "invalid result.json",
+                    "validation": exc.details,
+                    "stdout": stdout,
+                    "stderr": stderr,
+                    "artifacts_manifest": artifacts_manifest.model_dump(),
+                },
+            ) from exc
+
+        status = RunStatus(runner_payload.status)
+        runner_error_summary: str | None = (
+            None
+            if runner_payload.error_summary is None
+            else truncate_utf8_str(
+                value=runner_payload.error_summary,
+                max_bytes=self._output_max_error_summary_bytes,
+            )
+        )
+        ui_result = (
+            runner_payload
+            if runner_payload.error_summary == runner_error_summary
+            else runner_payload.model_copy(update={"error_summary": runner_error_summary})
+        )
+
+        try:
+            with phases.phase(RunnerPhase.ARTIFACTS):
+                artifacts_manifest = await self._store_output_archive(
+                    container=container,
+                    run_id=run_id,
+                    reported_artifacts=runner_payload.artifacts,
+                )
+        except DomainError as exc:
+            logger.warning(
+                "Artifact extraction violation",
+                run_id=str(run_id),
+                tool_id=str(version.tool_id),
+                tool_version_id=str(version.id),
+                context=context.value,
+                duration_seconds=round(time.monotonic() - start_time, 6),
+            )
+            raise DomainError(
+                code=ErrorCode.INTERNAL_ERROR,
+                message="Execution failed (artifact extraction violation).",
+                details={
+                    "stdout": stdout,
+                    "stderr": stderr,
+                },
+            ) from exc
+
+        span.add_event("artifacts_extracted", {"count": str(len(artifacts_manifest.artifacts))})
+        span.set_attribute("run.status", status.value)
+        span.set_attribute("run.duration_seconds", round(time.monotonic() - start_time, 6))
+        span.set_attribute("run.artifacts_count", len(artifacts_manifest.artifacts))
+        runner_timings = parse_runner_timings(result_json_bytes=result_json_bytes)
+        for phase, seconds in runner_timings.items():
+            span.set_attribute(f"runner.timing.{phase}", seconds)
+        phase_seconds = phases.durations()
+        for phase, seconds in phase_seconds.items():
+            span.set_attribute(f"runner.phase.{phase}_seconds", seconds)
+
+        logger.info(
+            "Runner execution finished",
+            run_id=str(run_id),
+            tool_id=str(version.tool_id),
+            tool_version_id=str(version.id),
+            context=context.value,
+            status=status.value,
+            duration_seconds=round(time.monotonic() - start_time, 6),
+            artifacts_count=len(artifacts_manifest.artifacts),
+            runner_timings=runner_timings,
+            phase_seconds=phase_seconds,
+            resource_usage=None if resource_usage is None else resource_usage.model_dump(),
+        )
+        return ToolExecutionResult(
+            status=status,
+            stdout=stdout,
+            stderr=stderr,
+            ui_result=ui_result,
+            artifacts_manifest=artifacts_manifest,
+            resource_usage=resource_usage,
+        )
+
+    async def _fetch_result_json_bytes(
+        self, *, container: AsyncDockerContainerProtocol
+    ) -> bytes | None:
+        try:
+            chunks = [
+                chunk
+                async for chunk in container.get_archive(path=f"{RUNNER_WORK_DIR}/result.json")
+            ]
+            return extract_first_file_from_tar_bytes(tar_bytes=b"".join(chunks))
+        except (DockerException, RuntimeError):
+            return None
+
+    async def _store_output_archive(
+        self,
+        *,
+        container: AsyncDockerContainerProtocol,
+        run_id: UUID,
+        reported_artifacts: list[RunnerArtifact],
+    ) -> ArtifactsManifest:
+        # Writes stay on the loop while the spool is in memory; once it rolls over to a temp
+        # file, writes (and the final close/unlink) run on a thread, as does the extraction.
+        spool = tempfile.SpooledTemporaryFile(max_size=_ARCHIVE_SPOOL_MAX_BYTES)
+        try:
+            spooled_bytes = 0
+            try:
+                async for chunk in container.get_archive(path=f"{RUNNER_WORK_DIR}/output"):
+                    spooled_bytes += len(chunk)
+                    if spooled_bytes <= _ARCHIVE_SPOOL_MAX_BYTES:
+                        spool.write(chunk)
+                    else:
+                        await asyncio.to_thread(spool.write, chunk)
+            except DockerException:
+                return ArtifactsManifest(artifacts=[])
+            await asyncio.to_thread(spool.seek, 0)
+            return await asyncio.to_thread(
+                self._artifacts.store_output_archive,
+                run_id=run_id,
+                output_archive=_iter_file_chunks(spool),
+                reported_artifacts=reported_artifacts,
+            )
+        finally:
+            await asyncio.to_thread(spool.close)
+
+    async def _store_output_archive_safely(
+        self,
+        *,
+        container: AsyncDockerContainerProtocol,
+        run_id: UUID,
+    ) -> ArtifactsManifest:
+        try:
+            return await self._store_output_archive(
+                container=container,
+                run_id=run_id,
+                reported_artifacts=[],
+            )
+        except DomainError:
+            return ArtifactsManifest(artifacts=[])
+
+
+def _iter_file_chunks(handle: IO[bytes]) -> Iterator[bytes]:
+    while chunk := handle.read(_ARCHIVE_READ_CHUNK_BYTES):
+        yield chunk
+
+
+async def _aiter_in_thread(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Pull a blocking iterator (disk reads) on a worker thread, one chunk at a time."""
+    while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+        yield chunk
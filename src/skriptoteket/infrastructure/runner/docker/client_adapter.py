@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from typing import Any
 
+from .api_metrics import observe_api_call
 from .protocols import (
     DockerClientProtocol,
     DockerContainerProtocol,
@@ -21,7 +22,8 @@ class DockerVolumeAdapter(DockerVolumeProtocol):
         return str(self._volume.name)
 
     def remove(self, *, force: bool) -> None:
-        self._volume.remove(force=force)
+        with observe_api_call("volume.remove"):
+            self._volume.remove(force=force)
 
 
 class DockerContainerAdapter(DockerContainerProtocol):
@@ -32,32 +34,58 @@ class DockerContainerAdapter(DockerContainerProtocol):
     def status(self) -> str:
         return str(self._container.status)
 
+    @property
+    def labels(self) -> dict[str, str]:
+        return {str(key): str(value) for key, value in (self._container.labels or {}).items()}
+
     def reload(self) -> None:
-        self._container.reload()
+        with observe_api_call("container.reload"):
+            self._container.reload()
+
+    def rename(self, *, name: str) -> None:
+        with observe_api_call("container.rename"):
+            self._container.rename(name)
 
-    def put_archive(self, *, path: str, data: bytes) -> bool:
-        return bool(self._container.put_archive(path=path, data=data))
+    def put_archive(self, *, path: str, data: bytes | Iterable[bytes]) -> bool:
+        with observe_api_call("container.put_archive"):
+            return bool(self._container.put_archive(path=path, data=data))
 
     def start(self) -> None:
-        self._container.start()
+        with observe_api_call("container.start"):
+            self._container.start()
 
     def wait(self, *, timeout: int) -> object:
+        # Not timed: blocks for the container's runtime rather than an API round trip.
         return self._container.wait(timeout=timeout)
 
     def kill(self) -> None:
-        self._container.kill()
+        with observe_api_call("container.kill"):
+            self._container.kill()
 
     def logs(self, *, stdout: bool, stderr: bool) -> bytes:
-        return bytes(self._container.logs(stdout=stdout, stderr=stderr))
+        with observe_api_call("container.logs"):
+            return bytes(self._container.logs(stdout=stdout, stderr=stderr))
+
+    def follow_logs(self, *, stdout: bool, stderr: bool) -> Iterator[bytes]:
+        # Not timed: streams for the container's runtime.
+        for chunk in self._container.logs(stdout=stdout, stderr=stderr, stream=True, follow=True):
+            yield bytes(chunk)
+
+    def follow_stats(self) -> Iterator[dict[str, object]]:
+        # Not timed: streams for the container's runtime.
+        for sample in self._container.stats(stream=True, decode=True):
+            yield dict(sample)
 
     def get_archive(self, *, path: str) -> tuple[Iterable[bytes], object]:
-        stream_any, stat_any = self._container.get_archive(path=path)
+        with observe_api_call("container.get_archive"):
+            stream_any, stat_any = self._container.get_archive(path=path)
         stream: Iterable[bytes] = (bytes(chunk) for chunk in stream_any)
         stat: object = stat_any
         return stream, stat
 
     def remove(self, *, force: bool) -> None:
-        self._container.remove(force=force)
+        with observe_api_call("container.remove"):
+            self._container.remove(force=force)
 
 
 class DockerVolumesClientAdapter(DockerVolumesClientProtocol):
@@ -65,10 +93,12 @@ class DockerVolumesClientAdapter(DockerVolumesClientProtocol):
         self._volumes = volumes
 
     def create(self, **kwargs: object) -> DockerVolumeProtocol:
-        return DockerVolumeAdapter(self._volumes.create(**kwargs))
+        with observe_api_call("volumes.create"):
+            return DockerVolumeAdapter(self._volumes.create(**kwargs))
 
     def list(self, **kwargs: object) -> list[DockerVolumeProtocol]:
-        return [DockerVolumeAdapter(volume) for volume in self._volumes.list(**kwargs)]
+        with observe_api_call("volumes.list"):
+            return [DockerVolumeAdapter(volume) for volume in self._volumes.list(**kwargs)]
 
 
 class DockerContainersClientAdapter(DockerContainersClientProtocol):
@@ -76,13 +106,18 @@ class DockerContainersClientAdapter(DockerContainersClientProtocol):
         self._containers = containers
 
     def create(self, **kwargs: object) -> DockerContainerProtocol:
-        return DockerContainerAdapter(self._containers.create(**kwargs))
+        with observe_api_call("containers.create"):
+            return DockerContainerAdapter(self._containers.create(**kwargs))
 
     def get(self, *args: object, **kwargs: object) -> DockerContainerProtocol:
-        return DockerContainerAdapter(self._containers.get(*args, **kwargs))
+        with observe_api_call("containers.get"):
+            return DockerContainerAdapter(self._containers.get(*args, **kwargs))
 
     def list(self, **kwargs: object) -> list[DockerContainerProtocol]:
-        return [DockerContainerAdapter(container) for container in self._containers.list(**kwargs)]
+        with observe_api_call("containers.list"):
+            return [
+                DockerContainerAdapter(container) for container in self._containers.list(**kwargs)
+            ]
 
 
 class DockerClientAdapter(DockerClientProtocol):
@@ -99,5 +134,9 @@ class DockerClientAdapter(DockerClientProtocol):
     def volumes(self) -> DockerVolumesClientProtocol:
         return self._volumes
 
+    def ping(self) -> bool:
+        with observe_api_call("ping"):
+            return bool(self._client.ping())
+
     def close(self) -> None:
         self._client.close()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from uuid import UUID
+
+from pydantic import JsonValue
+
+from skriptoteket.domain.errors import DomainError, ErrorCode
+from skriptoteket.domain.scripting.input_files import InputManifest
+from skriptoteket.domain.scripting.models import ToolVersion
+
+RUNNER_WORK_DIR = "/work"
+RUN_ENV_FILENAME = "run_env.json"
+RUN_ENV_PATH = f"{RUNNER_WORK_DIR}/{RUN_ENV_FILENAME}"
+SCRIPT_FILENAME = "script.py"
+SCRIPT_CODE_FILENAME = "script.pyc"
+RUNNER_SCRIPT_PATH = f"{RUNNER_WORK_DIR}/{SCRIPT_FILENAME}"
+# Written last into the workdir of a pre-started fork-server container: "the run may begin".
+RUN_TRIGGER_FILENAME = ".run"
+RUN_TRIGGER_PATH = f"{RUNNER_WORK_DIR}/{RUN_TRIGGER_FILENAME}"
+
+RUNNER_COMMAND: list[str] = [
+    "sh",
+    "-lc",
+    "set -euo pipefail; mkdir -p /tmp/home; /app/.venv/bin/python /runner/_runner.py",
+]
+FORK_SERVER_COMMAND: list[str] = [
+    "sh",
+    "-lc",
+    "set -euo pipefail; mkdir -p /tmp/home; /app/.venv/bin/python /runner/_forkserver.py",
+]
+
+
+@dataclass(frozen=True, slots=True)
+class DockerRunnerLimits:
+    cpu_limit: float
+    memory_limit: str
+    pids_limit: int
+    tmpfs_tmp: str
+
+
+def build_base_environment() -> dict[str, str]:
+    """Env vars that do not depend on the run (safe to bake into pre-created containers)."""
+    return {
+        "HOME": "/tmp/home",
+        "XDG_CACHE_HOME": "/tmp/home/.cache",
+        "SKRIPTOTEKET_SCRIPT_PATH": RUNNER_SCRIPT_PATH,
+        "SKRIPTOTEKET_SCRIPT_CODE_PATH": f"{RUNNER_WORK_DIR}/{SCRIPT_CODE_FILENAME}",
+        "SKRIPTOTEKET_INPUT_DIR": f"{RUNNER_WORK_DIR}/input",
+        "SKRIPTOTEKET_MEMORY_PATH": f"{RUNNER_WORK_DIR}/memory.json",
+        "SKRIPTOTEKET_OUTPUT_DIR": f"{RUNNER_WORK_DIR}/output",
+        "SKRIPTOTEKET_RESULT_PATH": f"{RUNNER_WORK_DIR}/result.json",
+    }
+
+
+def build_run_environment(
+    *,
+    entrypoint: str,
+    input_manifest: InputManifest,
+    input_values: dict[str, JsonValue],
+    action_payload: dict[str, JsonValue] | None,
+) -> dict[str, str]:
+    """Per-run env vars (`input_manifest` describes the already-normalized input files)."""
+    manifest_payload = {
+        "files": [
+            {
+                "name": entry.name,
+                "path": f"{RUNNER_WORK_DIR}/input/{entry.name}",
+                "bytes": entry.bytes,
+            }
+            for entry in input_manifest.files
+        ]
+    }
+    run_env: dict[str, str] = {
+        "SKRIPTOTEKET_ENTRYPOINT": entrypoint,
+        "SKRIPTOTEKET_INPUT_MANIFEST": json.dumps(
+            manifest_payload, ensure_ascii=False, separators=(",", ":")
+        ),
+        "SKRIPTOTEKET_INPUTS": json.dumps(input_values, ensure_ascii=False, separators=(",", ":")),
+    }
+    if action_payload is not None:
+        try:
+            run_env["SKRIPTOTEKET_ACTION"] = json.dumps(
+                action_payload,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        except TypeError as exc:
+            raise DomainError(
+                code=ErrorCode.INTERNAL_ERROR,
+                message="Failed to encode action payload as JSON.",
+            ) from exc
+    return run_env
+
+
+def build_run_labels(*, run_id: UUID, version: ToolVersion) -> dict[str, str]:
+    return {
+        "skriptoteket.run_id": str(run_id),
+        "skriptoteket.tool_version_id": str(version.id),
+        "skriptoteket.tool_id": str(version.tool_id),
+    }
+
+
+def build_sandbox_container_kwargs(
+    *,
+    image: str,
+    limits: DockerRunnerLimits,
+    environment: dict[str, str],
+    volume_name: str,
+    labels: dict[str, str],
+    fork_server: bool = False,
+) -> dict[str, object]:
+    """Single source of truth for runner container isolation (ADR-0013).
+
+    Both cold runs and warm-pool containers must be created from this spec so the sandbox
+    guarantees (no network, read-only root, all capabilities dropped) cannot drift apart.
+    `fork_server` only swaps the entrypoint (`_forkserver.py` instead of `_runner.py`).
+    """
+    return {
+        "image": image,
+        "environment": environment,
+        "command": list(FORK_SERVER_COMMAND if fork_server else RUNNER_COMMAND),
+        "working_dir": "/app",
+        "network_mode": "none",
+        "user": "runner",
+        "cap_drop": ["ALL"],
+        "pids_limit": limits.pids_limit,
+        "read_only": True,
+        "tmpfs": {
+            "/tmp": limits.tmpfs_tmp,
+        },
+        "volumes": {volume_name: {"bind": RUNNER_WORK_DIR, "mode": "rw"}},
+        "mem_limit": limits.memory_limit,
+        "nano_cpus": int(limits.cpu_limit * 1_000_000_000),
+        "labels": labels,
+    }
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import structlog
+
+from skriptoteket.observability.metrics import get_metrics
+
+from .protocols import DockerClientProtocol
+from .shared_client import PersistentDockerClient
+from .warm_pool import DockerWarmPool
+
+logger = structlog.get_logger(__name__)
+
+LOCAL_ENDPOINT_NAME = "local"
+
+
+@dataclass(frozen=True, slots=True)
+class DockerEndpointConfig:
+    url: str
+    capacity: int
+
+
+def parse_docker_endpoints(value: str) -> list[DockerEndpointConfig]:
+    """Parse `RUNNER_DOCKER_ENDPOINTS`: comma-separated `<docker host url>=<capacity>` entries.
+
+    Example: `unix:///var/run/docker.sock=2,tcp://runner-2:2376=4`. An empty value means "no
+    explicit endpoints" (a single endpoint from the environment).
+    """
+    endpoints: list[DockerEndpointConfig] = []
+    seen: set[str] = set()
+    for raw_entry in value.split(","):
+        entry = raw_entry.strip()
+        if not entry:
+            continue
+        url, separator, raw_capacity = entry.rpartition("=")
+        url = url.strip()
+        if not separator or not url:
+            raise ValueError(f"Docker endpoint must be '<url>=<capacity>': {entry!r}")
+        try:
+            capacity = int(raw_capacity)
+        except ValueError:
+            raise ValueError(f"Docker endpoint capacity must be an integer: {entry!r}") from None
+        if capacity < 1:
+            raise ValueError(f"Docker endpoint capacity must be >= 1: {entry!r}")
+        if url in seen:
+            raise ValueError(f"Duplicate Docker endpoint: {url!r}")
+        seen.add(url)
+        endpoints.append(DockerEndpointConfig(url=url, capacity=capacity))
+    return endpoints
+
+
+def docker_client_for_endpoint(*, url: str, max_pool_size: int) -> DockerClientProtocol:
+    """Create a Docker SDK client for `url`; TLS settings (DOCKER_TLS_VERIFY/DOCKER_CERT_PATH) and
+    the API version still come from the environment."""
+    import docker
+
+    from .client_adapter import DockerClientAdapter
+
+    return DockerClientAdapter(
+        docker.from_env(
+            max_pool_size=max_pool_size,
+            environment={**os.environ, "DOCKER_HOST": url},
+        )
+    )
+
+
+class DockerEndpoint:
+    """One Docker daemon runs can be scheduled on.
+
+    `capacity=None` means the endpoint is only bounded by the process-wide `RunnerCapacityLimiter`
+    (the single-endpoint default).
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        client: PersistentDockerClient,
+        capacity: int | None = None,
+        warm_pool: DockerWarmPool | None = None,
+    ) -> None:
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.name = name
+        self.client = client
+        self.capacity = capacity
+        self.warm_pool = warm_pool
+        self.in_flight = 0
+        self.unavailable_until = 0.0
+
+    def close(self) -> None:
+        if self.warm_pool is not None:
+            self.warm_pool.close()
+        self.client.close()
+
+
+class DockerEndpointPool:
+    """Schedules runs across Docker endpoints.
+
+    Each run goes to the available endpoint with the most free capacity (ties: configuration
+    order). An endpoint that fails (client creation, health check or connection errors) is taken
+    out of rotation for `cooldown_seconds`; afterwards the next run scheduled there acts as the
+    probe. Adoption looks for a run's container on every endpoint, see `endpoints`.
+    """
+
+    def __init__(
+        self,
+        *,
+        endpoints: Sequence[DockerEndpoint],
+        cooldown_seconds: float = 30.0,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("at least one Docker endpoint is required")
+        if len({endpoint.name for endpoint in endpoints}) != len(endpoints):
+            raise ValueError("Docker endpoint names must be unique")
+        if cooldown_seconds < 0:
+            raise ValueError("cooldown_seconds must be >= 0")
+        self._endpoints = tuple(endpoints)
+        self._cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        for endpoint in self._endpoints:
+            _set_healthy_gauge(endpoint=endpoint, healthy=True)
+
+    @property
+    def endpoints(self) -> tuple[DockerEndpoint, ...]:
+        return self._endpoints
+
+    def acquire(self) -> DockerEndpoint | None:
+        """Reserve a slot on the best endpoint; None when every endpoint is full or unhealthy."""
+        with self._lock:
+            now = time.monotonic()
+            best: DockerEndpoint | None = None
+            best_free = 0.0
+            for endpoint in self._endpoints:
+                if endpoint.unavailable_until > now:
+                    continue
+                free = (
+                    float("inf")
+                    if endpoint.capacity is None
+                    else endpoint.capacity - endpoint.in_flight
+                )
+                if free > best_free:
+                    best, best_free = endpoint, free
+            if best is not None:
+                self._hold(best)
+            return best
+
+    def hold(self, endpoint: DockerEndpoint) -> None:
+        """Count a run on a specific endpoint regardless of capacity (adoption)."""
+        with self._lock:
+            self._hold(endpoint)
+
+    def release(self, endpoint: DockerEndpoint) -> None:
+        with self._lock:
+            if endpoint.in_flight <= 0:
+                raise RuntimeError("DockerEndpointPool released too many times")
+            endpoint.in_flight -= 1
+            _set_in_flight_gauge(endpoint)
+
+    def mark_unhealthy(self, endpoint: DockerEndpoint) -> None:
+        with self._lock:
+            endpoint.unavailable_until = time.monotonic() + self._cooldown_seconds
+        logger.warning(
+            "Docker endpoint taken out of rotation",
+            endpoint=endpoint.name,
+            cooldown_seconds=self._cooldown_seconds,
+        )
+        _set_healthy_gauge(endpoint=endpoint, healthy=False)
+
+    def mark_healthy(self, endpoint: DockerEndpoint) -> None:
+        with self._lock:
+            if endpoint.unavailable_until == 0.0:
+                return
+            endpoint.unavailable_until = 0.0
+        logger.info("Docker endpoint back in rotation", endpoint=endpoint.name)
+        _set_healthy_gauge(endpoint=endpoint, healthy=True)
+
+    def start(self) -> None:
+        for endpoint in self._endpoints:
+            if endpoint.warm_pool is not None:
+                endpoint.warm_pool.start()
+
+    def close(self) -> None:
+        for endpoint in self._endpoints:
+            endpoint.close()
+
+    def _hold(self, endpoint: DockerEndpoint) -> None:
+        endpoint.in_flight += 1
+        _set_in_flight_gauge(endpoint)
+
+
+def _set_in_flight_gauge(endpoint: DockerEndpoint) -> None:
+    get_metrics()["runner_endpoint_runs_in_flight"].labels(endpoint=endpoint.name).set(
+        endpoint.in_flight
+    )
+
+
+def _set_healthy_gauge(*, endpoint: DockerEndpoint, healthy: bool) -> None:
+    get_metrics()["runner_endpoint_healthy"].labels(endpoint=endpoint.name).set(int(healthy))
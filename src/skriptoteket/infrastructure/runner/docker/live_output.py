@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from uuid import UUID
+
+import structlog
+
+from skriptoteket.protocols.run_logs import RunLogStream, RunLogWriterProtocol
+
+from .protocols import AsyncDockerContainerProtocol, DockerContainerProtocol
+
+logger = structlog.get_logger(__name__)
+
+_STREAMS: tuple[RunLogStream, ...] = ("stdout", "stderr")
+
+
+class LiveOutputFollower:
+    """Forwards a started container's stdout/stderr into a run log writer (one thread per stream).
+
+    Best effort: follow errors only end the live view; the final output is still read from the
+    container logs after exit.
+    """
+
+    def __init__(
+        self,
+        *,
+        run_id: UUID,
+        container: DockerContainerProtocol,
+        writer: RunLogWriterProtocol,
+    ) -> None:
+        self._run_id = run_id
+        self._container = container
+        self._writer = writer
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        for stream in _STREAMS:
+            thread = threading.Thread(
+                target=self._follow,
+                args=(stream,),
+                name=f"run-logs-{self._run_id}-{stream}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, *, timeout_seconds: float = 5.0) -> None:
+        """Wait for the streams to end (they do once the container exits) and close the writer."""
+        for thread in self._threads:
+            thread.join(timeout=timeout_seconds)
+        self._threads.clear()
+        self._writer.close()
+
+    def _follow(self, stream: RunLogStream) -> None:
+        try:
+            for chunk in self._container.follow_logs(
+                stdout=stream == "stdout",
+                stderr=stream == "stderr",
+            ):
+                self._writer.write(stream=stream, data=chunk)
+        except Exception:  # noqa: BLE001
+            logger.debug("Live output follow ended", run_id=str(self._run_id), exc_info=True)
+
+
+class AsyncLiveOutputFollower:
+    """Asyncio counterpart of `LiveOutputFollower` (one task per stream)."""
+
+    def __init__(
+        self,
+        *,
+        run_id: UUID,
+        container: AsyncDockerContainerProtocol,
+        writer: RunLogWriterProtocol,
+    ) -> None:
+        self._run_id = run_id
+        self._container = container
+        self._writer = writer
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._follow(stream), name=f"run-logs-{self._run_id}-{stream}")
+            for stream in _STREAMS
+        ]
+
+    async def stop(self, *, timeout_seconds: float = 5.0) -> None:
+        if self._tasks:
+            _done, pending = await asyncio.wait(self._tasks, timeout=timeout_seconds)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        self._writer.close()
+
+    async def _follow(self, stream: RunLogStream) -> None:
+        try:
+            async for chunk in self._container.follow_logs(
+                stdout=stream == "stdout",
+                stderr=stream == "stderr",
+            ):
+                self._writer.write(stream=stream, data=chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001
+            logger.debug("Live output follow ended", run_id=str(self._run_id), exc_info=True)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from enum import StrEnum
+
+from skriptoteket.observability.metrics import get_metrics
+
+
+class RunnerPhase(StrEnum):
+    VOLUME_CREATE = "volume_create"
+    CONTAINER_CREATE = "container_create"
+    PUT_ARCHIVE = "put_archive"
+    START = "start"
+    # Host-side wall time from start (or fork-server trigger) until the container exits.
+    CONTAINER_WAIT = "container_wait"
+    LOGS = "logs"
+    RESULT_JSON = "result_json"
+    ARTIFACTS = "artifacts"
+
+
+class RunPhaseTimer:
+    """Times the host-side phases of one runner execution.
+
+    Each phase is observed into `runner_phase_duration_seconds` when it ends (also when it raises,
+    so slow failures stay visible). Phases a run skips (e.g. container create on a warm pool hit)
+    are simply not observed.
+    """
+
+    def __init__(self) -> None:
+        self._durations: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, phase: RunnerPhase) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            seconds = time.monotonic() - started
+            self._durations[phase.value] = round(seconds, 6)
+            get_metrics()["runner_phase_duration_seconds"].labels(phase=phase.value).observe(
+                seconds
+            )
+
+    def durations(self) -> dict[str, float]:
+        return dict(self._durations)
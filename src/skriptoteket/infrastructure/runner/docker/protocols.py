@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
 from typing import Protocol
 
 
@@ -8,9 +8,14 @@ class DockerContainerProtocol(Protocol):
     @property
     def status(self) -> str: ...
 
+    @property
+    def labels(self) -> dict[str, str]: ...
+
     def reload(self) -> None: ...
 
-    def put_archive(self, *, path: str, data: bytes) -> bool: ...
+    def rename(self, *, name: str) -> None: ...
+
+    def put_archive(self, *, path: str, data: bytes | Iterable[bytes]) -> bool: ...
 
     def start(self) -> None: ...
 
@@ -20,6 +25,14 @@ class DockerContainerProtocol(Protocol):
 
     def logs(self, *, stdout: bool, stderr: bool) -> bytes: ...
 
+    def follow_logs(self, *, stdout: bool, stderr: bool) -> Iterator[bytes]:
+        """Yield log output as it is produced until the container stops."""
+        ...
+
+    def follow_stats(self) -> Iterator[dict[str, object]]:
+        """Yield decoded Engine API stats samples (about one per second) while it runs."""
+        ...
+
     def get_archive(self, *, path: str) -> tuple[Iterable[bytes], object]: ...
 
     def remove(self, *, force: bool) -> None: ...
@@ -53,4 +66,76 @@ class DockerClientProtocol(Protocol):
     @property
     def containers(self) -> DockerContainersClientProtocol: ...
 
+    def ping(self) -> bool: ...
+
     def close(self) -> None: ...
+
+
+class AsyncDockerContainerProtocol(Protocol):
+    """Coroutine-based container handle (asyncio engine; no thread per run)."""
+
+    @property
+    def id(self) -> str: ...
+
+    @property
+    def status(self) -> str: ...
+
+    @property
+    def labels(self) -> dict[str, str]: ...
+
+    async def reload(self) -> None: ...
+
+    async def put_archive(self, *, path: str, data: bytes | AsyncIterable[bytes]) -> None: ...
+
+    async def start(self) -> None: ...
+
+    async def wait(self, *, timeout: float) -> int:
+        """Wait for the container to exit; raise `TimeoutError` after `timeout` seconds."""
+        ...
+
+    async def kill(self) -> None: ...
+
+    async def logs(self, *, stdout: bool, stderr: bool) -> bytes: ...
+
+    def follow_logs(self, *, stdout: bool, stderr: bool) -> AsyncIterator[bytes]:
+        """Yield log output as it is produced until the container stops."""
+        ...
+
+    def follow_stats(self) -> AsyncIterator[dict[str, object]]:
+        """Yield decoded Engine API stats samples (about one per second) while it runs."""
+        ...
+
+    def get_archive(self, *, path: str) -> AsyncIterator[bytes]: ...
+
+    async def remove(self, *, force: bool) -> None: ...
+
+
+class AsyncDockerVolumeProtocol(Protocol):
+    @property
+    def name(self) -> str: ...
+
+    async def remove(self, *, force: bool) -> None: ...
+
+
+class AsyncDockerVolumesClientProtocol(Protocol):
+    async def create(self, **kwargs: object) -> AsyncDockerVolumeProtocol: ...
+
+    async def list(self, **kwargs: object) -> list[AsyncDockerVolumeProtocol]: ...
+
+
+class AsyncDockerContainersClientProtocol(Protocol):
+    async def create(self, **kwargs: object) -> AsyncDockerContainerProtocol: ...
+
+    async def list(self, **kwargs: object) -> list[AsyncDockerContainerProtocol]: ...
+
+
+class AsyncDockerClientProtocol(Protocol):
+    @property
+    def volumes(self) -> AsyncDockerVolumesClientProtocol: ...
+
+    @property
+    def containers(self) -> AsyncDockerContainersClientProtocol: ...
+
+    async def ping(self) -> bool: ...
+
+    async def close(self) -> None: ...
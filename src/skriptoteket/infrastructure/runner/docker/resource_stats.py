@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Mapping
+from uuid import UUID
+
+import structlog
+
+from skriptoteket.domain.scripting.models import RunResourceUsage
+from skriptoteket.observability.metrics import get_metrics
+
+from .protocols import AsyncDockerContainerProtocol, DockerContainerProtocol
+
+logger = structlog.get_logger(__name__)
+
+_NANOSECONDS = 1_000_000_000
+
+
+def _as_int(value: object) -> int | None:
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        return None
+    return int(value)
+
+
+def _mapping(value: object) -> Mapping[str, object]:
+    return value if isinstance(value, Mapping) else {}
+
+
+def _max(current: int | None, value: int | None) -> int | None:
+    if value is None:
+        return current
+    return value if current is None else max(current, value)
+
+
+class ContainerResourceAccumulator:
+    """Folds Engine API stats samples into a `RunResourceUsage` (cgroup v1 and v2 layouts).
+
+    Memory and pids keep the highest value seen; CPU time, throttling and block IO are cumulative
+    counters, so the highest value is the total at the last sample.
+    """
+
+    def __init__(self) -> None:
+        self._samples = 0
+        self._memory_peak: int | None = None
+        self._cpu_ns: int | None = None
+        self._throttled_ns: int | None = None
+        self._block_read: int | None = None
+        self._block_write: int | None = None
+        self._pids_peak: int | None = None
+
+    def add(self, sample: Mapping[str, object]) -> None:
+        self._samples += 1
+
+        memory = _mapping(sample.get("memory_stats"))
+        self._memory_peak = _max(self._memory_peak, _as_int(memory.get("max_usage")))
+        self._memory_peak = _max(self._memory_peak, _as_int(memory.get("usage")))
+
+        cpu = _mapping(sample.get("cpu_stats"))
+        self._cpu_ns = _max(
+            self._cpu_ns, _as_int(_mapping(cpu.get("cpu_usage")).get("total_usage"))
+        )
+        self._throttled_ns = _max(
+            self._throttled_ns,
+            _as_int(_mapping(cpu.get("throttling_data")).get("throttled_time")),
+        )
+
+        entries = _mapping(sample.get("blkio_stats")).get("io_service_bytes_recursive")
+        if isinstance(entries, list):
+            read = write = 0
+            for entry in entries:
+                entry_map = _mapping(entry)
+                value = _as_int(entry_map.get("value")) or 0
+                op = str(entry_map.get("op", "")).lower()
+                if op == "read":
+                    read += value
+                elif op == "write":
+                    write += value
+            self._block_read = _max(self._block_read, read)
+            self._block_write = _max(self._block_write, write)
+
+        self._pids_peak = _max(
+            self._pids_peak, _as_int(_mapping(sample.get("pids_stats")).get("current"))
+        )
+
+    def usage(self) -> RunResourceUsage | None:
+        if self._samples == 0:
+            return None
+        return RunResourceUsage(
+            memory_peak_bytes=self._memory_peak,
+            cpu_seconds=None if self._cpu_ns is None else self._cpu_ns / _NANOSECONDS,
+            cpu_throttled_seconds=(
+                None if self._throttled_ns is None else self._throttled_ns / _NANOSECONDS
+            ),
+            block_read_bytes=self._block_read,
+            block_write_bytes=self._block_write,
+            pids_peak=self._pids_peak,
+            samples=self._samples,
+        )
+
+
+def observe_resource_usage(*, tool_id: UUID, usage: RunResourceUsage) -> None:
+    metrics = get_metrics()
+    tool_label = str(tool_id)
+    if usage.memory_peak_bytes is not None:
+        metrics["runner_memory_peak_bytes"].labels(tool_id=tool_label).observe(
+            usage.memory_peak_bytes
+        )
+    if usage.cpu_seconds is not None:
+        metrics["runner_cpu_seconds"].labels(tool_id=tool_label).observe(usage.cpu_seconds)
+    if usage.cpu_throttled_seconds is not None:
+        metrics["runner_cpu_throttled_seconds"].labels(tool_id=tool_label).observe(
+            usage.cpu_throttled_seconds
+        )
+    if usage.block_read_bytes is not None:
+        metrics["runner_block_io_bytes"].labels(tool_id=tool_label, direction="read").observe(
+            usage.block_read_bytes
+        )
+    if usage.block_write_bytes is not None:
+        metrics["runner_block_io_bytes"].labels(tool_id=tool_label, direction="write").observe(
+            usage.block_write_bytes
+        )
+    if usage.pids_peak is not None:
+        metrics["runner_pids_peak"].labels(tool_id=tool_label).observe(usage.pids_peak)
+
+
+class ResourceStatsSampler:
+    """Samples a started container's stats on a background thread.
+
+    Best effort, like live output: sampling errors only leave gaps. Docker emits roughly one sample
+    per second, so runs shorter than that may report little more than their start-up footprint.
+    """
+
+    def __init__(self, *, run_id: UUID, container: DockerContainerProtocol) -> None:
+        self._run_id = run_id
+        self._container = container
+        self._accumulator = ContainerResourceAccumulator()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        threading.Thread(target=self._sample, name=f"run-stats-{self._run_id}", daemon=True).start()
+
+    def stop(self) -> RunResourceUsage | None:
+        """Return what was sampled so far without waiting for the next sample.
+
+        The thread exits on its next sample or once the stream closes (at the latest when the
+        container is removed).
+        """
+        self._stopped.set()
+        with self._lock:
+            return self._accumulator.usage()
+
+    def _sample(self) -> None:
+        try:
+            for sample in self._container.follow_stats():
+                if self._stopped.is_set():
+                    break
+                with self._lock:
+                    self._accumulator.add(sample)
+        except Exception:  # noqa: BLE001
+            logger.debug("Resource stats sampling ended", run_id=str(self._run_id), exc_info=True)
+
+
+class AsyncResourceStatsSampler:
+    """Asyncio counterpart of `ResourceStatsSampler` (one task per run)."""
+
+    def __init__(self, *, run_id: UUID, container: AsyncDockerContainerProtocol) -> None:
+        self._run_id = run_id
+        self._container = container
+        self._accumulator = ContainerResourceAccumulator()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._sample(), name=f"run-stats-{self._run_id}")
+
+    async def stop(self) -> RunResourceUsage | None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        return self._accumulator.usage()
+
+    async def _sample(self) -> None:
+        try:
+            async for sample in self._container.follow_stats():
+                self._accumulator.add(sample)
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001
+            logger.debug("Resource stats sampling ended", run_id=str(self._run_id), exc_info=True)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import asyncio
 import json
 import time
-from dataclasses import dataclass
+from collections.abc import Sequence
 from uuid import UUID
 
 import structlog
@@ -11,15 +11,18 @@ from pydantic import JsonValue
 
 from skriptoteket.domain.errors import DomainError, ErrorCode
 from skriptoteket.domain.scripting.execution import ToolExecutionResult
-from skriptoteket.domain.scripting.input_files import normalize_input_files
 from skriptoteket.domain.scripting.models import RunContext, RunStatus, ToolVersion
 from skriptoteket.domain.scripting.ui.contract_v2 import ToolUiContractV2Result
 from skriptoteket.infrastructure.runner.capacity import RunnerCapacityLimiter
-from skriptoteket.infrastructure.runner.result_contract import parse_runner_result_json
+from skriptoteket.infrastructure.runner.result_contract import (
+    parse_runner_result_json,
+    parse_runner_timings,
+)
 from skriptoteket.observability.tracing import get_tracer, trace_operation
+from skriptoteket.protocols.run_logs import RunLogBufferProtocol
 from skriptoteket.protocols.runner import ArtifactManagerProtocol, ToolRunnerProtocol
+from skriptoteket.protocols.session_files import RunnerInputFile
 
-from .client_adapter import DockerClientAdapter
 from .container_io import (
     fetch_result_json_bytes,
     fetch_stdout_stderr,
@@ -27,22 +30,37 @@ from .container_io import (
     store_output_archive_safely,
     truncate_utf8_str,
 )
+from .container_spec import (
+    DockerRunnerLimits,
+    build_base_environment,
+    build_run_environment,
+    build_run_labels,
+    build_sandbox_container_kwargs,
+)
+from .endpoints import LOCAL_ENDPOINT_NAME, DockerEndpoint, DockerEndpointPool
 from .errors import raise_docker_client_unavailable
+from .live_output import LiveOutputFollower
+from .phase_timings import RunnerPhase, RunPhaseTimer
 from .protocols import DockerClientProtocol, DockerContainerProtocol, DockerVolumeProtocol
-from .workdir_archive import build_workdir_archive
+from .resource_stats import ResourceStatsSampler, observe_resource_usage
+from .shared_client import PersistentDockerClient, docker_client_from_env
+from .warm_pool import WORK_VOLUME_LABEL, DockerWarmPool
+from .workdir_archive import iter_workdir_archive, normalize_workdir_input_files
 
 logger = structlog.get_logger(__name__)
 
 
-@dataclass(frozen=True, slots=True)
-class DockerRunnerLimits:
-    cpu_limit: float
-    memory_limit: str
-    pids_limit: int
-    tmpfs_tmp: str
+def _run_container_name(run_id: UUID) -> str:
+    return f"skriptoteket-run-{run_id}"
 
 
 class DockerToolRunner(ToolRunnerProtocol):
+    """Runs tools in sandboxed containers via docker-py (one thread per run).
+
+    Runs are scheduled on `endpoints` (several Docker daemons, each with its own capacity and
+    optional warm pool). Without it, `docker_client`/`warm_pool` form a single local endpoint.
+    """
+
     def __init__(
         self,
         *,
@@ -55,7 +73,14 @@ class DockerToolRunner(ToolRunnerProtocol):
         output_max_error_summary_bytes: int,
         capacity: RunnerCapacityLimiter,
         artifacts: ArtifactManagerProtocol,
+        warm_pool: DockerWarmPool | None = None,
+        docker_client: PersistentDockerClient | None = None,
+        endpoints: DockerEndpointPool | None = None,
+        run_logs: RunLogBufferProtocol | None = None,
+        resource_stats: bool = False,
     ) -> None:
+        if endpoints is not None and (warm_pool is not None or docker_client is not None):
+            raise ValueError("Pass either endpoints or docker_client/warm_pool, not both")
         self._runner_image = runner_image
         self._sandbox_timeout_seconds = sandbox_timeout_seconds
         self._production_timeout_seconds = production_timeout_seconds
@@ -65,6 +90,18 @@ class DockerToolRunner(ToolRunnerProtocol):
         self._output_max_error_summary_bytes = output_max_error_summary_bytes
         self._capacity = capacity
         self._artifacts = artifacts
+        self._endpoints = endpoints or DockerEndpointPool(
+            endpoints=[
+                DockerEndpoint(
+                    name=LOCAL_ENDPOINT_NAME,
+                    client=docker_client
+                    or PersistentDockerClient(client_factory=docker_client_from_env),
+                    warm_pool=warm_pool,
+                )
+            ]
+        )
+        self._run_logs = run_logs
+        self._resource_stats = resource_stats
 
     async def execute(
         self,
@@ -72,12 +109,15 @@ class DockerToolRunner(ToolRunnerProtocol):
         run_id: UUID,
         version: ToolVersion,
         context: RunContext,
-        input_files: list[tuple[str, bytes]],
+        input_files: Sequence[RunnerInputFile],
         input_values: dict[str, JsonValue],
         memory_json: bytes,
         action_payload: dict[str, JsonValue] | None,
+        requested_by_user_id: UUID | None = None,
+        script_bytecode: bytes | None = None,
     ) -> ToolExecutionResult:
-        if not await self._capacity.try_acquire():
+        owner_key = None if requested_by_user_id is None else str(requested_by_user_id)
+        if not await self._capacity.try_acquire(context=context, owner_key=owner_key):
             logger.warning(
                 "Runner at capacity",
                 run_id=str(run_id),
@@ -91,16 +131,33 @@ class DockerToolRunner(ToolRunnerProtocol):
             )
 
         try:
-            return await asyncio.to_thread(
-                self._execute_sync,
-                run_id=run_id,
-                version=version,
-                context=context,
-                input_files=input_files,
-                input_values=input_values,
-                memory_json=memory_json,
-                action_payload=action_payload,
-            )
+            endpoint = self._endpoints.acquire()
+            if endpoint is None:
+                logger.warning(
+                    "No Docker endpoint available",
+                    run_id=str(run_id),
+                    tool_id=str(version.tool_id),
+                    context=context.value,
+                )
+                raise DomainError(
+                    code=ErrorCode.SERVICE_UNAVAILABLE,
+                    message="Runner is at capacity; retry.",
+                )
+            try:
+                return await asyncio.to_thread(
+                    self._execute_sync,
+                    endpoint=endpoint,
+                    run_id=run_id,
+                    version=version,
+                    context=context,
+                    input_files=input_files,
+                    input_values=input_values,
+                    memory_json=memory_json,
+                    action_payload=action_payload,
+                    script_bytecode=script_bytecode,
+                )
+            finally:
+                self._endpoints.release(endpoint)
         finally:
             await self._capacity.release()
 
@@ -111,7 +168,7 @@ class DockerToolRunner(ToolRunnerProtocol):
         version: ToolVersion,
         context: RunContext,
     ) -> ToolExecutionResult | None:
-        if not await self._capacity.try_acquire():
+        if not await self._capacity.try_acquire(context=context):
             logger.warning(
                 "Runner at capacity (adopt)",
                 run_id=str(run_id),
@@ -141,7 +198,6 @@ class DockerToolRunner(ToolRunnerProtocol):
         version: ToolVersion,
         context: RunContext,
     ) -> ToolExecutionResult | None:
-        import docker
         from docker.errors import DockerException
         from requests.exceptions import ReadTimeout
 
@@ -153,16 +209,14 @@ class DockerToolRunner(ToolRunnerProtocol):
 
         client: DockerClientProtocol | None = None
         container: DockerContainerProtocol | None = None
+        endpoint: DockerEndpoint | None = None
 
         try:
-            client = DockerClientAdapter(docker.from_env())
-
-            containers = client.containers.list(
-                all=True,
-                filters={"label": f"skriptoteket.run_id={run_id}"},
-            )
-            if not containers:
+            found = self._find_run_containers(run_id=run_id)
+            if found is None:
                 return None
+            endpoint, client, containers = found
+            self._endpoints.hold(endpoint)
 
             # Prefer adopting a running container when multiple exist (defense-in-depth).
             for candidate in containers:
@@ -197,6 +251,7 @@ class DockerToolRunner(ToolRunnerProtocol):
                     "tool.id": str(version.tool_id),
                     "version.id": str(version.id),
                     "run.context": context.value,
+                    "runner.endpoint": endpoint.name,
                 },
             ) as span:
                 timed_out = False
@@ -335,40 +390,94 @@ class DockerToolRunner(ToolRunnerProtocol):
                     artifacts_manifest=artifacts_manifest,
                 )
         finally:
+            volume_filters: list[dict[str, object]] = [
+                {"label": f"skriptoteket.run_id={run_id}"},
+            ]
             if container is not None:
                 try:
-                    container.remove(force=True)
+                    work_volume_name = container.labels.get(WORK_VOLUME_LABEL)
                 except Exception:  # noqa: BLE001
-                    pass
-            if client is not None:
+                    work_volume_name = None
+                if work_volume_name:
+                    volume_filters.append({"name": work_volume_name})
                 try:
-                    for volume in client.volumes.list(
-                        filters={"label": f"skriptoteket.run_id={run_id}"},
-                    ):
-                        try:
-                            volume.remove(force=True)
-                        except Exception:  # noqa: BLE001
-                            pass
+                    container.remove(force=True)
                 except Exception:  # noqa: BLE001
                     pass
-                try:
-                    client.close()
-                except AttributeError:
-                    pass
+            if client is not None:
+                for filters in volume_filters:
+                    try:
+                        for volume in client.volumes.list(filters=filters):
+                            try:
+                                volume.remove(force=True)
+                            except Exception:  # noqa: BLE001
+                                pass
+                    except Exception:  # noqa: BLE001
+                        pass
+            if endpoint is not None:
+                if client is not None:
+                    endpoint.client.release(client)
+                self._endpoints.release(endpoint)
+
+    def _find_run_containers(
+        self, *, run_id: UUID
+    ) -> tuple[DockerEndpoint, DockerClientProtocol, list[DockerContainerProtocol]] | None:
+        """Find the endpoint that holds the run's container(s).
+
+        The returned client is leased (`PersistentDockerClient.acquire`) for the adoption, which
+        waits on the container for the rest of the run; the caller releases it.
+
+        Raises the last endpoint error when the containers were not found but some endpoint could
+        not be asked: reporting them missing would re-run a job that may still be running there.
+        """
+        from docker.errors import DockerException
+        from requests.exceptions import ConnectionError as RequestsConnectionError
+
+        last_error: Exception | None = None
+        for endpoint in self._endpoints.endpoints:
+            client: DockerClientProtocol | None = None
+            try:
+                client = endpoint.client.acquire()
+                containers = client.containers.list(
+                    all=True,
+                    filters={"label": f"skriptoteket.run_id={run_id}"},
+                )
+                if not containers:
+                    # Warm-pool containers are created before the run exists; they are renamed
+                    # on checkout instead.
+                    containers = client.containers.list(
+                        all=True,
+                        filters={"name": _run_container_name(run_id)},
+                    )
+            except (DockerException, RequestsConnectionError) as exc:
+                if client is not None:
+                    endpoint.client.release(client)
+                self._endpoints.mark_unhealthy(endpoint)
+                last_error = exc
+                continue
+            if containers:
+                return endpoint, client, containers
+            endpoint.client.release(client)
+
+        if last_error is not None:
+            raise last_error
+        return None
 
     def _execute_sync(
         self,
         *,
+        endpoint: DockerEndpoint,
         run_id: UUID,
         version: ToolVersion,
         context: RunContext,
-        input_files: list[tuple[str, bytes]],
+        input_files: Sequence[RunnerInputFile],
         input_values: dict[str, JsonValue],
         memory_json: bytes,
         action_payload: dict[str, JsonValue] | None,
+        script_bytecode: bytes | None,
     ) -> ToolExecutionResult:
-        import docker
         from docker.errors import DockerException
+        from requests.exceptions import ConnectionError as RequestsConnectionError
         from requests.exceptions import ReadTimeout
 
         tracer = get_tracer("skriptoteket")
@@ -378,17 +487,7 @@ class DockerToolRunner(ToolRunnerProtocol):
             if context is RunContext.SANDBOX
             else self._production_timeout_seconds
         )
-        normalized_input_files = (
-            normalize_input_files(input_files=input_files)[0] if input_files else []
-        )
-        input_manifest = {
-            "files": [
-                {"name": name, "path": f"/work/input/{name}", "bytes": len(content)}
-                for name, content in normalized_input_files
-            ]
-        }
-        input_manifest_json = json.dumps(input_manifest, ensure_ascii=False, separators=(",", ":"))
-        inputs_json = json.dumps(input_values, ensure_ascii=False, separators=(",", ":"))
+        workdir_input_files, input_manifest = normalize_workdir_input_files(input_files=input_files)
 
         logger.info(
             "Runner execution start",
@@ -397,46 +496,59 @@ class DockerToolRunner(ToolRunnerProtocol):
             tool_version_id=str(version.id),
             context=context.value,
             timeout_seconds=timeout_seconds,
-            input_files_count=len(normalized_input_files),
+            input_files_count=len(workdir_input_files),
             cpu_limit=self._limits.cpu_limit,
             memory_limit=self._limits.memory_limit,
             pids_limit=self._limits.pids_limit,
+            endpoint=endpoint.name,
         )
 
-        nano_cpus = int(self._limits.cpu_limit * 1_000_000_000)
-        env: dict[str, str] = {
-            "HOME": "/tmp/home",
-            "XDG_CACHE_HOME": "/tmp/home/.cache",
-            "SKRIPTOTEKET_SCRIPT_PATH": "/work/script.py",
-            "SKRIPTOTEKET_ENTRYPOINT": version.entrypoint,
-            "SKRIPTOTEKET_INPUT_DIR": "/work/input",
-            "SKRIPTOTEKET_INPUT_MANIFEST": input_manifest_json,
-            "SKRIPTOTEKET_INPUTS": inputs_json,
-            "SKRIPTOTEKET_MEMORY_PATH": "/work/memory.json",
-            "SKRIPTOTEKET_OUTPUT_DIR": "/work/output",
-            "SKRIPTOTEKET_RESULT_PATH": "/work/result.json",
-        }
-        if action_payload is not None:
-            try:
-                env["SKRIPTOTEKET_ACTION"] = json.dumps(
-                    action_payload,
-                    ensure_ascii=False,
-                    separators=(",", ":"),
-                )
-            except TypeError as exc:
-                raise DomainError(
-                    code=ErrorCode.INTERNAL_ERROR,
-                    message="Failed to encode action payload as JSON.",
-                ) from exc
+        run_env = build_run_environment(
+            entrypoint=version.entrypoint,
+            input_manifest=input_manifest,
+            input_values=input_values,
+            action_payload=action_payload,
+        )
+        run_labels = build_run_labels(run_id=run_id, version=version)
 
-        client: DockerClientProtocol
+        client: DockerClientProtocol | None = None
         container: DockerContainerProtocol | None = None
         work_volume: DockerVolumeProtocol | None = None
+        live_output: LiveOutputFollower | None = None
+        stats_sampler: ResourceStatsSampler | None = None
+        phases = RunPhaseTimer()
 
+        # Warm and cold runs alike hold a lease on the client for the whole run, so a failed
+        # health check elsewhere drains it instead of closing it under this run.
         try:
-            client = DockerClientAdapter(docker.from_env())
+            client = endpoint.client.acquire()
         except DockerException as exc:
+            self._endpoints.mark_unhealthy(endpoint)
             raise_docker_client_unavailable(exc=exc)
+        self._endpoints.mark_healthy(endpoint)
+
+        warm = endpoint.warm_pool.checkout() if endpoint.warm_pool is not None else None
+        if warm is not None and warm.client is not client:
+            # Created through a client that has been retired since; do not run on it.
+            assert endpoint.warm_pool is not None
+            endpoint.warm_pool.discard(warm)
+            warm = None
+        if warm is not None:
+            assert endpoint.warm_pool is not None
+            try:
+                # Pool containers are created before the run exists, so they cannot carry its
+                # run_id label; the run container name is what lets adoption find them.
+                warm.container.rename(name=_run_container_name(run_id))
+            except DockerException:
+                logger.warning(
+                    "Failed to rename warm runner container; falling back to a cold start",
+                    run_id=str(run_id),
+                    endpoint=endpoint.name,
+                    pool_id=endpoint.warm_pool.pool_id,
+                    exc_info=True,
+                )
+                endpoint.warm_pool.discard(warm)
+                warm = None
 
         try:
             with trace_operation(
@@ -447,85 +559,106 @@ class DockerToolRunner(ToolRunnerProtocol):
                     "tool.id": str(version.tool_id),
                     "version.id": str(version.id),
                     "run.context": context.value,
+                    "runner.warm_pool_hit": str(warm is not None),
+                    "runner.endpoint": endpoint.name,
                 },
             ) as span:
-                work_volume = client.volumes.create(
-                    labels={
-                        "skriptoteket.run_id": str(run_id),
-                        "skriptoteket.tool_version_id": str(version.id),
-                        "skriptoteket.tool_id": str(version.tool_id),
-                    }
-                )
-                span.add_event("volume_created")
-
-                workdir_tar = build_workdir_archive(
-                    version=version,
-                    input_files=normalized_input_files,
-                    memory_json=memory_json,
-                )
-
-                container = client.containers.create(
-                    image=self._runner_image,
-                    environment=env,
-                    command=[
-                        "sh",
-                        "-lc",
-                        "set -euo pipefail; mkdir -p /tmp/home; "
-                        "/app/.venv/bin/python /runner/_runner.py",
-                    ],
-                    working_dir="/app",
-                    network_mode="none",
-                    user="runner",
-                    cap_drop=["ALL"],
-                    pids_limit=self._limits.pids_limit,
-                    read_only=True,
-                    tmpfs={
-                        "/tmp": self._limits.tmpfs_tmp,
-                    },
-                    volumes={work_volume.name: {"bind": "/work", "mode": "rw"}},
-                    mem_limit=self._limits.memory_limit,
-                    nano_cpus=nano_cpus,
-                    labels={
-                        "skriptoteket.run_id": str(run_id),
-                        "skriptoteket.tool_version_id": str(version.id),
-                        "skriptoteket.tool_id": str(version.tool_id),
-                    },
-                )
+                if warm is not None:
+                    container = warm.container
+                    work_volume = warm.volume
+                    workdir_archive = iter_workdir_archive(
+                        version=version,
+                        input_files=workdir_input_files,
+                        memory_json=memory_json,
+                        script_bytecode=script_bytecode,
+                        run_env_json=json.dumps(
+                            run_env, ensure_ascii=False, separators=(",", ":")
+                        ).encode("utf-8"),
+                        run_trigger=warm.started,
+                    )
+                else:
+                    assert client is not None
+                    with phases.phase(RunnerPhase.VOLUME_CREATE):
+                        work_volume = client.volumes.create(labels=run_labels)
+                    span.add_event("volume_created")
+
+                    workdir_archive = iter_workdir_archive(
+                        version=version,
+                        input_files=workdir_input_files,
+                        memory_json=memory_json,
+                        script_bytecode=script_bytecode,
+                    )
 
-                container.put_archive(path="/work", data=workdir_tar)
-                container.start()
-                span.add_event("container_started")
+                    with phases.phase(RunnerPhase.CONTAINER_CREATE):
+                        container = client.containers.create(
+                            **build_sandbox_container_kwargs(
+                                image=self._runner_image,
+                                limits=self._limits,
+                                environment={**build_base_environment(), **run_env},
+                                volume_name=work_volume.name,
+                                labels=run_labels,
+                            )
+                        )
+
+                with phases.phase(RunnerPhase.PUT_ARCHIVE):
+                    container.put_archive(path="/work", data=workdir_archive)
+                if warm is not None and warm.started:
+                    # Fork server: the trigger file (last archive member) starts the run.
+                    span.add_event("run_triggered")
+                else:
+                    with phases.phase(RunnerPhase.START):
+                        container.start()
+                    span.add_event("container_started")
+                live_output = self._start_live_output(run_id=run_id, container=container)
+                if self._resource_stats:
+                    stats_sampler = ResourceStatsSampler(run_id=run_id, container=container)
+                    stats_sampler.start()
 
                 timed_out = False
-                try:
-                    container.wait(timeout=timeout_seconds)
-                except ReadTimeout:
-                    timed_out = True
-                    try:
-                        container.kill()
-                    except DockerException:
-                        pass
+                with phases.phase(RunnerPhase.CONTAINER_WAIT):
                     try:
-                        container.wait(timeout=10)
+                        container.wait(timeout=timeout_seconds)
                     except ReadTimeout:
-                        pass
+                        timed_out = True
+                        try:
+                            container.kill()
+                        except DockerException:
+                            pass
+                        try:
+                            container.wait(timeout=10)
+                        except ReadTimeout:
+                            pass
 
+                if live_output is not None:
+                    live_output.stop()
+                resource_usage = stats_sampler.stop() if stats_sampler is not None else None
+                if resource_usage is not None:
+                    observe_resource_usage(tool_id=version.tool_id, usage=resource_usage)
+                    if resource_usage.memory_peak_bytes is not None:
+                        span.set_attribute(
+                            "runner.memory_peak_bytes", resource_usage.memory_peak_bytes
+                        )
+                    if resource_usage.cpu_seconds is not None:
+                        span.set_attribute("runner.cpu_seconds", resource_usage.cpu_seconds)
                 span.add_event("container_finished", {"timed_out": str(timed_out)})
 
-                stdout, stderr = fetch_stdout_stderr(
-                    container=container,
-                    max_stdout_bytes=self._output_max_stdout_bytes,
-                    max_stderr_bytes=self._output_max_stderr_bytes,
-                )
+                with phases.phase(RunnerPhase.LOGS):
+                    stdout, stderr = fetch_stdout_stderr(
+                        container=container,
+                        max_stdout_bytes=self._output_max_stdout_bytes,
+                        max_stderr_bytes=self._output_max_stderr_bytes,
+                    )
 
-                result_json_bytes = fetch_result_json_bytes(container=container)
+                with phases.phase(RunnerPhase.RESULT_JSON):
+                    result_json_bytes = fetch_result_json_bytes(container=container)
 
                 if timed_out:
-                    artifacts_manifest = store_output_archive_safely(
-                        container=container,
-                        run_id=run_id,
-                        artifacts=self._artifacts,
-                    )
+                    with phases.phase(RunnerPhase.ARTIFACTS):
+                        artifacts_manifest = store_output_archive_safely(
+                            container=container,
+                            run_id=run_id,
+                            artifacts=self._artifacts,
+                        )
                     span.add_event(
                         "artifacts_extracted", {"count": str(len(artifacts_manifest.artifacts))}
                     )
@@ -543,6 +676,7 @@ class DockerToolRunner(ToolRunnerProtocol):
                         context=context.value,
                         timeout_seconds=timeout_seconds,
                         duration_seconds=round(time.monotonic() - start_time, 6),
+                        phase_seconds=phases.durations(),
                     )
 
                     timed_out_error_summary = truncate_utf8_str(
@@ -563,6 +697,7 @@ class DockerToolRunner(ToolRunnerProtocol):
                         stderr=stderr,
                         ui_result=ui_result,
                         artifacts_manifest=artifacts_manifest,
+                        resource_usage=resource_usage,
                     )
 
                 if result_json_bytes is None:
@@ -634,12 +769,13 @@ class DockerToolRunner(ToolRunnerProtocol):
                 )
 
                 try:
-                    artifacts_manifest = store_output_archive(
-                        container=container,
-                        run_id=run_id,
-                        reported_artifacts=runner_payload.artifacts,
-                        artifacts=self._artifacts,
-                    )
+                    with phases.phase(RunnerPhase.ARTIFACTS):
+                        artifacts_manifest = store_output_archive(
+                            container=container,
+                            run_id=run_id,
+                            reported_artifacts=runner_payload.artifacts,
+                            artifacts=self._artifacts,
+                        )
                 except DomainError:
                     logger.warning(
                         "Artifact extraction violation",
@@ -664,6 +800,12 @@ class DockerToolRunner(ToolRunnerProtocol):
                 span.set_attribute("run.status", status.value)
                 span.set_attribute("run.duration_seconds", round(time.monotonic() - start_time, 6))
                 span.set_attribute("run.artifacts_count", len(artifacts_manifest.artifacts))
+                runner_timings = parse_runner_timings(result_json_bytes=result_json_bytes)
+                for phase, seconds in runner_timings.items():
+                    span.set_attribute(f"runner.timing.{phase}", seconds)
+                phase_seconds = phases.durations()
+                for phase, seconds in phase_seconds.items():
+                    span.set_attribute(f"runner.phase.{phase}_seconds", seconds)
 
                 logger.info(
                     "Runner execution finished",
@@ -674,6 +816,11 @@ class DockerToolRunner(ToolRunnerProtocol):
                     status=status.value,
                     duration_seconds=round(time.monotonic() - start_time, 6),
                     artifacts_count=len(artifacts_manifest.artifacts),
+                    runner_timings=runner_timings,
+                    phase_seconds=phase_seconds,
+                    resource_usage=(
+                        None if resource_usage is None else resource_usage.model_dump()
+                    ),
                 )
                 return ToolExecutionResult(
                     status=status,
@@ -681,8 +828,12 @@ class DockerToolRunner(ToolRunnerProtocol):
                     stderr=stderr,
                     ui_result=ui_result,
                     artifacts_manifest=artifacts_manifest,
+                    resource_usage=resource_usage,
                 )
 
+        except RequestsConnectionError:
+            self._endpoints.mark_unhealthy(endpoint)
+            raise
         finally:
             if container is not None:
                 try:
@@ -694,8 +845,25 @@ class DockerToolRunner(ToolRunnerProtocol):
                     work_volume.remove(force=True)
                 except DockerException:
                     pass
+            if live_output is not None:
+                # No-op after a normal run; on errors the streams end once the container is gone.
+                live_output.stop()
             if client is not None:
-                try:
-                    client.close()
-                except AttributeError:
-                    pass
+                endpoint.client.release(client)
+
+    def _start_live_output(
+        self,
+        *,
+        run_id: UUID,
+        container: DockerContainerProtocol,
+    ) -> LiveOutputFollower | None:
+        if self._run_logs is None:
+            return None
+        try:
+            writer = self._run_logs.open_writer(run_id=run_id)
+        except OSError:
+            logger.warning("Live output buffer unavailable", run_id=str(run_id), exc_info=True)
+            return None
+        follower = LiveOutputFollower(run_id=run_id, container=container, writer=writer)
+        follower.start()
+        return follower
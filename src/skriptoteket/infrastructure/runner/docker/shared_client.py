@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+
+import structlog
+
+from skriptoteket.observability.metrics import get_metrics
+
+from .protocols import DockerClientProtocol
+
+logger = structlog.get_logger(__name__)
+
+
+def docker_client_from_env(*, max_pool_size: int = 10) -> DockerClientProtocol:
+    """Create a Docker SDK client from the environment (DOCKER_HOST or /var/run/docker.sock).
+
+    `max_pool_size` bounds the HTTP connections kept open to the daemon; each in-flight run can hold
+    up to four at once (the blocking `wait`, live logs, stats, and short API calls).
+    """
+    import docker
+
+    from .client_adapter import DockerClientAdapter
+
+    return DockerClientAdapter(docker.from_env(max_pool_size=max_pool_size))
+
+
+class PersistentDockerClient:
+    """Process-wide Docker API client shared by all runs (and the warm pool).
+
+    The underlying client (and its HTTP connection pool) is created lazily on first use and kept
+    for the lifetime of the process. A cheap `ping` is issued at most once per
+    `health_check_interval_seconds`. When it fails (e.g. the daemon restarted) the client is
+    retired and the call raises `DockerException`, so the runner takes the endpoint out of
+    rotation; the next call after that creates a fresh client. Runs hold the client through
+    `acquire`/`release`, and a retired client is only closed once the runs still using it have
+    released it. Creation errors (`DockerException`) propagate to the caller unchanged.
+    """
+
+    def __init__(
+        self,
+        *,
+        client_factory: Callable[[], DockerClientProtocol],
+        health_check_interval_seconds: float = 30.0,
+    ) -> None:
+        if health_check_interval_seconds < 0:
+            raise ValueError("health_check_interval_seconds must be >= 0")
+        self._client_factory = client_factory
+        self._health_check_interval_seconds = health_check_interval_seconds
+        self._lock = threading.Lock()
+        self._client: DockerClientProtocol | None = None
+        self._last_healthy_at = 0.0
+        # Leases per client (by id) and retired clients waiting for their last lease.
+        self._leases: dict[int, int] = {}
+        self._retired: dict[int, DockerClientProtocol] = {}
+
+    def get(self) -> DockerClientProtocol:
+        """Return the client for short calls that are not tied to a run."""
+        with self._lock:
+            return self._get_locked()
+
+    def acquire(self) -> DockerClientProtocol:
+        """Like `get`, but hold the client for a run until `release`."""
+        with self._lock:
+            client = self._get_locked()
+            self._leases[id(client)] = self._leases.get(id(client), 0) + 1
+            return client
+
+    def release(self, client: DockerClientProtocol) -> None:
+        with self._lock:
+            key = id(client)
+            remaining = self._leases.get(key, 0) - 1
+            if remaining > 0:
+                self._leases[key] = remaining
+                return
+            self._leases.pop(key, None)
+            retired = self._retired.pop(key, None)
+        if retired is not None:
+            _close_quietly(retired)
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._retired.values())
+            if self._client is not None:
+                clients.append(self._client)
+            self._client = None
+            self._retired.clear()
+            self._leases.clear()
+        for client in clients:
+            _close_quietly(client)
+
+    def _get_locked(self) -> DockerClientProtocol:
+        now = time.monotonic()
+        if self._client is None:
+            self._client = self._client_factory()
+            self._last_healthy_at = now
+            return self._client
+
+        if now - self._last_healthy_at < self._health_check_interval_seconds:
+            return self._client
+
+        try:
+            self._client.ping()
+        except Exception as exc:  # noqa: BLE001 - any failure means the connection is unusable
+            from docker.errors import DockerException
+
+            logger.warning(
+                "Docker client health check failed; draining it",
+                in_flight_runs=self._leases.get(id(self._client), 0),
+                exc_info=True,
+            )
+            get_metrics()["docker_client_reconnects_total"].inc()
+            stale, self._client = self._client, None
+            if self._leases.get(id(stale)):
+                self._retired[id(stale)] = stale
+            else:
+                _close_quietly(stale)
+            raise DockerException(f"Docker health check failed: {exc}") from exc
+
+        self._last_healthy_at = now
+        return self._client
+
+
+def _close_quietly(client: DockerClientProtocol) -> None:
+    try:
+        client.close()
+    except Exception:  # noqa: BLE001
+        pass
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from uuid import uuid4
+
+import structlog
+
+from skriptoteket.observability.metrics import get_metrics
+
+from .container_spec import (
+    RUN_ENV_PATH,
+    RUN_TRIGGER_PATH,
+    DockerRunnerLimits,
+    build_base_environment,
+    build_sandbox_container_kwargs,
+)
+from .protocols import DockerClientProtocol, DockerContainerProtocol, DockerVolumeProtocol
+
+logger = structlog.get_logger(__name__)
+
+POOL_LABEL = "skriptoteket.pool"
+POOL_ID_LABEL = "skriptoteket.pool_id"
+WORK_VOLUME_LABEL = "skriptoteket.work_volume"
+POOL_HOST_LABEL = "skriptoteket.pool_host"
+POOL_PID_LABEL = "skriptoteket.pool_pid"
+# Idle pool containers carry this name until checkout renames them to the run's container name.
+WARM_CONTAINER_NAME_PREFIX = "skriptoteket-warm-"
+
+_HOSTNAME = socket.gethostname()
+_live_pool_ids: set[str] = set()
+_live_pool_ids_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class WarmRunnerContainer:
+    container: DockerContainerProtocol
+    volume: DockerVolumeProtocol
+    # The client the container was created through; runs only use it while it is still current.
+    client: DockerClientProtocol
+    setup_seconds: float
+    # Fork-server containers are already running and wait for the run trigger file.
+    started: bool = False
+
+
+class DockerWarmPool:
+    """Per-process pool of pre-created runner containers and work volumes.
+
+    Containers are created from the same sandbox spec as cold runs. Since per-run env is not
+    known at creation time, it is shipped in the workdir archive (`run_env.json`) and applied
+    by `_runner.py`. Every container is handed out at most once; a replacement is created on a
+    background thread. The Docker client is borrowed from `client_provider` (normally the
+    runner's `PersistentDockerClient`) and is not closed by the pool.
+
+    By default containers are never started. With `fork_server`, they are started right away
+    with `_forkserver.py`, which imports `preload_modules` while idle and forks the run once the
+    workdir archive (ending with the trigger file) has been copied in.
+
+    Pool containers are labelled with the owning host and pid. `start` removes idle pool
+    containers (and their work volumes) that a dead process on the same host left behind;
+    containers already renamed for a run are left to the run's own cleanup and adoption.
+    """
+
+    def __init__(
+        self,
+        *,
+        client_provider: Callable[[], DockerClientProtocol],
+        runner_image: str,
+        limits: DockerRunnerLimits,
+        size: int,
+        fork_server: bool = False,
+        preload_modules: Sequence[str] = (),
+    ) -> None:
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self._client_provider = client_provider
+        self._runner_image = runner_image
+        self._limits = limits
+        self._size = size
+        self._fork_server = fork_server
+        self._preload_modules = tuple(preload_modules)
+        self._pool_id = str(uuid4())
+        with _live_pool_ids_lock:
+            _live_pool_ids.add(self._pool_id)
+
+        self._lock = threading.Lock()
+        self._idle: deque[WarmRunnerContainer] = deque()
+        self._pending = 0
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="runner-warm-pool")
+
+    @property
+    def pool_id(self) -> str:
+        return self._pool_id
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle_count(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+        # Queued ahead of the first refill on the single pool thread.
+        self._executor.submit(self._remove_orphans)
+        self._schedule_refill()
+
+    def checkout(self) -> WarmRunnerContainer | None:
+        """Hand out an idle container (or None on a miss) and schedule a replacement."""
+        with self._lock:
+            warm = self._idle.popleft() if self._idle else None
+            idle_count = len(self._idle)
+
+        metrics = get_metrics()
+        metrics["runner_pool_idle_containers"].set(idle_count)
+        self._schedule_refill()
+
+        if warm is None:
+            metrics["runner_pool_checkouts_total"].labels(result="miss").inc()
+            return None
+
+        metrics["runner_pool_checkouts_total"].labels(result="hit").inc()
+        metrics["runner_pool_setup_saved_seconds"].observe(warm.setup_seconds)
+        return warm
+
+    def discard(self, warm: WarmRunnerContainer) -> None:
+        """Remove a checked-out container that will not be used after all (best-effort)."""
+        _discard(warm)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        with _live_pool_ids_lock:
+            _live_pool_ids.discard(self._pool_id)
+
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for warm in idle:
+            _discard(warm)
+        get_metrics()["runner_pool_idle_containers"].set(0)
+
+    def _schedule_refill(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            missing = self._size - len(self._idle) - self._pending
+            if missing <= 0:
+                return
+            self._pending += missing
+
+        for _ in range(missing):
+            self._executor.submit(self._refill_one)
+
+    def _remove_orphans(self) -> None:
+        removed = 0
+        try:
+            client = self._client_provider()
+            containers = client.containers.list(
+                all=True,
+                filters={"label": POOL_LABEL, "name": WARM_CONTAINER_NAME_PREFIX},
+            )
+            for container in containers:
+                labels = container.labels
+                if not _is_orphan(labels):
+                    continue
+                try:
+                    container.remove(force=True)
+                except Exception:  # noqa: BLE001
+                    continue
+                removed += 1
+                volume_name = labels.get(WORK_VOLUME_LABEL)
+                if not volume_name:
+                    continue
+                for volume in client.volumes.list(filters={"name": volume_name}):
+                    try:
+                        volume.remove(force=True)
+                    except Exception:  # noqa: BLE001
+                        pass
+        except Exception:  # noqa: BLE001 - cleanup is best-effort
+            logger.warning(
+                "Warm pool orphan cleanup failed",
+                pool_id=self._pool_id,
+                exc_info=True,
+            )
+        if removed:
+            logger.info(
+                "Removed orphaned warm pool containers",
+                pool_id=self._pool_id,
+                count=removed,
+            )
+
+    def _refill_one(self) -> None:
+        warm: WarmRunnerContainer | None = None
+        try:
+            warm = self._create_warm_container()
+        except Exception:  # noqa: BLE001 - refill is best-effort; runs fall back to cold start
+            logger.warning(
+                "Warm pool container creation failed",
+                pool_id=self._pool_id,
+                exc_info=True,
+            )
+
+        with self._lock:
+            self._pending -= 1
+            if warm is not None and not self._closed:
+                self._idle.append(warm)
+                warm = None
+            idle_count = len(self._idle)
+
+        if warm is not None:
+            _discard(warm)
+        get_metrics()["runner_pool_idle_containers"].set(idle_count)
+
+    def _create_warm_container(self) -> WarmRunnerContainer:
+        client = self._client_provider()
+
+        started = time.monotonic()
+        labels = {
+            POOL_LABEL: "warm",
+            POOL_ID_LABEL: self._pool_id,
+            POOL_HOST_LABEL: _HOSTNAME,
+            POOL_PID_LABEL: str(os.getpid()),
+        }
+        volume = client.volumes.create(labels=labels)
+        try:
+            environment = build_base_environment()
+            environment["SKRIPTOTEKET_RUN_ENV_PATH"] = RUN_ENV_PATH
+            if self._fork_server:
+                environment["SKRIPTOTEKET_RUN_TRIGGER_PATH"] = RUN_TRIGGER_PATH
+                environment["SKRIPTOTEKET_PRELOAD_MODULES"] = ",".join(self._preload_modules)
+            container = client.containers.create(
+                name=f"{WARM_CONTAINER_NAME_PREFIX}{uuid4()}",
+                **build_sandbox_container_kwargs(
+                    image=self._runner_image,
+                    limits=self._limits,
+                    environment=environment,
+                    volume_name=volume.name,
+                    labels={**labels, WORK_VOLUME_LABEL: volume.name},
+                    fork_server=self._fork_server,
+                ),
+            )
+        except Exception:
+            try:
+                volume.remove(force=True)
+            except Exception:  # noqa: BLE001
+                pass
+            raise
+
+        if self._fork_server:
+            try:
+                container.start()
+            except Exception:
+                _discard(
+                    WarmRunnerContainer(
+                        container=container, volume=volume, client=client, setup_seconds=0.0
+                    )
+                )
+                raise
+
+        return WarmRunnerContainer(
+            container=container,
+            volume=volume,
+            client=client,
+            setup_seconds=time.monotonic() - started,
+            started=self._fork_server,
+        )
+
+
+def _is_orphan(labels: Mapping[str, str]) -> bool:
+    """True for pool containers whose owning process on this host is gone.
+
+    Pools on other hosts sharing the endpoint are never touched: their owners cannot be checked.
+    """
+    if labels.get(POOL_HOST_LABEL) != _HOSTNAME:
+        return False
+    try:
+        pid = int(labels.get(POOL_PID_LABEL, ""))
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        # Same pid after a restart (e.g. pid 1 in a container): orphaned unless a live pool.
+        with _live_pool_ids_lock:
+            return labels.get(POOL_ID_LABEL) not in _live_pool_ids
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def _discard(warm: WarmRunnerContainer) -> None:
+    try:
+        warm.container.remove(force=True)
+    except Exception:  # noqa: BLE001
+        pass
+    try:
+        warm.volume.remove(force=True)
+    except Exception:  # noqa: BLE001
+        pass
@@ -1,42 +1,155 @@
 from __future__ import annotations
 
-import io
 import tarfile
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
 
+from skriptoteket.domain.scripting.input_files import (
+    InputFileEntry,
+    InputManifest,
+    normalize_input_filenames,
+)
 from skriptoteket.domain.scripting.models import ToolVersion
+from skriptoteket.protocols.session_files import RunnerInputFile, StoredInputFile
 
+from .container_spec import (
+    RUN_ENV_FILENAME,
+    RUN_TRIGGER_FILENAME,
+    SCRIPT_CODE_FILENAME,
+    SCRIPT_FILENAME,
+)
 
-def build_workdir_archive(
+WORKDIR_ARCHIVE_CHUNK_BYTES = 256 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class WorkdirInputFile:
+    """A normalized input file; `content` is held in memory or read from disk while streaming."""
+
+    name: str
+    size: int
+    content: bytes | Path
+
+
+def normalize_workdir_input_files(
+    *, input_files: Sequence[RunnerInputFile]
+) -> tuple[list[WorkdirInputFile], InputManifest]:
+    if not input_files:
+        return [], InputManifest()
+
+    safe_names = normalize_input_filenames(
+        filenames=[
+            item.name if isinstance(item, StoredInputFile) else item[0] for item in input_files
+        ]
+    )
+    files: list[WorkdirInputFile] = []
+    for safe_name, item in zip(safe_names, input_files, strict=True):
+        if isinstance(item, StoredInputFile):
+            files.append(WorkdirInputFile(name=safe_name, size=item.bytes, content=item.path))
+        else:
+            files.append(WorkdirInputFile(name=safe_name, size=len(item[1]), content=item[1]))
+
+    manifest = InputManifest(
+        files=[InputFileEntry(name=item.name, bytes=item.size) for item in files]
+    )
+    return files, manifest
+
+
+def _header(*, name: str, size: int, directory: bool = False) -> bytes:
+    info = tarfile.TarInfo(name=name)
+    info.size = size
+    if directory:
+        info.type = tarfile.DIRTYPE
+        info.mode = 0o755
+    else:
+        info.mode = 0o644
+    return info.tobuf(tarfile.DEFAULT_FORMAT, tarfile.ENCODING, "surrogateescape")
+
+
+def _padding(size: int) -> bytes:
+    remainder = size % tarfile.BLOCKSIZE
+    return tarfile.NUL * (tarfile.BLOCKSIZE - remainder) if remainder else b""
+
+
+def _padding_to_record(written: int) -> bytes:
+    remainder = written % tarfile.RECORDSIZE
+    return tarfile.NUL * (tarfile.RECORDSIZE - remainder) if remainder else b""
+
+
+def _iter_bytes(data: bytes, *, chunk_bytes: int) -> Iterator[bytes]:
+    view = memoryview(data)
+    for offset in range(0, len(view), chunk_bytes):
+        yield bytes(view[offset : offset + chunk_bytes])
+
+
+def _iter_path(path: Path, *, size: int, chunk_bytes: int) -> Iterator[bytes]:
+    remaining = size
+    with path.open("rb") as handle:
+        while remaining > 0:
+            chunk = handle.read(min(chunk_bytes, remaining))
+            if not chunk:
+                raise OSError(f"Input file shrank while streaming: {path.name}")
+            remaining -= len(chunk)
+            yield chunk
+
+
+def iter_workdir_archive(
     *,
     version: ToolVersion,
-    input_files: list[tuple[str, bytes]],
+    input_files: Sequence[WorkdirInputFile],
     memory_json: bytes,
-) -> bytes:
-    tar_buffer = io.BytesIO()
-    with tarfile.open(fileobj=tar_buffer, mode="w") as tar:
-        script_bytes = version.source_code.encode("utf-8")
-
-        script_info = tarfile.TarInfo(name="script.py")
-        script_info.size = len(script_bytes)
-        script_info.mode = 0o644
-        tar.addfile(script_info, io.BytesIO(script_bytes))
-
-        memory_info = tarfile.TarInfo(name="memory.json")
-        memory_info.size = len(memory_json)
-        memory_info.mode = 0o644
-        tar.addfile(memory_info, io.BytesIO(memory_json))
-
-        input_dir_info = tarfile.TarInfo(name="input")
-        input_dir_info.type = tarfile.DIRTYPE
-        input_dir_info.mode = 0o755
-        input_dir_info.size = 0
-        tar.addfile(input_dir_info)
-
-        for safe_name, content in input_files:
-            input_path = f"input/{safe_name}"
-            input_info = tarfile.TarInfo(name=input_path)
-            input_info.size = len(content)
-            input_info.mode = 0o644
-            tar.addfile(input_info, io.BytesIO(content))
-
-    return tar_buffer.getvalue()
+    run_env_json: bytes | None = None,
+    script_bytecode: bytes | None = None,
+    run_trigger: bool = False,
+    chunk_bytes: int = WORKDIR_ARCHIVE_CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """Produce the `/work` tar incrementally (same bytes as `tarfile` would write).
+
+    Only one chunk of each input file is held at a time, so peak memory does not grow with input
+    size; on-disk inputs are read lazily as the consumer pulls. With `run_trigger`, an empty
+    trigger file is the final member, so a waiting fork server only sees it once the rest of the
+    workdir has been extracted.
+    """
+    members: list[tuple[str, bytes]] = [
+        (SCRIPT_FILENAME, version.source_code.encode("utf-8")),
+        ("memory.json", memory_json),
+    ]
+    if script_bytecode is not None:
+        members.append((SCRIPT_CODE_FILENAME, script_bytecode))
+    if run_env_json is not None:
+        members.append((RUN_ENV_FILENAME, run_env_json))
+
+    # Never yield empty chunks: an empty chunk ends a chunked HTTP request body.
+    written = 0
+    for name, data in members:
+        header = _header(name=name, size=len(data))
+        yield header
+        yield from _iter_bytes(data, chunk_bytes=chunk_bytes)
+        if padding := _padding(len(data)):
+            yield padding
+        written += len(header) + len(data) + len(padding)
+
+    input_dir_header = _header(name="input", size=0, directory=True)
+    yield input_dir_header
+    written += len(input_dir_header)
+
+    for item in input_files:
+        header = _header(name=f"input/{item.name}", size=item.size)
+        yield header
+        if isinstance(item.content, Path):
+            yield from _iter_path(item.content, size=item.size, chunk_bytes=chunk_bytes)
+        else:
+            yield from _iter_bytes(item.content, chunk_bytes=chunk_bytes)
+        if padding := _padding(item.size):
+            yield padding
+        written += len(header) + item.size + len(padding)
+
+    if run_trigger:
+        trigger_header = _header(name=RUN_TRIGGER_FILENAME, size=0)
+        yield trigger_header
+        written += len(trigger_header)
+
+    # End-of-archive marker, then pad to a full record like `TarFile.close()`.
+    written += 2 * tarfile.BLOCKSIZE
+    yield tarfile.NUL * (2 * tarfile.BLOCKSIZE) + _padding_to_record(written)
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import cast
+from uuid import UUID, uuid4
+
+import structlog
+from pydantic import JsonValue, ValidationError
+
+from skriptoteket.domain.scripting.artifacts import ArtifactsManifest
+from skriptoteket.domain.scripting.execution import ToolExecutionResult
+from skriptoteket.domain.scripting.input_files import normalize_input_filenames
+from skriptoteket.domain.scripting.models import (
+    ResultCacheStatus,
+    RunContext,
+    RunStatus,
+    ToolVersion,
+)
+from skriptoteket.domain.scripting.ui.contract_v2 import ToolUiContractV2Result
+from skriptoteket.infrastructure.artifacts.filesystem import build_artifacts_manifest
+from skriptoteket.observability.metrics import get_metrics
+from skriptoteket.protocols.runner import ToolRunnerAdoptionProtocol, ToolRunnerProtocol
+from skriptoteket.protocols.session_files import RunnerInputFile, StoredInputFile
+
+logger = structlog.get_logger(__name__)
+
+RESULT_CACHE_DIRNAME = "run-cache"
+_ENTRY_FILENAME = "entry.json"
+_HASH_CHUNK_BYTES = 256 * 1024
+
+# Other processes share the cache directory; re-walk it this often even while under budget.
+_RESCAN_INTERVAL_SECONDS = 300.0
+
+
+def _sha256_path(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while chunk := handle.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_result_cache_key(
+    *,
+    version: ToolVersion,
+    input_files: Sequence[RunnerInputFile],
+    input_values: dict[str, JsonValue],
+    memory_json: bytes,
+    action_payload: dict[str, JsonValue] | None,
+    runner_image: str,
+) -> str:
+    """Hash everything a deterministic run can observe (blocking: input files are read)."""
+    names = normalize_input_filenames(
+        filenames=[
+            item.name if isinstance(item, StoredInputFile) else item[0] for item in input_files
+        ]
+    )
+    files: list[list[object]] = []
+    for name, item in zip(names, input_files, strict=True):
+        if isinstance(item, StoredInputFile):
+            files.append([name, item.sha256 or _sha256_path(item.path), item.bytes])
+        else:
+            files.append([name, hashlib.sha256(item[1]).hexdigest(), len(item[1])])
+
+    payload = {
+        "runner_image": runner_image,
+        "content_hash": version.content_hash,
+        "input_files": files,
+        "input_values": input_values,
+        "memory_sha256": hashlib.sha256(memory_json).hexdigest(),
+        "action_payload": action_payload,
+    }
+    canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _link_or_copy_tree(*, source: Path, destination: Path) -> None:
+    def link_or_copy(src: str, dst: str) -> None:
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+    shutil.copytree(source, destination, copy_function=link_or_copy)
+
+
+def _tree_size(path: Path) -> int:
+    return sum(item.stat().st_size for item in path.rglob("*") if item.is_file())
+
+
+class FilesystemToolResultCache:
+    """Succeeded results of deterministic tool runs, stored under ARTIFACTS_ROOT.
+
+    Layout:
+      {artifacts_root}/run-cache/{key}/entry.json   (status, stdout/stderr, raw ui_result)
+      {artifacts_root}/run-cache/{key}/output/...   (artifact files)
+
+    Entries are written to a temporary directory and renamed into place, so readers never see a
+    partial entry. Reads bump the entry mtime; `evict()` removes least recently used entries until
+    the cache fits `max_bytes`. Artifact files are hard-linked (copied across filesystems).
+
+    The cache size is tracked as a running total (the last directory walk plus entries stored
+    since), so `evict()` only walks the directory once the total crosses `max_bytes` or the
+    last walk is older than `rescan_interval_seconds`.
+    """
+
+    def __init__(
+        self,
+        *,
+        artifacts_root: Path,
+        max_bytes: int,
+        rescan_interval_seconds: float = _RESCAN_INTERVAL_SECONDS,
+    ) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+        self._artifacts_root = artifacts_root
+        self._root = artifacts_root / RESULT_CACHE_DIRNAME
+        self._max_bytes = max_bytes
+        self._rescan_interval_seconds = rescan_interval_seconds
+        self._size_lock = threading.Lock()
+        self._size_bytes: int | None = None
+        self._scanned_at = 0.0
+
+    def load(self, *, key: str, run_id: UUID) -> ToolExecutionResult | None:
+        """Materialize a cached entry as the result of `run_id` (artifacts land in its run dir)."""
+        entry_dir = self._root / key
+        entry_path = entry_dir / _ENTRY_FILENAME
+        try:
+            payload = json.loads(entry_path.read_bytes())
+            ui_result = ToolUiContractV2Result.model_validate(payload["ui_result"])
+            stdout = str(payload["stdout"])
+            stderr = str(payload["stderr"])
+            # Entries written before digests were kept have no manifest; they are not hashed.
+            recorded_manifest = (
+                ArtifactsManifest.model_validate(payload["artifacts_manifest"])
+                if "artifacts_manifest" in payload
+                else None
+            )
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError, ValidationError):
+            logger.warning("Discarding unreadable result cache entry", cache_key=key)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        run_dir = self._artifacts_root / str(run_id)
+        output_dir = entry_dir / "output"
+        try:
+            run_dir.mkdir(parents=True, exist_ok=True)
+            if output_dir.is_dir():
+                _link_or_copy_tree(source=output_dir, destination=run_dir / "output")
+            os.utime(entry_path)
+        except FileNotFoundError:
+            # Evicted concurrently; treat as a miss.
+            shutil.rmtree(run_dir / "output", ignore_errors=True)
+            return None
+
+        return ToolExecutionResult(
+            status=RunStatus.SUCCEEDED,
+            stdout=stdout,
+            stderr=stderr,
+            ui_result=ui_result,
+            artifacts_manifest=build_artifacts_manifest(run_dir=run_dir, known=recorded_manifest),
+            result_cache=ResultCacheStatus.HIT,
+        )
+
+    def store(self, *, key: str, run_id: UUID, result: ToolExecutionResult) -> None:
+        if result.status is not RunStatus.SUCCEEDED:
+            return
+        entry_dir = self._root / key
+        if entry_dir.exists():
+            return
+
+        self._root.mkdir(parents=True, exist_ok=True)
+        staging_dir = self._root / f".tmp-{uuid4().hex}"
+        try:
+            staging_dir.mkdir()
+            run_output_dir = self._artifacts_root / str(run_id) / "output"
+            if run_output_dir.is_dir():
+                _link_or_copy_tree(source=run_output_dir, destination=staging_dir / "output")
+            (staging_dir / _ENTRY_FILENAME).write_text(
+                json.dumps(
+                    {
+                        "stdout": result.stdout,
+                        "stderr": result.stderr,
+                        "ui_result": result.ui_result.model_dump(mode="json"),
+                        "artifacts_manifest": result.artifacts_manifest.model_dump(mode="json"),
+                    },
+                    ensure_ascii=False,
+                ),
+                encoding="utf-8",
+            )
+            size = _tree_size(staging_dir)
+            try:
+                staging_dir.rename(entry_dir)
+            except OSError:
+                # Another run stored the same key first.
+                if not entry_dir.exists():
+                    raise
+                return
+            with self._size_lock:
+                if self._size_bytes is not None:
+                    self._size_bytes += size
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits; returns entries removed."""
+        with self._size_lock:
+            under_budget = self._size_bytes is not None and self._size_bytes <= self._max_bytes
+            recently_scanned = time.monotonic() - self._scanned_at < self._rescan_interval_seconds
+        if under_budget and recently_scanned:
+            return 0
+        scanned_at = time.monotonic()
+        if not self._root.exists():
+            self._record_scan(size_bytes=0, scanned_at=scanned_at)
+            return 0
+
+        entries: list[tuple[float, int, Path]] = []
+        for entry_dir in self._root.iterdir():
+            if not entry_dir.is_dir() or entry_dir.name.startswith("."):
+                continue
+            try:
+                last_used = (entry_dir / _ENTRY_FILENAME).stat().st_mtime
+                entries.append((last_used, _tree_size(entry_dir), entry_dir))
+            except FileNotFoundError:
+                continue
+
+        total = sum(size for _last_used, size, _path in entries)
+        deleted = 0
+        for _last_used, size, entry_dir in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            deleted += 1
+        self._record_scan(size_bytes=total, scanned_at=scanned_at)
+        return deleted
+
+    def _record_scan(self, *, size_bytes: int, scanned_at: float) -> None:
+        with self._size_lock:
+            self._size_bytes = size_bytes
+            self._scanned_at = scanned_at
+
+
+class MemoizingToolRunner(ToolRunnerProtocol, ToolRunnerAdoptionProtocol):
+    """Serves runs of `deterministic` tool versions from the result cache.
+
+    Hits never reach the wrapped runner, so they start no container and take no runner capacity.
+    Everything else (including adoption after a restart) is delegated unchanged.
+    """
+
+    def __init__(
+        self,
+        *,
+        runner: ToolRunnerProtocol,
+        cache: FilesystemToolResultCache,
+        runner_image: str,
+    ) -> None:
+        self._runner = runner
+        self._cache = cache
+        self._runner_image = runner_image
+
+    async def execute(
+        self,
+        *,
+        run_id: UUID,
+        version: ToolVersion,
+        context: RunContext,
+        input_files: Sequence[RunnerInputFile],
+        input_values: dict[str, JsonValue],
+        memory_json: bytes,
+        action_payload: dict[str, JsonValue] | None,
+        requested_by_user_id: UUID | None = None,
+        script_bytecode: bytes | None = None,
+    ) -> ToolExecutionResult:
+        key: str | None = None
+        if version.deterministic:
+            key = await asyncio.to_thread(
+                compute_result_cache_key,
+                version=version,
+                input_files=input_files,
+                input_values=input_values,
+                memory_json=memory_json,
+                action_payload=action_payload,
+                runner_image=self._runner_image,
+            )
+            lookups = get_metrics()["tool_result_cache_lookups_total"]
+            cached = await asyncio.to_thread(self._cache.load, key=key, run_id=run_id)
+            if cached is not None:
+                lookups.labels(result="hit").inc()
+                logger.info(
+                    "Tool run served from result cache",
+                    run_id=str(run_id),
+                    tool_id=str(version.tool_id),
+                    tool_version_id=str(version.id),
+                    cache_key=key,
+                )
+                return cached
+            lookups.labels(result="miss").inc()
+
+        result = await self._runner.execute(
+            run_id=run_id,
+            version=version,
+            context=context,
+            input_files=input_files,
+            input_values=input_values,
+            memory_json=memory_json,
+            action_payload=action_payload,
+            requested_by_user_id=requested_by_user_id,
+            script_bytecode=script_bytecode,
+        )
+        if key is None:
+            return result
+
+        try:
+            await asyncio.to_thread(self._cache.store, key=key, run_id=run_id, result=result)
+            await asyncio.to_thread(self._cache.evict)
+        except OSError:
+            logger.warning(
+                "Failed to store tool run in result cache",
+                run_id=str(run_id),
+                tool_version_id=str(version.id),
+                exc_info=True,
+            )
+        return result.model_copy(update={"result_cache": ResultCacheStatus.MISS})
+
+    async def try_adopt(
+        self,
+        *,
+        run_id: UUID,
+        version: ToolVersion,
+        context: RunContext,
+    ) -> ToolExecutionResult | None:
+        adoption = cast(ToolRunnerAdoptionProtocol, self._runner)
+        return await adoption.try_adopt(run_id=run_id, version=version, context=context)
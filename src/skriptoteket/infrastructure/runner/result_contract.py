@@ -50,3 +50,23 @@ def parse_runner_result_json(*, result_json_bytes: bytes) -> ToolUiContractV2Res
         validate_output_path(path=artifact.path)
 
     return payload
+
+
+def parse_runner_timings(*, result_json_bytes: bytes) -> dict[str, float]:
+    """Best-effort read of the optional `timings` map (phase name -> seconds) in result.json.
+
+    Timings are diagnostics only: anything missing or malformed yields an empty/partial map and
+    never fails the run.
+    """
+    try:
+        raw = json.loads(result_json_bytes.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return {}
+    timings = raw.get("timings") if _is_object(raw) else None
+    if not _is_object(timings):
+        return {}
+    return {
+        name: float(value)
+        for name, value in timings.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+    }
@@ -1,10 +1,31 @@
 from __future__ import annotations
 
+import asyncio
+import os
 import shutil
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from uuid import UUID
 
+import structlog
+
+from skriptoteket.protocols.runner import RunStoragePurgerProtocol
+from skriptoteket.protocols.scripting import (
+    ArtifactExpiryCandidate,
+    RunArtifactExpiryRepositoryProtocol,
+)
+from skriptoteket.protocols.uow import UnitOfWorkProtocol
+
+logger = structlog.get_logger(__name__)
+
+UPLOAD_SPOOL_DIRNAME = "upload-spool"
+
+# A spool directory lives for one upload request; anything older was left by a crashed process.
+UPLOAD_SPOOL_MIN_AGE = timedelta(hours=1)
+
 
 def prune_artifacts_root(
     *, artifacts_root: Path, retention_days: int, now: datetime | None = None
@@ -86,3 +107,236 @@ def prune_llm_captures_root(
             deleted += 1
 
     return deleted
+
+
+def prune_run_logs_root(
+    *, artifacts_root: Path, retention_days: int, now: datetime | None = None
+) -> int:
+    """Prune live output buffers under ARTIFACTS_ROOT/run-logs/.
+
+    Buffer files are expected at:
+      ARTIFACTS_ROOT/run-logs/<run_id>.ndjson
+    """
+    if retention_days < 0:
+        raise ValueError("retention_days must be >= 0")
+
+    if now is None:
+        now = datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        raise ValueError("now must be timezone-aware")
+
+    run_logs_root = artifacts_root / "run-logs"
+    if not run_logs_root.exists():
+        return 0
+
+    cutoff = now - timedelta(days=retention_days)
+    deleted = 0
+
+    for entry in run_logs_root.iterdir():
+        if not entry.is_file() or entry.suffix != ".ndjson":
+            continue
+        try:
+            UUID(entry.stem)
+        except ValueError:
+            continue
+
+        mtime = datetime.fromtimestamp(entry.stat().st_mtime, tz=timezone.utc)
+        if mtime >= cutoff:
+            continue
+
+        entry.unlink(missing_ok=True)
+        deleted += 1
+
+    return deleted
+
+
+def prune_upload_spool_root(
+    *, artifacts_root: Path, now: datetime, min_age: timedelta = UPLOAD_SPOOL_MIN_AGE
+) -> int:
+    """Delete upload spool directories left behind by crashed web processes.
+
+    Spool directories are expected at:
+      ARTIFACTS_ROOT/upload-spool/<uuid>/
+    """
+    if now.tzinfo is None:
+        raise ValueError("now must be timezone-aware")
+
+    spool_root = artifacts_root / UPLOAD_SPOOL_DIRNAME
+    if not spool_root.exists():
+        return 0
+
+    cutoff = (now - min_age).timestamp()
+    deleted = 0
+
+    for entry in spool_root.iterdir():
+        try:
+            UUID(entry.name)
+            mtime = entry.stat().st_mtime
+        except (ValueError, FileNotFoundError):
+            continue
+        # The directory mtime moves with every spooled file, so in-flight uploads look fresh.
+        if not entry.is_dir() or mtime >= cutoff:
+            continue
+
+        shutil.rmtree(entry, ignore_errors=True)
+        deleted += 1
+
+    return deleted
+
+
+def remove_tree(path: Path) -> int:
+    """Delete `path` recursively; returns the bytes freed (0 when missing).
+
+    Files with other hard links (run inputs linked from the blob store) free nothing here.
+    """
+    freed = 0
+    for dirpath, dirnames, filenames in os.walk(path, topdown=False):
+        for name in filenames:
+            file_path = os.path.join(dirpath, name)
+            try:
+                stat = os.lstat(file_path)
+                os.unlink(file_path)
+                if stat.st_nlink == 1:
+                    freed += stat.st_size
+            except FileNotFoundError:
+                pass
+        for name in dirnames:
+            dir_path = os.path.join(dirpath, name)
+            # os.walk lists symlinks to directories as dirnames but does not descend into them.
+            if os.path.islink(dir_path):
+                os.unlink(dir_path)
+            else:
+                os.rmdir(dir_path)
+    try:
+        os.rmdir(path)
+    except FileNotFoundError:
+        pass
+    return freed
+
+
+class LocalRunStoragePurger(RunStoragePurgerProtocol):
+    """Deletes `{artifacts_root}/{run_id}/` and `{artifacts_root}/run-inputs/{run_id}/`."""
+
+    def __init__(self, *, artifacts_root: Path) -> None:
+        self._artifacts_root = artifacts_root
+
+    def purge_run(self, *, run_id: UUID) -> int:
+        return remove_tree(self._artifacts_root / str(run_id)) + remove_tree(
+            self._artifacts_root / "run-inputs" / str(run_id)
+        )
+
+
+@dataclass(frozen=True)
+class RunArtifactExpiryResult:
+    expired_runs: int
+    failed_runs: int
+    bytes_deleted: int
+    elapsed_seconds: float
+
+    @property
+    def runs_per_second(self) -> float:
+        return self.expired_runs / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_deleted / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+class RunArtifactExpiry:
+    """Artifact and run input retention driven by `tool_runs.finished_at`.
+
+    Pages through finished runs that have no `artifacts_expired_at` tombstone yet (a partial
+    index keeps this cheap however many runs have already expired), deletes each run's files
+    with at most `concurrency` deletions in flight, and tombstones the batch so the UI can show
+    "expired" instead of a missing file. Runs whose files could not be deleted keep no tombstone
+    and are retried on the next pass.
+    """
+
+    def __init__(
+        self,
+        *,
+        uow: UnitOfWorkProtocol,
+        runs: RunArtifactExpiryRepositoryProtocol,
+        purger: RunStoragePurgerProtocol,
+        batch_size: int = 500,
+        concurrency: int = 8,
+        timer: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self._uow = uow
+        self._runs = runs
+        self._purger = purger
+        self._batch_size = batch_size
+        self._concurrency = concurrency
+        self._timer = timer
+
+    async def expire(
+        self, *, retention_days: int, now: datetime | None = None
+    ) -> RunArtifactExpiryResult:
+        if retention_days < 0:
+            raise ValueError("retention_days must be >= 0")
+
+        if now is None:
+            now = datetime.now(timezone.utc)
+        if now.tzinfo is None:
+            raise ValueError("now must be timezone-aware")
+
+        cutoff = now - timedelta(days=retention_days)
+        semaphore = asyncio.Semaphore(self._concurrency)
+        started = self._timer()
+        expired_runs = 0
+        failed_runs = 0
+        bytes_deleted = 0
+        cursor: ArtifactExpiryCandidate | None = None
+
+        while True:
+            async with self._uow:
+                batch = await self._runs.list_pending_artifact_expiry(
+                    finished_before=cutoff, limit=self._batch_size, after=cursor
+                )
+            if not batch:
+                break
+            cursor = batch[-1]
+
+            freed = await asyncio.gather(
+                *(self._purge(semaphore=semaphore, run_id=item.run_id) for item in batch)
+            )
+            purged = [
+                item.run_id for item, size in zip(batch, freed, strict=True) if size is not None
+            ]
+            if purged:
+                async with self._uow:
+                    await self._runs.mark_artifacts_expired(run_ids=purged, expired_at=now)
+
+            expired_runs += len(purged)
+            failed_runs += len(batch) - len(purged)
+            bytes_deleted += sum(size for size in freed if size is not None)
+            if len(batch) < self._batch_size:
+                break
+
+        result = RunArtifactExpiryResult(
+            expired_runs=expired_runs,
+            failed_runs=failed_runs,
+            bytes_deleted=bytes_deleted,
+            elapsed_seconds=self._timer() - started,
+        )
+        logger.info(
+            "Run artifact retention complete",
+            expired_runs=result.expired_runs,
+            failed_runs=result.failed_runs,
+            bytes_deleted=result.bytes_deleted,
+            runs_per_second=round(result.runs_per_second, 1),
+            bytes_per_second=round(result.bytes_per_second),
+        )
+        return result
+
+    async def _purge(self, *, semaphore: asyncio.Semaphore, run_id: UUID) -> int | None:
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(self._purger.purge_run, run_id=run_id)
+            except Exception:
+                logger.warning("Run artifact purge failed", run_id=str(run_id), exc_info=True)
+                return None
@@ -5,9 +5,10 @@ from pathlib import Path
 from uuid import UUID, uuid4
 
 from skriptoteket.domain.errors import validation_error
-from skriptoteket.domain.scripting.input_files import normalize_input_files
+from skriptoteket.domain.scripting.input_files import input_file_name, normalize_input_files
+from skriptoteket.infrastructure.storage.blob_store import LocalBlobStore
 from skriptoteket.protocols.run_inputs import RunInputStorageProtocol
-from skriptoteket.protocols.session_files import InputFile
+from skriptoteket.protocols.session_files import InputFile, RunnerInputFile, StoredInputFile
 
 
 class LocalRunInputStorage(RunInputStorageProtocol):
@@ -18,15 +19,19 @@ class LocalRunInputStorage(RunInputStorageProtocol):
 
     This is intentionally separate from the output artifacts directory
     ({artifacts_root}/{run_id}/) to avoid collisions with artifact extraction.
+
+    Files are hard links into the content-addressed `LocalBlobStore`, so inputs shared with
+    session files or other runs are stored once.
     """
 
-    def __init__(self, *, artifacts_root: Path) -> None:
+    def __init__(self, *, artifacts_root: Path, blob_store: LocalBlobStore | None = None) -> None:
         self._root = artifacts_root / "run-inputs"
+        self._blobs = blob_store or LocalBlobStore(artifacts_root=artifacts_root)
 
     def _run_dir(self, *, run_id: UUID) -> Path:
         return self._root / str(run_id)
 
-    async def store(self, *, run_id: UUID, files: list[InputFile]) -> None:
+    async def store(self, *, run_id: UUID, files: list[RunnerInputFile]) -> None:
         if not files:
             raise validation_error("files is required")
 
@@ -41,8 +46,8 @@ class LocalRunInputStorage(RunInputStorageProtocol):
 
         temp_dir.mkdir(parents=True, exist_ok=False)
         try:
-            for name, content in normalized_files:
-                (temp_dir / name).write_bytes(content)
+            for item in normalized_files:
+                self._blobs.link(item=item, target=temp_dir / input_file_name(item))
 
             if run_dir.exists():
                 old_dir = parent_dir / f"{run_dir.name}.old-{uuid4()}"
@@ -73,6 +78,18 @@ class LocalRunInputStorage(RunInputStorageProtocol):
             files.append((item.name, item.read_bytes()))
         return files
 
+    async def get_stored(self, *, run_id: UUID) -> list[StoredInputFile]:
+        run_dir = self._run_dir(run_id=run_id)
+        if not run_dir.exists():
+            return []
+
+        files: list[StoredInputFile] = []
+        for item in sorted(run_dir.iterdir(), key=lambda path: path.name):
+            if not item.is_file():
+                continue
+            files.append(StoredInputFile(name=item.name, path=item, bytes=item.stat().st_size))
+        return files
+
     async def delete(self, *, run_id: UUID) -> None:
         run_dir = self._run_dir(run_id=run_id)
         if not run_dir.exists():
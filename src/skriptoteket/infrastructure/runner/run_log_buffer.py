@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import codecs
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import BinaryIO
+from uuid import UUID, uuid4
+
+from skriptoteket.protocols.run_logs import (
+    RunLogBufferProtocol,
+    RunLogChunk,
+    RunLogStream,
+    RunLogTail,
+    RunLogWriterProtocol,
+)
+
+
+def _encode_record(record: dict[str, object]) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class _LocalRunLogWriter(RunLogWriterProtocol):
+    """Appends NDJSON records; keeps at most `max_bytes` of the newest records on disk.
+
+    The file is append-only between compactions. Once it grows past twice the budget the retained
+    records are rewritten to a temp file and swapped in with `os.replace`, so readers always see a
+    consistent file (a torn trailing line is ignored by the reader).
+    """
+
+    def __init__(self, *, path: Path, max_bytes: int) -> None:
+        self._path = path
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._decoders = {
+            stream: codecs.getincrementaldecoder("utf-8")(errors="replace")
+            for stream in ("stdout", "stderr")
+        }
+        self._records: deque[bytes] = deque()
+        self._retained_bytes = 0
+        self._file_bytes = 0
+        self._seq = 0
+        self._closed = False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: BinaryIO = path.open("wb")
+
+    def write(self, *, stream: RunLogStream, data: bytes) -> None:
+        if not data:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            if len(data) > self._max_bytes:
+                data = data[-self._max_bytes :]
+            text = self._decoders[stream].decode(data)
+            if text:
+                self._append({"stream": stream, "text": text})
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            for stream, decoder in self._decoders.items():
+                text = decoder.decode(b"", final=True)
+                if text:
+                    self._append({"stream": stream, "text": text})
+            self._append({"end": True})
+            self._closed = True
+            self._file.close()
+
+    def _append(self, record: dict[str, object]) -> None:
+        self._seq += 1
+        line = _encode_record({"seq": self._seq, **record})
+        self._records.append(line)
+        self._retained_bytes += len(line)
+        while self._retained_bytes > self._max_bytes and len(self._records) > 1:
+            self._retained_bytes -= len(self._records.popleft())
+
+        if self._file_bytes + len(line) > 2 * self._max_bytes:
+            self._compact()
+            return
+        self._file.write(line)
+        self._file.flush()
+        self._file_bytes += len(line)
+
+    def _compact(self) -> None:
+        temp_path = self._path.with_name(f"{self._path.name}.tmp-{uuid4()}")
+        payload = b"".join(self._records)
+        temp_path.write_bytes(payload)
+        os.replace(temp_path, self._path)
+        self._file.close()
+        self._file = self._path.open("ab")
+        self._file_bytes = len(payload)
+
+
+class LocalRunLogBuffer(RunLogBufferProtocol):
+    """Filesystem-backed live output buffer.
+
+    Layout:
+      {artifacts_root}/run-logs/{run_id}.ndjson
+
+    Runners (web or worker process) write; the web process reads it for the SSE output stream.
+    The persisted `tool_runs.stdout/stderr` remain the source of truth once the run has finished.
+    """
+
+    def __init__(self, *, artifacts_root: Path, max_bytes: int) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+        self._root = artifacts_root / "run-logs"
+        self._max_bytes = max_bytes
+
+    def _path(self, *, run_id: UUID) -> Path:
+        return self._root / f"{run_id}.ndjson"
+
+    def open_writer(self, *, run_id: UUID) -> RunLogWriterProtocol:
+        return _LocalRunLogWriter(path=self._path(run_id=run_id), max_bytes=self._max_bytes)
+
+    def read(self, *, run_id: UUID, after_seq: int = 0) -> RunLogTail | None:
+        try:
+            raw = self._path(run_id=run_id).read_bytes()
+        except FileNotFoundError:
+            return None
+
+        chunks: list[RunLogChunk] = []
+        finished = False
+        first_seq: int | None = None
+        # The last element is either empty or a line the writer has not finished yet.
+        for line in raw.split(b"\n")[:-1]:
+            try:
+                record = json.loads(line)
+                seq = int(record["seq"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if first_seq is None:
+                first_seq = seq
+            if record.get("end"):
+                finished = True
+                continue
+            if seq <= after_seq:
+                continue
+            chunks.append(RunLogChunk(seq=seq, stream=record["stream"], text=record["text"]))
+
+        return RunLogTail(
+            chunks=chunks,
+            finished=finished,
+            dropped=first_seq is not None and first_seq > after_seq + 1,
+        )
+
+    def delete(self, *, run_id: UUID) -> None:
+        self._path(run_id=run_id).unlink(missing_ok=True)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable, Iterator
+from pathlib import PurePosixPath
+from typing import IO
+from uuid import UUID
+
+from skriptoteket.domain.scripting.artifacts import (
+    ArtifactsManifest,
+    RunnerArtifact,
+    StoredArtifact,
+)
+from skriptoteket.infrastructure.artifacts.filesystem import ArtifactsManifestBuilder
+from skriptoteket.infrastructure.artifacts.precompression import artifact_media_type
+from skriptoteket.infrastructure.runner.artifact_manager import (
+    FilesystemArtifactManager,
+    iter_output_archive,
+)
+from skriptoteket.infrastructure.runner.path_safety import validate_output_path
+from skriptoteket.infrastructure.storage.s3 import S3ObjectStore
+from skriptoteket.protocols.runner import ArtifactManagerProtocol
+
+_READ_CHUNK_BYTES = 1024 * 64
+_MANIFEST_NAME = "manifest.json"
+
+
+class S3ArtifactManager(ArtifactManagerProtocol):
+    """Run artifacts in an S3-compatible bucket.
+
+    Layout (relative to the store prefix):
+      artifacts/{run_id}/output/...       artifact objects
+      artifacts/{run_id}/manifest.json    written last; makes `store_output_archive` idempotent
+
+    Each archive member is uploaded as it is read from the container (multipart for large files),
+    so the worker needs no local copy. Downloads redirect to presigned URLs. Artifacts that only
+    exist under `ARTIFACTS_ROOT` (written by the web process itself, e.g. curated apps) are served
+    through `local`.
+    """
+
+    def __init__(
+        self,
+        *,
+        store: S3ObjectStore,
+        local: FilesystemArtifactManager,
+        presigned_url_ttl_seconds: int,
+    ) -> None:
+        if presigned_url_ttl_seconds < 1:
+            raise ValueError("presigned_url_ttl_seconds must be >= 1")
+        self._store = store
+        self._local = local
+        self._presigned_url_ttl_seconds = presigned_url_ttl_seconds
+
+    def store_output_archive(
+        self,
+        *,
+        run_id: UUID,
+        output_archive: Iterable[bytes],
+        reported_artifacts: list[RunnerArtifact],
+    ) -> ArtifactsManifest:
+        for artifact in reported_artifacts:
+            validate_output_path(path=artifact.path)
+
+        manifest_key = _run_key(run_id, _MANIFEST_NAME)
+        existing = self._store.get_bytes(key=manifest_key)
+        if existing is not None:
+            return ArtifactsManifest.model_validate_json(existing)
+
+        builder = ArtifactsManifestBuilder()
+        for relative_path, _declared_size, content in iter_output_archive(output_archive):
+            if content is None:
+                continue
+            artifact_path = relative_path.as_posix()
+            reader = _HashingReader(content)
+            size = self._store.upload_stream(key=_run_key(run_id, artifact_path), chunks=reader)
+            builder.add(path=artifact_path, size=size, sha256=reader.hexdigest())
+
+        manifest = builder.build()
+        self._store.put_bytes(
+            key=manifest_key,
+            data=manifest.model_dump_json().encode("utf-8"),
+            content_type="application/json",
+        )
+        return manifest
+
+    def download_url(self, *, run_id: UUID, artifact: StoredArtifact) -> str | None:
+        key = _run_key(run_id, validate_output_path(path=artifact.path).as_posix())
+        if not self._store.exists(key=key):
+            return self._local.download_url(run_id=run_id, artifact=artifact)
+        filename = PurePosixPath(artifact.path).name
+        return self._store.presigned_get_url(
+            key=key,
+            expires_seconds=self._presigned_url_ttl_seconds,
+            filename=filename,
+            content_type=artifact_media_type(filename),
+        )
+
+    def open_artifact(self, *, run_id: UUID, artifact: StoredArtifact) -> Iterator[bytes] | None:
+        key = _run_key(run_id, validate_output_path(path=artifact.path).as_posix())
+        if not self._store.exists(key=key):
+            return self._local.open_artifact(run_id=run_id, artifact=artifact)
+        return self._store.iter_bytes(key=key)
+
+
+def _run_key(run_id: UUID, name: str) -> str:
+    return f"artifacts/{run_id}/{name}"
+
+
+class _HashingReader:
+    """Yields an archive member in chunks while hashing it."""
+
+    def __init__(self, content: IO[bytes]) -> None:
+        self._content = content
+        self._digest = hashlib.sha256()
+
+    def __iter__(self) -> Iterator[bytes]:
+        while chunk := self._content.read(_READ_CHUNK_BYTES):
+            self._digest.update(chunk)
+            yield chunk
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
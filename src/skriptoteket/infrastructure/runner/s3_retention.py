@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from skriptoteket.infrastructure.runner.retention import LocalRunStoragePurger
+from skriptoteket.infrastructure.storage.s3 import S3ObjectStore
+from skriptoteket.protocols.runner import RunStoragePurgerProtocol
+
+
+class S3RunStoragePurger(RunStoragePurgerProtocol):
+    """Deletes `artifacts/{run_id}/` and `run-inputs/{run_id}/` from the bucket.
+
+    Local copies (artifacts written by the web process, spooled run inputs) go through `local`.
+    """
+
+    def __init__(self, *, store: S3ObjectStore, local: LocalRunStoragePurger) -> None:
+        self._store = store
+        self._local = local
+
+    def purge_run(self, *, run_id: UUID) -> int:
+        freed = self._local.purge_run(run_id=run_id)
+        for prefix in (f"artifacts/{run_id}/", f"run-inputs/{run_id}/"):
+            freed += sum(item.bytes for item in self._store.delete_prefix(prefix=prefix))
+        return freed
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import shutil
+from pathlib import Path, PurePosixPath
+from uuid import UUID
+
+from skriptoteket.domain.errors import validation_error
+from skriptoteket.domain.scripting.input_files import input_file_name, normalize_input_files
+from skriptoteket.infrastructure.storage.input_files import put_input_file
+from skriptoteket.infrastructure.storage.s3 import S3Object, S3ObjectStore
+from skriptoteket.protocols.run_inputs import RunInputStorageProtocol
+from skriptoteket.protocols.session_files import InputFile, RunnerInputFile, StoredInputFile
+
+
+class S3RunInputStorage(RunInputStorageProtocol):
+    """S3-backed storage for per-run input files.
+
+    Layout (relative to the store prefix):
+      run-inputs/{run_id}/{name}
+
+    `get_stored` downloads the files into a worker-local spool directory
+    ({spool_root}/run-inputs/{run_id}/) so runners can stream them from disk; `delete` removes
+    both.
+    """
+
+    def __init__(self, *, store: S3ObjectStore, spool_root: Path) -> None:
+        self._store = store
+        self._spool_root = spool_root / "run-inputs"
+
+    @staticmethod
+    def _prefix(run_id: UUID) -> str:
+        return f"run-inputs/{run_id}/"
+
+    async def store(self, *, run_id: UUID, files: list[RunnerInputFile]) -> None:
+        if not files:
+            raise validation_error("files is required")
+
+        normalized_files = normalize_input_files(input_files=files)[0]
+        await asyncio.to_thread(self._store_sync, run_id=run_id, files=normalized_files)
+
+    def _store_sync(self, *, run_id: UUID, files: list[RunnerInputFile]) -> None:
+        prefix = self._prefix(run_id)
+        names = {input_file_name(item) for item in files}
+        stale = [item.key for item in self._store.list_objects(prefix=prefix)]
+        for item in files:
+            put_input_file(store=self._store, key=f"{prefix}{input_file_name(item)}", item=item)
+        self._store.delete_keys(keys=[key for key in stale if PurePosixPath(key).name not in names])
+
+    async def get(self, *, run_id: UUID) -> list[InputFile]:
+        return await asyncio.to_thread(self._get_sync, run_id=run_id)
+
+    def _get_sync(self, *, run_id: UUID) -> list[InputFile]:
+        files: list[InputFile] = []
+        for item in sorted(self._store.list_objects(prefix=self._prefix(run_id)), key=_name):
+            content = self._store.get_bytes(key=item.key)
+            if content is not None:
+                files.append((_name(item), content))
+        return files
+
+    async def get_stored(self, *, run_id: UUID) -> list[StoredInputFile]:
+        return await asyncio.to_thread(self._get_stored_sync, run_id=run_id)
+
+    def _get_stored_sync(self, *, run_id: UUID) -> list[StoredInputFile]:
+        spool_dir = self._spool_root / str(run_id)
+        files: list[StoredInputFile] = []
+        for item in sorted(self._store.list_objects(prefix=self._prefix(run_id)), key=_name):
+            path = spool_dir / _name(item)
+            if not path.is_file() or path.stat().st_size != item.bytes:
+                self._store.download_file(key=item.key, path=path)
+            files.append(StoredInputFile(name=path.name, path=path, bytes=item.bytes))
+        return files
+
+    async def delete(self, *, run_id: UUID) -> None:
+        await asyncio.to_thread(self._store.delete_prefix, prefix=self._prefix(run_id))
+        shutil.rmtree(self._spool_root / str(run_id), ignore_errors=True)
+
+
+def _name(item: S3Object) -> str:
+    return PurePosixPath(item.key).name
@@ -1,23 +1,44 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import shutil
+import time
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from uuid import UUID, uuid4
 
+import structlog
+
 from skriptoteket.domain.errors import validation_error
-from skriptoteket.domain.scripting.input_files import normalize_input_files
+from skriptoteket.domain.scripting.input_files import (
+    input_file_name,
+    input_file_size,
+    normalize_input_files,
+)
 from skriptoteket.domain.scripting.tool_sessions import normalize_tool_session_context
+from skriptoteket.infrastructure.session_files.usage import read_last_accessed_at
+from skriptoteket.infrastructure.session_files.usage_index import (
+    IndexedSession,
+    SessionFileUsageIndex,
+    session_file_usage_index,
+)
+from skriptoteket.infrastructure.storage.blob_store import LocalBlobStore
+from skriptoteket.infrastructure.time.asyncio_sleeper import AsyncioSleeper
 from skriptoteket.protocols.clock import ClockProtocol
 from skriptoteket.protocols.session_files import (
     CleanupExpiredSessionFilesResult,
     InputFile,
+    RunnerInputFile,
     SessionFileMetadata,
     SessionFileStorageProtocol,
+    StoredInputFile,
 )
+from skriptoteket.protocols.sleeper import SleeperProtocol
+
+logger = structlog.get_logger(__name__)
 
 _META_FILENAME = "meta.json"
 
@@ -30,6 +51,16 @@ class _SessionKey:
     context_key: str
 
 
+@dataclass(frozen=True)
+class _CleanupBatch:
+    candidates: int
+    deleted_sessions: int
+    deleted_files: int
+    deleted_bytes: int
+    # Index rows updated; without any, the next query returns the same batch.
+    progressed: bool
+
+
 def _context_key(*, context: str) -> str:
     return hashlib.sha256(context.encode("utf-8")).hexdigest()
 
@@ -45,17 +76,16 @@ def _safe_write_json(*, path: Path, payload: dict[str, object]) -> None:
             tmp_path.unlink(missing_ok=True)
 
 
-def _parse_last_accessed_at(*, value: object) -> str | None:
-    if not isinstance(value, str) or not value.strip():
-        return None
-    return value
-
-
 class LocalSessionFileStorage(SessionFileStorageProtocol):
     """Filesystem-backed session file storage (ADR-0039).
 
     Layout:
       {sessions_root}/sessions/{tool_id}/{user_id}/{context_key}/
+      {sessions_root}/session-usage.sqlite3   (usage/expiry index, see `SessionFileUsageIndex`)
+
+    Session files are hard links into the content-addressed `LocalBlobStore`; meta.json records
+    each file's sha256 so `get_stored_files` hands runs the files without reading them.
+    Filesystem and usage-index work runs in a worker thread, off the event loop.
     """
 
     def __init__(
@@ -64,10 +94,22 @@ class LocalSessionFileStorage(SessionFileStorageProtocol):
         sessions_root: Path,
         ttl_seconds: int,
         clock: ClockProtocol,
+        usage_index: SessionFileUsageIndex | None = None,
+        cleanup_batch_size: int = 500,
+        cleanup_max_sessions_per_second: float = 0.0,
+        sleeper: SleeperProtocol | None = None,
+        blob_store: LocalBlobStore | None = None,
     ) -> None:
+        if cleanup_batch_size < 1:
+            raise ValueError("cleanup_batch_size must be >= 1")
         self._sessions_root = sessions_root
         self._ttl_seconds = ttl_seconds
         self._clock = clock
+        self._usage_index = usage_index or session_file_usage_index(sessions_root)
+        self._cleanup_batch_size = cleanup_batch_size
+        self._cleanup_max_sessions_per_second = cleanup_max_sessions_per_second
+        self._sleeper = sleeper or AsyncioSleeper()
+        self._blobs = blob_store or LocalBlobStore(artifacts_root=sessions_root)
 
     def _key(self, *, tool_id: UUID, user_id: UUID, context: str) -> _SessionKey:
         normalized_context = normalize_tool_session_context(context=context)
@@ -86,22 +128,43 @@ class LocalSessionFileStorage(SessionFileStorageProtocol):
     def _meta_path(self, session_dir: Path) -> Path:
         return session_dir / _META_FILENAME
 
-    def _build_meta(self, *, key: _SessionKey, now_iso: str) -> dict[str, object]:
+    def _build_meta(
+        self, *, key: _SessionKey, now_iso: str, files: dict[str, str]
+    ) -> dict[str, object]:
         return {
             "context": key.context,
             "context_key": key.context_key,
             "last_accessed_at": now_iso,
+            "files": files,
         }
 
-    def _read_meta(self, *, session_dir: Path) -> dict[str, object] | None:
-        meta_path = self._meta_path(session_dir)
-        if not meta_path.exists():
-            return None
+    def _read_file_digests(self, session_dir: Path) -> dict[str, str]:
+        """name -> sha256 from meta.json (empty for sessions stored before the blob store)."""
         try:
-            raw = json.loads(meta_path.read_text("utf-8"))
-        except (OSError, json.JSONDecodeError):
-            return None
-        return raw if isinstance(raw, dict) else None
+            meta = json.loads(self._meta_path(session_dir).read_text("utf-8"))
+        except (OSError, ValueError):
+            return {}
+        files = meta.get("files") if isinstance(meta, dict) else None
+        if not isinstance(files, dict):
+            return {}
+        return {name: sha256 for name, sha256 in files.items() if isinstance(sha256, str)}
+
+    def _touch(self, *, key: _SessionKey, session_dir: Path) -> None:
+        now = self._clock.now()
+        _safe_write_json(
+            path=self._meta_path(session_dir),
+            payload=self._build_meta(
+                key=key,
+                now_iso=now.isoformat(),
+                files=self._read_file_digests(session_dir),
+            ),
+        )
+        self._usage_index.touch_session(
+            tool_id=key.tool_id,
+            user_id=key.user_id,
+            context_key=key.context_key,
+            last_accessed_at=now,
+        )
 
     async def store_files(
         self,
@@ -109,14 +172,16 @@ class LocalSessionFileStorage(SessionFileStorageProtocol):
         tool_id: UUID,
         user_id: UUID,
         context: str,
-        files: list[InputFile],
+        files: list[RunnerInputFile],
     ) -> None:
         if not files:
             raise validation_error("files is required")
 
         key = self._key(tool_id=tool_id, user_id=user_id, context=context)
         normalized_files = normalize_input_files(input_files=files)[0]
+        await asyncio.to_thread(self._store_files_sync, key=key, files=normalized_files)
 
+    def _store_files_sync(self, *, key: _SessionKey, files: list[RunnerInputFile]) -> None:
         session_dir = self._session_dir(key)
         parent_dir = session_dir.parent
         parent_dir.mkdir(parents=True, exist_ok=True)
@@ -124,15 +189,20 @@ class LocalSessionFileStorage(SessionFileStorageProtocol):
         temp_dir = parent_dir / f"{key.context_key}.tmp-{uuid4()}"
         old_dir: Path | None = None
 
-        now_iso = self._clock.now().isoformat()
+        now = self._clock.now()
+        now_iso = now.isoformat()
         temp_dir.mkdir(parents=True, exist_ok=False)
         try:
-            for name, content in normalized_files:
-                (temp_dir / name).write_bytes(content)
+            digests: dict[str, str] = {}
+            for item in files:
+                name = input_file_name(item)
+                blob = self._blobs.link(item=item, target=temp_dir / name)
+                if blob.sha256 is not None:
+                    digests[name] = blob.sha256
 
             _safe_write_json(
                 path=self._meta_path(temp_dir),
-                payload=self._build_meta(key=key, now_iso=now_iso),
+                payload=self._build_meta(key=key, now_iso=now_iso, files=digests),
             )
 
             if session_dir.exists():
@@ -152,6 +222,15 @@ class LocalSessionFileStorage(SessionFileStorageProtocol):
             if old_dir is not None:
                 shutil.rmtree(old_dir, ignore_errors=True)
 
+        self._usage_index.record_session(
+            tool_id=key.tool_id,
+            user_id=key.user_id,
+            context_key=key.context_key,
+            files=len(files),
+            bytes_total=sum(input_file_size(item) for item in files),
+            last_accessed_at=now,
+        )
+
     async def get_files(
         self,
         *,
@@ -160,6 +239,9 @@ class LocalSessionFileStorage(SessionFileStorageProtocol):
         context: str,
     ) -> list[InputFile]:
         key = self._key(tool_id=tool_id, user_id=user_id, context=context)
+        return await asyncio.to_thread(self._get_files_sync, key=key)
+
+    def _get_files_sync(self, *, key: _SessionKey) -> list[InputFile]:
         session_dir = self._session_dir(key)
         if not session_dir.exists():
             return []
@@ -172,11 +254,41 @@ class LocalSessionFileStorage(SessionFileStorageProtocol):
                 continue
             files.append((item.name, item.read_bytes()))
 
-        now_iso = self._clock.now().isoformat()
-        _safe_write_json(
-            path=self._meta_path(session_dir),
-            payload=self._build_meta(key=key, now_iso=now_iso),
-        )
+        self._touch(key=key, session_dir=session_dir)
+        return files
+
+    async def get_stored_files(
+        self,
+        *,
+        tool_id: UUID,
+        user_id: UUID,
+        context: str,
+    ) -> list[RunnerInputFile]:
+        key = self._key(tool_id=tool_id, user_id=user_id, context=context)
+        return await asyncio.to_thread(self._get_stored_files_sync, key=key)
+
+    def _get_stored_files_sync(self, *, key: _SessionKey) -> list[RunnerInputFile]:
+        session_dir = self._session_dir(key)
+        if not session_dir.exists():
+            return []
+
+        digests = self._read_file_digests(session_dir)
+        files: list[RunnerInputFile] = []
+        for item in sorted(session_dir.iterdir(), key=lambda path: path.name):
+            if item.name == _META_FILENAME:
+                continue
+            if not item.is_file():
+                continue
+            files.append(
+                StoredInputFile(
+                    name=item.name,
+                    path=item,
+                    bytes=item.stat().st_size,
+                    sha256=digests.get(item.name),
+                )
+            )
+
+        self._touch(key=key, session_dir=session_dir)
         return files
 
     async def list_files(
@@ -187,6 +299,9 @@ class LocalSessionFileStorage(SessionFileStorageProtocol):
         context: str,
     ) -> list[SessionFileMetadata]:
         key = self._key(tool_id=tool_id, user_id=user_id, context=context)
+        return await asyncio.to_thread(self._list_files_sync, key=key)
+
+    def _list_files_sync(self, *, key: _SessionKey) -> list[SessionFileMetadata]:
         session_dir = self._session_dir(key)
         if not session_dir.exists():
             return []
@@ -203,11 +318,7 @@ class LocalSessionFileStorage(SessionFileStorageProtocol):
                 size_bytes = 0
             files.append(SessionFileMetadata(name=item.name, bytes=size_bytes))
 
-        now_iso = self._clock.now().isoformat()
-        _safe_write_json(
-            path=self._meta_path(session_dir),
-            payload=self._build_meta(key=key, now_iso=now_iso),
-        )
+        self._touch(key=key, session_dir=session_dir)
         return files
 
     async def clear_session(
@@ -218,75 +329,125 @@ class LocalSessionFileStorage(SessionFileStorageProtocol):
         context: str,
     ) -> None:
         key = self._key(tool_id=tool_id, user_id=user_id, context=context)
+        await asyncio.to_thread(self._clear_session_sync, key=key)
+
+    def _clear_session_sync(self, *, key: _SessionKey) -> None:
         session_dir = self._session_dir(key)
         if not session_dir.exists():
             return
         shutil.rmtree(session_dir, ignore_errors=True)
+        self._usage_index.remove_session(
+            tool_id=key.tool_id, user_id=key.user_id, context_key=key.context_key
+        )
 
     async def clear_all(self) -> None:
+        await asyncio.to_thread(self._clear_all_sync)
+
+    def _clear_all_sync(self) -> None:
         root = self._sessions_root / "sessions"
-        if not root.exists():
-            return
-        shutil.rmtree(root, ignore_errors=True)
+        if root.exists():
+            shutil.rmtree(root, ignore_errors=True)
+        self._usage_index.remove_all()
 
     async def cleanup_expired(self) -> CleanupExpiredSessionFilesResult:
-        now = self._clock.now()
+        """Delete sessions not accessed within the TTL.
+
+        Candidates come from the usage index (oldest first, `cleanup_batch_size` at a time), so
+        the cost follows the number of expired sessions rather than all sessions. Each candidate's
+        meta.json is re-checked before deletion. Each batch runs in a worker thread. With
+        `cleanup_max_sessions_per_second` set, batches are spaced out to keep a large purge from
+        saturating disk IO.
+        """
+        cutoff = self._clock.now() - timedelta(seconds=self._ttl_seconds)
         scanned_sessions = 0
         deleted_sessions = 0
         deleted_files = 0
         deleted_bytes = 0
 
-        root = self._sessions_root / "sessions"
-        if not root.exists():
-            return CleanupExpiredSessionFilesResult(
-                scanned_sessions=0,
-                deleted_sessions=0,
-                deleted_files=0,
-                deleted_bytes=0,
+        while True:
+            batch_started = time.monotonic()
+            batch = await asyncio.to_thread(self._cleanup_batch_sync, cutoff=cutoff)
+            scanned_sessions += batch.candidates
+            deleted_sessions += batch.deleted_sessions
+            deleted_files += batch.deleted_files
+            deleted_bytes += batch.deleted_bytes
+            if batch.candidates < self._cleanup_batch_size:
+                break
+            if not batch.progressed:
+                # The index is not writable (errors were logged); stop rather than re-reading
+                # the same batch forever. The next run, or `reconcile`, picks up the rest.
+                logger.warning(
+                    "Session file cleanup stopped early: usage index updates failed",
+                    scanned_sessions=scanned_sessions,
+                )
+                break
+            if self._cleanup_max_sessions_per_second:
+                budget = batch.candidates / self._cleanup_max_sessions_per_second
+                await self._sleeper.sleep(max(0.0, budget - (time.monotonic() - batch_started)))
+
+        return CleanupExpiredSessionFilesResult(
+            scanned_sessions=scanned_sessions,
+            deleted_sessions=deleted_sessions,
+            deleted_files=deleted_files,
+            deleted_bytes=deleted_bytes,
+        )
+
+    def _cleanup_batch_sync(self, *, cutoff: datetime) -> _CleanupBatch:
+        candidates = self._usage_index.expired_sessions(
+            accessed_before=cutoff, limit=self._cleanup_batch_size
+        )
+        removed: list[IndexedSession] = []
+        progressed = False
+        deleted_sessions = 0
+        deleted_files = 0
+        deleted_bytes = 0
+        for candidate in candidates:
+            session_dir = (
+                self._sessions_root
+                / "sessions"
+                / str(candidate.tool_id)
+                / str(candidate.user_id)
+                / candidate.context_key
             )
+            if not session_dir.is_dir():
+                removed.append(candidate)
+                continue
 
-        for tool_dir in root.iterdir():
-            if not tool_dir.is_dir():
+            last_accessed_at = read_last_accessed_at(session_dir=session_dir)
+            if last_accessed_at is None or last_accessed_at >= cutoff:
+                # The index was stale (e.g. a lost update); trust meta.json, as before.
+                if self._usage_index.touch_session(
+                    tool_id=candidate.tool_id,
+                    user_id=candidate.user_id,
+                    context_key=candidate.context_key,
+                    last_accessed_at=last_accessed_at,
+                ):
+                    progressed = True
                 continue
-            for user_dir in tool_dir.iterdir():
-                if not user_dir.is_dir():
-                    continue
-                for context_dir in user_dir.iterdir():
-                    if not context_dir.is_dir():
-                        continue
-
-                    scanned_sessions += 1
-                    meta = self._read_meta(session_dir=context_dir) or {}
-                    last_accessed_at_raw = _parse_last_accessed_at(
-                        value=meta.get("last_accessed_at")
-                    )
-                    if last_accessed_at_raw is None:
-                        continue
-
-                    try:
-                        last_accessed_at = datetime.fromisoformat(last_accessed_at_raw)
-                    except ValueError:
-                        continue
-
-                    age_seconds = (now - last_accessed_at).total_seconds()
-                    if age_seconds <= self._ttl_seconds:
-                        continue
-
-                    for item in context_dir.iterdir():
-                        if not item.is_file() or item.name == _META_FILENAME:
-                            continue
-                        try:
-                            deleted_bytes += item.stat().st_size
-                        except OSError:
-                            pass
-                        deleted_files += 1
-
-                    shutil.rmtree(context_dir, ignore_errors=True)
-                    deleted_sessions += 1
 
-        return CleanupExpiredSessionFilesResult(
-            scanned_sessions=scanned_sessions,
+            for item in session_dir.iterdir():
+                if not item.is_file() or item.name == _META_FILENAME:
+                    continue
+                try:
+                    stat = item.stat()
+                except OSError:
+                    pass
+                else:
+                    # Blob-backed files only drop a link; their bytes are freed by blob GC.
+                    if stat.st_nlink == 1:
+                        deleted_bytes += stat.st_size
+                deleted_files += 1
+
+            shutil.rmtree(session_dir, ignore_errors=True)
+            removed.append(candidate)
+            deleted_sessions += 1
+
+        if removed and self._usage_index.remove_sessions(sessions=removed):
+            progressed = True
+        return _CleanupBatch(
+            candidates=len(candidates),
             deleted_sessions=deleted_sessions,
             deleted_files=deleted_files,
             deleted_bytes=deleted_bytes,
+            progressed=progressed,
         )
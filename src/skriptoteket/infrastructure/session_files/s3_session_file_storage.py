@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import PurePosixPath
+from uuid import UUID
+
+from skriptoteket.domain.errors import validation_error
+from skriptoteket.domain.scripting.input_files import input_file_name, normalize_input_files
+from skriptoteket.domain.scripting.tool_sessions import normalize_tool_session_context
+from skriptoteket.infrastructure.storage.input_files import put_input_file
+from skriptoteket.infrastructure.storage.s3 import S3DeleteError, S3Object, S3ObjectStore
+from skriptoteket.protocols.clock import ClockProtocol
+from skriptoteket.protocols.session_files import (
+    CleanupExpiredSessionFilesResult,
+    InputFile,
+    RunnerInputFile,
+    SessionFileMetadata,
+    SessionFileStorageProtocol,
+)
+
+_META_FILENAME = "meta.json"
+_SESSIONS_PREFIX = "sessions/"
+
+
+@dataclass(frozen=True)
+class _SessionKey:
+    tool_id: UUID
+    user_id: UUID
+    context: str
+    context_key: str
+
+
+class S3SessionFileStorage(SessionFileStorageProtocol):
+    """S3-backed session file storage (ADR-0039 layout in a bucket).
+
+    Layout (relative to the store prefix):
+      sessions/{tool_id}/{user_id}/{context_key}/{name}
+      sessions/{tool_id}/{user_id}/{context_key}/meta.json
+
+    Object stores have no atomic directory rename: `store_files` writes the new files and
+    meta.json first, then deletes objects that are no longer part of the session.
+    """
+
+    def __init__(
+        self,
+        *,
+        store: S3ObjectStore,
+        ttl_seconds: int,
+        clock: ClockProtocol,
+    ) -> None:
+        self._store = store
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+
+    def _key(self, *, tool_id: UUID, user_id: UUID, context: str) -> _SessionKey:
+        normalized_context = normalize_tool_session_context(context=context)
+        return _SessionKey(
+            tool_id=tool_id,
+            user_id=user_id,
+            context=normalized_context,
+            context_key=hashlib.sha256(normalized_context.encode("utf-8")).hexdigest(),
+        )
+
+    @staticmethod
+    def _prefix(key: _SessionKey) -> str:
+        return f"{_SESSIONS_PREFIX}{key.tool_id}/{key.user_id}/{key.context_key}/"
+
+    def _write_meta(self, *, key: _SessionKey) -> None:
+        payload = {
+            "context": key.context,
+            "context_key": key.context_key,
+            "last_accessed_at": self._clock.now().isoformat(),
+        }
+        self._store.put_bytes(
+            key=f"{self._prefix(key)}{_META_FILENAME}",
+            data=json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            content_type="application/json",
+        )
+
+    def _session_objects(self, *, key: _SessionKey) -> list[S3Object]:
+        objects = self._store.list_objects(prefix=self._prefix(key))
+        return sorted(
+            (item for item in objects if _name(item) != _META_FILENAME),
+            key=_name,
+        )
+
+    async def store_files(
+        self,
+        *,
+        tool_id: UUID,
+        user_id: UUID,
+        context: str,
+        files: list[RunnerInputFile],
+    ) -> None:
+        if not files:
+            raise validation_error("files is required")
+
+        key = self._key(tool_id=tool_id, user_id=user_id, context=context)
+        normalized_files = normalize_input_files(input_files=files)[0]
+        await asyncio.to_thread(self._store_files_sync, key=key, files=normalized_files)
+
+    def _store_files_sync(self, *, key: _SessionKey, files: list[RunnerInputFile]) -> None:
+        prefix = self._prefix(key)
+        stale = self._session_objects(key=key)
+        for item in files:
+            put_input_file(store=self._store, key=f"{prefix}{input_file_name(item)}", item=item)
+        self._write_meta(key=key)
+
+        names = {input_file_name(item) for item in files}
+        self._store.delete_keys(keys=[item.key for item in stale if _name(item) not in names])
+
+    async def get_files(
+        self,
+        *,
+        tool_id: UUID,
+        user_id: UUID,
+        context: str,
+    ) -> list[InputFile]:
+        key = self._key(tool_id=tool_id, user_id=user_id, context=context)
+        return await asyncio.to_thread(self._get_files_sync, key=key)
+
+    def _get_files_sync(self, *, key: _SessionKey) -> list[InputFile]:
+        objects = self._session_objects(key=key)
+        if not objects:
+            return []
+
+        files: list[InputFile] = []
+        for item in objects:
+            content = self._store.get_bytes(key=item.key)
+            if content is not None:
+                files.append((_name(item), content))
+        self._write_meta(key=key)
+        return files
+
+    async def get_stored_files(
+        self,
+        *,
+        tool_id: UUID,
+        user_id: UUID,
+        context: str,
+    ) -> list[RunnerInputFile]:
+        # Objects are not on local disk; runs get the contents.
+        return list(await self.get_files(tool_id=tool_id, user_id=user_id, context=context))
+
+    async def list_files(
+        self,
+        *,
+        tool_id: UUID,
+        user_id: UUID,
+        context: str,
+    ) -> list[SessionFileMetadata]:
+        key = self._key(tool_id=tool_id, user_id=user_id, context=context)
+        return await asyncio.to_thread(self._list_files_sync, key=key)
+
+    def _list_files_sync(self, *, key: _SessionKey) -> list[SessionFileMetadata]:
+        objects = self._session_objects(key=key)
+        if not objects:
+            return []
+
+        self._write_meta(key=key)
+        return [SessionFileMetadata(name=_name(item), bytes=item.bytes) for item in objects]
+
+    async def clear_session(
+        self,
+        *,
+        tool_id: UUID,
+        user_id: UUID,
+        context: str,
+    ) -> None:
+        key = self._key(tool_id=tool_id, user_id=user_id, context=context)
+        await asyncio.to_thread(self._store.delete_prefix, prefix=self._prefix(key))
+
+    async def clear_all(self) -> None:
+        await asyncio.to_thread(self._store.delete_prefix, prefix=_SESSIONS_PREFIX)
+
+    async def cleanup_expired(self) -> CleanupExpiredSessionFilesResult:
+        return await asyncio.to_thread(self._cleanup_expired_sync)
+
+    def _cleanup_expired_sync(self) -> CleanupExpiredSessionFilesResult:
+        now = self._clock.now()
+        scanned_sessions = 0
+        deleted_sessions = 0
+        deleted_files = 0
+        deleted_bytes = 0
+        # Keys are listed in order, so each session's objects arrive together and only one
+        # session is held in memory at a time.
+        for prefix, objects in _group_sessions(self._store.iter_objects(prefix=_SESSIONS_PREFIX)):
+            scanned_sessions += 1
+            last_accessed_at = self._read_last_accessed_at(prefix=prefix)
+            if last_accessed_at is None:
+                continue
+            if (now - last_accessed_at).total_seconds() <= self._ttl_seconds:
+                continue
+
+            files = [item for item in objects if _name(item) != _META_FILENAME]
+            try:
+                self._store.delete_keys(keys=[item.key for item in objects])
+            except S3DeleteError:
+                # Logged by the store; the session stays listed and is retried next run.
+                continue
+            deleted_sessions += 1
+            deleted_files += len(files)
+            deleted_bytes += sum(item.bytes for item in files)
+
+        return CleanupExpiredSessionFilesResult(
+            scanned_sessions=scanned_sessions,
+            deleted_sessions=deleted_sessions,
+            deleted_files=deleted_files,
+            deleted_bytes=deleted_bytes,
+        )
+
+    def _read_last_accessed_at(self, *, prefix: str) -> datetime | None:
+        raw = self._store.get_bytes(key=f"{prefix}{_META_FILENAME}")
+        if raw is None:
+            return None
+        try:
+            meta = json.loads(raw)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None
+        value = meta.get("last_accessed_at") if isinstance(meta, dict) else None
+        if not isinstance(value, str) or not value.strip():
+            return None
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+
+
+def _name(item: S3Object) -> str:
+    return PurePosixPath(item.key).name
+
+
+def _group_sessions(objects: Iterable[S3Object]) -> Iterator[tuple[str, list[S3Object]]]:
+    """Group consecutive `sessions/{tool_id}/{user_id}/{context_key}/{name}` keys by session."""
+    current: str | None = None
+    group: list[S3Object] = []
+    for item in objects:
+        parts = PurePosixPath(item.key).parts
+        if len(parts) != 5:
+            continue
+        prefix = "/".join(parts[:4]) + "/"
+        if prefix != current:
+            if current is not None:
+                yield current, group
+            current, group = prefix, []
+        group.append(item)
+    if current is not None:
+        yield current, group
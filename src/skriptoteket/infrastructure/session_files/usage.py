@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
+from uuid import UUID
 
 _META_FILENAME = "meta.json"
 
@@ -13,26 +16,43 @@ class SessionFileUsage:
     bytes_total: int
 
 
-def get_session_file_usage(*, artifacts_root: Path) -> SessionFileUsage:
+@dataclass(frozen=True)
+class SessionUsageEntry:
+    """Files and bytes held by one session directory, and when it was last accessed."""
+
+    tool_id: UUID
+    user_id: UUID
+    context_key: str
+    files: int
+    bytes_total: int
+    last_accessed_at: datetime | None
+
+
+def scan_session_usage(*, artifacts_root: Path) -> list[SessionUsageEntry]:
+    """Walk `sessions/{tool_id}/{user_id}/{context_key}/` and stat every file.
+
+    In-flight `store_files` staging directories (`{context_key}.tmp-*`/`.old-*`) are skipped.
+    This is the source of truth the usage index is rebuilt from.
+    """
     sessions_dir = artifacts_root / "sessions"
     if not sessions_dir.exists():
-        return SessionFileUsage(sessions=0, files=0, bytes_total=0)
-
-    sessions = 0
-    files = 0
-    bytes_total = 0
+        return []
 
+    entries: list[SessionUsageEntry] = []
     for tool_dir in sessions_dir.iterdir():
-        if not tool_dir.is_dir():
+        tool_id = _parse_uuid(tool_dir)
+        if tool_id is None:
             continue
         for user_dir in tool_dir.iterdir():
-            if not user_dir.is_dir():
+            user_id = _parse_uuid(user_dir)
+            if user_id is None:
                 continue
             for context_dir in user_dir.iterdir():
-                if not context_dir.is_dir():
+                if not context_dir.is_dir() or "." in context_dir.name:
                     continue
 
-                sessions += 1
+                files = 0
+                bytes_total = 0
                 for item in context_dir.iterdir():
                     if item.name == _META_FILENAME:
                         continue
@@ -43,5 +63,48 @@ def get_session_file_usage(*, artifacts_root: Path) -> SessionFileUsage:
                         bytes_total += item.stat().st_size
                     except OSError:
                         pass
+                entries.append(
+                    SessionUsageEntry(
+                        tool_id=tool_id,
+                        user_id=user_id,
+                        context_key=context_dir.name,
+                        files=files,
+                        bytes_total=bytes_total,
+                        last_accessed_at=read_last_accessed_at(session_dir=context_dir),
+                    )
+                )
+
+    return entries
+
+
+def get_session_file_usage(*, artifacts_root: Path) -> SessionFileUsage:
+    entries = scan_session_usage(artifacts_root=artifacts_root)
+    return SessionFileUsage(
+        sessions=len(entries),
+        files=sum(entry.files for entry in entries),
+        bytes_total=sum(entry.bytes_total for entry in entries),
+    )
+
+
+def read_last_accessed_at(*, session_dir: Path) -> datetime | None:
+    """`last_accessed_at` from the session's meta.json; None when missing or unreadable."""
+    try:
+        meta = json.loads((session_dir / _META_FILENAME).read_text("utf-8"))
+    except (OSError, ValueError):
+        return None
+    value = meta.get("last_accessed_at") if isinstance(meta, dict) else None
+    if not isinstance(value, str) or not value.strip():
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
 
-    return SessionFileUsage(sessions=sessions, files=files, bytes_total=bytes_total)
+def _parse_uuid(path: Path) -> UUID | None:
+    if not path.is_dir():
+        return None
+    try:
+        return UUID(path.name)
+    except ValueError:
+        return None
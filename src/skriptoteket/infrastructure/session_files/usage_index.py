@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import functools
+import sqlite3
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID
+
+import structlog
+
+from skriptoteket.infrastructure.session_files.usage import (
+    SessionFileUsage,
+    SessionUsageEntry,
+    scan_session_usage,
+)
+
+logger = structlog.get_logger(__name__)
+
+USAGE_INDEX_FILENAME = "session-usage.sqlite3"
+
+_BUSY_TIMEOUT_SECONDS = 30.0
+
+# Bumped whenever the schema changes; an index with an older version is dropped and rebuilt from
+# a directory walk (it only holds derived data).
+_SCHEMA_VERSION = 2
+
+# One row per session plus a single totals row kept current by triggers, so reading the totals
+# is a primary-key lookup no matter how many sessions exist. `last_accessed_at` (epoch seconds,
+# NULL when the session has no readable meta.json) is indexed so TTL cleanup can range-scan the
+# expired sessions only.
+_SCHEMA = """
+CREATE TABLE session_usage (
+    tool_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    context_key TEXT NOT NULL,
+    files INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    last_accessed_at REAL,
+    PRIMARY KEY (tool_id, user_id, context_key)
+) WITHOUT ROWID;
+CREATE INDEX session_usage_user_id ON session_usage (user_id);
+CREATE INDEX session_usage_last_accessed_at ON session_usage (last_accessed_at);
+
+CREATE TABLE usage_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    sessions INTEGER NOT NULL,
+    files INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT INTO usage_totals (id, sessions, files, bytes) VALUES (1, 0, 0, 0);
+
+CREATE TRIGGER session_usage_insert AFTER INSERT ON session_usage BEGIN
+    UPDATE usage_totals
+    SET sessions = sessions + 1, files = files + NEW.files, bytes = bytes + NEW.bytes
+    WHERE id = 1;
+END;
+CREATE TRIGGER session_usage_update AFTER UPDATE OF files, bytes ON session_usage BEGIN
+    UPDATE usage_totals
+    SET files = files - OLD.files + NEW.files, bytes = bytes - OLD.bytes + NEW.bytes
+    WHERE id = 1;
+END;
+CREATE TRIGGER session_usage_delete AFTER DELETE ON session_usage BEGIN
+    UPDATE usage_totals
+    SET sessions = sessions - 1, files = files - OLD.files, bytes = bytes - OLD.bytes
+    WHERE id = 1;
+END;
+"""
+
+
+@dataclass(frozen=True)
+class IndexedSession:
+    tool_id: UUID
+    user_id: UUID
+    context_key: str
+
+
+class SessionFileUsageIndex:
+    """Incremental usage and expiry index for local session files (ADR-0039).
+
+    `LocalSessionFileStorage` records every store/access/clear/expiry here, so `/metrics` reads
+    the totals without walking `sessions/` and TTL cleanup visits only expired sessions. The
+    index is a SQLite file next to the session directories, shared by the web app and the
+    cleanup CLI; SQLite's file locking serialises writers across processes.
+
+    The index is built from a directory walk the first time it is opened. Updates are
+    best-effort (a failure is logged, never raised to the caller; `touch_session` and
+    `remove_sessions` return False so TTL cleanup can tell it made no progress); `reconcile`
+    rebuilds the index from the walk to repair any drift.
+    """
+
+    def __init__(self, *, artifacts_root: Path) -> None:
+        self._artifacts_root = artifacts_root
+        self._path = artifacts_root / USAGE_INDEX_FILENAME
+        self._ready = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(
+            sqlite3.connect(self._path, timeout=_BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        ) as connection:
+            if not self._ready:
+                self._migrate(connection)
+                self._ready = True
+            yield connection
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as connection, _transaction(connection):
+            yield connection
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        (version,) = connection.execute("PRAGMA user_version").fetchone()
+        if version == _SCHEMA_VERSION:
+            return
+        # Walk the sessions before taking the write lock so other writers are blocked only for
+        # the swap, not for the whole directory walk.
+        entries = scan_session_usage(artifacts_root=self._artifacts_root)
+        with _transaction(connection):
+            (version,) = connection.execute("PRAGMA user_version").fetchone()
+            if version == _SCHEMA_VERSION:
+                # Another process rebuilt the index while we were walking.
+                return
+            for kind, name in connection.execute(
+                "SELECT type, name FROM sqlite_master"
+                " WHERE type IN ('table', 'trigger') AND name NOT LIKE 'sqlite_%'"
+            ).fetchall():
+                connection.execute(f'DROP {kind.upper()} IF EXISTS "{name}"')
+            for statement in _statements(_SCHEMA):
+                connection.execute(statement)
+            _insert_entries(connection, entries=entries)
+            connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    def record_session(
+        self,
+        *,
+        tool_id: UUID,
+        user_id: UUID,
+        context_key: str,
+        files: int,
+        bytes_total: int,
+        last_accessed_at: datetime,
+    ) -> None:
+        try:
+            with self._write() as connection:
+                connection.execute(
+                    """
+                    INSERT INTO session_usage
+                        (tool_id, user_id, context_key, files, bytes, last_accessed_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (tool_id, user_id, context_key)
+                    DO UPDATE SET
+                        files = excluded.files,
+                        bytes = excluded.bytes,
+                        last_accessed_at = excluded.last_accessed_at
+                    """,
+                    (
+                        str(tool_id),
+                        str(user_id),
+                        context_key,
+                        files,
+                        bytes_total,
+                        last_accessed_at.timestamp(),
+                    ),
+                )
+        except sqlite3.Error:
+            logger.warning("Session file usage index update failed", exc_info=True)
+
+    def touch_session(
+        self,
+        *,
+        tool_id: UUID,
+        user_id: UUID,
+        context_key: str,
+        last_accessed_at: datetime | None,
+    ) -> bool:
+        try:
+            with self._write() as connection:
+                connection.execute(
+                    "UPDATE session_usage SET last_accessed_at = ?"
+                    " WHERE tool_id = ? AND user_id = ? AND context_key = ?",
+                    (
+                        last_accessed_at.timestamp() if last_accessed_at is not None else None,
+                        str(tool_id),
+                        str(user_id),
+                        context_key,
+                    ),
+                )
+        except sqlite3.Error:
+            logger.warning("Session file usage index update failed", exc_info=True)
+            return False
+        return True
+
+    def remove_session(self, *, tool_id: UUID, user_id: UUID, context_key: str) -> None:
+        self.remove_sessions(
+            sessions=[IndexedSession(tool_id=tool_id, user_id=user_id, context_key=context_key)]
+        )
+
+    def remove_sessions(self, *, sessions: Sequence[IndexedSession]) -> bool:
+        try:
+            with self._write() as connection:
+                connection.executemany(
+                    "DELETE FROM session_usage"
+                    " WHERE tool_id = ? AND user_id = ? AND context_key = ?",
+                    [
+                        (str(session.tool_id), str(session.user_id), session.context_key)
+                        for session in sessions
+                    ],
+                )
+        except sqlite3.Error:
+            logger.warning("Session file usage index update failed", exc_info=True)
+            return False
+        return True
+
+    def remove_all(self) -> None:
+        try:
+            with self._write() as connection:
+                connection.execute("DELETE FROM session_usage")
+        except sqlite3.Error:
+            logger.warning("Session file usage index update failed", exc_info=True)
+
+    def expired_sessions(self, *, accessed_before: datetime, limit: int) -> list[IndexedSession]:
+        """Up to `limit` sessions last accessed before the cutoff, oldest first."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT tool_id, user_id, context_key FROM session_usage"
+                " WHERE last_accessed_at < ? ORDER BY last_accessed_at LIMIT ?",
+                (accessed_before.timestamp(), limit),
+            ).fetchall()
+        return [
+            IndexedSession(tool_id=UUID(tool_id), user_id=UUID(user_id), context_key=context_key)
+            for tool_id, user_id, context_key in rows
+        ]
+
+    def totals(self) -> SessionFileUsage:
+        with self._connect() as connection:
+            return _read_totals(connection)
+
+    def usage_by_tool(self) -> dict[UUID, SessionFileUsage]:
+        return self._grouped("tool_id")
+
+    def usage_by_user(self) -> dict[UUID, SessionFileUsage]:
+        return self._grouped("user_id")
+
+    def _grouped(self, column: str) -> dict[UUID, SessionFileUsage]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT {column}, COUNT(*), SUM(files), SUM(bytes)"
+                f" FROM session_usage GROUP BY {column}"
+            ).fetchall()
+        return {
+            UUID(key): SessionFileUsage(sessions=sessions, files=files, bytes_total=bytes_total)
+            for key, sessions, files, bytes_total in rows
+        }
+
+    def reconcile(self) -> tuple[SessionFileUsage, SessionFileUsage]:
+        """Rebuild the index from a directory walk; returns the totals before and after.
+
+        The walk runs outside the write lock. Rows written while it ran are newer than what it
+        saw and are kept; every other row is replaced in one short transaction.
+        """
+        scan_started_at = time.time()
+        entries = scan_session_usage(artifacts_root=self._artifacts_root)
+        with self._write() as connection:
+            before = _read_totals(connection)
+            connection.execute(
+                "DELETE FROM session_usage WHERE last_accessed_at IS NULL OR last_accessed_at < ?",
+                (scan_started_at,),
+            )
+            _insert_entries(connection, entries=entries)
+            # Recompute the totals row from the rows in case it drifted.
+            connection.execute(
+                """
+                UPDATE usage_totals SET
+                    sessions = (SELECT COUNT(*) FROM session_usage),
+                    files = (SELECT COALESCE(SUM(files), 0) FROM session_usage),
+                    bytes = (SELECT COALESCE(SUM(bytes), 0) FROM session_usage)
+                WHERE id = 1
+                """
+            )
+            after = _read_totals(connection)
+        return before, after
+
+
+@functools.cache
+def session_file_usage_index(artifacts_root: Path) -> SessionFileUsageIndex:
+    """The process-wide index for `artifacts_root` (schema checks run once per process)."""
+    return SessionFileUsageIndex(artifacts_root=artifacts_root)
+
+
+@contextmanager
+def _transaction(connection: sqlite3.Connection) -> Iterator[None]:
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+def _statements(script: str) -> Iterator[str]:
+    # `executescript` would commit the surrounding transaction, so run statements one by one.
+    pending = ""
+    for line in script.splitlines(keepends=True):
+        pending += line
+        if sqlite3.complete_statement(pending):
+            yield pending.strip()
+            pending = ""
+
+
+def _read_totals(connection: sqlite3.Connection) -> SessionFileUsage:
+    sessions, files, bytes_total = connection.execute(
+        "SELECT sessions, files, bytes FROM usage_totals WHERE id = 1"
+    ).fetchone()
+    return SessionFileUsage(sessions=sessions, files=files, bytes_total=bytes_total)
+
+
+def _insert_entries(connection: sqlite3.Connection, *, entries: list[SessionUsageEntry]) -> None:
+    connection.executemany(
+        "INSERT INTO session_usage"
+        " (tool_id, user_id, context_key, files, bytes, last_accessed_at)"
+        " VALUES (?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT (tool_id, user_id, context_key) DO NOTHING",
+        [
+            (
+                str(entry.tool_id),
+                str(entry.user_id),
+                entry.context_key,
+                entry.files,
+                entry.bytes_total,
+                entry.last_accessed_at.timestamp() if entry.last_accessed_at is not None else None,
+            )
+            for entry in entries
+        ],
+    )
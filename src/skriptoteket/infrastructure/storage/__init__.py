@@ -0,0 +1 @@
+"""Object storage clients shared by the artifact, run input and session file backends."""
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+from skriptoteket.protocols.session_files import RunnerInputFile, StoredInputFile
+
+BLOBS_DIRNAME = "blobs"
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+# A blob that just lost its last reference may be about to be linked again by a concurrent
+# store (which refreshes the mtime first); only blobs unreferenced for this long are collected.
+DEFAULT_GC_MIN_AGE = timedelta(hours=1)
+
+
+@dataclass(frozen=True)
+class BlobGarbageCollectionResult:
+    scanned_blobs: int
+    deleted_blobs: int
+    deleted_bytes: int
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while chunk := handle.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LocalBlobStore:
+    """Content-addressed store for run input and session files under ARTIFACTS_ROOT.
+
+    Layout:
+      {artifacts_root}/blobs/{sha256[:2]}/{sha256}
+      {artifacts_root}/blobs/tmp/                  (in-flight writes)
+
+    Run-input and session directories hold hard links to blobs instead of copies, so the same
+    upload is stored once however many runs and sessions use it. The inode link count is the
+    reference count: a blob with `st_nlink == 1` is referenced by the store only and
+    `collect_garbage` may delete it. Blobs are never modified in place.
+    """
+
+    def __init__(self, *, artifacts_root: Path) -> None:
+        self._root = artifacts_root / BLOBS_DIRNAME
+
+    def blob_path(self, *, sha256: str) -> Path:
+        return self._root / sha256[:2] / sha256
+
+    def put(self, *, item: RunnerInputFile) -> StoredInputFile:
+        """Add an input file to the store; returns it as a stored file pointing at the blob.
+
+        A stored file whose digest is already known and present costs no reads or writes.
+        Other stored files are linked into the store (copied across filesystems).
+        """
+        if isinstance(item, StoredInputFile):
+            sha256 = item.sha256 or _sha256_file(item.path)
+            path = self.blob_path(sha256=sha256)
+            if not self._touch(path):
+                self._add(path=path, source=item.path)
+            return StoredInputFile(name=item.name, path=path, bytes=item.bytes, sha256=sha256)
+
+        name, content = item
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self.blob_path(sha256=sha256)
+        if not self._touch(path):
+            self._add(path=path, source=content)
+        return StoredInputFile(name=name, path=path, bytes=len(content), sha256=sha256)
+
+    def link(self, *, item: RunnerInputFile, target: Path) -> StoredInputFile:
+        """`put` the file and hard-link the blob to `target` (which must not exist)."""
+        for _attempt in range(2):
+            blob = self.put(item=item)
+            try:
+                os.link(blob.path, target)
+            except FileNotFoundError:
+                # Collected between `put` and the link; store it again.
+                continue
+            except OSError:
+                shutil.copyfile(blob.path, target)
+            return blob
+        raise FileNotFoundError(f"Blob vanished while linking {target}")
+
+    def _touch(self, path: Path) -> bool:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _add(self, *, path: Path, source: Path | bytes) -> None:
+        tmp_dir = self._root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = tmp_dir / str(uuid4())
+        try:
+            if isinstance(source, Path):
+                try:
+                    os.link(source, tmp_path)
+                except OSError:
+                    shutil.copyfile(source, tmp_path)
+            else:
+                tmp_path.write_bytes(source)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(tmp_path, path)
+            except FileExistsError:
+                # A concurrent writer stored the same content first.
+                pass
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def collect_garbage(
+        self, *, now: datetime, min_age: timedelta = DEFAULT_GC_MIN_AGE
+    ) -> BlobGarbageCollectionResult:
+        """Delete blobs no run-input or session directory links to any more."""
+        if now.tzinfo is None:
+            raise ValueError("now must be timezone-aware")
+        if not self._root.exists():
+            return BlobGarbageCollectionResult(scanned_blobs=0, deleted_blobs=0, deleted_bytes=0)
+
+        cutoff = (now - min_age).timestamp()
+        scanned = 0
+        deleted = 0
+        deleted_bytes = 0
+        for shard in self._root.iterdir():
+            if not shard.is_dir():
+                continue
+            for entry in shard.iterdir():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if shard.name == "tmp":
+                    # Left behind by a crashed writer (in-flight links share a source inode).
+                    if stat.st_nlink == 1 and stat.st_mtime < cutoff:
+                        entry.unlink(missing_ok=True)
+                    continue
+                scanned += 1
+                if stat.st_nlink > 1 or stat.st_mtime >= cutoff:
+                    continue
+                entry.unlink(missing_ok=True)
+                deleted += 1
+                deleted_bytes += stat.st_size
+
+        return BlobGarbageCollectionResult(
+            scanned_blobs=scanned, deleted_blobs=deleted, deleted_bytes=deleted_bytes
+        )
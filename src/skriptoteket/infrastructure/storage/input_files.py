@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from skriptoteket.infrastructure.storage.s3 import S3ObjectStore
+from skriptoteket.protocols.session_files import RunnerInputFile, StoredInputFile
+
+
+def put_input_file(*, store: S3ObjectStore, key: str, item: RunnerInputFile) -> None:
+    """Upload an input file; stored files are streamed from disk instead of read into memory."""
+    if isinstance(item, StoredInputFile):
+        store.upload_file(key=key, path=item.path)
+        return
+    store.put_bytes(key=key, data=item[1])
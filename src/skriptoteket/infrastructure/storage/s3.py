@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# S3 rejects multipart parts below 5 MiB (except the last one).
+MIN_MULTIPART_PART_BYTES = 5 * 1024 * 1024
+_DELETE_BATCH_SIZE = 1000
+_READ_CHUNK_BYTES = 1024 * 64
+
+
+def s3_client_factory(
+    *,
+    endpoint_url: str | None,
+    region: str | None,
+    access_key_id: str | None,
+    secret_access_key: str | None,
+) -> Callable[[], Any]:
+    """Factory for a boto3 S3 client (needs the `s3` extra). Empty credentials fall back to the
+    standard AWS credential chain (environment, instance profile, ...)."""
+
+    def create() -> Any:
+        import boto3
+        from botocore.config import Config
+
+        return boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None,
+            # Path-style addressing works with MinIO and other S3-compatible stores.
+            config=Config(s3={"addressing_style": "path"}, signature_version="s3v4"),
+        )
+
+    return create
+
+
+class S3DeleteError(RuntimeError):
+    """`DeleteObjects` reported keys it could not delete (the request itself succeeded)."""
+
+    def __init__(self, *, failed_keys: list[str]) -> None:
+        super().__init__(f"Failed to delete {len(failed_keys)} S3 object(s): {failed_keys[0]}, ...")
+        self.failed_keys = failed_keys
+
+
+@dataclass(frozen=True, slots=True)
+class S3Object:
+    key: str
+    bytes: int
+
+
+class S3ObjectStore:
+    """Blocking helpers over one bucket (optionally under a key prefix).
+
+    The boto3 client is created on first use and shared; the bucket is not probed, so a missing
+    bucket surfaces on the first request. boto3 clients are thread-safe, so async callers run
+    these methods with `asyncio.to_thread`. Keys passed in are relative to `prefix`.
+    """
+
+    def __init__(
+        self,
+        *,
+        client_factory: Callable[[], Any],
+        bucket: str,
+        prefix: str = "",
+        part_size_bytes: int = 8 * 1024 * 1024,
+    ) -> None:
+        if part_size_bytes < MIN_MULTIPART_PART_BYTES:
+            raise ValueError(f"part_size_bytes must be >= {MIN_MULTIPART_PART_BYTES}")
+        self._client_factory = client_factory
+        self._bucket = bucket
+        self._prefix = prefix.strip("/")
+        self._part_size_bytes = part_size_bytes
+        self._lock = threading.Lock()
+        self._client: Any | None = None
+
+    def _s3(self) -> Any:
+        with self._lock:
+            if self._client is None:
+                if not self._bucket:
+                    raise ValueError("bucket is required")
+                self._client = self._client_factory()
+            return self._client
+
+    def _key(self, key: str) -> str:
+        return f"{self._prefix}/{key}" if self._prefix else key
+
+    def _relative(self, key: str) -> str:
+        return key[len(self._prefix) + 1 :] if self._prefix else key
+
+    def put_bytes(self, *, key: str, data: bytes, content_type: str | None = None) -> None:
+        extra = {"ContentType": content_type} if content_type else {}
+        self._s3().put_object(Bucket=self._bucket, Key=self._key(key), Body=data, **extra)
+
+    def upload_stream(self, *, key: str, chunks: Iterable[bytes]) -> int:
+        """Upload `chunks` without holding the object in memory; returns the object size.
+
+        Objects smaller than one part are sent with a single `PutObject`; larger ones as a
+        multipart upload of `part_size_bytes` parts, aborted if anything fails.
+        """
+        client = self._s3()
+        full_key = self._key(key)
+        buffer = bytearray()
+        size = 0
+        upload_id: str | None = None
+        parts: list[dict[str, object]] = []
+        try:
+            for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                while len(buffer) >= self._part_size_bytes:
+                    if upload_id is None:
+                        upload_id = client.create_multipart_upload(
+                            Bucket=self._bucket, Key=full_key
+                        )["UploadId"]
+                    part = bytes(buffer[: self._part_size_bytes])
+                    del buffer[: self._part_size_bytes]
+                    parts.append(self._upload_part(full_key, upload_id, len(parts) + 1, part))
+
+            if upload_id is None:
+                client.put_object(Bucket=self._bucket, Key=full_key, Body=bytes(buffer))
+                return size
+
+            if buffer:
+                parts.append(self._upload_part(full_key, upload_id, len(parts) + 1, bytes(buffer)))
+            client.complete_multipart_upload(
+                Bucket=self._bucket,
+                Key=full_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+            return size
+        except BaseException:
+            if upload_id is not None:
+                try:
+                    client.abort_multipart_upload(
+                        Bucket=self._bucket, Key=full_key, UploadId=upload_id
+                    )
+                except Exception:  # noqa: BLE001
+                    logger.warning("Failed to abort multipart upload", key=full_key, exc_info=True)
+            raise
+
+    def _upload_part(
+        self, full_key: str, upload_id: str, part_number: int, data: bytes
+    ) -> dict[str, object]:
+        response = self._s3().upload_part(
+            Bucket=self._bucket,
+            Key=full_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        return {"ETag": response["ETag"], "PartNumber": part_number}
+
+    def get_bytes(self, *, key: str) -> bytes | None:
+        try:
+            response = self._s3().get_object(Bucket=self._bucket, Key=self._key(key))
+        except Exception as exc:
+            if _is_not_found(exc):
+                return None
+            raise
+        body = response["Body"]
+        try:
+            return bytes(body.read())
+        finally:
+            body.close()
+
+    def iter_bytes(self, *, key: str) -> Iterator[bytes]:
+        response = self._s3().get_object(Bucket=self._bucket, Key=self._key(key))
+        body = response["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size=_READ_CHUNK_BYTES)
+        finally:
+            body.close()
+
+    def download_file(self, *, key: str, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._s3().download_file(self._bucket, self._key(key), str(path))
+
+    def upload_file(self, *, key: str, path: Path) -> None:
+        """Upload a local file; boto3 streams it from disk (multipart when large)."""
+        self._s3().upload_file(str(path), self._bucket, self._key(key))
+
+    def exists(self, *, key: str) -> bool:
+        try:
+            self._s3().head_object(Bucket=self._bucket, Key=self._key(key))
+        except Exception as exc:
+            if _is_not_found(exc):
+                return False
+            raise
+        return True
+
+    def iter_objects(self, *, prefix: str) -> Iterator[S3Object]:
+        """Objects under `prefix` in key order, one listing page at a time."""
+        paginator = self._s3().get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self._bucket, Prefix=self._key(prefix)):
+            for item in page.get("Contents", []):
+                yield S3Object(key=self._relative(item["Key"]), bytes=int(item["Size"]))
+
+    def list_objects(self, *, prefix: str) -> list[S3Object]:
+        return list(self.iter_objects(prefix=prefix))
+
+    def delete_keys(self, *, keys: list[str]) -> None:
+        """Delete `keys` in batches; raises `S3DeleteError` if any key could not be deleted."""
+        client = self._s3()
+        failed: list[str] = []
+        for start in range(0, len(keys), _DELETE_BATCH_SIZE):
+            batch = keys[start : start + _DELETE_BATCH_SIZE]
+            response = client.delete_objects(
+                Bucket=self._bucket,
+                Delete={"Objects": [{"Key": self._key(key)} for key in batch], "Quiet": True},
+            )
+            errors = response.get("Errors", [])
+            if errors:
+                logger.warning(
+                    "S3 objects could not be deleted",
+                    failed=len(errors),
+                    key=errors[0].get("Key"),
+                    code=errors[0].get("Code"),
+                    message=errors[0].get("Message"),
+                )
+                failed.extend(self._relative(str(error.get("Key", ""))) for error in errors)
+        if failed:
+            raise S3DeleteError(failed_keys=failed)
+
+    def delete_prefix(self, *, prefix: str) -> list[S3Object]:
+        """Delete every object under `prefix`; returns what was deleted."""
+        objects = self.list_objects(prefix=prefix)
+        self.delete_keys(keys=[item.key for item in objects])
+        return objects
+
+    def presigned_get_url(
+        self,
+        *,
+        key: str,
+        expires_seconds: int,
+        filename: str | None = None,
+        content_type: str | None = None,
+    ) -> str:
+        params: dict[str, str] = {"Bucket": self._bucket, "Key": self._key(key)}
+        if filename is not None:
+            quoted = quote(filename)
+            params["ResponseContentDisposition"] = (
+                f'attachment; filename="{filename}"'
+                if quoted == filename
+                else f"attachment; filename*=utf-8''{quoted}"
+            )
+        if content_type is not None:
+            params["ResponseContentType"] = content_type
+        return str(
+            self._s3().generate_presigned_url(
+                "get_object", Params=params, ExpiresIn=expires_seconds
+            )
+        )
+
+
+def _is_not_found(exc: Exception) -> bool:
+    response = getattr(exc, "response", None)
+    if not isinstance(response, dict):
+        return False
+    code = str(response.get("Error", {}).get("Code", ""))
+    return code in {"404", "NoSuchKey", "NotFound"}
@@ -22,6 +22,24 @@ class Metrics(TypedDict):
     active_sessions: Gauge
     logins_total: Counter
     users_by_role: Gauge
+    runner_pool_checkouts_total: Counter
+    runner_pool_setup_saved_seconds: Histogram
+    runner_pool_idle_containers: Gauge
+    docker_api_call_duration_seconds: Histogram
+    docker_client_reconnects_total: Counter
+    runner_admission_queue_depth: Gauge
+    runner_admission_wait_seconds: Histogram
+    tool_code_cache_lookups_total: Counter
+    tool_result_cache_lookups_total: Counter
+    runner_memory_peak_bytes: Histogram
+    runner_cpu_seconds: Histogram
+    runner_cpu_throttled_seconds: Histogram
+    runner_block_io_bytes: Histogram
+    runner_pids_peak: Histogram
+    runner_phase_duration_seconds: Histogram
+    execution_queue_wait_seconds: Histogram
+    runner_endpoint_runs_in_flight: Gauge
+    runner_endpoint_healthy: Gauge
 
 
 # Singleton instance
@@ -87,6 +105,121 @@ def _create_metrics() -> Metrics:
                 ["role"],
                 registry=REGISTRY,
             ),
+            "runner_pool_checkouts_total": Counter(
+                "skriptoteket_runner_pool_checkouts_total",
+                "Warm runner pool checkouts (hit = pre-created container handed out)",
+                ["result"],
+                registry=REGISTRY,
+            ),
+            "runner_pool_setup_saved_seconds": Histogram(
+                "skriptoteket_runner_pool_setup_saved_seconds",
+                "Container setup time (volume + container create) moved off the run path",
+                buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+                registry=REGISTRY,
+            ),
+            "runner_pool_idle_containers": Gauge(
+                "skriptoteket_runner_pool_idle_containers",
+                "Pre-created runner containers currently idle in the warm pool",
+                registry=REGISTRY,
+            ),
+            "docker_api_call_duration_seconds": Histogram(
+                "skriptoteket_docker_api_call_duration_seconds",
+                "Docker API call latency in seconds (container wait excluded)",
+                ["operation"],
+                buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+                registry=REGISTRY,
+            ),
+            "docker_client_reconnects_total": Counter(
+                "skriptoteket_docker_client_reconnects_total",
+                "Shared Docker client replaced after a failed health check",
+                registry=REGISTRY,
+            ),
+            "runner_admission_queue_depth": Gauge(
+                "skriptoteket_runner_admission_queue_depth",
+                "Runs waiting for a runner slot (admission queue mode)",
+                ["context"],
+                registry=REGISTRY,
+            ),
+            "runner_admission_wait_seconds": Histogram(
+                "skriptoteket_runner_admission_wait_seconds",
+                "Time spent waiting for a runner slot",
+                ["context", "outcome"],
+                buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+                registry=REGISTRY,
+            ),
+            "tool_code_cache_lookups_total": Counter(
+                "skriptoteket_tool_code_cache_lookups_total",
+                "Tool script bytecode cache lookups (hit = compile skipped)",
+                ["result"],
+                registry=REGISTRY,
+            ),
+            "tool_result_cache_lookups_total": Counter(
+                "skriptoteket_tool_result_cache_lookups_total",
+                "Deterministic tool run result cache lookups (hit = no container started)",
+                ["result"],
+                registry=REGISTRY,
+            ),
+            "runner_memory_peak_bytes": Histogram(
+                "skriptoteket_runner_memory_peak_bytes",
+                "Peak container memory usage per run",
+                ["tool_id"],
+                buckets=(16e6, 32e6, 64e6, 128e6, 256e6, 512e6, 768e6, 1024e6, 1536e6, 2048e6),
+                registry=REGISTRY,
+            ),
+            "runner_cpu_seconds": Histogram(
+                "skriptoteket_runner_cpu_seconds",
+                "Container CPU time per run",
+                ["tool_id"],
+                buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+                registry=REGISTRY,
+            ),
+            "runner_cpu_throttled_seconds": Histogram(
+                "skriptoteket_runner_cpu_throttled_seconds",
+                "Time the container was CPU-throttled per run",
+                ["tool_id"],
+                buckets=(0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+                registry=REGISTRY,
+            ),
+            "runner_block_io_bytes": Histogram(
+                "skriptoteket_runner_block_io_bytes",
+                "Container block IO per run",
+                ["tool_id", "direction"],
+                buckets=(0.0, 64e3, 1e6, 4e6, 16e6, 64e6, 256e6, 1024e6),
+                registry=REGISTRY,
+            ),
+            "runner_pids_peak": Histogram(
+                "skriptoteket_runner_pids_peak",
+                "Highest number of processes/threads in the container per run",
+                ["tool_id"],
+                buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+                registry=REGISTRY,
+            ),
+            "runner_phase_duration_seconds": Histogram(
+                "skriptoteket_runner_phase_duration_seconds",
+                "Time spent in each phase of a runner execution",
+                ["phase"],
+                buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 60.0),
+                registry=REGISTRY,
+            ),
+            "execution_queue_wait_seconds": Histogram(
+                "skriptoteket_execution_queue_wait_seconds",
+                "Time from job enqueue to first claim by an execution worker",
+                ["queue"],
+                buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+                registry=REGISTRY,
+            ),
+            "runner_endpoint_runs_in_flight": Gauge(
+                "skriptoteket_runner_endpoint_runs_in_flight",
+                "Runs currently scheduled on each Docker endpoint",
+                ["endpoint"],
+                registry=REGISTRY,
+            ),
+            "runner_endpoint_healthy": Gauge(
+                "skriptoteket_runner_endpoint_healthy",
+                "Docker endpoint in rotation (1) or cooling down after a failure (0)",
+                ["endpoint"],
+                registry=REGISTRY,
+            ),
         }
         return metrics
     except ValueError as e:
@@ -108,6 +241,24 @@ def _get_existing_metrics() -> Metrics:
     active_sessions: Gauge | None = None
     logins_total: Counter | None = None
     users_by_role: Gauge | None = None
+    runner_pool_checkouts_total: Counter | None = None
+    runner_pool_setup_saved_seconds: Histogram | None = None
+    runner_pool_idle_containers: Gauge | None = None
+    docker_api_call_duration_seconds: Histogram | None = None
+    docker_client_reconnects_total: Counter | None = None
+    runner_admission_queue_depth: Gauge | None = None
+    runner_admission_wait_seconds: Histogram | None = None
+    tool_code_cache_lookups_total: Counter | None = None
+    tool_result_cache_lookups_total: Counter | None = None
+    runner_memory_peak_bytes: Histogram | None = None
+    runner_cpu_seconds: Histogram | None = None
+    runner_cpu_throttled_seconds: Histogram | None = None
+    runner_block_io_bytes: Histogram | None = None
+    runner_pids_peak: Histogram | None = None
+    runner_phase_duration_seconds: Histogram | None = None
+    execution_queue_wait_seconds: Histogram | None = None
+    runner_endpoint_runs_in_flight: Gauge | None = None
+    runner_endpoint_healthy: Gauge | None = None
 
     # Find existing metrics in the registry
     for collector in REGISTRY._names_to_collectors.values():
@@ -134,6 +285,68 @@ def _get_existing_metrics() -> Metrics:
             continue
         if name == "skriptoteket_users_by_role" and isinstance(collector, Gauge):
             users_by_role = collector
+            continue
+        if name == "skriptoteket_runner_pool_checkouts" and isinstance(collector, Counter):
+            runner_pool_checkouts_total = collector
+            continue
+        if name == "skriptoteket_runner_pool_setup_saved_seconds" and isinstance(
+            collector, Histogram
+        ):
+            runner_pool_setup_saved_seconds = collector
+            continue
+        if name == "skriptoteket_runner_pool_idle_containers" and isinstance(collector, Gauge):
+            runner_pool_idle_containers = collector
+            continue
+        if name == "skriptoteket_docker_api_call_duration_seconds" and isinstance(
+            collector, Histogram
+        ):
+            docker_api_call_duration_seconds = collector
+            continue
+        if name == "skriptoteket_docker_client_reconnects" and isinstance(collector, Counter):
+            docker_client_reconnects_total = collector
+            continue
+        if name == "skriptoteket_runner_admission_queue_depth" and isinstance(collector, Gauge):
+            runner_admission_queue_depth = collector
+            continue
+        if name == "skriptoteket_runner_admission_wait_seconds" and isinstance(
+            collector, Histogram
+        ):
+            runner_admission_wait_seconds = collector
+            continue
+        if name == "skriptoteket_tool_code_cache_lookups" and isinstance(collector, Counter):
+            tool_code_cache_lookups_total = collector
+            continue
+        if name == "skriptoteket_tool_result_cache_lookups" and isinstance(collector, Counter):
+            tool_result_cache_lookups_total = collector
+            continue
+        if name == "skriptoteket_runner_memory_peak_bytes" and isinstance(collector, Histogram):
+            runner_memory_peak_bytes = collector
+            continue
+        if name == "skriptoteket_runner_cpu_seconds" and isinstance(collector, Histogram):
+            runner_cpu_seconds = collector
+            continue
+        if name == "skriptoteket_runner_cpu_throttled_seconds" and isinstance(collector, Histogram):
+            runner_cpu_throttled_seconds = collector
+            continue
+        if name == "skriptoteket_runner_block_io_bytes" and isinstance(collector, Histogram):
+            runner_block_io_bytes = collector
+            continue
+        if name == "skriptoteket_runner_pids_peak" and isinstance(collector, Histogram):
+            runner_pids_peak = collector
+            continue
+        if name == "skriptoteket_runner_phase_duration_seconds" and isinstance(
+            collector, Histogram
+        ):
+            runner_phase_duration_seconds = collector
+            continue
+        if name == "skriptoteket_execution_queue_wait_seconds" and isinstance(collector, Histogram):
+            execution_queue_wait_seconds = collector
+            continue
+        if name == "skriptoteket_runner_endpoint_runs_in_flight" and isinstance(collector, Gauge):
+            runner_endpoint_runs_in_flight = collector
+            continue
+        if name == "skriptoteket_runner_endpoint_healthy" and isinstance(collector, Gauge):
+            runner_endpoint_healthy = collector
 
     if (
         requests_total is None
@@ -143,6 +356,24 @@ def _get_existing_metrics() -> Metrics:
         or active_sessions is None
         or logins_total is None
         or users_by_role is None
+        or runner_pool_checkouts_total is None
+        or runner_pool_setup_saved_seconds is None
+        or runner_pool_idle_containers is None
+        or docker_api_call_duration_seconds is None
+        or docker_client_reconnects_total is None
+        or runner_admission_queue_depth is None
+        or runner_admission_wait_seconds is None
+        or tool_code_cache_lookups_total is None
+        or tool_result_cache_lookups_total is None
+        or runner_memory_peak_bytes is None
+        or runner_cpu_seconds is None
+        or runner_cpu_throttled_seconds is None
+        or runner_block_io_bytes is None
+        or runner_pids_peak is None
+        or runner_phase_duration_seconds is None
+        or execution_queue_wait_seconds is None
+        or runner_endpoint_runs_in_flight is None
+        or runner_endpoint_healthy is None
     ):
         raise RuntimeError("Prometheus metrics already registered but could not be retrieved.")
 
@@ -154,5 +385,23 @@ def _get_existing_metrics() -> Metrics:
         "active_sessions": active_sessions,
         "logins_total": logins_total,
         "users_by_role": users_by_role,
+        "runner_pool_checkouts_total": runner_pool_checkouts_total,
+        "runner_pool_setup_saved_seconds": runner_pool_setup_saved_seconds,
+        "runner_pool_idle_containers": runner_pool_idle_containers,
+        "docker_api_call_duration_seconds": docker_api_call_duration_seconds,
+        "docker_client_reconnects_total": docker_client_reconnects_total,
+        "runner_admission_queue_depth": runner_admission_queue_depth,
+        "runner_admission_wait_seconds": runner_admission_wait_seconds,
+        "tool_code_cache_lookups_total": tool_code_cache_lookups_total,
+        "tool_result_cache_lookups_total": tool_result_cache_lookups_total,
+        "runner_memory_peak_bytes": runner_memory_peak_bytes,
+        "runner_cpu_seconds": runner_cpu_seconds,
+        "runner_cpu_throttled_seconds": runner_cpu_throttled_seconds,
+        "runner_block_io_bytes": runner_block_io_bytes,
+        "runner_pids_peak": runner_pids_peak,
+        "runner_phase_duration_seconds": runner_phase_duration_seconds,
+        "execution_queue_wait_seconds": execution_queue_wait_seconds,
+        "runner_endpoint_runs_in_flight": runner_endpoint_runs_in_flight,
+        "runner_endpoint_healthy": runner_endpoint_healthy,
     }
     return metrics
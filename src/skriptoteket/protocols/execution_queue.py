@@ -32,6 +32,24 @@ class ToolRunJobRepositoryProtocol(Protocol):
         queue: str = "default",
     ) -> ToolRunJobClaim | None: ...
 
+    async def claim_batch(
+        self,
+        *,
+        worker_id: str,
+        now: datetime,
+        lease_ttl: timedelta,
+        queue: str = "default",
+        max_jobs: int = 1,
+        fair_share: bool = False,
+        max_running_per_tool: int = 0,
+    ) -> list[ToolRunJobClaim]:
+        """Claim up to `max_jobs` jobs in one transaction (adoptable jobs first).
+
+        `fair_share` lets users take turns within a priority instead of strict FIFO;
+        `max_running_per_tool > 0` leaves jobs queued while their tool has that many running.
+        """
+        ...
+
     async def heartbeat(
         self,
         *,
@@ -46,3 +64,18 @@ class ToolRunJobRepositoryProtocol(Protocol):
         *,
         now: datetime,
     ) -> int: ...
+
+    async def next_available_at(self, *, queue: str, now: datetime) -> datetime | None:
+        """Earliest `available_at` of a queued job not yet claimable (backoff), if any."""
+        ...
+
+
+class ExecutionQueueNotificationListenerProtocol(Protocol):
+    """Wakes idle workers when a job is enqueued (Postgres LISTEN/NOTIFY)."""
+
+    @property
+    def is_listening(self) -> bool: ...
+
+    async def listen(self, *, queue: str) -> bool: ...
+
+    async def wait(self) -> None: ...
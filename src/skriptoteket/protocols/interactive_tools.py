@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from typing import Protocol
 
 from skriptoteket.application.scripting.interactive_tools import (
@@ -9,8 +10,10 @@ from skriptoteket.application.scripting.interactive_tools import (
     GetSessionStateResult,
     ListArtifactsQuery,
     ListArtifactsResult,
+    RunOutputStreamEvent,
     StartActionCommand,
     StartActionResult,
+    StreamRunOutputQuery,
 )
 from skriptoteket.application.scripting.session_files import (
     ListSessionFilesQuery,
@@ -36,6 +39,15 @@ class GetRunHandlerProtocol(Protocol):
     async def handle(self, *, actor: User, query: GetRunQuery) -> GetRunResult: ...
 
 
+class StreamRunOutputHandlerProtocol(Protocol):
+    def stream(
+        self,
+        *,
+        actor: User,
+        query: StreamRunOutputQuery,
+    ) -> AsyncIterator[RunOutputStreamEvent]: ...
+
+
 class ListArtifactsHandlerProtocol(Protocol):
     async def handle(
         self,
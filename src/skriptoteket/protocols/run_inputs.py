@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Protocol
 from uuid import UUID
 
-from skriptoteket.protocols.session_files import InputFile
+from skriptoteket.protocols.session_files import InputFile, RunnerInputFile, StoredInputFile
 
 
 class RunInputStorageProtocol(Protocol):
@@ -11,9 +11,13 @@ class RunInputStorageProtocol(Protocol):
         self,
         *,
         run_id: UUID,
-        files: list[InputFile],
+        files: list[RunnerInputFile],
     ) -> None: ...
 
     async def get(self, *, run_id: UUID) -> list[InputFile]: ...
 
+    async def get_stored(self, *, run_id: UUID) -> list[StoredInputFile]:
+        """Like `get`, but leaves the contents on disk for the runner to stream."""
+        ...
+
     async def delete(self, *, run_id: UUID) -> None: ...
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import Literal, Protocol
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+RunLogStream = Literal["stdout", "stderr"]
+
+
+class RunLogChunk(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    seq: int
+    stream: RunLogStream
+    text: str
+
+
+class RunLogTail(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    chunks: list[RunLogChunk]
+    finished: bool
+    dropped: bool = False
+
+
+class RunLogWriterProtocol(Protocol):
+    """Appends live output for one run; safe to call from runner threads."""
+
+    def write(self, *, stream: RunLogStream, data: bytes) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class RunLogBufferProtocol(Protocol):
+    """Bounded per-run buffer of live stdout/stderr, shared between runner and web processes."""
+
+    def open_writer(self, *, run_id: UUID) -> RunLogWriterProtocol: ...
+
+    def read(self, *, run_id: UUID, after_seq: int = 0) -> RunLogTail | None:
+        """Chunks with `seq > after_seq`; `None` when no live buffer exists for the run."""
+        ...
+
+    def delete(self, *, run_id: UUID) -> None: ...
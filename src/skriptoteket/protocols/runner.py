@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator, Sequence
 from typing import Protocol
 from uuid import UUID
 
-from pydantic import JsonValue
+from pydantic import BaseModel, ConfigDict, JsonValue
 
-from skriptoteket.domain.scripting.artifacts import ArtifactsManifest, RunnerArtifact
+from skriptoteket.domain.scripting.artifacts import (
+    ArtifactsManifest,
+    RunnerArtifact,
+    StoredArtifact,
+)
 from skriptoteket.domain.scripting.execution import ToolExecutionResult
 from skriptoteket.domain.scripting.models import RunContext, ToolVersion
+from skriptoteket.protocols.session_files import RunnerInputFile
 
 
 class ArtifactManagerProtocol(Protocol):
@@ -20,6 +25,20 @@ class ArtifactManagerProtocol(Protocol):
         reported_artifacts: list[RunnerArtifact],
     ) -> ArtifactsManifest: ...
 
+    def download_url(self, *, run_id: UUID, artifact: StoredArtifact) -> str | None:
+        """URL to redirect a download to, or None when the web app serves the file itself."""
+        ...
+
+    def open_artifact(self, *, run_id: UUID, artifact: StoredArtifact) -> Iterator[bytes] | None:
+        """Artifact content in chunks; None when it no longer exists (e.g. removed by retention)."""
+        ...
+
+
+class RunStoragePurgerProtocol(Protocol):
+    def purge_run(self, *, run_id: UUID) -> int:
+        """Delete the run's artifacts and input files; returns the bytes freed (0 if none)."""
+        ...
+
 
 class ToolRunnerProtocol(Protocol):
     async def execute(
@@ -28,11 +47,15 @@ class ToolRunnerProtocol(Protocol):
         run_id: UUID,
         version: ToolVersion,
         context: RunContext,
-        input_files: list[tuple[str, bytes]],
+        input_files: Sequence[RunnerInputFile],
         input_values: dict[str, JsonValue],
         memory_json: bytes,
         action_payload: dict[str, JsonValue] | None,
-    ) -> ToolExecutionResult: ...
+        requested_by_user_id: UUID | None = None,
+        script_bytecode: bytes | None = None,
+    ) -> ToolExecutionResult:
+        """`script_bytecode` is an optional `.pyc` for the script (see `ToolCodeCacheProtocol`)."""
+        ...
 
 
 class ToolRunnerAdoptionProtocol(Protocol):
@@ -43,3 +66,19 @@ class ToolRunnerAdoptionProtocol(Protocol):
         version: ToolVersion,
         context: RunContext,
     ) -> ToolExecutionResult | None: ...
+
+
+class CompiledToolCode(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    content_hash: str
+    pyc: bytes
+
+
+class ToolCodeCacheProtocol(Protocol):
+    def compile(self, *, version: ToolVersion) -> CompiledToolCode:
+        """Validated bytecode for the version's source, cached by `content_hash`.
+
+        Raises `SyntaxError` for invalid source (failures are not cached).
+        """
+        ...
@@ -77,7 +77,25 @@ class ToolVersionRepositoryProtocol(Protocol):
     async def update(self, *, version: ToolVersion) -> ToolVersion: ...
 
 
-class ToolRunRepositoryProtocol(Protocol):
+class RunArtifactExpiryRepositoryProtocol(Protocol):
+    """The part of the tool run repository that artifact retention needs."""
+
+    async def list_pending_artifact_expiry(
+        self,
+        *,
+        finished_before: datetime,
+        limit: int,
+        after: "ArtifactExpiryCandidate | None" = None,
+    ) -> list["ArtifactExpiryCandidate"]:
+        """Finished runs without a tombstone, ordered by (finished_at, id); `after` is a cursor."""
+        ...
+
+    async def mark_artifacts_expired(self, *, run_ids: list[UUID], expired_at: datetime) -> int:
+        """Set the `artifacts_expired_at` tombstone; returns how many runs were updated."""
+        ...
+
+
+class ToolRunRepositoryProtocol(RunArtifactExpiryRepositoryProtocol, Protocol):
     async def get_by_id(self, *, run_id: UUID) -> ToolRun | None: ...
 
     async def create(self, *, run: ToolRun) -> ToolRun: ...
@@ -124,6 +142,13 @@ class RecentRunRow(BaseModel):
     last_used_at: datetime
 
 
+class ArtifactExpiryCandidate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    run_id: UUID
+    finished_at: datetime
+
+
 class ExecuteToolVersionHandlerProtocol(Protocol):
     async def handle(
         self,
@@ -5,7 +5,16 @@ from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
 
-type InputFile = tuple[str, bytes]
+from skriptoteket.domain.scripting.input_files import InputFile, RunnerInputFile, StoredInputFile
+
+__all__ = [
+    "CleanupExpiredSessionFilesResult",
+    "InputFile",
+    "RunnerInputFile",
+    "SessionFileMetadata",
+    "SessionFileStorageProtocol",
+    "StoredInputFile",
+]
 
 
 class CleanupExpiredSessionFilesResult(BaseModel):
@@ -31,7 +40,7 @@ class SessionFileStorageProtocol(Protocol):
         tool_id: UUID,
         user_id: UUID,
         context: str,
-        files: list[InputFile],
+        files: list[RunnerInputFile],
     ) -> None: ...
 
     async def get_files(
@@ -42,6 +51,16 @@ class SessionFileStorageProtocol(Protocol):
         context: str,
     ) -> list[InputFile]: ...
 
+    async def get_stored_files(
+        self,
+        *,
+        tool_id: UUID,
+        user_id: UUID,
+        context: str,
+    ) -> list[RunnerInputFile]:
+        """Like `get_files`, but local backends leave the contents on disk (`StoredInputFile`)."""
+        ...
+
     async def list_files(
         self,
         *,
@@ -133,6 +133,7 @@ Adresserna är semikolonseparerade och fungerar direkt i Outlook.""",
                 ],
             ),
         ],
+        deterministic=True,
     ),
     ScriptBankEntry(
         slug="demo-next-actions",
@@ -27,3 +27,4 @@ class ScriptBankEntry(BaseModel):
     source_filename: str
     settings_schema: list[UiActionField] | None = None
     input_schema: list[ToolInputField] = Field(default_factory=list)
+    deterministic: bool = False
@@ -150,6 +150,7 @@ def _build_editor_response(
         settings_schema=settings_schema,
         input_schema=input_schema,
         usage_instructions=usage_instructions,
+        deterministic=selected_version.deterministic if selected_version else False,
     )
 
 
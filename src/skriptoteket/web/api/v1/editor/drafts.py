@@ -44,6 +44,8 @@ async def create_draft_version(
         command_payload["input_schema"] = payload.input_schema
     if "usage_instructions" in payload.model_fields_set:
         command_payload["usage_instructions"] = payload.usage_instructions
+    if "deterministic" in payload.model_fields_set:
+        command_payload["deterministic"] = payload.deterministic
     result = await handler.handle(
         actor=user,
         command=CreateDraftVersionCommand.model_validate(command_payload),
@@ -76,6 +78,8 @@ async def save_draft_version(
         command_payload["input_schema"] = payload.input_schema
     if "usage_instructions" in payload.model_fields_set:
         command_payload["usage_instructions"] = payload.usage_instructions
+    if "deterministic" in payload.model_fields_set:
+        command_payload["deterministic"] = payload.deterministic
     result = await handler.handle(
         actor=user,
         command=SaveDraftVersionCommand.model_validate(command_payload),
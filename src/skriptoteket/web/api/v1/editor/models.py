@@ -63,6 +63,7 @@ class EditorBootResponse(BaseModel):
     settings_schema: list[UiActionField] | None = None
     input_schema: list[ToolInputField] = Field(default_factory=list)
     usage_instructions: str | None = None
+    deterministic: bool = False
 
 
 class EditorEditOpsSelection(BaseModel):
@@ -239,6 +240,7 @@ class CreateDraftVersionRequest(BaseModel):
     settings_schema: list[UiActionField] | None = None
     input_schema: list[ToolInputField] = Field(default_factory=list)
     usage_instructions: str | None = None
+    deterministic: bool = False
     change_summary: str | None = None
     derived_from_version_id: UUID | None = None
 
@@ -251,6 +253,7 @@ class SaveDraftVersionRequest(BaseModel):
     settings_schema: list[UiActionField] | None = None
     input_schema: list[ToolInputField] = Field(default_factory=list)
     usage_instructions: str | None = None
+    deterministic: bool = False
     change_summary: str | None = None
     expected_parent_version_id: UUID
 
@@ -363,6 +366,8 @@ class EditorRunDetails(BaseModel):
     stderr_truncated: bool | None = None
     ui_payload: dict | None
     artifacts: list[ArtifactEntry]
+    # Set once retention deleted the files; the artifact list is kept for display.
+    artifacts_expired_at: datetime | None = None
 
 
 class ToolTaxonomyResponse(BaseModel):
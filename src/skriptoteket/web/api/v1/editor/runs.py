@@ -2,8 +2,8 @@ from pathlib import Path
 from uuid import UUID
 
 from dishka.integrations.fastapi import FromDishka, inject
-from fastapi import APIRouter, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response
 
 from skriptoteket.config import Settings
 from skriptoteket.domain.errors import DomainError, ErrorCode, not_found
@@ -11,7 +11,13 @@ from skriptoteket.domain.identity.models import Role, User
 from skriptoteket.domain.scripting.artifacts import ArtifactsManifest
 from skriptoteket.domain.scripting.models import ToolRun
 from skriptoteket.infrastructure.runner.path_safety import validate_output_path
+from skriptoteket.protocols.runner import ArtifactManagerProtocol
 from skriptoteket.protocols.scripting import ToolRunRepositoryProtocol
+from skriptoteket.web.artifact_downloads import (
+    artifact_file_response,
+    artifact_redirect_response,
+    raise_if_artifacts_expired,
+)
 from skriptoteket.web.auth.api_dependencies import require_contributor_api
 
 from .models import ArtifactEntry, EditorRunDetails
@@ -120,6 +126,7 @@ def _build_run_details(*, run: ToolRun, settings: Settings) -> EditorRunDetails:
         stderr_truncated=stderr_truncated,
         ui_payload=ui_payload,
         artifacts=artifacts,
+        artifacts_expired_at=run.artifacts_expired_at,
     )
 
 
@@ -138,20 +145,29 @@ async def get_run(
 @router.get("/tool-runs/{run_id}/artifacts/{artifact_id}")
 @inject
 async def download_artifact(
+    request: Request,
     run_id: UUID,
     artifact_id: str,
     settings: FromDishka[Settings],
     runs: FromDishka[ToolRunRepositoryProtocol],
+    artifacts: FromDishka[ArtifactManagerProtocol],
     user: User = Depends(require_contributor_api),
-):
+) -> Response:
     run = await _load_run_for_actor(runs=runs, run_id=run_id, actor=user)
+    raise_if_artifacts_expired(run)
 
     manifest = ArtifactsManifest.model_validate(run.artifacts_manifest or {"artifacts": []})
     artifact = next((a for a in manifest.artifacts if a.artifact_id == artifact_id), None)
     if artifact is None:
         raise not_found("Artifact", artifact_id)
 
-    candidate_path, relative_path = _resolve_artifact_path(
+    redirect = await artifact_redirect_response(
+        artifacts=artifacts, run_id=run.id, artifact=artifact
+    )
+    if redirect is not None:
+        return redirect
+
+    candidate_path, _relative_path = _resolve_artifact_path(
         settings=settings,
         run_id=run.id,
         artifact_path=artifact.path,
@@ -159,8 +175,9 @@ async def download_artifact(
     if not candidate_path.is_file():
         raise not_found("ArtifactFile", str(candidate_path))
 
-    return FileResponse(
-        candidate_path,
-        filename=relative_path.name,
-        media_type="application/octet-stream",
+    return artifact_file_response(
+        request=request,
+        run_dir=settings.ARTIFACTS_ROOT / str(run.id),
+        file_path=candidate_path,
+        artifact=artifact,
     )
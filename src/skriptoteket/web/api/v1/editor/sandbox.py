@@ -1,4 +1,5 @@
 import json
+from contextlib import AsyncExitStack
 from typing import Annotated
 from uuid import UUID
 
@@ -24,12 +25,13 @@ from skriptoteket.protocols.scripting import (
     StartSandboxActionHandlerProtocol,
     ToolVersionRepositoryProtocol,
 )
+from skriptoteket.protocols.session_files import RunnerInputFile
 from skriptoteket.protocols.tool_sessions import ToolSessionRepositoryProtocol
 from skriptoteket.web.auth.api_dependencies import (
     require_contributor_api,
     require_csrf_token,
 )
-from skriptoteket.web.uploads import read_upload_files
+from skriptoteket.web.uploads import spool_upload_files
 
 from .models import (
     SandboxRunResponse,
@@ -81,15 +83,6 @@ async def run_sandbox(
     if version is None:
         raise not_found("ToolVersion", str(version_id))
 
-    input_files: list[tuple[str, bytes]] = []
-    if files:
-        input_files = await read_upload_files(
-            files=files,
-            max_files=settings.UPLOAD_MAX_FILES,
-            max_file_bytes=settings.UPLOAD_MAX_FILE_BYTES,
-            max_total_bytes=settings.UPLOAD_MAX_TOTAL_BYTES,
-        )
-
     input_values: dict[str, JsonValue] = {}
     if inputs is not None and inputs.strip():
         try:
@@ -115,18 +108,33 @@ async def run_sandbox(
             details={"errors": exc.errors()},
         ) from exc
 
-    result = await handler.handle(
-        actor=user,
-        command=RunSandboxCommand(
-            tool_id=version.tool_id,
-            version_id=version_id,
-            snapshot_payload=snapshot_payload,
-            input_files=input_files,
-            input_values=input_values,
-            session_context=session_context.strip() if session_context else None,
-            session_files_mode=_parse_session_files_mode(session_files_mode),
-        ),
-    )
+    async with AsyncExitStack() as stack:
+        input_files: list[RunnerInputFile] = []
+        if files:
+            input_files = list(
+                await stack.enter_async_context(
+                    spool_upload_files(
+                        files=files,
+                        spool_root=settings.ARTIFACTS_ROOT,
+                        max_files=settings.UPLOAD_MAX_FILES,
+                        max_file_bytes=settings.UPLOAD_MAX_FILE_BYTES,
+                        max_total_bytes=settings.UPLOAD_MAX_TOTAL_BYTES,
+                    )
+                )
+            )
+
+        result = await handler.handle(
+            actor=user,
+            command=RunSandboxCommand(
+                tool_id=version.tool_id,
+                version_id=version_id,
+                snapshot_payload=snapshot_payload,
+                input_files=input_files,
+                input_values=input_values,
+                session_context=session_context.strip() if session_context else None,
+                session_files_mode=_parse_session_files_mode(session_files_mode),
+            ),
+        )
     run = result.run
     if run.started_at is None:
         raise DomainError(
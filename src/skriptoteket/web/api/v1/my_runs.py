@@ -78,6 +78,7 @@ class MyRunItem(BaseModel):
     finished_at: datetime | None
     input_files: list[InputFileSummary]
     output_files: list[OutputFileSummary]
+    artifacts_expired_at: datetime | None = None
 
 
 class ListMyRunsResponse(BaseModel):
@@ -135,6 +136,7 @@ async def list_my_runs(
                     finished_at=run.finished_at,
                     input_files=input_files,
                     output_files=output_files,
+                    artifacts_expired_at=run.artifacts_expired_at,
                 )
             )
 
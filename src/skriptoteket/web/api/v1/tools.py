@@ -1,4 +1,5 @@
 import json
+from contextlib import AsyncExitStack
 from typing import Annotated
 from uuid import UUID
 
@@ -32,6 +33,7 @@ from skriptoteket.protocols.scripting import (
     RunActiveToolHandlerProtocol,
     ToolVersionRepositoryProtocol,
 )
+from skriptoteket.protocols.session_files import RunnerInputFile
 from skriptoteket.protocols.tool_sessions import ToolSessionRepositoryProtocol
 from skriptoteket.protocols.tool_settings import (
     GetToolSettingsHandlerProtocol,
@@ -39,7 +41,7 @@ from skriptoteket.protocols.tool_settings import (
 )
 from skriptoteket.protocols.uow import UnitOfWorkProtocol
 from skriptoteket.web.auth.api_dependencies import require_csrf_token, require_user_api
-from skriptoteket.web.uploads import read_upload_files
+from skriptoteket.web.uploads import spool_upload_files
 
 router = APIRouter(prefix="/api/v1/tools", tags=["tools"])
 
@@ -219,15 +221,6 @@ async def start_tool_run(
     session_files_mode: Annotated[str | None, Form()] = None,
     session_context: Annotated[str | None, Form()] = None,
 ) -> StartToolRunResponse:
-    input_files: list[tuple[str, bytes]] = []
-    if files:
-        input_files = await read_upload_files(
-            files=files,
-            max_files=settings.UPLOAD_MAX_FILES,
-            max_file_bytes=settings.UPLOAD_MAX_FILE_BYTES,
-            max_total_bytes=settings.UPLOAD_MAX_TOTAL_BYTES,
-        )
-
     input_values: dict[str, JsonValue] = {}
     if inputs is not None and inputs.strip():
         try:
@@ -245,16 +238,31 @@ async def start_tool_run(
         input_values = parsed
 
     context = session_context.strip() if session_context is not None else ""
-    result = await handler.handle(
-        actor=user,
-        command=RunActiveToolCommand(
-            tool_slug=slug,
-            input_files=input_files,
-            input_values=input_values,
-            session_context=context or "default",
-            session_files_mode=_parse_session_files_mode(session_files_mode),
-        ),
-    )
+    async with AsyncExitStack() as stack:
+        input_files: list[RunnerInputFile] = []
+        if files:
+            input_files = list(
+                await stack.enter_async_context(
+                    spool_upload_files(
+                        files=files,
+                        spool_root=settings.ARTIFACTS_ROOT,
+                        max_files=settings.UPLOAD_MAX_FILES,
+                        max_file_bytes=settings.UPLOAD_MAX_FILE_BYTES,
+                        max_total_bytes=settings.UPLOAD_MAX_TOTAL_BYTES,
+                    )
+                )
+            )
+
+        result = await handler.handle(
+            actor=user,
+            command=RunActiveToolCommand(
+                tool_slug=slug,
+                input_files=input_files,
+                input_values=input_values,
+                session_context=context or "default",
+                session_files_mode=_parse_session_files_mode(session_files_mode),
+            ),
+        )
     return StartToolRunResponse(run_id=result.run.id)
 
 
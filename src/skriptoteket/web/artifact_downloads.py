@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+import time
+import zipfile
+from collections.abc import Buffer, Iterator, Sequence
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path, PurePosixPath
+from uuid import UUID
+
+from fastapi import Request
+from fastapi.responses import FileResponse, RedirectResponse, Response
+from starlette.datastructures import Headers
+
+from skriptoteket.domain.errors import DomainError, ErrorCode
+from skriptoteket.domain.scripting.artifacts import StoredArtifact
+from skriptoteket.domain.scripting.models import ToolRun
+from skriptoteket.infrastructure.artifacts.precompression import (
+    PRECOMPRESSED_ENCODINGS,
+    artifact_media_type,
+    precompressed_artifact_path,
+)
+from skriptoteket.protocols.runner import ArtifactManagerProtocol
+
+# Downloads are per-user; browsers may keep them but must revalidate (a cheap 304 via the ETag).
+_CACHE_CONTROL = "private, no-cache"
+
+# Formats that are already compressed; deflating them again costs CPU for no gain.
+_ZIP_STORED_SUFFIXES = frozenset(
+    {
+        ".7z",
+        ".avif",
+        ".bz2",
+        ".docx",
+        ".epub",
+        ".gif",
+        ".gz",
+        ".jpeg",
+        ".jpg",
+        ".m4a",
+        ".mov",
+        ".mp3",
+        ".mp4",
+        ".odp",
+        ".ods",
+        ".odt",
+        ".ogg",
+        ".pdf",
+        ".png",
+        ".pptx",
+        ".webm",
+        ".webp",
+        ".xlsx",
+        ".xz",
+        ".zip",
+        ".zst",
+    }
+)
+
+
+def artifact_file_response(
+    *,
+    request: Request,
+    run_dir: Path,
+    file_path: Path,
+    artifact: StoredArtifact,
+) -> Response:
+    """Serve a stored artifact with validators, byte ranges and precompressed variants.
+
+    The ETag is the manifest sha256 when recorded (strong, content-derived), otherwise derived from
+    mtime and size. Ranges and `If-Range` are handled by `FileResponse`; a precompressed sidecar
+    is a separate representation with its own ETag, so ranges stay consistent within it.
+    """
+    filename = PurePosixPath(artifact.path).name
+    encoding, served_path = _select_encoding(
+        accept_encoding=request.headers.get("accept-encoding", ""),
+        run_dir=run_dir,
+        artifact=artifact,
+        file_path=file_path,
+    )
+    stat_result = served_path.stat()
+    etag = _etag(artifact=artifact, stat_result=stat_result, encoding=encoding)
+    headers = {
+        "Cache-Control": _CACHE_CONTROL,
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Vary": "Accept-Encoding",
+        "X-Content-Type-Options": "nosniff",
+    }
+
+    if _not_modified(request.headers, etag=etag, mtime=stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(
+        served_path,
+        filename=filename,
+        media_type=artifact_media_type(filename),
+        headers=headers,
+        stat_result=stat_result,
+    )
+
+
+def raise_if_artifacts_expired(run: ToolRun) -> None:
+    """Retention removed the run's files: answer 410 (not 404) so clients can say "expired"."""
+    if run.artifacts_expired_at is None:
+        return
+    raise DomainError(
+        code=ErrorCode.ARTIFACTS_EXPIRED,
+        message="Run artifacts have expired",
+        details={"run_id": str(run.id), "expired_at": run.artifacts_expired_at.isoformat()},
+    )
+
+
+async def artifact_redirect_response(
+    *,
+    artifacts: ArtifactManagerProtocol,
+    run_id: UUID,
+    artifact: StoredArtifact,
+) -> Response | None:
+    """Redirect to the backend's own download URL (e.g. presigned S3), if it has one."""
+    url = await asyncio.to_thread(artifacts.download_url, run_id=run_id, artifact=artifact)
+    if url is None:
+        return None
+    # The URL is short-lived; never let a cache keep the redirect.
+    return RedirectResponse(url, status_code=307, headers={"Cache-Control": "no-store"})
+
+
+def _select_encoding(
+    *,
+    accept_encoding: str,
+    run_dir: Path,
+    artifact: StoredArtifact,
+    file_path: Path,
+) -> tuple[str | None, Path]:
+    accepted = _accepted_encodings(accept_encoding)
+    for encoding in PRECOMPRESSED_ENCODINGS:
+        if encoding not in accepted:
+            continue
+        candidate = precompressed_artifact_path(
+            run_dir=run_dir, artifact_path=artifact.path, encoding=encoding
+        )
+        if candidate.is_file():
+            return encoding, candidate
+    return None, file_path
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted: set[str] = set()
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+    if "*" in accepted:
+        accepted.update(PRECOMPRESSED_ENCODINGS)
+    return accepted
+
+
+def _etag(*, artifact: StoredArtifact, stat_result: os.stat_result, encoding: str | None) -> str:
+    if artifact.sha256 is not None:
+        base = artifact.sha256
+    else:
+        base = f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"
+    return f'"{base}-{encoding}"' if encoding is not None else f'"{base}"'
+
+
+def _not_modified(headers: Headers, *, etag: str, mtime: float) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison (RFC 9110 13.1.2); If-Modified-Since is ignored when present.
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return int(mtime) <= since.timestamp()
+
+
+def artifact_zip_entry_name(artifact: StoredArtifact) -> str:
+    """Archive member name: the artifact path without the `output/` prefix."""
+    return PurePosixPath(artifact.path).relative_to("output").as_posix()
+
+
+def iter_artifacts_zip(entries: Sequence[tuple[str, int, Iterator[bytes]]]) -> Iterator[bytes]:
+    """Yield a zip archive of `(name, size, chunks)` entries as it is written.
+
+    Memory stays bounded by one source chunk (plus deflate state) regardless of artifact size: the
+    archive is written to an unseekable sink, so sizes and CRCs go into data descriptors. The
+    declared size only decides whether an entry needs zip64 headers up front.
+    """
+    sink = _ZipChunkSink()
+    date_time = time.localtime()[:6]
+    with zipfile.ZipFile(sink, mode="w") as archive:
+        for name, size, chunks in entries:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.file_size = size
+            info.external_attr = 0o644 << 16
+            info.compress_type = (
+                zipfile.ZIP_STORED
+                if PurePosixPath(name).suffix.lower() in _ZIP_STORED_SUFFIXES
+                else zipfile.ZIP_DEFLATED
+            )
+            with archive.open(info, mode="w") as target:
+                for chunk in chunks:
+                    target.write(chunk)
+                    if data := sink.drain():
+                        yield data
+            if data := sink.drain():
+                yield data
+    if data := sink.drain():
+        yield data
+
+
+class _ZipChunkSink(io.RawIOBase):
+    """Write-only, unseekable file object that hands written bytes back to the generator."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Buffer, /) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        return len(chunk)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
@@ -11,6 +11,7 @@ ERROR_CODE_TO_STATUS: dict[ErrorCode, int] = {
     ErrorCode.NOT_FOUND: 404,
     ErrorCode.USER_NOT_FOUND: 404,
     ErrorCode.SESSION_NOT_FOUND: 404,
+    ErrorCode.ARTIFACTS_EXPIRED: 410,
     ErrorCode.CONFLICT: 409,
     ErrorCode.DUPLICATE_ENTRY: 409,
     ErrorCode.EMAIL_SEND_FAILED: 503,
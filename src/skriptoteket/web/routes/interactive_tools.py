@@ -1,9 +1,12 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator, Iterator
 from pathlib import Path
 from uuid import UUID
 
 from dishka.integrations.fastapi import FromDishka, inject
 from fastapi import APIRouter, Depends, Query, Request
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import Response, StreamingResponse
 
 from skriptoteket.application.scripting.interactive_tools import (
     GetRunQuery,
@@ -12,8 +15,10 @@ from skriptoteket.application.scripting.interactive_tools import (
     GetSessionStateResult,
     ListArtifactsQuery,
     ListArtifactsResult,
+    RunOutputStreamEvent,
     StartActionCommand,
     StartActionResult,
+    StreamRunOutputQuery,
 )
 from skriptoteket.application.scripting.session_files import (
     ListSessionFilesQuery,
@@ -31,12 +36,25 @@ from skriptoteket.protocols.interactive_tools import (
     ListArtifactsHandlerProtocol,
     ListSessionFilesHandlerProtocol,
     StartActionHandlerProtocol,
+    StreamRunOutputHandlerProtocol,
 )
+from skriptoteket.protocols.runner import ArtifactManagerProtocol
 from skriptoteket.protocols.scripting import ToolRunRepositoryProtocol
+from skriptoteket.web.artifact_downloads import (
+    artifact_file_response,
+    artifact_redirect_response,
+    artifact_zip_entry_name,
+    iter_artifacts_zip,
+    raise_if_artifacts_expired,
+)
 from skriptoteket.web.auth.api_dependencies import require_csrf_token, require_user_api
 
 router = APIRouter(prefix="/api/v1")
 
+# Idle SSE connections get a comment line this often so intermediaries keep them open.
+_SSE_KEEPALIVE_SECONDS = 15.0
+_SSE_KEEPALIVE = b": keepalive\n\n"
+
 
 async def _load_production_run_for_user(
     *,
@@ -80,6 +98,46 @@ def _resolve_artifact_path(
     return candidate_path, relative_path
 
 
+def _encode_sse_event(event: RunOutputStreamEvent) -> bytes:
+    payload = json.dumps(
+        event.data.model_dump(mode="json"),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return f"event: {event.event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+async def _with_keepalive(
+    events: AsyncIterator[RunOutputStreamEvent], *, interval: float
+) -> AsyncIterator[bytes]:
+    """Encode `events`, writing an SSE comment whenever none arrives for `interval` seconds.
+
+    Keeps proxies and load balancers from closing the connection while a queued run waits
+    for a worker or a running tool prints nothing.
+    """
+    pending: asyncio.Task[RunOutputStreamEvent | None] | None = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.create_task(_next_event(events))
+            done, _ = await asyncio.wait({pending}, timeout=interval)
+            if not done:
+                yield _SSE_KEEPALIVE
+                continue
+            event = pending.result()
+            pending = None
+            if event is None:
+                return
+            yield _encode_sse_event(event)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def _next_event(events: AsyncIterator[RunOutputStreamEvent]) -> RunOutputStreamEvent | None:
+    return await anext(events, None)
+
+
 @router.post("/start_action", response_model=StartActionResult)
 @inject
 async def start_action(
@@ -129,6 +187,34 @@ async def get_run(
     return await handler.handle(actor=user, query=GetRunQuery(run_id=run_id))
 
 
+@router.get("/runs/{run_id}/output/stream", response_class=StreamingResponse)
+@inject
+async def stream_run_output(
+    run_id: UUID,
+    handler: FromDishka[StreamRunOutputHandlerProtocol],
+    user: User = Depends(require_user_api),
+) -> Response:
+    stream_iter = handler.stream(actor=user, query=StreamRunOutputQuery(run_id=run_id))
+
+    # The handler yields a `status` event right after resolving ownership, so this only waits
+    # for the run lookup (and surfaces 404) before the 200 response starts streaming.
+    first_event = await anext(stream_iter)
+
+    async def stream() -> AsyncIterator[bytes]:
+        yield _encode_sse_event(first_event)
+
+        async for chunk in _with_keepalive(stream_iter, interval=_SSE_KEEPALIVE_SECONDS):
+            yield chunk
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+        },
+    )
+
+
 @router.get("/runs/{run_id}/artifacts", response_model=ListArtifactsResult)
 @inject
 async def list_artifacts(
@@ -139,6 +225,49 @@ async def list_artifacts(
     return await handler.handle(actor=user, query=ListArtifactsQuery(run_id=run_id))
 
 
+def _open_zip_entries(
+    *,
+    artifacts: ArtifactManagerProtocol,
+    run_id: UUID,
+    manifest: ArtifactsManifest,
+) -> list[tuple[str, int, Iterator[bytes]]]:
+    entries: list[tuple[str, int, Iterator[bytes]]] = []
+    for artifact in manifest.artifacts:
+        chunks = artifacts.open_artifact(run_id=run_id, artifact=artifact)
+        # Files removed by retention are left out rather than failing mid-stream.
+        if chunks is not None:
+            entries.append((artifact_zip_entry_name(artifact), artifact.bytes, chunks))
+    return entries
+
+
+@router.get("/runs/{run_id}/artifacts.zip")
+@inject
+async def download_artifacts_zip(
+    run_id: UUID,
+    runs: FromDishka[ToolRunRepositoryProtocol],
+    artifacts: FromDishka[ArtifactManagerProtocol],
+    user: User = Depends(require_user_api),
+) -> Response:
+    run = await _load_production_run_for_user(runs=runs, run_id=run_id, actor=user)
+    raise_if_artifacts_expired(run)
+
+    manifest = ArtifactsManifest.model_validate(run.artifacts_manifest)
+    entries = await asyncio.to_thread(
+        _open_zip_entries, artifacts=artifacts, run_id=run.id, manifest=manifest
+    )
+    if not entries:
+        raise not_found("Artifacts", str(run.id))
+
+    return StreamingResponse(
+        iter_artifacts_zip(entries),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="run-{run.id}-artifacts.zip"',
+            "Cache-Control": "private, no-cache",
+        },
+    )
+
+
 @router.get("/runs/{run_id}/artifacts/{artifact_id}")
 @inject
 async def download_artifact(
@@ -147,17 +276,24 @@ async def download_artifact(
     artifact_id: str,
     settings: FromDishka[Settings],
     runs: FromDishka[ToolRunRepositoryProtocol],
+    artifacts: FromDishka[ArtifactManagerProtocol],
     user: User = Depends(require_user_api),
 ) -> Response:
-    del request
     run = await _load_production_run_for_user(runs=runs, run_id=run_id, actor=user)
+    raise_if_artifacts_expired(run)
 
     manifest = ArtifactsManifest.model_validate(run.artifacts_manifest)
     artifact = next((a for a in manifest.artifacts if a.artifact_id == artifact_id), None)
     if artifact is None:
         raise not_found("Artifact", artifact_id)
 
-    candidate_path, relative_path = _resolve_artifact_path(
+    redirect = await artifact_redirect_response(
+        artifacts=artifacts, run_id=run.id, artifact=artifact
+    )
+    if redirect is not None:
+        return redirect
+
+    candidate_path, _relative_path = _resolve_artifact_path(
         settings=settings,
         run_id=run.id,
         artifact_path=artifact.path,
@@ -165,8 +301,9 @@ async def download_artifact(
     if not candidate_path.is_file():
         raise not_found("ArtifactFile", str(candidate_path))
 
-    return FileResponse(
-        candidate_path,
-        filename=relative_path.name,
-        media_type="application/octet-stream",
+    return artifact_file_response(
+        request=request,
+        run_dir=settings.ARTIFACTS_ROOT / str(run.id),
+        file_path=candidate_path,
+        artifact=artifact,
     )
@@ -17,7 +17,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine
 
 from skriptoteket.config import Settings
 from skriptoteket.domain.identity.models import Role
-from skriptoteket.infrastructure.session_files.usage import get_session_file_usage
+from skriptoteket.infrastructure.session_files.usage_index import session_file_usage_index
 from skriptoteket.observability.health import build_health_response, check_database, check_smtp
 from skriptoteket.observability.metrics import get_metrics
 from skriptoteket.protocols.clock import ClockProtocol
@@ -68,7 +68,7 @@ async def metrics(
 ) -> Response:
     """Prometheus metrics endpoint for scraping."""
     metrics = get_metrics()
-    usage = await asyncio.to_thread(get_session_file_usage, artifacts_root=settings.ARTIFACTS_ROOT)
+    usage = await asyncio.to_thread(session_file_usage_index(settings.ARTIFACTS_ROOT).totals)
     now = clock.now()
     active_sessions = await sessions.count_active(now=now)
     users_by_role = await users.count_active_by_role()
@@ -1,31 +1,77 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import shutil
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import BinaryIO
+from uuid import uuid4
+
 from fastapi import UploadFile
 
 from skriptoteket.domain.errors import validation_error
+from skriptoteket.infrastructure.runner.retention import UPLOAD_SPOOL_DIRNAME
+from skriptoteket.protocols.session_files import StoredInputFile
 
+_CHUNK_BYTES = 1024 * 1024
 
-async def _read_upload_file_with_limit(*, file: UploadFile, max_bytes: int) -> bytes:
-    data = await file.read(max_bytes + 1)
-    if len(data) > max_bytes:
-        raise validation_error(
-            "Uploaded file is too large.",
-            details={
-                "filename": file.filename,
-                "max_bytes": max_bytes,
-            },
-        )
-    return data
+
+def _spool_upload_file(
+    *,
+    source: BinaryIO,
+    target: Path,
+    filename: str | None,
+    max_bytes: int,
+    total_bytes: int,
+    max_total_bytes: int,
+) -> tuple[int, str]:
+    """Copy one upload in chunks, enforcing the limits and hashing as it goes."""
+    digest = hashlib.sha256()
+    size = 0
+    with target.open("xb") as handle:
+        while chunk := source.read(_CHUNK_BYTES):
+            size += len(chunk)
+            if size > max_bytes:
+                raise validation_error(
+                    "Uploaded file is too large.",
+                    details={
+                        "filename": filename,
+                        "max_bytes": max_bytes,
+                    },
+                )
+            if total_bytes + size > max_total_bytes:
+                raise validation_error(
+                    "Total upload size exceeded.",
+                    details={
+                        "max_total_bytes": max_total_bytes,
+                        "total_bytes": total_bytes + size,
+                    },
+                )
+            digest.update(chunk)
+            handle.write(chunk)
+    return size, digest.hexdigest()
 
 
-async def read_upload_files(
+@asynccontextmanager
+async def spool_upload_files(
     *,
     files: list[UploadFile],
+    spool_root: Path,
     max_files: int,
     max_file_bytes: int,
     max_total_bytes: int,
     default_filename: str = "input.bin",
-) -> list[tuple[str, bytes]]:
+) -> AsyncIterator[list[StoredInputFile]]:
+    """Stream uploads into `{spool_root}/upload-spool/{uuid}/` and yield them as stored files.
+
+    Each part is copied in chunks off the event loop; size and sha256 are computed in the same
+    pass and the per-file/total limits are enforced mid-stream, so no upload is held in memory.
+    The spool directory lives under `ARTIFACTS_ROOT` so run inputs and session files can
+    hard-link the spooled files; it is removed when the block exits (`prune-artifacts` sweeps
+    directories a crashed process left behind).
+    """
     if not files:
         raise validation_error("At least one file is required.")
     if len(files) > max_files:
@@ -34,20 +80,34 @@ async def read_upload_files(
             details={"max_files": max_files, "files": len(files)},
         )
 
-    total_bytes = 0
-    input_files: list[tuple[str, bytes]] = []
-
-    for upload in files:
-        filename = upload.filename or default_filename
-        content = await _read_upload_file_with_limit(file=upload, max_bytes=max_file_bytes)
+    spool_dir = spool_root / UPLOAD_SPOOL_DIRNAME / str(uuid4())
+    spool_dir.mkdir(parents=True)
+    try:
+        total_bytes = 0
+        input_files: list[StoredInputFile] = []
 
-        total_bytes += len(content)
-        if total_bytes > max_total_bytes:
-            raise validation_error(
-                "Total upload size exceeded.",
-                details={"max_total_bytes": max_total_bytes, "total_bytes": total_bytes},
+        for index, upload in enumerate(files):
+            # Names are sanitized later (normalize_input_files); spool under a neutral name.
+            path = spool_dir / f"{index:04d}"
+            size, sha256 = await asyncio.to_thread(
+                _spool_upload_file,
+                source=upload.file,
+                target=path,
+                filename=upload.filename,
+                max_bytes=max_file_bytes,
+                total_bytes=total_bytes,
+                max_total_bytes=max_total_bytes,
+            )
+            total_bytes += size
+            input_files.append(
+                StoredInputFile(
+                    name=upload.filename or default_filename,
+                    path=path,
+                    bytes=size,
+                    sha256=sha256,
+                )
             )
 
-        input_files.append((filename, content))
-
-    return input_files
+        yield input_files
+    finally:
+        await asyncio.to_thread(shutil.rmtree, spool_dir, True)
@@ -15,12 +15,17 @@ from skriptoteket.domain.scripting.tool_runs import finish_run
 from skriptoteket.domain.scripting.ui.contract_v2 import ToolUiContractV2Result, UiFormAction
 from skriptoteket.domain.scripting.ui.normalization import UiNormalizationResult
 from skriptoteket.domain.scripting.ui.policy import UiPolicy
+from skriptoteket.observability.metrics import get_metrics
 from skriptoteket.observability.tracing import get_tracer, trace_operation
 from skriptoteket.protocols.clock import ClockProtocol
 from skriptoteket.protocols.execution_queue import ToolRunJobClaim
 from skriptoteket.protocols.id_generator import IdGeneratorProtocol
 from skriptoteket.protocols.run_inputs import RunInputStorageProtocol
-from skriptoteket.protocols.runner import ToolRunnerAdoptionProtocol, ToolRunnerProtocol
+from skriptoteket.protocols.runner import (
+    ToolCodeCacheProtocol,
+    ToolRunnerAdoptionProtocol,
+    ToolRunnerProtocol,
+)
 from skriptoteket.protocols.scripting_ui import (
     BackendActionProviderProtocol,
     UiPayloadNormalizerProtocol,
@@ -50,6 +55,7 @@ async def process_claim(
     adopt_missing_backoff_seconds: int,
     runner: ToolRunnerProtocol,
     runner_adoption: ToolRunnerAdoptionProtocol,
+    code_cache: ToolCodeCacheProtocol,
     run_inputs: RunInputStorageProtocol,
     ui_policy_provider: UiPolicyProviderProtocol,
     backend_actions_provider: BackendActionProviderProtocol,
@@ -61,6 +67,14 @@ async def process_claim(
     job = claim.job
     started_at = time.monotonic()
 
+    # Queue wait only for first claims: retries and adoptions include earlier execution time.
+    queue_wait_seconds: float | None = None
+    if not claim.is_adoption and job.attempts == 1 and job.started_at is not None:
+        queue_wait_seconds = max(0.0, (job.started_at - job.created_at).total_seconds())
+        get_metrics()["execution_queue_wait_seconds"].labels(queue=queue).observe(
+            queue_wait_seconds
+        )
+
     logger.info(
         "Job claimed",
         queue=queue,
@@ -71,6 +85,7 @@ async def process_claim(
         max_attempts=job.max_attempts,
         locked_by=job.locked_by,
         locked_until=None if job.locked_until is None else job.locked_until.isoformat(),
+        queue_wait_seconds=queue_wait_seconds,
     )
 
     try:
@@ -129,7 +144,7 @@ async def process_claim(
             raw_result: ToolUiContractV2Result | None = None
 
             try:
-                compile(ctx.version.source_code, "<tool_version>", "exec")
+                compiled = code_cache.compile(version=ctx.version)
 
                 if claim.is_adoption:
                     execution_result = await runner_adoption.try_adopt(
@@ -166,7 +181,7 @@ async def process_claim(
                             span.add_event("adopt_missing_container")
                             return
                 else:
-                    input_files = await run_inputs.get(run_id=job.run_id)
+                    input_files = await run_inputs.get_stored(run_id=job.run_id)
                     execution_result = await runner.execute(
                         run_id=job.run_id,
                         version=ctx.version,
@@ -175,6 +190,8 @@ async def process_claim(
                         input_values=ctx.run.input_values,
                         memory_json=ctx.memory_json,
                         action_payload=None,
+                        requested_by_user_id=ctx.run.requested_by_user_id,
+                        script_bytecode=compiled.pyc,
                     )
             except SyntaxError as exc:
                 error_summary = _format_syntax_error(exc)
@@ -286,6 +303,12 @@ async def process_claim(
                 ),
                 error_summary=raw_result.error_summary,
                 ui_payload=normalization_result.ui_payload,
+                result_cache=(
+                    execution_result.result_cache if execution_result is not None else None
+                ),
+                resource_usage=(
+                    execution_result.resource_usage if execution_result is not None else None
+                ),
             )
             finished_job = mark_job_finished(
                 job=job,
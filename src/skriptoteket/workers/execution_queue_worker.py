@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import os
+import signal
 import socket
 import time
 from datetime import datetime, timedelta
@@ -9,16 +10,25 @@ from typing import cast
 
 import structlog
 from dishka import Scope
+from prometheus_client import start_http_server
 
 from skriptoteket.config import Settings
 from skriptoteket.di import create_container
 from skriptoteket.observability.logging import configure_logging
 from skriptoteket.observability.tracing import init_tracing
 from skriptoteket.protocols.clock import ClockProtocol
-from skriptoteket.protocols.execution_queue import ToolRunJobClaim, ToolRunJobRepositoryProtocol
+from skriptoteket.protocols.execution_queue import (
+    ExecutionQueueNotificationListenerProtocol,
+    ToolRunJobClaim,
+    ToolRunJobRepositoryProtocol,
+)
 from skriptoteket.protocols.id_generator import IdGeneratorProtocol
 from skriptoteket.protocols.run_inputs import RunInputStorageProtocol
-from skriptoteket.protocols.runner import ToolRunnerAdoptionProtocol, ToolRunnerProtocol
+from skriptoteket.protocols.runner import (
+    ToolCodeCacheProtocol,
+    ToolRunnerAdoptionProtocol,
+    ToolRunnerProtocol,
+)
 from skriptoteket.protocols.scripting_ui import (
     BackendActionProviderProtocol,
     UiPayloadNormalizerProtocol,
@@ -36,8 +46,16 @@ async def run_execution_queue_worker(
     queue: str = "default",
     worker_id: str | None = None,
     once: bool = False,
+    concurrency: int = 1,
 ) -> None:
-    """Run the Postgres execution-queue worker loop (ADR-0062)."""
+    """Run the Postgres execution-queue worker loop (ADR-0062).
+
+    Keeps up to `concurrency` claimed jobs in flight as asyncio tasks (each with its own heartbeat).
+    When idle it blocks on the queue's LISTEN channel (enqueue NOTIFYs); polling is the fallback.
+    SIGTERM/SIGINT stop claiming and drain in-flight jobs before exiting.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
     settings = Settings()
     configure_logging(
         service_name=settings.SERVICE_NAME,
@@ -47,18 +65,30 @@ async def run_execution_queue_worker(
     )
     if settings.OTEL_TRACING_ENABLED:
         init_tracing(settings.SERVICE_NAME)
+    if settings.RUNNER_WORKER_METRICS_PORT > 0:
+        start_http_server(settings.RUNNER_WORKER_METRICS_PORT)
 
     normalized_queue = queue.strip() or "default"
     effective_worker_id = worker_id.strip() if worker_id is not None else ""
     if not effective_worker_id:
         effective_worker_id = f"{socket.gethostname()}:{os.getpid()}:{int(time.time())}"
 
+    if concurrency > settings.RUNNER_MAX_CONCURRENCY:
+        logger.warning(
+            "Worker concurrency exceeds runner capacity; clamping",
+            requested_concurrency=concurrency,
+            runner_max_concurrency=settings.RUNNER_MAX_CONCURRENCY,
+        )
+        concurrency = settings.RUNNER_MAX_CONCURRENCY
+
     container = create_container(settings)
+    in_flight: set[asyncio.Task[None]] = set()
     try:
         clock = await container.get(ClockProtocol)
         sleeper = await container.get(SleeperProtocol)
         runner = await container.get(ToolRunnerProtocol)
         runner_adoption = await container.get(ToolRunnerAdoptionProtocol)
+        code_cache = await container.get(ToolCodeCacheProtocol)
         run_inputs = await container.get(RunInputStorageProtocol)
         ui_policy_provider = await container.get(UiPolicyProviderProtocol)
         backend_actions_provider = await container.get(BackendActionProviderProtocol)
@@ -70,22 +100,34 @@ async def run_execution_queue_worker(
         poll_interval = float(settings.RUNNER_QUEUE_POLL_INTERVAL_SECONDS)
         reaper_interval = float(settings.RUNNER_QUEUE_REAPER_INTERVAL_SECONDS)
         adopt_missing_backoff_seconds = int(settings.RUNNER_QUEUE_ADOPT_MISSING_BACKOFF_SECONDS)
+        listen_fallback_poll_interval = max(
+            poll_interval, float(settings.RUNNER_QUEUE_LISTEN_FALLBACK_POLL_SECONDS)
+        )
+
+        notifications: ExecutionQueueNotificationListenerProtocol | None = None
+        if settings.RUNNER_QUEUE_LISTEN_ENABLED:
+            notifications = await container.get(ExecutionQueueNotificationListenerProtocol)
+            await notifications.listen(queue=normalized_queue)
 
         logger.info(
             "Execution worker started",
             worker_id=effective_worker_id,
             queue=normalized_queue,
             queue_enabled=settings.RUNNER_QUEUE_ENABLED,
+            concurrency=concurrency,
             lease_ttl_seconds=int(lease_ttl.total_seconds()),
             heartbeat_interval_seconds=heartbeat_interval,
             poll_interval_seconds=poll_interval,
+            listening=notifications is not None and notifications.is_listening,
             reaper_interval_seconds=reaper_interval,
         )
 
         loop = asyncio.get_running_loop()
+        stop_event = asyncio.Event()
+        _install_stop_signal_handlers(loop=loop, stop_event=stop_event)
         next_reaper_at = loop.time()
 
-        while True:
+        while not stop_event.is_set():
             now = clock.now()
 
             if loop.time() >= next_reaper_at:
@@ -101,45 +143,149 @@ async def run_execution_queue_worker(
                     )
                 next_reaper_at = loop.time() + reaper_interval
 
-            claim = await _claim_next_job(
-                container=container,
-                worker_id=effective_worker_id,
-                now=now,
-                lease_ttl=lease_ttl,
-                queue=normalized_queue,
-            )
-            if claim is None:
+            claims: list[ToolRunJobClaim] = []
+            free_slots = concurrency - len(in_flight)
+            if free_slots > 0:
+                claims = await _claim_jobs(
+                    container=container,
+                    worker_id=effective_worker_id,
+                    now=now,
+                    lease_ttl=lease_ttl,
+                    queue=normalized_queue,
+                    max_jobs=1 if once else free_slots,
+                    fair_share=settings.RUNNER_QUEUE_FAIR_SHARE_ENABLED,
+                    max_running_per_tool=settings.RUNNER_QUEUE_MAX_RUNNING_PER_TOOL,
+                )
+
+            for claim in claims:
+                task = asyncio.create_task(
+                    process_claim(
+                        container=container,
+                        service_name=settings.SERVICE_NAME,
+                        worker_id=effective_worker_id,
+                        queue=normalized_queue,
+                        claim=claim,
+                        lease_ttl=lease_ttl,
+                        heartbeat_interval=heartbeat_interval,
+                        adopt_missing_backoff_seconds=adopt_missing_backoff_seconds,
+                        runner=runner,
+                        runner_adoption=runner_adoption,
+                        code_cache=code_cache,
+                        run_inputs=run_inputs,
+                        ui_policy_provider=ui_policy_provider,
+                        backend_actions_provider=backend_actions_provider,
+                        ui_normalizer=ui_normalizer,
+                        clock=clock,
+                        id_generator=id_generator,
+                        sleeper=sleeper,
+                    ),
+                    name=f"execution-job-{claim.job.id}",
+                )
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                task.add_done_callback(_log_job_task_failure)
+            if claims:
                 if once:
-                    return
-                await sleeper.sleep(poll_interval)
-                continue
+                    break
+                if len(claims) == free_slots:
+                    # A full batch: slots may have freed up meanwhile, claim again before waiting.
+                    continue
 
-            await process_claim(
-                container=container,
-                service_name=settings.SERVICE_NAME,
-                worker_id=effective_worker_id,
-                queue=normalized_queue,
-                claim=claim,
-                lease_ttl=lease_ttl,
-                heartbeat_interval=heartbeat_interval,
-                adopt_missing_backoff_seconds=adopt_missing_backoff_seconds,
-                runner=runner,
-                runner_adoption=runner_adoption,
-                run_inputs=run_inputs,
-                ui_policy_provider=ui_policy_provider,
-                backend_actions_provider=backend_actions_provider,
-                ui_normalizer=ui_normalizer,
-                clock=clock,
-                id_generator=id_generator,
-                sleeper=sleeper,
+            if once and not in_flight:
+                return
+
+            listening = notifications is not None and notifications.is_listening
+            timeout_seconds = min(
+                listen_fallback_poll_interval if listening else poll_interval,
+                max(0.0, next_reaper_at - loop.time()),
+            )
+            if listening and timeout_seconds > poll_interval:
+                # Jobs requeued with a backoff become claimable without a NOTIFY.
+                next_available_at = await _next_available_at(
+                    container=container, queue=normalized_queue, now=now
+                )
+                if next_available_at is not None:
+                    timeout_seconds = min(
+                        timeout_seconds,
+                        max(poll_interval, (next_available_at - clock.now()).total_seconds()),
+                    )
+            await _wait_for_progress(
+                in_flight=in_flight,
+                stop_event=stop_event,
+                notifications=notifications,
+                timeout_seconds=timeout_seconds,
             )
 
-            if once:
-                return
+        if in_flight:
+            logger.info(
+                "Execution worker draining",
+                worker_id=effective_worker_id,
+                in_flight=len(in_flight),
+            )
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        logger.info("Execution worker stopped", worker_id=effective_worker_id)
     finally:
+        for task in in_flight:
+            task.cancel()
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
         await container.close()
 
 
+def _install_stop_signal_handlers(
+    *,
+    loop: asyncio.AbstractEventLoop,
+    stop_event: asyncio.Event,
+) -> None:
+    def _request_stop(signum: signal.Signals) -> None:
+        if not stop_event.is_set():
+            logger.info("Execution worker stop requested", signal=signum.name)
+        stop_event.set()
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, _request_stop, signum)
+        except (NotImplementedError, RuntimeError):
+            # Not supported on this platform / not the main thread: rely on default handling.
+            pass
+
+
+async def _wait_for_progress(
+    *,
+    in_flight: set[asyncio.Task[None]],
+    stop_event: asyncio.Event,
+    notifications: ExecutionQueueNotificationListenerProtocol | None,
+    timeout_seconds: float,
+) -> None:
+    """Sleep until a job finishes (a slot frees up), a job is enqueued, a stop is requested, or
+    the poll interval elapses."""
+    waiters: set[asyncio.Task[object]] = {asyncio.create_task(stop_event.wait())}
+    if notifications is not None:
+        waiters.add(asyncio.create_task(notifications.wait()))
+    try:
+        await asyncio.wait(
+            {*waiters, *in_flight},
+            timeout=timeout_seconds,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+
+
+def _log_job_task_failure(task: asyncio.Task[None]) -> None:
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        # The job's lease expires without heartbeats; the reaper + adoption path recovers it.
+        logger.error(
+            "Job processing crashed",
+            task=task.get_name(),
+            exc_info=(type(exc), exc, exc.__traceback__),
+        )
+
+
 async def _clear_stale_leases(*, container, now: datetime) -> int:
     async with container(scope=Scope.REQUEST) as request:
         uow = cast(UnitOfWorkProtocol, await request.get(UnitOfWorkProtocol))
@@ -148,21 +294,35 @@ async def _clear_stale_leases(*, container, now: datetime) -> int:
             return await jobs.clear_stale_leases(now=now)
 
 
-async def _claim_next_job(
+async def _next_available_at(*, container, queue: str, now: datetime) -> datetime | None:
+    async with container(scope=Scope.REQUEST) as request:
+        uow = cast(UnitOfWorkProtocol, await request.get(UnitOfWorkProtocol))
+        jobs = cast(ToolRunJobRepositoryProtocol, await request.get(ToolRunJobRepositoryProtocol))
+        async with uow:
+            return await jobs.next_available_at(queue=queue, now=now)
+
+
+async def _claim_jobs(
     *,
     container,
     worker_id: str,
     now: datetime,
     lease_ttl: timedelta,
     queue: str,
-) -> ToolRunJobClaim | None:
+    max_jobs: int,
+    fair_share: bool,
+    max_running_per_tool: int,
+) -> list[ToolRunJobClaim]:
     async with container(scope=Scope.REQUEST) as request:
         uow = cast(UnitOfWorkProtocol, await request.get(UnitOfWorkProtocol))
         jobs = cast(ToolRunJobRepositoryProtocol, await request.get(ToolRunJobRepositoryProtocol))
         async with uow:
-            return await jobs.claim_next(
+            return await jobs.claim_batch(
                 worker_id=worker_id,
                 now=now,
                 lease_ttl=lease_ttl,
                 queue=queue,
+                max_jobs=max_jobs,
+                fair_share=fair_share,
+                max_running_per_tool=max_running_per_tool,
             )
@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from skriptoteket.domain.identity.models import AuthProvider, Role
+from skriptoteket.domain.scripting.models import RunContext, RunStatus, VersionState
+from skriptoteket.infrastructure.db.models.tool import ToolModel
+from skriptoteket.infrastructure.db.models.tool_run import ToolRunModel
+from skriptoteket.infrastructure.db.models.tool_run_job import ToolRunJobModel
+from skriptoteket.infrastructure.db.models.tool_version import ToolVersionModel
+from skriptoteket.infrastructure.db.models.user import UserModel
+from skriptoteket.infrastructure.repositories.tool_run_job_repository import (
+    PostgreSQLToolRunJobRepository,
+)
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+LEASE_TTL = timedelta(seconds=60)
+
+
+async def _create_tool_version(
+    *, db_session: AsyncSession, now: datetime
+) -> tuple[uuid.UUID, uuid.UUID, uuid.UUID]:
+    user_id = uuid.uuid4()
+    tool_id = uuid.uuid4()
+    version_id = uuid.uuid4()
+    db_session.add(
+        UserModel(
+            id=user_id,
+            email=f"queue-{user_id.hex[:8]}@example.com",
+            password_hash="hash",
+            role=Role.USER,
+            auth_provider=AuthProvider.LOCAL,
+            created_at=now,
+            updated_at=now,
+        )
+    )
+    await db_session.flush()
+    db_session.add(
+        ToolModel(
+            id=tool_id,
+            owner_user_id=user_id,
+            slug=f"tool-{tool_id.hex[:8]}",
+            title="Queue tool",
+            summary=None,
+            is_published=False,
+            active_version_id=None,
+            created_at=now,
+            updated_at=now,
+        )
+    )
+    await db_session.flush()
+    db_session.add(
+        ToolVersionModel(
+            id=version_id,
+            tool_id=tool_id,
+            version_number=1,
+            state=VersionState.DRAFT,
+            source_code="print('hi')",
+            entrypoint="run_tool",
+            content_hash="hash",
+            input_schema=[],
+            derived_from_version_id=None,
+            created_by_user_id=user_id,
+            created_at=now,
+            submitted_for_review_by_user_id=None,
+            submitted_for_review_at=None,
+            reviewed_by_user_id=None,
+            reviewed_at=None,
+            published_by_user_id=None,
+            published_at=None,
+            change_summary=None,
+            review_note=None,
+        )
+    )
+    await db_session.flush()
+    return user_id, tool_id, version_id
+
+
+async def _seed_jobs(
+    *,
+    db_session: AsyncSession,
+    now: datetime,
+    count: int,
+    queue: str = "default",
+    status: RunStatus = RunStatus.QUEUED,
+    priorities: list[int] | None = None,
+    arrivals: list[timedelta] | None = None,
+) -> list[uuid.UUID]:
+    """Bulk-insert `count` runs + jobs for one new user and tool; returns job ids in creation order.
+
+    `arrivals` offsets each job's `created_at`/`available_at` from `now` (default: all at `now`).
+    """
+    user_id, tool_id, version_id = await _create_tool_version(db_session=db_session, now=now)
+    run_ids = [uuid.uuid4() for _ in range(count)]
+    job_ids = [uuid.uuid4() for _ in range(count)]
+    await db_session.execute(
+        insert(ToolRunModel),
+        [
+            {
+                "id": run_id,
+                "tool_id": tool_id,
+                "version_id": version_id,
+                "context": RunContext.SANDBOX.value,
+                "requested_by_user_id": user_id,
+                "status": status.value,
+                "requested_at": now,
+                "started_at": None,
+                "workdir_path": str(run_id),
+                "input_size_bytes": 0,
+            }
+            for run_id in run_ids
+        ],
+    )
+    await db_session.execute(
+        insert(ToolRunJobModel),
+        [
+            {
+                "id": job_id,
+                "run_id": run_id,
+                "status": status.value,
+                "queue": queue,
+                "priority": priorities[index] if priorities else 0,
+                "attempts": 1 if status is RunStatus.RUNNING else 0,
+                "max_attempts": 1,
+                "available_at": now + (arrivals[index] if arrivals else timedelta()),
+                "locked_by": None,
+                "locked_until": None,
+                "created_at": now
+                + (arrivals[index] if arrivals else timedelta())
+                + timedelta(microseconds=index),
+                "updated_at": now,
+            }
+            for index, (job_id, run_id) in enumerate(zip(job_ids, run_ids, strict=True))
+        ],
+    )
+    await db_session.commit()
+    return job_ids
+
+
+@pytest.mark.integration
+async def test_claim_batch_adopts_first_then_claims_queued_by_priority(
+    db_session: AsyncSession,
+) -> None:
+    now = datetime.now(timezone.utc)
+    adoptable_id = (
+        await _seed_jobs(db_session=db_session, now=now, count=1, status=RunStatus.RUNNING)
+    )[0]
+    low, high, mid = await _seed_jobs(db_session=db_session, now=now, count=3, priorities=[0, 5, 1])
+
+    repo = PostgreSQLToolRunJobRepository(db_session)
+    claims = await repo.claim_batch(worker_id="w1", now=now, lease_ttl=LEASE_TTL, max_jobs=3)
+    await db_session.commit()
+
+    assert [claim.job.id for claim in claims] == [adoptable_id, high, mid]
+    assert [claim.is_adoption for claim in claims] == [True, False, False]
+    assert all(claim.job.locked_by == "w1" for claim in claims)
+    assert claims[1].job.attempts == 1
+    assert claims[1].job.started_at == now
+
+    runs = {model.id: model for model in (await db_session.scalars(select(ToolRunModel))).all()}
+    jobs = {model.id: model for model in (await db_session.scalars(select(ToolRunJobModel))).all()}
+    assert runs[jobs[high].run_id].status == RunStatus.RUNNING.value
+    assert runs[jobs[high].run_id].started_at == now
+    assert jobs[low].status == RunStatus.QUEUED.value
+    assert runs[jobs[low].run_id].status == RunStatus.QUEUED.value
+
+
+@pytest.mark.integration
+async def test_claim_batch_skips_jobs_locked_by_another_worker(
+    db_session: AsyncSession,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    now = datetime.now(timezone.utc)
+    job_ids = await _seed_jobs(db_session=db_session, now=now, count=5)
+
+    async with session_factory() as first_session, session_factory() as second_session:
+        first = await PostgreSQLToolRunJobRepository(first_session).claim_batch(
+            worker_id="w1", now=now, lease_ttl=LEASE_TTL, max_jobs=2
+        )
+        # The first transaction is still open: its rows must be skipped, not waited on.
+        second = await PostgreSQLToolRunJobRepository(second_session).claim_batch(
+            worker_id="w2", now=now, lease_ttl=LEASE_TTL, max_jobs=10
+        )
+        await first_session.commit()
+        await second_session.commit()
+
+    assert [claim.job.id for claim in first] == job_ids[:2]
+    assert [claim.job.id for claim in second] == job_ids[2:]
+
+
+@pytest.mark.integration
+async def test_claim_next_delegates_to_single_job_batch(db_session: AsyncSession) -> None:
+    now = datetime.now(timezone.utc)
+    job_ids = await _seed_jobs(db_session=db_session, now=now, count=2)
+
+    repo = PostgreSQLToolRunJobRepository(db_session)
+    claim = await repo.claim_next(worker_id="w1", now=now, lease_ttl=LEASE_TTL)
+
+    assert claim is not None
+    assert claim.job.id == job_ids[0]
+    assert claim.is_adoption is False
+
+
+@pytest.mark.integration
+async def test_claim_batch_fair_share_interleaves_users(db_session: AsyncSession) -> None:
+    now = datetime.now(timezone.utc)
+    batch = await _seed_jobs(db_session=db_session, now=now, count=40, queue="fair")
+    (other,) = await _seed_jobs(
+        db_session=db_session, now=now + timedelta(seconds=1), count=1, queue="fair"
+    )
+
+    repo = PostgreSQLToolRunJobRepository(db_session)
+    fifo = await repo.claim_batch(
+        worker_id="w1", now=now + timedelta(seconds=1), lease_ttl=LEASE_TTL, queue="fair"
+    )
+    # The batch user now has a job running, so the other user's first job goes before their next.
+    fair = await repo.claim_batch(
+        worker_id="w1",
+        now=now + timedelta(seconds=1),
+        lease_ttl=LEASE_TTL,
+        queue="fair",
+        max_jobs=2,
+        fair_share=True,
+    )
+    await db_session.commit()
+
+    assert [claim.job.id for claim in fifo] == [batch[0]]
+    assert {claim.job.id for claim in fair} == {other, batch[1]}
+
+
+@pytest.mark.integration
+async def test_claim_batch_caps_running_jobs_per_tool(db_session: AsyncSession) -> None:
+    now = datetime.now(timezone.utc)
+    capped = await _seed_jobs(db_session=db_session, now=now, count=5, queue="tool-cap")
+    other_tool = await _seed_jobs(
+        db_session=db_session, now=now + timedelta(seconds=1), count=1, queue="tool-cap"
+    )
+
+    repo = PostgreSQLToolRunJobRepository(db_session)
+    first = await repo.claim_batch(
+        worker_id="w1", now=now, lease_ttl=LEASE_TTL, queue="tool-cap", max_jobs=1
+    )
+    rest = await repo.claim_batch(
+        worker_id="w2",
+        now=now + timedelta(seconds=1),
+        lease_ttl=LEASE_TTL,
+        queue="tool-cap",
+        max_jobs=10,
+        max_running_per_tool=2,
+    )
+    await db_session.commit()
+
+    assert [claim.job.id for claim in first] == [capped[0]]
+    assert [claim.job.id for claim in rest] == [capped[1], other_tool[0]]
+    jobs = {model.id: model for model in (await db_session.scalars(select(ToolRunJobModel))).all()}
+    assert all(jobs[job_id].status == RunStatus.QUEUED.value for job_id in capped[2:])
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+async def test_benchmark_queue_wait_per_user_fifo_vs_fair_share(
+    db_session: AsyncSession,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Simulate mixed load on 4 runner slots: one user batch-submits 40 runs at t=0 while three
+    users submit a run every 5s. Reports p50/p99 queue wait per user for FIFO and fair share.
+
+    Run with `pdm run pytest -m slow -s <this file>` to see the numbers.
+    """
+    slots = 4
+    service_seconds = 3
+    now = datetime.now(timezone.utc)
+
+    async def seed(queue: str) -> dict[uuid.UUID, tuple[str, int]]:
+        arrivals_by_user = {"batch": [0] * 40} | {
+            f"light-{index}": list(range(index, 30, 5)) for index in range(3)
+        }
+        jobs: dict[uuid.UUID, tuple[str, int]] = {}
+        for user, arrivals in arrivals_by_user.items():
+            job_ids = await _seed_jobs(
+                db_session=db_session,
+                now=now,
+                count=len(arrivals),
+                queue=queue,
+                arrivals=[timedelta(seconds=arrival) for arrival in arrivals],
+            )
+            jobs.update(zip(job_ids, ((user, arrival) for arrival in arrivals), strict=True))
+        return jobs
+
+    async def simulate(*, queue: str, fair_share: bool) -> dict[str, list[int]]:
+        jobs = await seed(queue)
+        waits: dict[str, list[int]] = {}
+        finishing: dict[uuid.UUID, int] = {}
+        tick = 0
+        while len(jobs) > sum(len(user_waits) for user_waits in waits.values()):
+            async with session_factory() as session:
+                done = [job_id for job_id, finish in finishing.items() if finish <= tick]
+                if done:
+                    await session.execute(
+                        update(ToolRunJobModel)
+                        .where(ToolRunJobModel.id.in_(done))
+                        .values(status=RunStatus.SUCCEEDED.value)
+                    )
+                    for job_id in done:
+                        del finishing[job_id]
+                claims = []
+                if len(finishing) < slots:
+                    claims = await PostgreSQLToolRunJobRepository(session).claim_batch(
+                        worker_id="sim",
+                        now=now + timedelta(seconds=tick),
+                        lease_ttl=LEASE_TTL,
+                        queue=queue,
+                        max_jobs=slots - len(finishing),
+                        fair_share=fair_share,
+                    )
+                await session.commit()
+            for claim in claims:
+                user, arrival = jobs[claim.job.id]
+                waits.setdefault(user, []).append(tick - arrival)
+                finishing[claim.job.id] = tick + service_seconds
+            tick += 1
+        return waits
+
+    def percentile(values: list[int], fraction: float) -> int:
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    fifo = await simulate(queue="sim-fifo", fair_share=False)
+    fair = await simulate(queue="sim-fair", fair_share=True)
+
+    print("\nqueue wait in seconds per user (p50/p99), FIFO vs fair share:")
+    for user in sorted(fifo):
+        print(
+            f"  {user:>8}: fifo {percentile(fifo[user], 0.5)}/{percentile(fifo[user], 0.99)}"
+            f"  fair {percentile(fair[user], 0.5)}/{percentile(fair[user], 0.99)}"
+        )
+    for user in (user for user in fifo if user.startswith("light")):
+        assert percentile(fair[user], 0.99) < percentile(fifo[user], 0.99)
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+async def test_benchmark_claim_throughput_with_10k_queued_jobs(
+    db_session: AsyncSession,
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """Drain 10k queued jobs one transaction per job vs. 50 per transaction.
+
+    Run with `pdm run pytest -m slow -s <this file>` to see the numbers.
+    """
+    job_count = 10_000
+    batch_size = 50
+    now = datetime.now(timezone.utc)
+    await _seed_jobs(db_session=db_session, now=now, count=job_count, queue="bench-single")
+    await _seed_jobs(db_session=db_session, now=now, count=job_count, queue="bench-batch")
+
+    async def drain(*, queue: str, max_jobs: int) -> float:
+        claimed = 0
+        started = time.perf_counter()
+        while True:
+            async with session_factory() as session:
+                claims = await PostgreSQLToolRunJobRepository(session).claim_batch(
+                    worker_id="bench", now=now, lease_ttl=LEASE_TTL, queue=queue, max_jobs=max_jobs
+                )
+                await session.commit()
+            if not claims:
+                break
+            claimed += len(claims)
+        elapsed = time.perf_counter() - started
+        assert claimed == job_count
+        return job_count / elapsed
+
+    single_rate = await drain(queue="bench-single", max_jobs=1)
+    batch_rate = await drain(queue="bench-batch", max_jobs=batch_size)
+
+    print(
+        f"\nclaim throughput ({job_count} jobs): "
+        f"claim_next {single_rate:,.0f} jobs/s, "
+        f"claim_batch(max_jobs={batch_size}) {batch_rate:,.0f} jobs/s "
+        f"({batch_rate / single_rate:.1f}x)"
+    )
+    assert batch_rate > single_rate
@@ -563,3 +563,63 @@ async def test_count_for_user_this_month_returns_correct_count(
         user_id=user_id, context=RunContext.SANDBOX
     )
     assert sandbox_count == 1
+
+
+@pytest.mark.integration
+async def test_artifact_expiry_pages_by_finished_at_and_tombstones(
+    db_session: AsyncSession,
+) -> None:
+    now = datetime.now(timezone.utc)
+    user_id = await _create_user(db_session=db_session, now=now)
+    tool_id = await _create_tool(db_session=db_session, now=now, owner_user_id=user_id)
+    version_id = await _create_tool_version(
+        db_session=db_session, tool_id=tool_id, created_by_user_id=user_id, now=now
+    )
+
+    repo = PostgreSQLToolRunRepository(db_session)
+    # Far in the past so runs created by other tests sort after these.
+    base = datetime(2001, 1, 1, tzinfo=timezone.utc)
+    finished_offsets: list[timedelta | None] = [
+        timedelta(days=1),
+        timedelta(days=2),
+        timedelta(days=3),
+        None,  # still running
+    ]
+    run_ids: list[uuid.UUID] = []
+    for i, offset in enumerate(finished_offsets):
+        run = ToolRun(
+            id=uuid.uuid4(),
+            tool_id=tool_id,
+            version_id=version_id,
+            context=RunContext.PRODUCTION,
+            requested_by_user_id=user_id,
+            status=RunStatus.SUCCEEDED if offset is not None else RunStatus.RUNNING,
+            requested_at=base,
+            started_at=base,
+            finished_at=None if offset is None else base + offset,
+            workdir_path=f"expiry-{i}/work",
+            input_filename=None,
+            input_size_bytes=0,
+            input_manifest=InputManifest(),
+            artifacts_manifest={},
+        )
+        await repo.create(run=run)
+        run_ids.append(run.id)
+
+    cutoff = base + timedelta(days=10)
+    first_page = await repo.list_pending_artifact_expiry(finished_before=cutoff, limit=2)
+    second_page = await repo.list_pending_artifact_expiry(
+        finished_before=cutoff, limit=2, after=first_page[-1]
+    )
+    assert [item.run_id for item in first_page] == run_ids[:2]
+    assert second_page[0].run_id == run_ids[2]
+
+    expired_at = now
+    assert await repo.mark_artifacts_expired(run_ids=run_ids[:2], expired_at=expired_at) == 2
+    assert await repo.mark_artifacts_expired(run_ids=run_ids[:1], expired_at=expired_at) == 0
+
+    remaining = await repo.list_pending_artifact_expiry(finished_before=cutoff, limit=2)
+    assert remaining[0].run_id == run_ids[2]
+    fetched = await repo.get_by_id(run_id=run_ids[0])
+    assert fetched is not None
+    assert fetched.artifacts_expired_at == expired_at
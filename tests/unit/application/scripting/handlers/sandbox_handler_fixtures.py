@@ -16,7 +16,7 @@ from skriptoteket.protocols.session_files import SessionFileStorageProtocol
 @pytest.fixture
 def session_files() -> AsyncMock:
     storage = AsyncMock(spec=SessionFileStorageProtocol)
-    storage.get_files.return_value = []
+    storage.get_stored_files.return_value = []
     return storage
 
 
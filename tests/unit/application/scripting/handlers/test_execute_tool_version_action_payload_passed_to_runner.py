@@ -24,6 +24,7 @@ from skriptoteket.domain.scripting.models import (
 from skriptoteket.domain.scripting.tool_inputs import ToolInputStringField
 from skriptoteket.domain.scripting.ui.contract_v2 import ToolUiContractV2Result
 from skriptoteket.domain.scripting.ui.normalizer import DeterministicUiPayloadNormalizer
+from skriptoteket.infrastructure.runner.code_cache import InMemoryToolCodeCache
 from skriptoteket.infrastructure.scripting_ui.backend_actions import NoopBackendActionProvider
 from skriptoteket.infrastructure.scripting_ui.policy_provider import DefaultUiPolicyProvider
 from skriptoteket.protocols.clock import ClockProtocol
@@ -130,6 +131,7 @@ async def test_execute_tool_version_passes_action_payload_without_affecting_file
         run_inputs=run_inputs,
         sessions=sessions,
         runner=runner,
+        code_cache=InMemoryToolCodeCache(max_entries=8),
         ui_policy_provider=ui_policy_provider,
         backend_actions=backend_actions,
         ui_normalizer=ui_normalizer,
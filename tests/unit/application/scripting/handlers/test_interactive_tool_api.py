@@ -178,7 +178,7 @@ async def test_start_action_executes_with_session_state_and_updates_state_rev(
     )
 
     session_files = AsyncMock(spec=SessionFileStorageProtocol)
-    session_files.get_files.return_value = [("original.txt", b"hello")]
+    session_files.get_stored_files.return_value = [("original.txt", b"hello")]
 
     async def _execute(
         *,
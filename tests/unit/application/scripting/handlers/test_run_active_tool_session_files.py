@@ -136,7 +136,7 @@ async def test_run_active_tool_reuses_session_files_when_requested(now: datetime
     session_files = AsyncMock(spec=SessionFileStorageProtocol)
 
     persisted_files = [("persist.txt", b"data")]
-    session_files.get_files.return_value = persisted_files
+    session_files.get_stored_files.return_value = persisted_files
 
     run = make_tool_run(
         run_id=uuid4(),
@@ -167,7 +167,7 @@ async def test_run_active_tool_reuses_session_files_when_requested(now: datetime
 
     command = execute.handle.call_args.kwargs["command"]
     assert command.input_files == persisted_files
-    session_files.get_files.assert_awaited_once()
+    session_files.get_stored_files.assert_awaited_once()
     session_files.store_files.assert_not_called()
 
 
@@ -67,7 +67,7 @@ async def test_run_sandbox_reuses_session_files_on_initial_run(
     versions.list_for_tool.return_value = []
 
     persisted_files = [("persist.txt", b"data")]
-    session_files.get_files.return_value = persisted_files
+    session_files.get_stored_files.return_value = persisted_files
 
     run = make_tool_run(
         tool_id=tool_id,
@@ -104,7 +104,7 @@ async def test_run_sandbox_reuses_session_files_on_initial_run(
 
     command = execute.handle.call_args.kwargs["command"]
     assert command.input_files == persisted_files
-    session_files.get_files.assert_awaited_once_with(
+    session_files.get_stored_files.assert_awaited_once_with(
         tool_id=tool_id,
         user_id=actor.id,
         context=f"sandbox:{previous_snapshot_id}",
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from datetime import datetime
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import pytest
+
+from skriptoteket.application.scripting.handlers.stream_run_output import StreamRunOutputHandler
+from skriptoteket.application.scripting.interactive_tools import (
+    RunOutputChunkEvent,
+    RunOutputDoneEvent,
+    RunOutputStatusEvent,
+    StreamRunOutputQuery,
+)
+from skriptoteket.domain.errors import DomainError, ErrorCode
+from skriptoteket.domain.scripting.input_files import InputManifest
+from skriptoteket.domain.scripting.models import RunContext, RunStatus, ToolRun
+from skriptoteket.infrastructure.runner.run_log_buffer import LocalRunLogBuffer
+from skriptoteket.protocols.scripting import ToolRunRepositoryProtocol
+from skriptoteket.protocols.sleeper import SleeperProtocol
+from skriptoteket.protocols.uow import UnitOfWorkProtocol
+from tests.fixtures.identity_fixtures import make_user
+
+
+class FakeUow(UnitOfWorkProtocol):
+    async def __aenter__(self) -> UnitOfWorkProtocol:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+def make_run(
+    *, run_id: UUID, requested_by_user_id: UUID, status: RunStatus, now: datetime
+) -> ToolRun:
+    return ToolRun(
+        id=run_id,
+        tool_id=uuid4(),
+        version_id=uuid4(),
+        requested_by_user_id=requested_by_user_id,
+        context=RunContext.PRODUCTION,
+        status=status,
+        requested_at=now,
+        started_at=now,
+        finished_at=None if status is RunStatus.RUNNING else now,
+        workdir_path="/tmp/run",
+        input_filename=None,
+        input_size_bytes=0,
+        input_manifest=InputManifest(),
+        html_output=None,
+        stdout="",
+        stderr="",
+        error_summary=None,
+        artifacts_manifest={"artifacts": []},
+        ui_payload=None,
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stream_emits_merged_output_then_done(now: datetime, tmp_path) -> None:
+    actor = make_user()
+    run_id = uuid4()
+    run_logs = LocalRunLogBuffer(artifacts_root=tmp_path, max_bytes=4096)
+    writer = run_logs.open_writer(run_id=run_id)
+    writer.write(stream="stdout", data=b"a\n")
+    writer.write(stream="stdout", data=b"b\n")
+    writer.write(stream="stderr", data=b"oops\n")
+
+    runs = AsyncMock(spec=ToolRunRepositoryProtocol)
+    runs.get_by_id.side_effect = [
+        make_run(run_id=run_id, requested_by_user_id=actor.id, status=RunStatus.RUNNING, now=now),
+        make_run(run_id=run_id, requested_by_user_id=actor.id, status=RunStatus.SUCCEEDED, now=now),
+    ]
+
+    async def finish_run(_seconds: float) -> None:
+        writer.write(stream="stdout", data=b"c\n")
+        writer.close()
+
+    sleeper = AsyncMock(spec=SleeperProtocol)
+    sleeper.sleep.side_effect = finish_run
+
+    handler = StreamRunOutputHandler(
+        uow=FakeUow(),
+        runs=runs,
+        run_logs=run_logs,
+        sleeper=sleeper,
+        poll_interval_seconds=0.5,
+    )
+
+    events = [
+        event
+        async for event in handler.stream(actor=actor, query=StreamRunOutputQuery(run_id=run_id))
+    ]
+
+    assert isinstance(events[0], RunOutputStatusEvent)
+    assert events[0].data.status is RunStatus.RUNNING
+    output = [event.data for event in events if isinstance(event, RunOutputChunkEvent)]
+    assert [(data.stream, data.text, data.seq) for data in output] == [
+        ("stdout", "a\nb\n", 2),
+        ("stderr", "oops\n", 3),
+        ("stdout", "c\n", 4),
+    ]
+    assert isinstance(events[-1], RunOutputDoneEvent)
+    assert events[-1].data.status is RunStatus.SUCCEEDED
+    sleeper.sleep.assert_awaited_with(0.5)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stream_rejects_runs_of_other_users(now: datetime, tmp_path) -> None:
+    actor = make_user()
+    run_id = uuid4()
+    runs = AsyncMock(spec=ToolRunRepositoryProtocol)
+    runs.get_by_id.return_value = make_run(
+        run_id=run_id, requested_by_user_id=uuid4(), status=RunStatus.RUNNING, now=now
+    )
+    handler = StreamRunOutputHandler(
+        uow=FakeUow(),
+        runs=runs,
+        run_logs=LocalRunLogBuffer(artifacts_root=tmp_path, max_bytes=4096),
+        sleeper=AsyncMock(spec=SleeperProtocol),
+        poll_interval_seconds=0.5,
+    )
+
+    with pytest.raises(DomainError) as exc_info:
+        async for _event in handler.stream(actor=actor, query=StreamRunOutputQuery(run_id=run_id)):
+            pass
+
+    assert exc_info.value.code is ErrorCode.NOT_FOUND
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import importlib.util
 from datetime import datetime
 from unittest.mock import AsyncMock, Mock
 from uuid import UUID, uuid4
@@ -24,6 +25,7 @@ from skriptoteket.domain.scripting.models import (
 from skriptoteket.domain.scripting.ui.contract_v2 import ToolUiContractV2Result
 from skriptoteket.domain.scripting.ui.normalizer import DeterministicUiPayloadNormalizer
 from skriptoteket.domain.scripting.ui.policy import DEFAULT_UI_POLICY, UiPolicyProfileId
+from skriptoteket.infrastructure.runner.code_cache import InMemoryToolCodeCache
 from skriptoteket.protocols.clock import ClockProtocol
 from skriptoteket.protocols.execution_queue import ToolRunJobRepositoryProtocol
 from skriptoteket.protocols.id_generator import IdGeneratorProtocol
@@ -149,9 +151,14 @@ async def test_execute_tool_version_commits_before_runner_execute(now: datetime)
         input_values: dict[str, object],
         memory_json: bytes,
         action_payload: dict[str, object] | None,
+        requested_by_user_id: UUID | None = None,
+        script_bytecode: bytes | None = None,
     ) -> ToolExecutionResult:
         del run_id, version, context, input_files, memory_json, action_payload
+        del requested_by_user_id
         assert input_values == {}
+        assert script_bytecode is not None
+        assert script_bytecode[:4] == importlib.util.MAGIC_NUMBER
         assert uow.active is False
         return execution_result
 
@@ -166,6 +173,7 @@ async def test_execute_tool_version_commits_before_runner_execute(now: datetime)
         run_inputs=run_inputs,
         sessions=sessions_repo,
         runner=runner,
+        code_cache=InMemoryToolCodeCache(max_entries=8),
         ui_policy_provider=ui_policy_provider,
         backend_actions=backend_actions,
         ui_normalizer=ui_normalizer,
@@ -241,6 +249,7 @@ async def test_execute_tool_version_marks_failed_on_capacity_error(now: datetime
         run_inputs=run_inputs,
         sessions=sessions_repo,
         runner=runner,
+        code_cache=InMemoryToolCodeCache(max_entries=8),
         ui_policy_provider=ui_policy_provider,
         backend_actions=backend_actions,
         ui_normalizer=ui_normalizer,
@@ -319,6 +328,7 @@ async def test_execute_tool_version_marks_failed_on_syntax_error_and_skips_runne
         run_inputs=run_inputs,
         sessions=sessions_repo,
         runner=runner,
+        code_cache=InMemoryToolCodeCache(max_entries=8),
         ui_policy_provider=ui_policy_provider,
         backend_actions=backend_actions,
         ui_normalizer=ui_normalizer,
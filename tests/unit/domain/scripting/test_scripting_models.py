@@ -6,6 +6,7 @@ import pytest
 from skriptoteket.domain.errors import DomainError, ErrorCode
 from skriptoteket.domain.scripting.input_files import InputFileEntry, InputManifest
 from skriptoteket.domain.scripting.models import (
+    ResultCacheStatus,
     RunContext,
     RunStatus,
     ToolVersion,
@@ -288,6 +289,7 @@ def test_publish_version_success() -> None:
         source_code="code",
         entrypoint="main.py",
         input_schema=[],
+        deterministic=True,
         created_by_user_id=uuid4(),
         derived_from_version_id=None,
         change_summary=None,
@@ -315,6 +317,7 @@ def test_publish_version_success() -> None:
     assert result.new_active_version.state == VersionState.ACTIVE
     assert result.new_active_version.version_number == 2
     assert result.new_active_version.published_by_user_id == publisher_id
+    assert result.new_active_version.deterministic is True
 
     assert result.archived_reviewed_version.id == in_review.id
     assert result.archived_reviewed_version.state == VersionState.ARCHIVED
@@ -430,10 +433,12 @@ def test_start_and_finish_tool_run() -> None:
         artifacts_manifest={},
         error_summary=None,
         ui_payload=UiPayloadV2(outputs=[], next_actions=[]),
+        result_cache=ResultCacheStatus.HIT,
     )
 
     assert finished.status == RunStatus.SUCCEEDED
     assert finished.finished_at == now
+    assert finished.result_cache is ResultCacheStatus.HIT
 
 
 def test_start_tool_run_validation() -> None:
@@ -1,12 +1,25 @@
+import gzip
+import hashlib
 import io
 import tarfile
+import time
 from uuid import uuid4
 
 import pytest
 
 from skriptoteket.domain.errors import DomainError, ErrorCode
 from skriptoteket.domain.scripting.artifacts import RunnerArtifact
+from skriptoteket.infrastructure.artifacts.filesystem import (
+    ArtifactsManifestBuilder,
+    build_artifacts_manifest,
+)
+from skriptoteket.infrastructure.artifacts.precompression import (
+    PRECOMPRESSED_DIRNAME,
+    PRECOMPRESSED_ENCODINGS,
+    precompressed_artifact_path,
+)
 from skriptoteket.infrastructure.runner.artifact_manager import FilesystemArtifactManager
+from skriptoteket.infrastructure.runner.path_safety import validate_output_path
 
 
 def _build_tar_bytes(*, members: list[tuple[str, bytes]]) -> bytes:
@@ -33,6 +46,92 @@ def test_store_output_archive_extracts_and_builds_manifest(tmp_path) -> None:
     stored_path = tmp_path / str(run_id) / "output" / "report.txt"
     assert stored_path.read_bytes() == b"hello"
     assert manifest.artifacts[0].path == "output/report.txt"
+    assert manifest.artifacts[0].bytes == 5
+    assert manifest.artifacts[0].sha256 == hashlib.sha256(b"hello").hexdigest()
+
+
+def test_store_output_archive_precompresses_large_text_artifacts(tmp_path) -> None:
+    run_id = uuid4()
+    manager = FilesystemArtifactManager(artifacts_root=tmp_path, precompress_min_bytes=1024)
+    csv = b"elev;betyg\n" * 500
+
+    manager.store_output_archive(
+        run_id=run_id,
+        output_archive=[
+            _build_tar_bytes(
+                members=[
+                    ("output/grades.csv", csv),
+                    ("output/small.txt", b"hej"),
+                    ("output/photo.png", b"\x00" * 4096),
+                ]
+            )
+        ],
+        reported_artifacts=[],
+    )
+
+    run_dir = tmp_path / str(run_id)
+    sidecar = precompressed_artifact_path(
+        run_dir=run_dir, artifact_path="output/grades.csv", encoding="gzip"
+    )
+    assert gzip.decompress(sidecar.read_bytes()) == csv
+    # Only the large text file gets sidecars (small and binary files are skipped).
+    assert sorted(
+        path for path in (run_dir / PRECOMPRESSED_DIRNAME).rglob("*") if path.is_file()
+    ) == sorted(
+        precompressed_artifact_path(
+            run_dir=run_dir, artifact_path="output/grades.csv", encoding=encoding
+        )
+        for encoding in PRECOMPRESSED_ENCODINGS
+    )
+    assert build_artifacts_manifest(run_dir=run_dir).artifacts[0].path == "output/grades.csv"
+
+
+def test_store_output_archive_manifest_matches_directory_walk(tmp_path) -> None:
+    run_id = uuid4()
+    manager = FilesystemArtifactManager(artifacts_root=tmp_path)
+
+    # Tar order differs from path order; a later member overwrites an earlier one.
+    tar_bytes = _build_tar_bytes(
+        members=[
+            ("output/b.txt", b"first"),
+            ("output/a-b.txt", b"dash"),
+            ("output/a/b.txt", b"nested"),
+            ("output/a_b.txt", b"underscore"),
+            ("output/b.txt", b"second"),
+        ]
+    )
+    manifest = manager.store_output_archive(
+        run_id=run_id, output_archive=[tar_bytes], reported_artifacts=[]
+    )
+
+    assert manifest == build_artifacts_manifest(run_dir=tmp_path / str(run_id), known=manifest)
+    by_path = {artifact.path: artifact for artifact in manifest.artifacts}
+    assert len(by_path) == 4
+    assert by_path["output/b.txt"].bytes == 6
+    assert by_path["output/b.txt"].sha256 == hashlib.sha256(b"second").hexdigest()
+
+
+def test_build_artifacts_manifest_reuses_recorded_digests_without_hashing(tmp_path) -> None:
+    run_id = uuid4()
+    manager = FilesystemArtifactManager(artifacts_root=tmp_path)
+    recorded = manager.store_output_archive(
+        run_id=run_id,
+        output_archive=[
+            _build_tar_bytes(members=[("output/a.txt", b"alpha"), ("output/b.txt", b"beta")])
+        ],
+        reported_artifacts=[],
+    )
+    (tmp_path / str(run_id) / "output" / "b.txt").write_bytes(b"rewritten")
+
+    walked = build_artifacts_manifest(run_dir=tmp_path / str(run_id), known=recorded)
+    unknown = build_artifacts_manifest(run_dir=tmp_path / str(run_id))
+
+    by_path = {artifact.path: artifact for artifact in walked.artifacts}
+    assert by_path["output/a.txt"].sha256 == hashlib.sha256(b"alpha").hexdigest()
+    # The size no longer matches the recorded entry, so its digest is not trusted.
+    assert by_path["output/b.txt"].sha256 is None
+    assert by_path["output/b.txt"].bytes == len(b"rewritten")
+    assert [artifact.sha256 for artifact in unknown.artifacts] == [None, None]
 
 
 def test_store_output_archive_rejects_path_traversal(tmp_path) -> None:
@@ -143,3 +242,63 @@ def test_store_output_archive_rejects_reported_artifact_with_invalid_path(tmp_pa
         )
 
     assert exc_info.value.code == ErrorCode.INTERNAL_ERROR
+
+
+@pytest.mark.slow
+def test_benchmark_single_pass_extraction_vs_extract_then_walk(tmp_path) -> None:
+    """Store 2,000 small artifacts (a many-file docx batch) with the manifest built while
+    extracting vs. extracting first and walking the directory afterwards.
+
+    Reports numbers only (no timing assertion). Run with
+    `pdm run pytest -m slow -s <this file>` to see them.
+    """
+    file_count = 2_000
+    tar_bytes = _build_tar_bytes(
+        members=[
+            (f"output/batch/elev-{index:04d}.docx", bytes([index % 256]) * 16_384)
+            for index in range(file_count)
+        ]
+    )
+    manager = FilesystemArtifactManager(artifacts_root=tmp_path)
+
+    def single_pass() -> None:
+        manager.store_output_archive(
+            run_id=uuid4(), output_archive=[tar_bytes], reported_artifacts=[]
+        )
+
+    def extract_then_walk() -> None:
+        # The pre-single-pass algorithm: plain extraction, then a walk that re-reads and hashes.
+        run_dir = tmp_path / "baseline" / str(uuid4())
+        run_dir.mkdir(parents=True)
+        with tarfile.open(fileobj=io.BytesIO(tar_bytes), mode="r|") as tar:
+            tar.extractall(run_dir, filter="data")
+        builder = ArtifactsManifestBuilder()
+        for file_path in (run_dir / "output").rglob("*"):
+            if not file_path.is_file():
+                continue
+            relative_path = file_path.relative_to(run_dir).as_posix()
+            validate_output_path(path=relative_path)
+            digest = hashlib.sha256()
+            size = 0
+            with file_path.open("rb") as handle:
+                while chunk := handle.read(64 * 1024):
+                    digest.update(chunk)
+                    size += len(chunk)
+            builder.add(path=relative_path, size=size, sha256=digest.hexdigest())
+        builder.build()
+
+    def best_of(fn, rounds: int = 3) -> float:
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    single = best_of(single_pass)
+    two = best_of(extract_then_walk)
+
+    print(
+        f"\nstore {file_count} artifacts: single pass {single * 1000:.0f} ms, "
+        f"extract + walk {two * 1000:.0f} ms ({two / single:.2f}x)"
+    )
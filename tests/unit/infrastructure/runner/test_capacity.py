@@ -1,5 +1,8 @@
+import asyncio
+
 import pytest
 
+from skriptoteket.domain.scripting.models import RunContext
 from skriptoteket.infrastructure.runner.capacity import RunnerCapacityLimiter
 
 
@@ -55,3 +58,91 @@ def test_max_concurrency_property_returns_configured_value() -> None:
     limiter = RunnerCapacityLimiter(max_concurrency=5)
 
     assert limiter.max_concurrency == 5
+
+
+@pytest.mark.asyncio
+async def test_try_acquire_in_queue_mode_waits_for_release() -> None:
+    limiter = RunnerCapacityLimiter(max_concurrency=1, max_queue_length=2, max_wait_seconds=1.0)
+    await limiter.try_acquire()
+
+    waiter = asyncio.create_task(limiter.try_acquire(context=RunContext.SANDBOX, owner_key="a"))
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 1
+
+    await limiter.release()
+
+    assert await waiter is True
+    assert limiter.queue_depth == 0
+    assert await limiter.try_acquire() is False
+
+
+@pytest.mark.asyncio
+async def test_try_acquire_in_queue_mode_times_out() -> None:
+    limiter = RunnerCapacityLimiter(max_concurrency=1, max_queue_length=1, max_wait_seconds=0.01)
+    await limiter.try_acquire()
+
+    result = await limiter.try_acquire(context=RunContext.PRODUCTION)
+
+    assert result is False
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_try_acquire_in_queue_mode_rejects_when_queue_full() -> None:
+    limiter = RunnerCapacityLimiter(max_concurrency=1, max_queue_length=1, max_wait_seconds=1.0)
+    await limiter.try_acquire()
+    queued = asyncio.create_task(limiter.try_acquire(owner_key="a"))
+    await asyncio.sleep(0)
+
+    assert await limiter.try_acquire(owner_key="b") is False
+
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_try_acquire_in_queue_mode_limits_entries_per_owner() -> None:
+    limiter = RunnerCapacityLimiter(
+        max_concurrency=1,
+        max_queue_length=5,
+        max_wait_seconds=1.0,
+        max_queued_per_owner=1,
+    )
+    await limiter.try_acquire()
+    first = asyncio.create_task(limiter.try_acquire(owner_key="a"))
+    other = asyncio.create_task(limiter.try_acquire(owner_key="b"))
+    await asyncio.sleep(0)
+
+    assert await limiter.try_acquire(owner_key="a") is False
+
+    await limiter.release()
+    assert await first is True
+    await limiter.release()
+    assert await other is True
+
+
+@pytest.mark.asyncio
+async def test_release_hands_slots_to_waiters_in_fifo_order() -> None:
+    limiter = RunnerCapacityLimiter(max_concurrency=1, max_queue_length=3, max_wait_seconds=1.0)
+    await limiter.try_acquire()
+    admitted: list[str] = []
+
+    async def acquire(owner: str) -> None:
+        if await limiter.try_acquire(owner_key=owner):
+            admitted.append(owner)
+
+    tasks = [asyncio.create_task(acquire(owner)) for owner in ("a", "b", "c")]
+    await asyncio.sleep(0)
+    for _ in tasks:
+        await limiter.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    assert admitted == ["a", "b", "c"]
+
+
+def test_init_with_queue_but_no_wait_raises_value_error() -> None:
+    with pytest.raises(ValueError, match="max_wait_seconds must be > 0"):
+        RunnerCapacityLimiter(max_concurrency=1, max_queue_length=1)
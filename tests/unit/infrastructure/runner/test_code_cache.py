@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import importlib.util
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from _runner import _load_module_from_path
+from prometheus_client import REGISTRY
+
+from skriptoteket.domain.scripting.models import ToolVersion, VersionState
+from skriptoteket.domain.scripting.tool_versions import compute_content_hash
+from skriptoteket.infrastructure.runner.code_cache import (
+    InMemoryToolCodeCache,
+    build_hash_based_pyc,
+)
+from skriptoteket.observability.metrics import get_metrics
+
+
+def _make_tool_version(*, source_code: str, content_hash: str | None = None) -> ToolVersion:
+    return ToolVersion(
+        id=uuid4(),
+        tool_id=uuid4(),
+        version_number=1,
+        state=VersionState.DRAFT,
+        entrypoint="run_tool",
+        source_code=source_code,
+        content_hash=content_hash
+        or compute_content_hash(entrypoint="run_tool", source_code=source_code),
+        derived_from_version_id=None,
+        created_by_user_id=uuid4(),
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def _lookups(result: str) -> float:
+    get_metrics()
+    value = REGISTRY.get_sample_value(
+        "skriptoteket_tool_code_cache_lookups_total", {"result": result}
+    )
+    return value or 0.0
+
+
+def test_build_hash_based_pyc_writes_unchecked_hash_header() -> None:
+    source = b"VALUE = 1\n"
+
+    pyc = build_hash_based_pyc(source=source, filename="/work/script.py")
+
+    assert pyc[:4] == importlib.util.MAGIC_NUMBER
+    assert int.from_bytes(pyc[4:8], "little") == 0b01
+    assert pyc[8:16] == importlib.util.source_hash(source)
+
+
+def test_compile_caches_by_content_hash() -> None:
+    cache = InMemoryToolCodeCache(max_entries=4)
+    version = _make_tool_version(source_code="def run_tool(i, o): return 'ok'\n")
+    hits_before, misses_before = _lookups("hit"), _lookups("miss")
+
+    first = cache.compile(version=version)
+    second = cache.compile(version=version.model_copy(update={"id": uuid4()}))
+
+    assert second is first
+    assert first.content_hash == version.content_hash
+    assert _lookups("miss") - misses_before == 1
+    assert _lookups("hit") - hits_before == 1
+
+
+def test_compile_does_not_cache_syntax_errors() -> None:
+    cache = InMemoryToolCodeCache(max_entries=4)
+    version = _make_tool_version(source_code="def run_tool(:\n")
+    misses_before = _lookups("miss")
+
+    for _ in range(2):
+        with pytest.raises(SyntaxError):
+            cache.compile(version=version)
+
+    assert _lookups("miss") - misses_before == 2
+
+
+def test_compile_recompiles_when_source_differs_for_same_content_hash() -> None:
+    cache = InMemoryToolCodeCache(max_entries=4)
+    first = cache.compile(version=_make_tool_version(source_code="A = 1\n", content_hash="same"))
+
+    second = cache.compile(version=_make_tool_version(source_code="A = 2\n", content_hash="same"))
+
+    assert second is not first
+    assert second.pyc[8:16] == importlib.util.source_hash(b"A = 2\n")
+
+
+def test_compile_evicts_least_recently_used_entry() -> None:
+    cache = InMemoryToolCodeCache(max_entries=2)
+    a = _make_tool_version(source_code="A = 1\n")
+    b = _make_tool_version(source_code="B = 1\n")
+    c = _make_tool_version(source_code="C = 1\n")
+
+    compiled_a = cache.compile(version=a)
+    cache.compile(version=b)
+    assert cache.compile(version=a) is compiled_a
+    cache.compile(version=c)
+
+    assert cache.compile(version=a) is compiled_a
+    misses_before = _lookups("miss")
+    cache.compile(version=b)
+    assert _lookups("miss") - misses_before == 1
+
+
+def test_runner_executes_matching_pyc_and_falls_back_on_stale_source(tmp_path: Path) -> None:
+    script_path = tmp_path / "script.py"
+    code_path = tmp_path / "script.pyc"
+    # Header matches the source on disk, but the code body sets a different value, so the loaded
+    # module reveals whether the pyc was used.
+    script_path.write_bytes(b"ORIGIN = 'source'\n")
+    pyc = build_hash_based_pyc(source=b"ORIGIN = 'source'\n", filename=str(script_path))
+    code_path.write_bytes(
+        pyc[:16] + build_hash_based_pyc(source=b"ORIGIN = 'pyc'\n", filename="")[16:]
+    )
+
+    module = _load_module_from_path(module_path=script_path, code_path=code_path)
+    assert getattr(module, "ORIGIN") == "pyc"
+
+    script_path.write_bytes(b"ORIGIN = 'edited'\n")
+    module = _load_module_from_path(module_path=script_path, code_path=code_path)
+    assert getattr(module, "ORIGIN") == "edited"
+
+    code_path.write_bytes(b"\x00" * 32)
+    module = _load_module_from_path(module_path=script_path, code_path=code_path)
+    assert getattr(module, "ORIGIN") == "edited"
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import struct
+from collections.abc import AsyncIterator, Callable
+
+import httpx
+import pytest
+from docker.errors import NotFound
+
+from skriptoteket.infrastructure.runner.docker.async_client import (
+    HttpxDockerClient,
+    demultiplex_log_stream,
+    engine_create_container_body,
+)
+from skriptoteket.infrastructure.runner.docker.container_spec import (
+    DockerRunnerLimits,
+    build_sandbox_container_kwargs,
+)
+from skriptoteket.infrastructure.runner.docker.protocols import AsyncDockerContainerProtocol
+
+
+def _frame(stream: int, payload: bytes) -> bytes:
+    return struct.pack(">BxxxL", stream, len(payload)) + payload
+
+
+def _client(routes: dict[str, Callable[[httpx.Request], httpx.Response]]) -> HttpxDockerClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/v1.41/containers/create":
+            return httpx.Response(201, json={"Id": "abc"})
+        return routes[request.url.path](request)
+
+    return HttpxDockerClient(
+        http=httpx.AsyncClient(
+            transport=httpx.MockTransport(handler),
+            base_url="http://docker/v1.41",
+        )
+    )
+
+
+async def _create_container(client: HttpxDockerClient) -> AsyncDockerContainerProtocol:
+    return await client.containers.create(image="skriptoteket-runner:unit-test", labels={})
+
+
+def test_engine_create_container_body_translates_sandbox_spec() -> None:
+    kwargs = build_sandbox_container_kwargs(
+        image="skriptoteket-runner:unit-test",
+        limits=DockerRunnerLimits(
+            cpu_limit=0.5,
+            memory_limit="256m",
+            pids_limit=64,
+            tmpfs_tmp="size=64m",
+        ),
+        environment={"HOME": "/tmp/home"},
+        volume_name="work-volume",
+        labels={"skriptoteket.run_id": "run-1"},
+    )
+
+    body = engine_create_container_body(kwargs)
+
+    assert body["Env"] == ["HOME=/tmp/home"]
+    assert body["User"] == "runner"
+    assert body["HostConfig"] == {
+        "NetworkMode": "none",
+        "CapDrop": ["ALL"],
+        "PidsLimit": 64,
+        "ReadonlyRootfs": True,
+        "Tmpfs": {"/tmp": "size=64m"},
+        "Binds": ["work-volume:/work:rw"],
+        "NanoCpus": 500_000_000,
+        "Memory": 256 * 1024 * 1024,
+    }
+
+
+def test_demultiplex_log_stream_strips_frame_headers() -> None:
+    data = _frame(1, b"hello ") + _frame(1, b"world")
+
+    assert demultiplex_log_stream(data) == b"hello world"
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_exit_code_from_die_event() -> None:
+    def events(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.url.params["filters"])["container"] == ["abc"]
+        event = {"Action": "die", "Actor": {"Attributes": {"exitCode": "3"}}}
+        return httpx.Response(200, content=json.dumps(event).encode("utf-8") + b"\n")
+
+    client = _client(
+        {
+            "/v1.41/events": events,
+            "/v1.41/containers/abc/json": lambda _request: httpx.Response(
+                200, json={"State": {"Status": "running"}}
+            ),
+        }
+    )
+    container = await _create_container(client)
+
+    assert await container.wait(timeout=5) == 3
+    assert container.status == "exited"
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_immediately_when_container_already_exited() -> None:
+    client = _client(
+        {
+            "/v1.41/events": lambda _request: httpx.Response(200, content=b""),
+            "/v1.41/containers/abc/json": lambda _request: httpx.Response(
+                200, json={"State": {"Status": "exited", "ExitCode": 0}}
+            ),
+        }
+    )
+    container = await _create_container(client)
+
+    assert await container.wait(timeout=5) == 0
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_logs_are_demultiplexed() -> None:
+    client = _client(
+        {
+            "/v1.41/containers/abc/logs": lambda _request: httpx.Response(
+                200, content=_frame(1, b"out")
+            ),
+        }
+    )
+    container = await _create_container(client)
+
+    assert await container.logs(stdout=True, stderr=False) == b"out"
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_get_archive_raises_not_found() -> None:
+    client = _client(
+        {
+            "/v1.41/containers/abc/archive": lambda _request: httpx.Response(
+                404, json={"message": "no such file"}
+            ),
+        }
+    )
+    container = await _create_container(client)
+
+    with pytest.raises(NotFound):
+        async for _chunk in container.get_archive(path="/work/result.json"):
+            pass
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_follow_logs_reassembles_frames_split_across_reads() -> None:
+    payload = _frame(1, b"first\n") + _frame(1, b"second\n")
+
+    async def network_reads() -> AsyncIterator[bytes]:
+        # 5-byte reads split both frame headers and payloads.
+        for offset in range(0, len(payload), 5):
+            yield payload[offset : offset + 5]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["follow"] == "1"
+        return httpx.Response(200, content=network_reads())
+
+    client = _client({"/v1.41/containers/abc/logs": handler})
+    container = await _create_container(client)
+
+    chunks = [chunk async for chunk in container.follow_logs(stdout=True, stderr=False)]
+
+    assert b"".join(chunks) == b"first\nsecond\n"
+    await client.close()
@@ -0,0 +1,520 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import tarfile
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from docker.errors import DockerException, NotFound
+from prometheus_client import REGISTRY
+
+from skriptoteket.domain.errors import DomainError, ErrorCode
+from skriptoteket.domain.scripting.artifacts import ArtifactsManifest
+from skriptoteket.domain.scripting.models import (
+    RunContext,
+    RunStatus,
+    ToolVersion,
+    VersionState,
+    compute_content_hash,
+)
+from skriptoteket.infrastructure.runner.capacity import RunnerCapacityLimiter
+from skriptoteket.infrastructure.runner.docker import async_runner as async_runner_module
+from skriptoteket.infrastructure.runner.docker.async_runner import AsyncDockerToolRunner
+from skriptoteket.infrastructure.runner.docker.container_spec import DockerRunnerLimits
+from skriptoteket.observability.metrics import get_metrics
+from skriptoteket.protocols.runner import ArtifactManagerProtocol
+
+
+def _single_file_tar(*, name: str, data: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        info = tarfile.TarInfo(name=name)
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def _result_tar(*, status: str, artifacts: list[dict[str, object]] | None = None) -> bytes:
+    payload = {
+        "contract_version": 2,
+        "status": status,
+        "error_summary": None,
+        "outputs": [{"kind": "notice", "level": "info", "message": "ok"}],
+        "next_actions": [],
+        "state": None,
+        "artifacts": artifacts or [],
+    }
+    return _single_file_tar(name="result.json", data=json.dumps(payload).encode("utf-8"))
+
+
+class FakeVolume:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.removed = False
+
+    async def remove(self, *, force: bool) -> None:
+        self.removed = True
+
+
+class FakeContainer:
+    def __init__(self, *, labels: dict[str, str], status: str = "created") -> None:
+        self.id = str(uuid4())
+        self.status = status
+        self.labels = labels
+        self.archives: dict[str, bytes] = {}
+        self.put_archives: list[tuple[str, bytes]] = []
+        self.stdout = b"stdout"
+        self.stderr = b"stderr"
+        self.wait_outcomes: list[int | BaseException] = [0]
+        self.stats_samples: list[dict[str, object]] = []
+        self.killed = False
+        self.removed = False
+
+    async def reload(self) -> None:
+        return None
+
+    async def put_archive(self, *, path: str, data: bytes | AsyncIterable[bytes]) -> None:
+        if not isinstance(data, bytes):
+            data = b"".join([chunk async for chunk in data])
+        self.put_archives.append((path, data))
+
+    async def start(self) -> None:
+        self.status = "running"
+
+    async def wait(self, *, timeout: float) -> int:
+        # Yield once so background tasks (stats sampling) get to run, as during a real wait.
+        await asyncio.sleep(0)
+        outcome = self.wait_outcomes.pop(0) if self.wait_outcomes else 0
+        if isinstance(outcome, BaseException):
+            raise outcome
+        self.status = "exited"
+        return outcome
+
+    async def kill(self) -> None:
+        self.killed = True
+
+    async def logs(self, *, stdout: bool, stderr: bool) -> bytes:
+        return self.stdout if stdout else self.stderr
+
+    async def follow_stats(self) -> AsyncIterator[dict[str, object]]:
+        for sample in self.stats_samples:
+            yield sample
+
+    async def get_archive(self, *, path: str) -> AsyncIterator[bytes]:
+        if path not in self.archives:
+            raise NotFound("Not found")
+        yield self.archives[path]
+
+    async def remove(self, *, force: bool) -> None:
+        self.removed = True
+
+
+class FakeAsyncDockerClient:
+    def __init__(self) -> None:
+        self.created_kwargs: list[dict[str, object]] = []
+        self.created: list[FakeContainer] = []
+        self.volumes_created: list[FakeVolume] = []
+        self.existing: list[FakeContainer] = []
+        self.next_archives: dict[str, bytes] = {}
+        self.next_wait_outcomes: list[int | BaseException] = [0]
+        self.next_stats_samples: list[dict[str, object]] = []
+        self.volume_error: BaseException | None = None
+        self.containers = MagicMock()
+        self.containers.create = AsyncMock(side_effect=self._create_container)
+        self.containers.list = AsyncMock(side_effect=lambda **_kwargs: list(self.existing))
+        self.volumes = MagicMock()
+        self.volumes.create = AsyncMock(side_effect=self._create_volume)
+        self.volumes.list = AsyncMock(return_value=[])
+
+    async def _create_volume(self, **_kwargs: object) -> FakeVolume:
+        if self.volume_error is not None:
+            raise self.volume_error
+        volume = FakeVolume(f"work-volume-{len(self.volumes_created)}")
+        self.volumes_created.append(volume)
+        return volume
+
+    async def _create_container(self, **kwargs: object) -> FakeContainer:
+        labels = kwargs["labels"]
+        assert isinstance(labels, dict)
+        container = FakeContainer(labels=labels)
+        container.archives = dict(self.next_archives)
+        container.wait_outcomes = list(self.next_wait_outcomes)
+        container.stats_samples = list(self.next_stats_samples)
+        self.created_kwargs.append(kwargs)
+        self.created.append(container)
+        return container
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        return None
+
+
+@pytest.fixture
+def tool_version(now: datetime) -> ToolVersion:
+    source_code = "def run_tool(input_path: str, output_dir: str) -> str:\n    return '<p>Hi</p>'\n"
+    entrypoint = "run_tool"
+    return ToolVersion(
+        id=uuid4(),
+        tool_id=uuid4(),
+        version_number=1,
+        state=VersionState.DRAFT,
+        source_code=source_code,
+        entrypoint=entrypoint,
+        content_hash=compute_content_hash(entrypoint=entrypoint, source_code=source_code),
+        derived_from_version_id=None,
+        created_by_user_id=uuid4(),
+        created_at=now,
+        submitted_for_review_by_user_id=None,
+        submitted_for_review_at=None,
+        reviewed_by_user_id=None,
+        reviewed_at=None,
+        published_by_user_id=None,
+        published_at=None,
+        change_summary=None,
+        review_note=None,
+    )
+
+
+@pytest.fixture
+def mock_capacity() -> MagicMock:
+    capacity = MagicMock(spec=RunnerCapacityLimiter)
+    capacity.try_acquire = AsyncMock(return_value=True)
+    capacity.release = AsyncMock()
+    return capacity
+
+
+@pytest.fixture
+def mock_artifacts() -> MagicMock:
+    artifacts = MagicMock(spec=ArtifactManagerProtocol)
+    artifacts.store_output_archive.return_value = ArtifactsManifest(artifacts=[])
+    return artifacts
+
+
+@pytest.fixture
+def docker_client() -> FakeAsyncDockerClient:
+    return FakeAsyncDockerClient()
+
+
+def _build_runner(
+    *,
+    mock_capacity: MagicMock,
+    mock_artifacts: MagicMock,
+    docker_client: FakeAsyncDockerClient,
+    resource_stats: bool = False,
+) -> AsyncDockerToolRunner:
+    return AsyncDockerToolRunner(
+        runner_image="skriptoteket-runner:unit-test",
+        sandbox_timeout_seconds=30,
+        production_timeout_seconds=60,
+        limits=DockerRunnerLimits(
+            cpu_limit=1.0,
+            memory_limit="256m",
+            pids_limit=128,
+            tmpfs_tmp="size=64m",
+        ),
+        output_max_stdout_bytes=2048,
+        output_max_stderr_bytes=2048,
+        output_max_error_summary_bytes=2048,
+        capacity=mock_capacity,
+        artifacts=mock_artifacts,
+        client=docker_client,
+        resource_stats=resource_stats,
+    )
+
+
+@pytest.fixture
+def runner(
+    mock_capacity: MagicMock,
+    mock_artifacts: MagicMock,
+    docker_client: FakeAsyncDockerClient,
+) -> AsyncDockerToolRunner:
+    return _build_runner(
+        mock_capacity=mock_capacity, mock_artifacts=mock_artifacts, docker_client=docker_client
+    )
+
+
+async def _execute(runner: AsyncDockerToolRunner, tool_version: ToolVersion):
+    return await runner.execute(
+        run_id=uuid4(),
+        version=tool_version,
+        context=RunContext.SANDBOX,
+        input_files=[("input.txt", b"input")],
+        input_values={},
+        memory_json=b'{"settings":{}}',
+        action_payload=None,
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_success(
+    runner: AsyncDockerToolRunner,
+    docker_client: FakeAsyncDockerClient,
+    tool_version: ToolVersion,
+    mock_capacity: MagicMock,
+    mock_artifacts: MagicMock,
+) -> None:
+    docker_client.next_archives = {
+        "/work/result.json": _result_tar(status="succeeded"),
+        "/work/output": b"tar_stream",
+    }
+
+    result = await _execute(runner, tool_version)
+
+    assert result.status is RunStatus.SUCCEEDED
+    assert result.stdout == "stdout"
+    assert result.stderr == "stderr"
+    mock_capacity.release.assert_awaited_once()
+    mock_artifacts.store_output_archive.assert_called_once()
+
+    kwargs = docker_client.created_kwargs[0]
+    assert kwargs["network_mode"] == "none"
+    assert kwargs["read_only"] is True
+    environment = kwargs["environment"]
+    assert isinstance(environment, dict)
+    assert environment["SKRIPTOTEKET_INPUTS"] == "{}"
+    assert json.loads(environment["SKRIPTOTEKET_INPUT_MANIFEST"])["files"][0]["name"] == (
+        "input.txt"
+    )
+    container = docker_client.created[0]
+    assert container.put_archives[0][0] == "/work"
+    assert container.removed is True
+    assert docker_client.volumes_created[0].removed is True
+    assert result.resource_usage is None
+
+
+def _phase_count(phase: str) -> float:
+    get_metrics()
+    value = REGISTRY.get_sample_value(
+        "skriptoteket_runner_phase_duration_seconds_count", {"phase": phase}
+    )
+    return value or 0.0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_observes_phase_durations(
+    runner: AsyncDockerToolRunner,
+    docker_client: FakeAsyncDockerClient,
+    tool_version: ToolVersion,
+) -> None:
+    docker_client.next_archives = {
+        "/work/result.json": _result_tar(status="succeeded"),
+        "/work/output": b"tar_stream",
+    }
+    phases = (
+        "volume_create",
+        "container_create",
+        "put_archive",
+        "start",
+        "container_wait",
+        "logs",
+        "result_json",
+        "artifacts",
+    )
+    before = {phase: _phase_count(phase) for phase in phases}
+
+    await _execute(runner, tool_version)
+
+    assert {phase: _phase_count(phase) - before[phase] for phase in phases} == dict.fromkeys(
+        phases, 1.0
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_samples_container_resource_usage_when_enabled(
+    docker_client: FakeAsyncDockerClient,
+    tool_version: ToolVersion,
+    mock_capacity: MagicMock,
+    mock_artifacts: MagicMock,
+) -> None:
+    runner = _build_runner(
+        mock_capacity=mock_capacity,
+        mock_artifacts=mock_artifacts,
+        docker_client=docker_client,
+        resource_stats=True,
+    )
+    docker_client.next_archives = {
+        "/work/result.json": _result_tar(status="succeeded"),
+        "/work/output": b"tar_stream",
+    }
+    docker_client.next_stats_samples = [
+        {"memory_stats": {"usage": 50_000_000}, "pids_stats": {"current": 3}},
+        {
+            "memory_stats": {"usage": 40_000_000},
+            "cpu_stats": {"cpu_usage": {"total_usage": 1_500_000_000}},
+            "pids_stats": {"current": 2},
+        },
+    ]
+
+    result = await _execute(runner, tool_version)
+
+    assert result.resource_usage is not None
+    assert result.resource_usage.memory_peak_bytes == 50_000_000
+    assert result.resource_usage.cpu_seconds == 1.5
+    assert result.resource_usage.pids_peak == 3
+    assert result.resource_usage.samples == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_streams_output_archive_to_artifact_manager(
+    runner: AsyncDockerToolRunner,
+    docker_client: FakeAsyncDockerClient,
+    tool_version: ToolVersion,
+    mock_artifacts: MagicMock,
+) -> None:
+    seen: list[bytes] = []
+
+    def store_output_archive(*, run_id, output_archive, reported_artifacts):
+        seen.append(b"".join(output_archive))
+        return ArtifactsManifest(artifacts=[])
+
+    mock_artifacts.store_output_archive.side_effect = store_output_archive
+    docker_client.next_archives = {
+        "/work/result.json": _result_tar(status="succeeded"),
+        "/work/output": b"tar_stream",
+    }
+
+    await _execute(runner, tool_version)
+
+    assert seen == [b"tar_stream"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_spools_large_output_archive_to_disk(
+    runner: AsyncDockerToolRunner,
+    docker_client: FakeAsyncDockerClient,
+    tool_version: ToolVersion,
+    mock_artifacts: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(async_runner_module, "_ARCHIVE_SPOOL_MAX_BYTES", 4)
+    seen: list[bytes] = []
+
+    def store_output_archive(*, run_id, output_archive, reported_artifacts):
+        seen.append(b"".join(output_archive))
+        return ArtifactsManifest(artifacts=[])
+
+    mock_artifacts.store_output_archive.side_effect = store_output_archive
+    docker_client.next_archives = {
+        "/work/result.json": _result_tar(status="succeeded"),
+        "/work/output": b"tar_stream",
+    }
+
+    await _execute(runner, tool_version)
+
+    assert seen == [b"tar_stream"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_missing_result_json_returns_failed(
+    runner: AsyncDockerToolRunner,
+    tool_version: ToolVersion,
+) -> None:
+    with pytest.raises(DomainError) as exc_info:
+        await _execute(runner, tool_version)
+
+    assert exc_info.value.code is ErrorCode.INTERNAL_ERROR
+    assert exc_info.value.message == "Execution failed (runner contract violation)."
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_timeout_kills_container_and_returns_timed_out(
+    runner: AsyncDockerToolRunner,
+    docker_client: FakeAsyncDockerClient,
+    tool_version: ToolVersion,
+) -> None:
+    docker_client.next_wait_outcomes = [TimeoutError(), 137]
+
+    result = await _execute(runner, tool_version)
+
+    assert result.status is RunStatus.TIMED_OUT
+    assert result.ui_result.error_summary == "Execution timed out."
+    assert docker_client.created[0].killed is True
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_artifact_extraction_violation_returns_failed(
+    runner: AsyncDockerToolRunner,
+    docker_client: FakeAsyncDockerClient,
+    tool_version: ToolVersion,
+    mock_artifacts: MagicMock,
+) -> None:
+    docker_client.next_archives = {
+        "/work/result.json": _result_tar(
+            status="succeeded",
+            artifacts=[{"path": "output/report.txt", "bytes": 1}],
+        ),
+        "/work/output": b"tar_stream",
+    }
+    mock_artifacts.store_output_archive.side_effect = DomainError(
+        code=ErrorCode.INTERNAL_ERROR,
+        message="Runner contract violation: unsafe artifact path",
+    )
+
+    with pytest.raises(DomainError) as exc_info:
+        await _execute(runner, tool_version)
+
+    assert exc_info.value.message == "Execution failed (artifact extraction violation)."
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_returns_service_unavailable_when_docker_unreachable(
+    runner: AsyncDockerToolRunner,
+    docker_client: FakeAsyncDockerClient,
+    tool_version: ToolVersion,
+    mock_capacity: MagicMock,
+) -> None:
+    docker_client.volume_error = DockerException("Docker is not reachable")
+
+    with pytest.raises(DomainError) as exc_info:
+        await _execute(runner, tool_version)
+
+    assert exc_info.value.code is ErrorCode.SERVICE_UNAVAILABLE
+    mock_capacity.release.assert_awaited_once()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_try_adopt_waits_for_running_container(
+    runner: AsyncDockerToolRunner,
+    docker_client: FakeAsyncDockerClient,
+    tool_version: ToolVersion,
+) -> None:
+    run_id = uuid4()
+    container = FakeContainer(labels={"skriptoteket.run_id": str(run_id)}, status="running")
+    container.archives = {"/work/result.json": _result_tar(status="succeeded")}
+    docker_client.existing = [container]
+
+    result = await runner.try_adopt(run_id=run_id, version=tool_version, context=RunContext.SANDBOX)
+
+    assert result is not None
+    assert result.status is RunStatus.SUCCEEDED
+    assert container.removed is True
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_try_adopt_returns_none_without_container(
+    runner: AsyncDockerToolRunner,
+    tool_version: ToolVersion,
+) -> None:
+    result = await runner.try_adopt(
+        run_id=uuid4(), version=tool_version, context=RunContext.SANDBOX
+    )
+
+    assert result is None
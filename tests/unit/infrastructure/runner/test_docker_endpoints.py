@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from docker.errors import DockerException, NotFound
+from prometheus_client import REGISTRY
+
+from skriptoteket.domain.errors import DomainError, ErrorCode
+from skriptoteket.domain.scripting.artifacts import ArtifactsManifest
+from skriptoteket.domain.scripting.models import (
+    RunContext,
+    RunStatus,
+    ToolVersion,
+    VersionState,
+    compute_content_hash,
+)
+from skriptoteket.infrastructure.runner.capacity import RunnerCapacityLimiter
+from skriptoteket.infrastructure.runner.docker.endpoints import (
+    DockerEndpoint,
+    DockerEndpointConfig,
+    DockerEndpointPool,
+    parse_docker_endpoints,
+)
+from skriptoteket.infrastructure.runner.docker.shared_client import PersistentDockerClient
+from skriptoteket.infrastructure.runner.docker_runner import DockerRunnerLimits, DockerToolRunner
+from skriptoteket.observability.metrics import get_metrics
+from skriptoteket.protocols.runner import ArtifactManagerProtocol
+
+
+def _result_tar() -> bytes:
+    payload = json.dumps(
+        {
+            "contract_version": 2,
+            "status": "succeeded",
+            "error_summary": None,
+            "outputs": [],
+            "next_actions": [],
+            "state": None,
+            "artifacts": [],
+        }
+    ).encode("utf-8")
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        info = tarfile.TarInfo(name="result.json")
+        info.size = len(payload)
+        tar.addfile(info, io.BytesIO(payload))
+    return buffer.getvalue()
+
+
+def _host() -> MagicMock:
+    """A Docker client fake whose containers complete successfully."""
+    client = MagicMock()
+    volume = MagicMock()
+    volume.name = "work-volume"
+    client.volumes.create.return_value = volume
+    client.containers.list.return_value = []
+
+    def create_container(**_kwargs: object) -> MagicMock:
+        container = MagicMock()
+        container.status = "running"
+        container.labels = {}
+        container.wait.return_value = {"StatusCode": 0}
+        container.logs.side_effect = lambda *, stdout, stderr: b"out" if stdout else b""
+
+        def get_archive(*, path: str):
+            if path == "/work/result.json":
+                return [_result_tar()], {}
+            if path == "/work/output":
+                return [b"tar_stream"], {}
+            raise NotFound("Not found")
+
+        container.get_archive.side_effect = get_archive
+        return container
+
+    client.containers.create.side_effect = create_container
+    return client
+
+
+def _endpoint(name: str, client: MagicMock, *, capacity: int | None = None) -> DockerEndpoint:
+    return DockerEndpoint(
+        name=name,
+        client=PersistentDockerClient(client_factory=lambda: client),
+        capacity=capacity,
+    )
+
+
+@pytest.fixture
+def tool_version(now: datetime) -> ToolVersion:
+    source_code = "def run_tool(input_dir, output_dir):\n    return 'ok'\n"
+    return ToolVersion(
+        id=uuid4(),
+        tool_id=uuid4(),
+        version_number=1,
+        state=VersionState.ACTIVE,
+        source_code=source_code,
+        entrypoint="run_tool",
+        content_hash=compute_content_hash(entrypoint="run_tool", source_code=source_code),
+        derived_from_version_id=None,
+        created_by_user_id=uuid4(),
+        created_at=now,
+    )
+
+
+def _runner(endpoints: DockerEndpointPool) -> DockerToolRunner:
+    capacity = MagicMock(spec=RunnerCapacityLimiter)
+    capacity.try_acquire = AsyncMock(return_value=True)
+    capacity.release = AsyncMock()
+    artifacts = MagicMock(spec=ArtifactManagerProtocol)
+    artifacts.store_output_archive.return_value = ArtifactsManifest(artifacts=[])
+    return DockerToolRunner(
+        runner_image="skriptoteket-runner:unit-test",
+        sandbox_timeout_seconds=30,
+        production_timeout_seconds=60,
+        limits=DockerRunnerLimits(
+            cpu_limit=1.0, memory_limit="256m", pids_limit=128, tmpfs_tmp="size=64m"
+        ),
+        output_max_stdout_bytes=2048,
+        output_max_stderr_bytes=2048,
+        output_max_error_summary_bytes=2048,
+        capacity=capacity,
+        artifacts=artifacts,
+        endpoints=endpoints,
+    )
+
+
+async def _execute(runner: DockerToolRunner, tool_version: ToolVersion):
+    return await runner.execute(
+        run_id=uuid4(),
+        version=tool_version,
+        context=RunContext.SANDBOX,
+        input_files=[],
+        input_values={},
+        memory_json=b"{}",
+        action_payload=None,
+    )
+
+
+@pytest.mark.unit
+def test_parse_docker_endpoints() -> None:
+    assert parse_docker_endpoints("") == []
+    assert parse_docker_endpoints(" unix:///var/run/docker.sock=2 , tcp://runner-2:2376=4 ,") == [
+        DockerEndpointConfig(url="unix:///var/run/docker.sock", capacity=2),
+        DockerEndpointConfig(url="tcp://runner-2:2376", capacity=4),
+    ]
+    for invalid in ("tcp://runner-2:2376", "tcp://a=0", "tcp://a=x", "tcp://a=1,tcp://a=2"):
+        with pytest.raises(ValueError):
+            parse_docker_endpoints(invalid)
+
+
+@pytest.mark.unit
+def test_acquire_prefers_most_free_capacity_and_skips_unhealthy_endpoints() -> None:
+    small = _endpoint("small", _host(), capacity=1)
+    large = _endpoint("large", _host(), capacity=2)
+    pool = DockerEndpointPool(endpoints=[small, large], cooldown_seconds=60)
+
+    assert pool.acquire() is large
+    assert pool.acquire() is small  # tie (1 free each): configuration order
+    assert pool.acquire() is large
+    assert pool.acquire() is None
+
+    pool.release(large)
+    pool.release(small)
+    pool.mark_unhealthy(small)
+    assert pool.acquire() is large
+    assert pool.acquire() is None
+    get_metrics()
+    assert (
+        REGISTRY.get_sample_value("skriptoteket_runner_endpoint_healthy", {"endpoint": "small"})
+        == 0
+    )
+
+    pool.mark_healthy(small)
+    assert pool.acquire() is small
+    assert (
+        REGISTRY.get_sample_value(
+            "skriptoteket_runner_endpoint_runs_in_flight", {"endpoint": "large"}
+        )
+        == 2
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_spreads_runs_and_takes_failing_endpoint_out_of_rotation(
+    tool_version: ToolVersion,
+) -> None:
+    healthy = _host()
+    failing = MagicMock(side_effect=DockerException("connection refused"))
+    failing_endpoint = DockerEndpoint(
+        name="tcp://runner-2:2376",
+        client=PersistentDockerClient(client_factory=failing),
+        capacity=4,
+    )
+    pool = DockerEndpointPool(
+        endpoints=[_endpoint("local", healthy, capacity=2), failing_endpoint],
+        cooldown_seconds=60,
+    )
+    runner = _runner(pool)
+
+    with pytest.raises(DomainError) as exc_info:
+        await _execute(runner, tool_version)
+    assert exc_info.value.code is ErrorCode.SERVICE_UNAVAILABLE
+
+    result = await _execute(runner, tool_version)
+
+    assert result.status is RunStatus.SUCCEEDED
+    assert healthy.containers.create.call_count == 1
+    failing.assert_called_once_with()
+    assert failing_endpoint.in_flight == 0
+    assert pool.acquire() is not failing_endpoint
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_try_adopt_uses_endpoint_holding_labelled_container(
+    tool_version: ToolVersion,
+) -> None:
+    first, second = _host(), _host()
+    run_id = uuid4()
+    adopted = second.containers.create()
+    second.containers.list.side_effect = lambda *, all, filters: (
+        [adopted] if filters == {"label": f"skriptoteket.run_id={run_id}"} else []
+    )
+    runner = _runner(
+        DockerEndpointPool(endpoints=[_endpoint("first", first), _endpoint("second", second)])
+    )
+
+    result = await runner.try_adopt(run_id=run_id, version=tool_version, context=RunContext.SANDBOX)
+
+    assert result is not None
+    assert result.status is RunStatus.SUCCEEDED
+    adopted.wait.assert_called()
+    adopted.remove.assert_called_once_with(force=True)
+    assert first.containers.list.call_count == 2  # label, then warm-pool name
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_try_adopt_raises_when_an_unreachable_endpoint_may_hold_the_container(
+    tool_version: ToolVersion,
+) -> None:
+    unreachable = _host()
+    unreachable.containers.list.side_effect = DockerException("no route to host")
+    runner = _runner(
+        DockerEndpointPool(
+            endpoints=[_endpoint("reachable", _host()), _endpoint("down", unreachable)]
+        )
+    )
+
+    with pytest.raises(DockerException):
+        await runner.try_adopt(run_id=uuid4(), version=tool_version, context=RunContext.SANDBOX)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_try_adopt_keeps_client_open_when_it_is_retired_mid_run(
+    tool_version: ToolVersion,
+) -> None:
+    host = _host()
+    run_id = uuid4()
+    adopted = host.containers.create()
+    host.containers.list.side_effect = lambda *, all, filters: (
+        [adopted] if filters == {"label": f"skriptoteket.run_id={run_id}"} else []
+    )
+    shared = PersistentDockerClient(client_factory=lambda: host, health_check_interval_seconds=0)
+    closed_during_wait: list[bool] = []
+
+    def wait(*, timeout: int) -> dict[str, int]:
+        # Another caller's health check fails while the adopted run is still waiting.
+        host.ping.side_effect = ConnectionError("daemon restarted")
+        with pytest.raises(DockerException):
+            shared.get()
+        closed_during_wait.append(host.close.called)
+        return {"StatusCode": 0}
+
+    adopted.wait.side_effect = wait
+    runner = _runner(DockerEndpointPool(endpoints=[DockerEndpoint(name="local", client=shared)]))
+
+    result = await runner.try_adopt(run_id=run_id, version=tool_version, context=RunContext.SANDBOX)
+
+    assert result is not None
+    assert closed_during_wait == [False]
+    host.close.assert_called_once_with()
@@ -22,10 +22,13 @@ from skriptoteket.domain.scripting.models import (
     compute_content_hash,
 )
 from skriptoteket.infrastructure.runner.capacity import RunnerCapacityLimiter
+from skriptoteket.infrastructure.runner.docker.shared_client import PersistentDockerClient
+from skriptoteket.infrastructure.runner.docker.warm_pool import DockerWarmPool, WarmRunnerContainer
 from skriptoteket.infrastructure.runner.docker_runner import (
     DockerRunnerLimits,
     DockerToolRunner,
 )
+from skriptoteket.infrastructure.runner.run_log_buffer import LocalRunLogBuffer
 from skriptoteket.protocols.runner import ArtifactManagerProtocol
 
 
@@ -197,6 +200,151 @@ async def test_execute_success(
     }
 
 
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_forwards_live_output_to_run_log_buffer(
+    mock_capacity: MagicMock,
+    mock_artifacts: MagicMock,
+    mock_docker_client: MagicMock,
+    tool_version: ToolVersion,
+    tmp_path,
+) -> None:
+    run_logs = LocalRunLogBuffer(artifacts_root=tmp_path, max_bytes=4096)
+    runner = DockerToolRunner(
+        runner_image="skriptoteket-runner:unit-test",
+        sandbox_timeout_seconds=30,
+        production_timeout_seconds=60,
+        limits=DockerRunnerLimits(
+            cpu_limit=1.0,
+            memory_limit="256m",
+            pids_limit=128,
+            tmpfs_tmp="size=64m",
+        ),
+        output_max_stdout_bytes=2048,
+        output_max_stderr_bytes=2048,
+        output_max_error_summary_bytes=2048,
+        capacity=mock_capacity,
+        artifacts=mock_artifacts,
+        run_logs=run_logs,
+    )
+    client_instance = mock_docker_client.return_value
+    volume = MagicMock()
+    volume.name = "work-volume"
+    client_instance.volumes.create.return_value = volume
+    container = MagicMock()
+    client_instance.containers.create.return_value = container
+    container.wait.return_value = {"StatusCode": 0}
+
+    def logs_side_effect(*, stdout: bool, stderr: bool, stream: bool = False, follow: bool = False):
+        if stream:
+            return iter([b"live out\n"] if stdout else [b"live err\n"])
+        return b"stdout" if stdout else b"stderr"
+
+    container.logs.side_effect = logs_side_effect
+    result_tar = create_result_tar(status="succeeded", outputs=[])
+
+    def get_archive_side_effect(*, path: str):
+        if path == "/work/result.json":
+            return [result_tar], {}
+        raise NotFound("Not found")
+
+    container.get_archive.side_effect = get_archive_side_effect
+    run_id = uuid4()
+
+    result = await runner.execute(
+        run_id=run_id,
+        version=tool_version,
+        context=RunContext.SANDBOX,
+        input_files=[],
+        input_values={},
+        memory_json=b'{"settings":{}}',
+        action_payload=None,
+    )
+
+    assert result.stdout == "stdout"
+    tail = run_logs.read(run_id=run_id)
+    assert tail is not None
+    assert tail.finished is True
+    assert sorted((chunk.stream, chunk.text) for chunk in tail.chunks) == [
+        ("stderr", "live err\n"),
+        ("stdout", "live out\n"),
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_reuses_docker_client_across_runs(
+    runner: DockerToolRunner,
+    mock_docker_client: MagicMock,
+    tool_version: ToolVersion,
+) -> None:
+    client_instance = mock_docker_client.return_value
+
+    volume = MagicMock()
+    volume.name = "work-volume"
+    client_instance.volumes.create.return_value = volume
+
+    container = MagicMock()
+    client_instance.containers.create.return_value = container
+    container.logs.return_value = b""
+    container.wait.return_value = {"StatusCode": 0}
+    result_tar = create_result_tar(
+        status="succeeded",
+        outputs=[{"kind": "notice", "level": "info", "message": "ok"}],
+    )
+
+    def get_archive_side_effect(*, path: str):
+        if path == "/work/result.json":
+            return [result_tar], {}
+        raise NotFound("Not found")
+
+    container.get_archive.side_effect = get_archive_side_effect
+
+    for _ in range(2):
+        await runner.execute(
+            run_id=uuid4(),
+            version=tool_version,
+            context=RunContext.SANDBOX,
+            input_files=[],
+            input_values={},
+            memory_json=b'{"settings":{}}',
+            action_payload=None,
+        )
+
+    mock_docker_client.assert_called_once()
+    assert client_instance.containers.create.call_count == 2
+    client_instance.close.assert_not_called()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_passes_context_and_user_to_capacity_limiter(
+    runner: DockerToolRunner,
+    mock_capacity: MagicMock,
+    tool_version: ToolVersion,
+) -> None:
+    mock_capacity.try_acquire.return_value = False
+    user_id = uuid4()
+
+    with pytest.raises(DomainError) as exc_info:
+        await runner.execute(
+            run_id=uuid4(),
+            version=tool_version,
+            context=RunContext.PRODUCTION,
+            input_files=[],
+            input_values={},
+            memory_json=b'{"settings":{}}',
+            action_payload=None,
+            requested_by_user_id=user_id,
+        )
+
+    assert exc_info.value.code is ErrorCode.SERVICE_UNAVAILABLE
+    mock_capacity.try_acquire.assert_awaited_once_with(
+        context=RunContext.PRODUCTION,
+        owner_key=str(user_id),
+    )
+
+
 @pytest.mark.unit
 @pytest.mark.asyncio
 async def test_execute_injects_action_payload_env_var(
@@ -406,3 +554,247 @@ async def test_execute_returns_service_unavailable_when_docker_sock_missing(
     assert exc_info.value.code is ErrorCode.SERVICE_UNAVAILABLE
     assert "pdm run dev-start" in exc_info.value.message
     mock_capacity.release.assert_awaited_once()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_uses_warm_pool_container_and_ships_run_env(
+    mock_capacity: MagicMock,
+    mock_artifacts: MagicMock,
+    tool_version: ToolVersion,
+    monkeypatch,
+) -> None:
+    import docker
+
+    monkeypatch.setattr(
+        docker,
+        "from_env",
+        MagicMock(side_effect=AssertionError("warm path must not create another client")),
+    )
+
+    container = MagicMock()
+    container.logs.side_effect = [b"stdout", b"stderr"]
+    container.wait.return_value = {"StatusCode": 0}
+    result_tar = create_result_tar(
+        status="succeeded",
+        outputs=[{"kind": "notice", "level": "info", "message": "ok"}],
+    )
+
+    def get_archive_side_effect(*, path: str):
+        if path == "/work/result.json":
+            return [result_tar], {}
+        raise NotFound("Not found")
+
+    container.get_archive.side_effect = get_archive_side_effect
+    volume = MagicMock()
+    volume.name = "warm-volume"
+
+    pool_client = MagicMock()
+    warm_pool = MagicMock(spec=DockerWarmPool)
+    warm_pool.checkout.return_value = WarmRunnerContainer(
+        container=container,
+        volume=volume,
+        client=pool_client,
+        setup_seconds=0.5,
+    )
+    runner = DockerToolRunner(
+        runner_image="skriptoteket-runner:unit-test",
+        sandbox_timeout_seconds=30,
+        production_timeout_seconds=60,
+        limits=DockerRunnerLimits(
+            cpu_limit=1.0,
+            memory_limit="256m",
+            pids_limit=128,
+            tmpfs_tmp="size=64m",
+        ),
+        output_max_stdout_bytes=2048,
+        output_max_stderr_bytes=2048,
+        output_max_error_summary_bytes=2048,
+        capacity=mock_capacity,
+        artifacts=mock_artifacts,
+        warm_pool=warm_pool,
+        docker_client=PersistentDockerClient(client_factory=lambda: pool_client),
+    )
+    run_id = uuid4()
+
+    result = await runner.execute(
+        run_id=run_id,
+        version=tool_version,
+        context=RunContext.SANDBOX,
+        input_files=[("input.txt", b"input")],
+        input_values={"mode": "fast"},
+        memory_json=b'{"settings":{}}',
+        action_payload=None,
+    )
+
+    assert result.status is RunStatus.SUCCEEDED
+    container.rename.assert_called_once_with(name=f"skriptoteket-run-{run_id}")
+    container.remove.assert_called_once_with(force=True)
+    volume.remove.assert_called_once_with(force=True)
+
+    workdir_tar = b"".join(container.put_archive.call_args.kwargs["data"])
+    with tarfile.open(fileobj=io.BytesIO(workdir_tar), mode="r") as tar:
+        run_env_member = tar.extractfile("run_env.json")
+        assert run_env_member is not None
+        run_env = json.loads(run_env_member.read())
+    assert run_env["SKRIPTOTEKET_ENTRYPOINT"] == tool_version.entrypoint
+    assert json.loads(run_env["SKRIPTOTEKET_INPUTS"]) == {"mode": "fast"}
+    assert "SKRIPTOTEKET_ACTION" not in run_env
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("reason", ["rename_fails", "client_retired"])
+async def test_execute_falls_back_to_cold_start_when_warm_container_is_unusable(
+    mock_capacity: MagicMock,
+    mock_artifacts: MagicMock,
+    tool_version: ToolVersion,
+    reason: str,
+) -> None:
+    client = MagicMock()
+    cold_volume = MagicMock()
+    cold_volume.name = "work-volume"
+    client.volumes.create.return_value = cold_volume
+    cold_container = MagicMock()
+    cold_container.logs.side_effect = [b"stdout", b"stderr"]
+    cold_container.wait.return_value = {"StatusCode": 0}
+
+    def get_archive_side_effect(*, path: str):
+        if path == "/work/result.json":
+            return [create_result_tar(status="succeeded", outputs=[])], {}
+        raise NotFound("Not found")
+
+    cold_container.get_archive.side_effect = get_archive_side_effect
+    client.containers.create.return_value = cold_container
+
+    warm_container = MagicMock()
+    if reason == "rename_fails":
+        warm_container.rename.side_effect = DockerException("conflict")
+    warm = WarmRunnerContainer(
+        container=warm_container,
+        volume=MagicMock(),
+        # A container created through a since-retired client is not used.
+        client=client if reason == "rename_fails" else MagicMock(),
+        setup_seconds=0.5,
+    )
+    warm_pool = MagicMock(spec=DockerWarmPool)
+    warm_pool.pool_id = "pool"
+    warm_pool.checkout.return_value = warm
+    runner = DockerToolRunner(
+        runner_image="skriptoteket-runner:unit-test",
+        sandbox_timeout_seconds=30,
+        production_timeout_seconds=60,
+        limits=DockerRunnerLimits(
+            cpu_limit=1.0,
+            memory_limit="256m",
+            pids_limit=128,
+            tmpfs_tmp="size=64m",
+        ),
+        output_max_stdout_bytes=2048,
+        output_max_stderr_bytes=2048,
+        output_max_error_summary_bytes=2048,
+        capacity=mock_capacity,
+        artifacts=mock_artifacts,
+        warm_pool=warm_pool,
+        docker_client=PersistentDockerClient(client_factory=lambda: client),
+    )
+    run_id = uuid4()
+
+    result = await runner.execute(
+        run_id=run_id,
+        version=tool_version,
+        context=RunContext.SANDBOX,
+        input_files=[("input.txt", b"input")],
+        input_values={},
+        memory_json=b'{"settings":{}}',
+        action_payload=None,
+    )
+
+    assert result.status is RunStatus.SUCCEEDED
+    warm_pool.discard.assert_called_once_with(warm)
+    warm_container.put_archive.assert_not_called()
+    labels = client.containers.create.call_args.kwargs["labels"]
+    assert labels["skriptoteket.run_id"] == str(run_id)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_execute_triggers_started_fork_server_container_instead_of_starting_it(
+    mock_capacity: MagicMock,
+    mock_artifacts: MagicMock,
+    tool_version: ToolVersion,
+    monkeypatch,
+) -> None:
+    import docker
+
+    monkeypatch.setattr(
+        docker,
+        "from_env",
+        MagicMock(side_effect=AssertionError("warm path must not create another client")),
+    )
+
+    container = MagicMock()
+    container.logs.side_effect = [b"stdout", b"stderr"]
+    container.wait.return_value = {"StatusCode": 0}
+    result_tar = create_result_tar(
+        status="succeeded",
+        outputs=[{"kind": "notice", "level": "info", "message": "ok"}],
+    )
+
+    def get_archive_side_effect(*, path: str):
+        if path == "/work/result.json":
+            return [result_tar], {}
+        raise NotFound("Not found")
+
+    container.get_archive.side_effect = get_archive_side_effect
+    volume = MagicMock()
+    volume.name = "warm-volume"
+
+    pool_client = MagicMock()
+    warm_pool = MagicMock(spec=DockerWarmPool)
+    warm_pool.checkout.return_value = WarmRunnerContainer(
+        container=container,
+        volume=volume,
+        client=pool_client,
+        setup_seconds=0.5,
+        started=True,
+    )
+    runner = DockerToolRunner(
+        runner_image="skriptoteket-runner:unit-test",
+        sandbox_timeout_seconds=30,
+        production_timeout_seconds=60,
+        limits=DockerRunnerLimits(
+            cpu_limit=1.0,
+            memory_limit="256m",
+            pids_limit=128,
+            tmpfs_tmp="size=64m",
+        ),
+        output_max_stdout_bytes=2048,
+        output_max_stderr_bytes=2048,
+        output_max_error_summary_bytes=2048,
+        capacity=mock_capacity,
+        artifacts=mock_artifacts,
+        warm_pool=warm_pool,
+        docker_client=PersistentDockerClient(client_factory=lambda: pool_client),
+    )
+    run_id = uuid4()
+
+    result = await runner.execute(
+        run_id=run_id,
+        version=tool_version,
+        context=RunContext.SANDBOX,
+        input_files=[("input.txt", b"input")],
+        input_values={"mode": "fast"},
+        memory_json=b'{"settings":{}}',
+        action_payload=None,
+    )
+
+    assert result.status is RunStatus.SUCCEEDED
+    container.start.assert_not_called()
+    container.wait.assert_called_once()
+
+    workdir_tar = b"".join(container.put_archive.call_args.kwargs["data"])
+    with tarfile.open(fileobj=io.BytesIO(workdir_tar), mode="r") as tar:
+        names = tar.getnames()
+    assert names[-1] == ".run"
+    assert "run_env.json" in names
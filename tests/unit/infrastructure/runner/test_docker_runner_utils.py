@@ -13,7 +13,10 @@ from skriptoteket.infrastructure.runner.docker.container_io import (
     truncate_utf8_bytes,
     truncate_utf8_str,
 )
-from skriptoteket.infrastructure.runner.docker.workdir_archive import build_workdir_archive
+from skriptoteket.infrastructure.runner.docker.workdir_archive import (
+    WorkdirInputFile,
+    iter_workdir_archive,
+)
 
 # --- sanitize_input_filename tests ---
 
@@ -156,7 +159,7 @@ def test_truncate_utf8_str_with_zero_limit_returns_empty() -> None:
     assert result == ""
 
 
-# --- _build_workdir_archive tests ---
+# --- iter_workdir_archive tests ---
 
 
 def _make_tool_version(source_code: str = "print('test')") -> ToolVersion:
@@ -174,13 +177,19 @@ def _make_tool_version(source_code: str = "print('test')") -> ToolVersion:
     )
 
 
-def test_build_workdir_archive_contains_script_and_input() -> None:
+def _input_file(name: str, content: bytes) -> WorkdirInputFile:
+    return WorkdirInputFile(name=name, size=len(content), content=content)
+
+
+def test_iter_workdir_archive_contains_script_and_input() -> None:
     version = _make_tool_version(source_code="def run_tool(): pass")
 
-    archive_bytes = build_workdir_archive(
-        version=version,
-        input_files=[("data.csv", b"col1,col2\n1,2")],
-        memory_json=b'{"settings":{}}',
+    archive_bytes = b"".join(
+        iter_workdir_archive(
+            version=version,
+            input_files=[_input_file("data.csv", b"col1,col2\n1,2")],
+            memory_json=b'{"settings":{}}',
+        )
     )
 
     with tarfile.open(fileobj=io.BytesIO(archive_bytes), mode="r") as tar:
@@ -191,14 +200,16 @@ def test_build_workdir_archive_contains_script_and_input() -> None:
         assert "input/data.csv" in names
 
 
-def test_build_workdir_archive_script_has_correct_content() -> None:
+def test_iter_workdir_archive_script_has_correct_content() -> None:
     source = "def run_tool(): return '<p>ok</p>'"
     version = _make_tool_version(source_code=source)
 
-    archive_bytes = build_workdir_archive(
-        version=version,
-        input_files=[("file.txt", b"content")],
-        memory_json=b'{"settings":{}}',
+    archive_bytes = b"".join(
+        iter_workdir_archive(
+            version=version,
+            input_files=[_input_file("file.txt", b"content")],
+            memory_json=b'{"settings":{}}',
+        )
     )
 
     with tarfile.open(fileobj=io.BytesIO(archive_bytes), mode="r") as tar:
@@ -208,14 +219,16 @@ def test_build_workdir_archive_script_has_correct_content() -> None:
         assert script_file.read().decode("utf-8") == source
 
 
-def test_build_workdir_archive_input_has_correct_content() -> None:
+def test_iter_workdir_archive_input_has_correct_content() -> None:
     version = _make_tool_version()
     input_data = b"test input data"
 
-    archive_bytes = build_workdir_archive(
-        version=version,
-        input_files=[("input.txt", input_data)],
-        memory_json=b'{"settings":{}}',
+    archive_bytes = b"".join(
+        iter_workdir_archive(
+            version=version,
+            input_files=[_input_file("input.txt", input_data)],
+            memory_json=b'{"settings":{}}',
+        )
     )
 
     with tarfile.open(fileobj=io.BytesIO(archive_bytes), mode="r") as tar:
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+from docker.errors import DockerException
+
+from skriptoteket.infrastructure.runner.docker.shared_client import PersistentDockerClient
+
+
+def _factory(*clients: MagicMock) -> MagicMock:
+    return MagicMock(name="client_factory", side_effect=list(clients))
+
+
+def test_get_reuses_client_without_health_check_inside_interval() -> None:
+    client = MagicMock()
+    factory = _factory(client)
+    shared = PersistentDockerClient(client_factory=factory, health_check_interval_seconds=60)
+
+    assert shared.get() is client
+    assert shared.get() is client
+
+    factory.assert_called_once_with()
+    client.ping.assert_not_called()
+
+
+def test_failed_health_check_raises_and_next_get_reconnects() -> None:
+    stale = MagicMock()
+    stale.ping.side_effect = ConnectionError("daemon restarted")
+    fresh = MagicMock()
+    shared = PersistentDockerClient(
+        client_factory=_factory(stale, fresh),
+        health_check_interval_seconds=0,
+    )
+
+    assert shared.get() is stale
+    with pytest.raises(DockerException):
+        shared.get()
+    assert shared.get() is fresh
+
+    stale.close.assert_called_once_with()
+    fresh.ping.assert_not_called()
+
+
+def test_failed_health_check_drains_client_until_runs_release_it() -> None:
+    stale = MagicMock()
+    fresh = MagicMock()
+    shared = PersistentDockerClient(
+        client_factory=_factory(stale, fresh),
+        health_check_interval_seconds=0,
+    )
+    first_run = shared.acquire()
+    second_run = shared.acquire()
+    assert first_run is second_run is stale
+    stale.ping.side_effect = ConnectionError("daemon restarted")
+
+    with pytest.raises(DockerException):
+        shared.get()
+    assert shared.get() is fresh
+    shared.release(first_run)
+    stale.close.assert_not_called()
+
+    shared.release(second_run)
+    stale.close.assert_called_once_with()
+
+
+def test_get_propagates_creation_errors_and_retries_next_call() -> None:
+    client = MagicMock()
+    factory = MagicMock(side_effect=[DockerException("unreachable"), client])
+    shared = PersistentDockerClient(client_factory=factory)
+
+    with pytest.raises(DockerException):
+        shared.get()
+
+    assert shared.get() is client
+
+
+def test_close_closes_client_and_next_get_recreates() -> None:
+    first = MagicMock()
+    second = MagicMock()
+    shared = PersistentDockerClient(client_factory=_factory(first, second))
+
+    shared.get()
+    shared.close()
+
+    first.close.assert_called_once_with()
+    assert shared.get() is second
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from unittest.mock import MagicMock
+
+import pytest
+
+from skriptoteket.infrastructure.runner.docker.container_spec import (
+    FORK_SERVER_COMMAND,
+    RUN_ENV_PATH,
+    RUN_TRIGGER_PATH,
+    RUNNER_COMMAND,
+    DockerRunnerLimits,
+)
+from skriptoteket.infrastructure.runner.docker.warm_pool import (
+    POOL_HOST_LABEL,
+    POOL_ID_LABEL,
+    POOL_LABEL,
+    POOL_PID_LABEL,
+    WARM_CONTAINER_NAME_PREFIX,
+    WORK_VOLUME_LABEL,
+    DockerWarmPool,
+)
+
+
+def _wait_for(predicate: Callable[[], bool], *, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return
+        time.sleep(0.01)
+    raise AssertionError("condition not met before timeout")
+
+
+@pytest.fixture
+def docker_client() -> MagicMock:
+    client = MagicMock()
+    client.created_volumes = []
+    client.created_containers = []
+
+    def create_volume(**_kwargs: object) -> MagicMock:
+        volume = MagicMock()
+        volume.name = f"warm-volume-{len(client.created_volumes)}"
+        client.created_volumes.append(volume)
+        return volume
+
+    def create_container(**_kwargs: object) -> MagicMock:
+        container = MagicMock()
+        client.created_containers.append(container)
+        return container
+
+    client.volumes.create.side_effect = create_volume
+    client.containers.create.side_effect = create_container
+    return client
+
+
+@pytest.fixture
+def pool(docker_client: MagicMock):
+    warm_pool = DockerWarmPool(
+        client_provider=lambda: docker_client,
+        runner_image="skriptoteket-runner:unit-test",
+        limits=DockerRunnerLimits(
+            cpu_limit=1.0,
+            memory_limit="256m",
+            pids_limit=128,
+            tmpfs_tmp="size=64m",
+        ),
+        size=2,
+    )
+    yield warm_pool
+    warm_pool.close()
+
+
+def test_start_prefills_sandboxed_containers(pool: DockerWarmPool, docker_client) -> None:
+    pool.start()
+
+    _wait_for(lambda: pool.idle_count == 2)
+
+    kwargs = docker_client.containers.create.call_args.kwargs
+    assert kwargs["network_mode"] == "none"
+    assert kwargs["read_only"] is True
+    assert kwargs["cap_drop"] == ["ALL"]
+    assert kwargs["pids_limit"] == 128
+    assert kwargs["environment"]["SKRIPTOTEKET_RUN_ENV_PATH"] == RUN_ENV_PATH
+    assert "SKRIPTOTEKET_ENTRYPOINT" not in kwargs["environment"]
+    assert kwargs["name"].startswith(WARM_CONTAINER_NAME_PREFIX)
+    assert kwargs["labels"][POOL_LABEL] == "warm"
+    assert kwargs["labels"][POOL_PID_LABEL] == str(os.getpid())
+    assert kwargs["labels"][WORK_VOLUME_LABEL].startswith("warm-volume-")
+    assert "skriptoteket.run_id" not in kwargs["labels"]
+    assert kwargs["command"] == RUNNER_COMMAND
+    for container in docker_client.created_containers:
+        container.start.assert_not_called()
+
+
+def test_checkout_hands_out_once_and_schedules_replacement(
+    pool: DockerWarmPool, docker_client
+) -> None:
+    pool.start()
+    _wait_for(lambda: pool.idle_count == 2)
+
+    first = pool.checkout()
+    second = pool.checkout()
+
+    assert first is not None
+    assert second is not None
+    assert first.container is not second.container
+    assert first.setup_seconds >= 0
+    _wait_for(lambda: pool.idle_count == 2)
+    assert docker_client.containers.create.call_count == 4
+
+
+def test_checkout_returns_none_when_pool_is_empty(docker_client) -> None:
+    docker_client.volumes.create.side_effect = RuntimeError("docker down")
+    pool = DockerWarmPool(
+        client_provider=lambda: docker_client,
+        runner_image="skriptoteket-runner:unit-test",
+        limits=DockerRunnerLimits(
+            cpu_limit=1.0,
+            memory_limit="256m",
+            pids_limit=128,
+            tmpfs_tmp="size=64m",
+        ),
+        size=1,
+    )
+    try:
+        assert pool.checkout() is None
+    finally:
+        pool.close()
+
+
+def test_close_removes_idle_containers_and_volumes(pool: DockerWarmPool, docker_client) -> None:
+    pool.start()
+    _wait_for(lambda: pool.idle_count == 2)
+
+    pool.close()
+
+    assert pool.checkout() is None
+    for container in docker_client.created_containers:
+        container.remove.assert_called_once_with(force=True)
+    for volume in docker_client.created_volumes:
+        volume.remove.assert_called_once_with(force=True)
+
+
+def test_fork_server_pool_starts_containers_with_preload_env(docker_client) -> None:
+    pool = DockerWarmPool(
+        client_provider=lambda: docker_client,
+        runner_image="skriptoteket-runner:unit-test",
+        limits=DockerRunnerLimits(
+            cpu_limit=1.0,
+            memory_limit="256m",
+            pids_limit=128,
+            tmpfs_tmp="size=64m",
+        ),
+        size=1,
+        fork_server=True,
+        preload_modules=["openpyxl", "docx"],
+    )
+    try:
+        pool.start()
+        _wait_for(lambda: pool.idle_count == 1)
+
+        kwargs = docker_client.containers.create.call_args.kwargs
+        assert kwargs["command"] == FORK_SERVER_COMMAND
+        assert kwargs["network_mode"] == "none"
+        assert kwargs["environment"]["SKRIPTOTEKET_RUN_TRIGGER_PATH"] == RUN_TRIGGER_PATH
+        assert kwargs["environment"]["SKRIPTOTEKET_PRELOAD_MODULES"] == "openpyxl,docx"
+        warm = pool.checkout()
+        assert warm is not None
+        assert warm.started is True
+        docker_client.created_containers[0].start.assert_called_once_with()
+    finally:
+        pool.close()
+
+
+def test_fork_server_start_failure_discards_container_and_volume(docker_client) -> None:
+    def create_failing_container(**_kwargs: object) -> MagicMock:
+        container = MagicMock()
+        container.start.side_effect = RuntimeError("start failed")
+        docker_client.created_containers.append(container)
+        return container
+
+    docker_client.containers.create.side_effect = create_failing_container
+    pool = DockerWarmPool(
+        client_provider=lambda: docker_client,
+        runner_image="skriptoteket-runner:unit-test",
+        limits=DockerRunnerLimits(
+            cpu_limit=1.0,
+            memory_limit="256m",
+            pids_limit=128,
+            tmpfs_tmp="size=64m",
+        ),
+        size=1,
+        fork_server=True,
+    )
+    try:
+        pool.start()
+        _wait_for(lambda: len(docker_client.created_containers) == 1)
+        _wait_for(lambda: docker_client.created_volumes[0].remove.called)
+
+        assert pool.idle_count == 0
+        docker_client.created_containers[0].remove.assert_called_once_with(force=True)
+    finally:
+        pool.close()
+
+
+def _pool_container(**labels: str) -> MagicMock:
+    container = MagicMock()
+    container.labels = {POOL_LABEL: "warm", **labels}
+    return container
+
+
+def test_start_removes_orphans_of_dead_processes_on_this_host(
+    pool: DockerWarmPool, docker_client
+) -> None:
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    pool.start()
+    _wait_for(lambda: pool.idle_count == 2)
+    live_labels = docker_client.containers.create.call_args.kwargs["labels"]
+    host = live_labels[POOL_HOST_LABEL]
+
+    orphan = _pool_container(
+        **{
+            POOL_HOST_LABEL: host,
+            POOL_PID_LABEL: str(exited.pid),
+            POOL_ID_LABEL: "dead-pool",
+            WORK_VOLUME_LABEL: "orphan-volume",
+        }
+    )
+    restarted = _pool_container(
+        **{POOL_HOST_LABEL: host, POOL_PID_LABEL: str(os.getpid()), POOL_ID_LABEL: "old-pool"}
+    )
+    live = _pool_container(**live_labels)
+    other_host = _pool_container(
+        **{POOL_HOST_LABEL: "other-host", POOL_PID_LABEL: str(exited.pid), POOL_ID_LABEL: "x"}
+    )
+    orphan_volume = MagicMock()
+    docker_client.containers.list.return_value = [orphan, restarted, live, other_host]
+    docker_client.volumes.list.return_value = [orphan_volume]
+
+    pool._remove_orphans()
+
+    assert docker_client.containers.list.call_args.kwargs["filters"] == {
+        "label": POOL_LABEL,
+        "name": WARM_CONTAINER_NAME_PREFIX,
+    }
+    orphan.remove.assert_called_once_with(force=True)
+    restarted.remove.assert_called_once_with(force=True)
+    live.remove.assert_not_called()
+    other_host.remove.assert_not_called()
+    docker_client.volumes.list.assert_called_once_with(filters={"name": "orphan-volume"})
+    orphan_volume.remove.assert_called_once_with(force=True)
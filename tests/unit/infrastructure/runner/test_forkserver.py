@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+
+import _forkserver
+import pytest
+from _forkserver import (
+    DEFAULT_PRELOAD_MODULES,
+    preload,
+    preload_module_names,
+    run_forked,
+    wait_for_trigger,
+)
+
+
+@pytest.fixture
+def workdir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    (tmp_path / "output").mkdir()
+    monkeypatch.delenv("SKRIPTOTEKET_RUN_ENV_PATH", raising=False)
+    monkeypatch.setenv("SKRIPTOTEKET_SCRIPT_PATH", str(tmp_path / "script.py"))
+    monkeypatch.setenv("SKRIPTOTEKET_SCRIPT_CODE_PATH", str(tmp_path / "script.pyc"))
+    monkeypatch.setenv("SKRIPTOTEKET_ENTRYPOINT", "run_tool")
+    monkeypatch.setenv("SKRIPTOTEKET_INPUT_DIR", str(tmp_path / "input"))
+    monkeypatch.setenv("SKRIPTOTEKET_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setenv("SKRIPTOTEKET_RESULT_PATH", str(tmp_path / "result.json"))
+    return tmp_path
+
+
+def test_preload_module_names_defaults_and_env_override(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("SKRIPTOTEKET_PRELOAD_MODULES", raising=False)
+    assert preload_module_names() == list(DEFAULT_PRELOAD_MODULES)
+
+    monkeypatch.setenv("SKRIPTOTEKET_PRELOAD_MODULES", " json, ,csv ")
+    assert preload_module_names() == ["json", "csv"]
+
+    monkeypatch.setenv("SKRIPTOTEKET_PRELOAD_MODULES", "")
+    assert preload_module_names() == []
+
+
+def test_preload_skips_modules_that_fail_to_import() -> None:
+    assert preload(["json", "skriptoteket_missing_module_for_test"]) == ["json"]
+
+
+@pytest.mark.parametrize("inotify", [True, False])
+def test_wait_for_trigger_returns_once_file_appears(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, inotify: bool
+) -> None:
+    if not inotify:
+        monkeypatch.setattr(_forkserver, "_watch_directory", lambda _path: None)
+    trigger_path = tmp_path / ".run"
+    timer = threading.Timer(0.05, trigger_path.touch)
+    timer.start()
+    try:
+        started = time.monotonic()
+        # A long safety-net interval: returning promptly means the wait woke on the event.
+        wait_for_trigger(trigger_path=trigger_path, poll_seconds=5.0 if inotify else 0.01)
+        elapsed = time.monotonic() - started
+    finally:
+        timer.cancel()
+
+    assert trigger_path.exists()
+    assert elapsed < 2.0
+
+
+def test_run_forked_writes_result_with_phase_timings(workdir: Path) -> None:
+    (workdir / "script.py").write_text(
+        "def run_tool(input_dir, output_dir):\n    return '<p>forked</p>'\n", encoding="utf-8"
+    )
+
+    exit_code = run_forked(timings={"preload_seconds": 0.25})
+
+    assert exit_code == 0
+    payload = json.loads((workdir / "result.json").read_text(encoding="utf-8"))
+    assert payload["status"] == "succeeded"
+    assert payload["outputs"] == [{"kind": "html_sandboxed", "html": "<p>forked</p>"}]
+    assert payload["timings"]["preload_seconds"] == 0.25
+    assert {"import_seconds", "user_code_seconds", "artifacts_seconds"} <= set(payload["timings"])
+
+
+def test_run_forked_reports_signal_exit_like_a_shell(workdir: Path) -> None:
+    (workdir / "script.py").write_text(
+        "import os, signal\n\ndef run_tool(input_dir, output_dir):\n"
+        "    os.kill(os.getpid(), signal.SIGKILL)\n",
+        encoding="utf-8",
+    )
+
+    assert run_forked(timings={}) == 128 + 9
+    assert not (workdir / "result.json").exists()
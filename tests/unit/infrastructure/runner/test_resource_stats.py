@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterator
+from uuid import uuid4
+
+from prometheus_client import REGISTRY
+
+from skriptoteket.domain.scripting.models import RunResourceUsage
+from skriptoteket.infrastructure.runner.docker.resource_stats import (
+    ContainerResourceAccumulator,
+    ResourceStatsSampler,
+    observe_resource_usage,
+)
+from skriptoteket.observability.metrics import get_metrics
+
+
+def _cgroup_v1_sample(*, usage: int, max_usage: int, cpu_ns: int, pids: int) -> dict[str, object]:
+    return {
+        "memory_stats": {"usage": usage, "max_usage": max_usage, "limit": 268_435_456},
+        "cpu_stats": {
+            "cpu_usage": {"total_usage": cpu_ns},
+            "throttling_data": {"throttled_time": 250_000_000},
+        },
+        "blkio_stats": {
+            "io_service_bytes_recursive": [
+                {"major": 8, "minor": 0, "op": "Read", "value": 4096},
+                {"major": 8, "minor": 0, "op": "Write", "value": 8192},
+                {"major": 8, "minor": 0, "op": "Total", "value": 12288},
+            ]
+        },
+        "pids_stats": {"current": pids},
+    }
+
+
+def test_accumulator_keeps_peaks_and_latest_counters_for_cgroup_v1() -> None:
+    accumulator = ContainerResourceAccumulator()
+
+    accumulator.add(_cgroup_v1_sample(usage=10, max_usage=90, cpu_ns=500_000_000, pids=4))
+    accumulator.add(_cgroup_v1_sample(usage=30, max_usage=60, cpu_ns=2_000_000_000, pids=2))
+
+    assert accumulator.usage() == RunResourceUsage(
+        memory_peak_bytes=90,
+        cpu_seconds=2.0,
+        cpu_throttled_seconds=0.25,
+        block_read_bytes=4096,
+        block_write_bytes=8192,
+        pids_peak=4,
+        samples=2,
+    )
+
+
+def test_accumulator_handles_cgroup_v2_and_empty_samples() -> None:
+    accumulator = ContainerResourceAccumulator()
+    assert accumulator.usage() is None
+
+    # cgroup v2: no max_usage, lowercase blkio ops, null blkio lists on exited containers.
+    accumulator.add(
+        {
+            "memory_stats": {"usage": 70_000_000},
+            "blkio_stats": {
+                "io_service_bytes_recursive": [
+                    {"op": "read", "value": 100},
+                    {"op": "write", "value": 200},
+                ]
+            },
+        }
+    )
+    accumulator.add({"memory_stats": {}, "blkio_stats": {"io_service_bytes_recursive": None}})
+
+    usage = accumulator.usage()
+    assert usage is not None
+    assert usage.memory_peak_bytes == 70_000_000
+    assert usage.block_read_bytes == 100
+    assert usage.block_write_bytes == 200
+    assert usage.cpu_seconds is None
+    assert usage.pids_peak is None
+
+
+class _StatsContainer:
+    def __init__(self, samples: list[dict[str, object]]) -> None:
+        self._samples = samples
+        self.drained = threading.Event()
+
+    def follow_stats(self) -> Iterator[dict[str, object]]:
+        yield from self._samples
+        self.drained.set()
+
+
+def test_sampler_collects_samples_from_background_thread() -> None:
+    container = _StatsContainer(
+        [_cgroup_v1_sample(usage=10, max_usage=20, cpu_ns=1_000_000_000, pids=1)]
+    )
+    sampler = ResourceStatsSampler(run_id=uuid4(), container=container)  # type: ignore[arg-type]
+
+    sampler.start()
+    assert container.drained.wait(timeout=5)
+    usage = sampler.stop()
+
+    assert usage is not None
+    assert usage.memory_peak_bytes == 20
+    assert usage.samples == 1
+
+
+def test_observe_resource_usage_records_histograms_by_tool() -> None:
+    tool_id = uuid4()
+    get_metrics()
+
+    observe_resource_usage(
+        tool_id=tool_id,
+        usage=RunResourceUsage(memory_peak_bytes=100_000_000, block_write_bytes=10, samples=1),
+    )
+
+    labels = {"tool_id": str(tool_id)}
+    assert REGISTRY.get_sample_value("skriptoteket_runner_memory_peak_bytes_count", labels) == 1
+    assert (
+        REGISTRY.get_sample_value(
+            "skriptoteket_runner_block_io_bytes_sum", {**labels, "direction": "write"}
+        )
+        == 10
+    )
+    assert REGISTRY.get_sample_value("skriptoteket_runner_cpu_seconds_count", labels) is None
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pytest
+from prometheus_client import REGISTRY
+from pydantic import JsonValue
+
+from skriptoteket.domain.scripting.artifacts import ArtifactsManifest
+from skriptoteket.domain.scripting.execution import ToolExecutionResult
+from skriptoteket.domain.scripting.models import (
+    ResultCacheStatus,
+    RunContext,
+    RunStatus,
+    ToolVersion,
+    VersionState,
+)
+from skriptoteket.domain.scripting.ui.contract_v2 import ToolUiContractV2Result
+from skriptoteket.infrastructure.artifacts.filesystem import ArtifactsManifestBuilder
+from skriptoteket.infrastructure.runner.result_cache import (
+    RESULT_CACHE_DIRNAME,
+    FilesystemToolResultCache,
+    MemoizingToolRunner,
+    compute_result_cache_key,
+)
+from skriptoteket.observability.metrics import get_metrics
+from skriptoteket.protocols.session_files import RunnerInputFile, StoredInputFile
+
+
+def _make_tool_version(*, deterministic: bool) -> ToolVersion:
+    return ToolVersion(
+        id=uuid4(),
+        tool_id=uuid4(),
+        version_number=1,
+        state=VersionState.ACTIVE,
+        entrypoint="run_tool",
+        source_code="def run_tool(input_dir, output_dir):\n    return 'ok'\n",
+        content_hash="content-hash",
+        deterministic=deterministic,
+        derived_from_version_id=None,
+        created_by_user_id=uuid4(),
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def _lookups(result: str) -> float:
+    get_metrics()
+    value = REGISTRY.get_sample_value(
+        "skriptoteket_tool_result_cache_lookups_total", {"result": result}
+    )
+    return value or 0.0
+
+
+class _FakeRunner:
+    """Writes one artifact into the run dir like the artifact manager would."""
+
+    def __init__(self, *, artifacts_root: Path, status: RunStatus = RunStatus.SUCCEEDED) -> None:
+        self._artifacts_root = artifacts_root
+        self._status = status
+        self.calls: list[UUID] = []
+        self.adopted: list[UUID] = []
+
+    async def execute(
+        self,
+        *,
+        run_id: UUID,
+        version: ToolVersion,
+        context: RunContext,
+        input_files: Sequence[RunnerInputFile],
+        input_values: dict[str, JsonValue],
+        memory_json: bytes,
+        action_payload: dict[str, JsonValue] | None,
+        requested_by_user_id: UUID | None = None,
+        script_bytecode: bytes | None = None,
+    ) -> ToolExecutionResult:
+        self.calls.append(run_id)
+        run_dir = self._artifacts_root / str(run_id)
+        (run_dir / "output" / "docs").mkdir(parents=True)
+        (run_dir / "output" / "docs" / "report.docx").write_bytes(b"docx-bytes")
+        # Like the artifact manager, record digests while storing the files.
+        manifest = ArtifactsManifestBuilder()
+        manifest.add(
+            path="output/docs/report.docx",
+            size=len(b"docx-bytes"),
+            sha256=hashlib.sha256(b"docx-bytes").hexdigest(),
+        )
+        return ToolExecutionResult(
+            status=self._status,
+            stdout="converted\n",
+            stderr="",
+            ui_result=ToolUiContractV2Result(
+                status="succeeded" if self._status is RunStatus.SUCCEEDED else "failed",
+                error_summary=None,
+                outputs=[{"kind": "notice", "level": "info", "message": "Klart"}],
+                next_actions=[],
+                state=None,
+                artifacts=[],
+            ),
+            artifacts_manifest=manifest.build(),
+        )
+
+    async def try_adopt(
+        self, *, run_id: UUID, version: ToolVersion, context: RunContext
+    ) -> ToolExecutionResult | None:
+        self.adopted.append(run_id)
+        return None
+
+
+async def _execute(
+    runner: MemoizingToolRunner,
+    *,
+    version: ToolVersion,
+    input_files: Sequence[RunnerInputFile] = (("data.md", b"# Rubrik\n"),),
+    input_values: dict[str, JsonValue] | None = None,
+) -> tuple[UUID, ToolExecutionResult]:
+    run_id = uuid4()
+    result = await runner.execute(
+        run_id=run_id,
+        version=version,
+        context=RunContext.PRODUCTION,
+        input_files=input_files,
+        input_values=input_values or {"profile": "standard"},
+        memory_json=b'{"settings":{}}',
+        action_payload=None,
+    )
+    return run_id, result
+
+
+def test_cache_key_covers_inputs_and_matches_stored_files(tmp_path: Path) -> None:
+    version = _make_tool_version(deterministic=True)
+    path = tmp_path / "data.md"
+    path.write_bytes(b"# Rubrik\n")
+
+    def key(**overrides: object) -> str:
+        params: dict[str, object] = {
+            "version": version,
+            "input_files": [("data.md", b"# Rubrik\n")],
+            "input_values": {"b": 1, "a": "x"},
+            "memory_json": b'{"settings":{}}',
+            "action_payload": None,
+            "runner_image": "runner:1",
+        }
+        params.update(overrides)
+        return compute_result_cache_key(**params)  # type: ignore[arg-type]
+
+    base = key()
+    assert key(input_values={"a": "x", "b": 1}) == base
+    assert key(input_files=[StoredInputFile(name="data.md", path=path, bytes=9)]) == base
+    assert key(input_files=[("data.md", b"# Annan\n")]) != base
+    assert key(input_files=[("other.md", b"# Rubrik\n")]) != base
+    assert key(input_values={"a": "y", "b": 1}) != base
+    assert key(memory_json=b'{"settings":{"lang":"en"}}') != base
+    assert key(action_payload={"action_id": "next"}) != base
+    assert key(runner_image="runner:2") != base
+    assert key(version=version.model_copy(update={"content_hash": "other"})) != base
+
+
+@pytest.mark.asyncio
+async def test_deterministic_run_is_served_from_cache_with_copied_artifacts(
+    tmp_path: Path,
+) -> None:
+    inner = _FakeRunner(artifacts_root=tmp_path)
+    runner = MemoizingToolRunner(
+        runner=inner,
+        cache=FilesystemToolResultCache(artifacts_root=tmp_path, max_bytes=10_000),
+        runner_image="runner:1",
+    )
+    version = _make_tool_version(deterministic=True)
+    hits_before, misses_before = _lookups("hit"), _lookups("miss")
+
+    first_run_id, first = await _execute(runner, version=version)
+    second_run_id, second = await _execute(runner, version=version)
+
+    assert inner.calls == [first_run_id]
+    assert first.result_cache is ResultCacheStatus.MISS
+    assert second.result_cache is ResultCacheStatus.HIT
+    assert second.status is RunStatus.SUCCEEDED
+    assert second.stdout == first.stdout
+    assert second.ui_result == first.ui_result
+    assert second.artifacts_manifest == first.artifacts_manifest
+    assert second.artifacts_manifest.artifacts[0].sha256 is not None
+    copied = tmp_path / str(second_run_id) / "output" / "docs" / "report.docx"
+    assert copied.read_bytes() == b"docx-bytes"
+    assert _lookups("miss") - misses_before == 1
+    assert _lookups("hit") - hits_before == 1
+
+    # Removing the original run (retention) does not affect later hits.
+    os.remove(tmp_path / str(first_run_id) / "output" / "docs" / "report.docx")
+    _third_run_id, third = await _execute(runner, version=version)
+    assert third.result_cache is ResultCacheStatus.HIT
+
+    _other_run_id, other = await _execute(
+        runner, version=version, input_values={"profile": "print_bw"}
+    )
+    assert other.result_cache is ResultCacheStatus.MISS
+    assert len(inner.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_non_deterministic_and_failed_runs_bypass_cache(tmp_path: Path) -> None:
+    inner = _FakeRunner(artifacts_root=tmp_path)
+    runner = MemoizingToolRunner(
+        runner=inner,
+        cache=FilesystemToolResultCache(artifacts_root=tmp_path, max_bytes=10_000),
+        runner_image="runner:1",
+    )
+
+    _run_id, result = await _execute(runner, version=_make_tool_version(deterministic=False))
+    await _execute(runner, version=_make_tool_version(deterministic=False))
+
+    assert result.result_cache is None
+    assert len(inner.calls) == 2
+    assert not (tmp_path / RESULT_CACHE_DIRNAME).exists()
+
+    failing = _FakeRunner(artifacts_root=tmp_path, status=RunStatus.FAILED)
+    runner = MemoizingToolRunner(
+        runner=failing,
+        cache=FilesystemToolResultCache(artifacts_root=tmp_path, max_bytes=10_000),
+        runner_image="runner:1",
+    )
+    version = _make_tool_version(deterministic=True)
+    await _execute(runner, version=version)
+    _run_id, result = await _execute(runner, version=version)
+
+    assert result.result_cache is ResultCacheStatus.MISS
+    assert len(failing.calls) == 2
+
+    adopt_run_id = uuid4()
+    assert (
+        await runner.try_adopt(run_id=adopt_run_id, version=version, context=RunContext.SANDBOX)
+        is None
+    )
+    assert failing.adopted == [adopt_run_id]
+
+
+def test_evict_removes_least_recently_used_entries(tmp_path: Path) -> None:
+    cache = FilesystemToolResultCache(artifacts_root=tmp_path, max_bytes=1)
+    result = ToolExecutionResult(
+        status=RunStatus.SUCCEEDED,
+        stdout="",
+        stderr="",
+        ui_result=ToolUiContractV2Result(
+            status="succeeded",
+            error_summary=None,
+            outputs=[],
+            next_actions=[],
+            state=None,
+            artifacts=[],
+        ),
+        artifacts_manifest=ArtifactsManifest(artifacts=[]),
+    )
+    for index, key in enumerate(["old", "recent"]):
+        cache.store(key=key, run_id=uuid4(), result=result)
+        entry_path = tmp_path / RESULT_CACHE_DIRNAME / key / "entry.json"
+        os.utime(entry_path, (1_000 + index, 1_000 + index))
+    entry_size = (tmp_path / RESULT_CACHE_DIRNAME / "old" / "entry.json").stat().st_size
+    cache = FilesystemToolResultCache(artifacts_root=tmp_path, max_bytes=entry_size)
+
+    assert cache.evict() == 1
+
+    assert cache.load(key="old", run_id=uuid4()) is None
+    assert cache.load(key="recent", run_id=uuid4()) is not None
+
+
+def test_evict_walks_the_cache_only_past_the_budget_or_rescan_interval(tmp_path: Path) -> None:
+    result = ToolExecutionResult(
+        status=RunStatus.SUCCEEDED,
+        stdout="",
+        stderr="",
+        ui_result=ToolUiContractV2Result(
+            status="succeeded",
+            error_summary=None,
+            outputs=[],
+            next_actions=[],
+            state=None,
+            artifacts=[],
+        ),
+        artifacts_manifest=ArtifactsManifest(artifacts=[]),
+    )
+    cache = FilesystemToolResultCache(artifacts_root=tmp_path, max_bytes=10_000)
+    cache.store(key="own", run_id=uuid4(), result=result)
+    assert cache.evict() == 0
+
+    # An entry another process stored is invisible to the running total...
+    foreign = tmp_path / RESULT_CACHE_DIRNAME / "foreign"
+    foreign.mkdir()
+    (foreign / "entry.json").write_bytes(b"x" * 20_000)
+    assert cache.evict() == 0
+
+    # ...until this process's own stores cross the budget, which triggers a walk.
+    cache.store(
+        key="big", run_id=uuid4(), result=result.model_copy(update={"stdout": "y" * 10_000})
+    )
+    assert cache.evict() >= 1
+    assert not foreign.exists()
+
+    # A rescan interval of zero always walks.
+    foreign.mkdir()
+    (foreign / "entry.json").write_bytes(b"x" * 20_000)
+    eager = FilesystemToolResultCache(
+        artifacts_root=tmp_path, max_bytes=10_000, rescan_interval_seconds=0
+    )
+    assert eager.evict() >= 1
@@ -3,7 +3,10 @@ import json
 import pytest
 
 from skriptoteket.domain.errors import DomainError, ErrorCode
-from skriptoteket.infrastructure.runner.result_contract import parse_runner_result_json
+from skriptoteket.infrastructure.runner.result_contract import (
+    parse_runner_result_json,
+    parse_runner_timings,
+)
 
 
 def test_parse_runner_result_json_success() -> None:
@@ -125,3 +128,27 @@ def test_parse_runner_result_json_with_error_summary_succeeds() -> None:
 
     assert result.error_summary == "Something went wrong"
     assert result.status == "failed"
+
+
+def test_parse_runner_timings_keeps_non_negative_numbers_only() -> None:
+    payload = {
+        "contract_version": 2,
+        "status": "succeeded",
+        "timings": {
+            "import_seconds": 0.5,
+            "user_code_seconds": 2,
+            "artifacts_seconds": -1,
+            "flag": True,
+            "label": "fast",
+        },
+    }
+
+    timings = parse_runner_timings(result_json_bytes=json.dumps(payload).encode("utf-8"))
+
+    assert timings == {"import_seconds": 0.5, "user_code_seconds": 2.0}
+
+
+def test_parse_runner_timings_tolerates_missing_or_invalid_payloads() -> None:
+    assert parse_runner_timings(result_json_bytes=b"not json") == {}
+    assert parse_runner_timings(result_json_bytes=b"[]") == {}
+    assert parse_runner_timings(result_json_bytes=b'{"timings": [1, 2]}') == {}
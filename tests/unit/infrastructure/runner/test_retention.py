@@ -1,13 +1,25 @@
 import os
+import threading
+import time
 from datetime import datetime, timedelta, timezone
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 import pytest
 
 from skriptoteket.infrastructure.runner.retention import (
+    LocalRunStoragePurger,
+    RunArtifactExpiry,
     prune_artifacts_root,
     prune_llm_captures_root,
+    prune_run_logs_root,
+    prune_upload_spool_root,
 )
+from skriptoteket.protocols.runner import RunStoragePurgerProtocol
+from skriptoteket.protocols.scripting import (
+    ArtifactExpiryCandidate,
+    RunArtifactExpiryRepositoryProtocol,
+)
+from tests.fixtures.application_fixtures import FakeUow
 
 
 def test_prune_artifacts_root_deletes_old_run_dirs(tmp_path) -> None:
@@ -121,3 +133,162 @@ def test_prune_llm_captures_root_deletes_old_capture_dirs(tmp_path) -> None:
     assert deleted == 1
     assert not old_dir.exists()
     assert new_dir.exists()
+
+
+def test_prune_run_logs_root_deletes_old_buffers(tmp_path) -> None:
+    now = datetime.now(timezone.utc)
+    run_logs_root = tmp_path / "run-logs"
+    run_logs_root.mkdir()
+
+    old_file = run_logs_root / f"{uuid4()}.ndjson"
+    new_file = run_logs_root / f"{uuid4()}.ndjson"
+    foreign_file = run_logs_root / "notes.ndjson"
+    for path in (old_file, new_file, foreign_file):
+        path.write_text("")
+
+    old_mtime = (now - timedelta(days=10)).timestamp()
+    os.utime(old_file, (old_mtime, old_mtime))
+    os.utime(foreign_file, (old_mtime, old_mtime))
+
+    deleted = prune_run_logs_root(artifacts_root=tmp_path, retention_days=7, now=now)
+
+    assert deleted == 1
+    assert not old_file.exists()
+    assert new_file.exists()
+    assert foreign_file.exists()
+
+
+def test_prune_upload_spool_root_deletes_only_abandoned_spool_dirs(tmp_path) -> None:
+    now = datetime.now(timezone.utc)
+    spool_root = tmp_path / "upload-spool"
+    stale_dir = spool_root / str(uuid4())
+    active_dir = spool_root / str(uuid4())
+    for path in (stale_dir, active_dir):
+        path.mkdir(parents=True)
+        (path / "0000").write_bytes(b"upload")
+
+    old_mtime = (now - timedelta(hours=2)).timestamp()
+    os.utime(stale_dir, (old_mtime, old_mtime))
+
+    deleted = prune_upload_spool_root(artifacts_root=tmp_path, now=now)
+
+    assert deleted == 1
+    assert not stale_dir.exists()
+    assert (active_dir / "0000").exists()
+
+
+def test_local_run_storage_purger_removes_artifacts_and_inputs_and_counts_bytes(tmp_path) -> None:
+    run_id = uuid4()
+    other_run_dir = tmp_path / str(uuid4())
+    other_run_dir.mkdir()
+    (tmp_path / str(run_id) / "output" / "nested").mkdir(parents=True)
+    (tmp_path / str(run_id) / "output" / "report.csv").write_bytes(b"a" * 10)
+    (tmp_path / str(run_id) / "output" / "nested" / "data.bin").write_bytes(b"b" * 5)
+    (tmp_path / "run-inputs" / str(run_id)).mkdir(parents=True)
+    (tmp_path / "run-inputs" / str(run_id) / "input.txt").write_bytes(b"c" * 3)
+
+    purger = LocalRunStoragePurger(artifacts_root=tmp_path)
+
+    assert purger.purge_run(run_id=run_id) == 18
+    assert not (tmp_path / str(run_id)).exists()
+    assert not (tmp_path / "run-inputs" / str(run_id)).exists()
+    assert other_run_dir.exists()
+    assert purger.purge_run(run_id=run_id) == 0
+
+
+class FakeRetentionRuns(RunArtifactExpiryRepositoryProtocol):
+    def __init__(self, finished: dict[UUID, datetime]) -> None:
+        self.finished = finished
+        self.expired: dict[UUID, datetime] = {}
+        self.list_calls = 0
+
+    async def list_pending_artifact_expiry(
+        self,
+        *,
+        finished_before: datetime,
+        limit: int,
+        after: ArtifactExpiryCandidate | None = None,
+    ) -> list[ArtifactExpiryCandidate]:
+        self.list_calls += 1
+        pending = sorted(
+            (finished_at, run_id)
+            for run_id, finished_at in self.finished.items()
+            if run_id not in self.expired and finished_at < finished_before
+        )
+        if after is not None:
+            pending = [key for key in pending if key > (after.finished_at, after.run_id)]
+        return [
+            ArtifactExpiryCandidate(run_id=run_id, finished_at=finished_at)
+            for finished_at, run_id in pending[:limit]
+        ]
+
+    async def mark_artifacts_expired(self, *, run_ids: list[UUID], expired_at: datetime) -> int:
+        for run_id in run_ids:
+            self.expired[run_id] = expired_at
+        return len(run_ids)
+
+
+class RecordingPurger(RunStoragePurgerProtocol):
+    def __init__(self, *, failing: set[UUID]) -> None:
+        self._failing = failing
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.max_in_flight = 0
+        self.purged: list[UUID] = []
+
+    def purge_run(self, *, run_id: UUID) -> int:
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            time.sleep(0.005)
+            if run_id in self._failing:
+                raise PermissionError("read-only file system")
+            with self._lock:
+                self.purged.append(run_id)
+            return 100
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_run_artifact_expiry_batches_bounds_concurrency_and_tombstones(tmp_path) -> None:
+    now = datetime(2026, 10, 17, tzinfo=timezone.utc)
+    old = {uuid4(): now - timedelta(days=30, minutes=i) for i in range(7)}
+    recent = {uuid4(): now - timedelta(days=1)}
+    failing = next(iter(old))
+    runs = FakeRetentionRuns({**old, **recent})
+    purger = RecordingPurger(failing={failing})
+    ticks = iter([10.0, 12.0])
+
+    result = await RunArtifactExpiry(
+        uow=FakeUow(),
+        runs=runs,
+        purger=purger,
+        batch_size=3,
+        concurrency=2,
+        timer=lambda: next(ticks),
+    ).expire(retention_days=7, now=now)
+
+    assert set(runs.expired) == set(old) - {failing}
+    assert set(runs.expired.values()) == {now}
+    assert sorted(purger.purged) == sorted(set(old) - {failing})
+    assert purger.max_in_flight == 2
+    # 7 candidates in batches of 3; the failed run is skipped by the cursor, not re-listed.
+    assert runs.list_calls == 3
+    assert result.expired_runs == 6
+    assert result.failed_runs == 1
+    assert result.bytes_deleted == 600
+    assert result.runs_per_second == 3.0
+    assert result.bytes_per_second == 300.0
+
+
+@pytest.mark.asyncio
+async def test_run_artifact_expiry_rejects_naive_now() -> None:
+    expiry = RunArtifactExpiry(
+        uow=FakeUow(), runs=FakeRetentionRuns({}), purger=RecordingPurger(failing=set())
+    )
+
+    with pytest.raises(ValueError, match="timezone-aware"):
+        await expiry.expire(retention_days=7, now=datetime(2026, 10, 17))
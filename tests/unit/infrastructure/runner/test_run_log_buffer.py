@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+
+from skriptoteket.infrastructure.runner.run_log_buffer import LocalRunLogBuffer
+
+
+def test_read_returns_none_without_buffer(tmp_path) -> None:
+    buffer = LocalRunLogBuffer(artifacts_root=tmp_path, max_bytes=1024)
+
+    assert buffer.read(run_id=uuid4()) is None
+
+
+def test_read_returns_chunks_after_seq_and_end_marker(tmp_path) -> None:
+    buffer = LocalRunLogBuffer(artifacts_root=tmp_path, max_bytes=1024)
+    run_id = uuid4()
+    writer = buffer.open_writer(run_id=run_id)
+
+    writer.write(stream="stdout", data=b"hello\n")
+    writer.write(stream="stderr", data=b"warn\n")
+
+    tail = buffer.read(run_id=run_id)
+    assert tail is not None
+    assert [(chunk.seq, chunk.stream, chunk.text) for chunk in tail.chunks] == [
+        (1, "stdout", "hello\n"),
+        (2, "stderr", "warn\n"),
+    ]
+    assert tail.finished is False
+    assert tail.dropped is False
+
+    writer.write(stream="stdout", data=b"bye\n")
+    writer.close()
+
+    tail = buffer.read(run_id=run_id, after_seq=2)
+    assert tail is not None
+    assert [chunk.text for chunk in tail.chunks] == ["bye\n"]
+    assert tail.finished is True
+
+
+def test_writer_decodes_multibyte_characters_split_across_writes(tmp_path) -> None:
+    buffer = LocalRunLogBuffer(artifacts_root=tmp_path, max_bytes=1024)
+    run_id = uuid4()
+    writer = buffer.open_writer(run_id=run_id)
+    encoded = "Åäö\n".encode()
+
+    writer.write(stream="stdout", data=encoded[:1])
+    writer.write(stream="stdout", data=encoded[1:])
+    writer.close()
+
+    tail = buffer.read(run_id=run_id)
+    assert tail is not None
+    assert "".join(chunk.text for chunk in tail.chunks) == "Åäö\n"
+
+
+def test_writer_keeps_newest_output_within_budget_and_reports_dropped(tmp_path) -> None:
+    buffer = LocalRunLogBuffer(artifacts_root=tmp_path, max_bytes=200)
+    run_id = uuid4()
+    writer = buffer.open_writer(run_id=run_id)
+
+    for index in range(50):
+        writer.write(stream="stdout", data=f"line {index}\n".encode())
+    writer.close()
+
+    path = tmp_path / "run-logs" / f"{run_id}.ndjson"
+    assert path.stat().st_size <= 2 * 200
+
+    tail = buffer.read(run_id=run_id)
+    assert tail is not None
+    assert tail.dropped is True
+    assert tail.finished is True
+    assert tail.chunks[-1].text == "line 49\n"
+    assert [chunk.seq for chunk in tail.chunks] == sorted(chunk.seq for chunk in tail.chunks)
+
+
+def test_read_ignores_torn_trailing_line(tmp_path) -> None:
+    buffer = LocalRunLogBuffer(artifacts_root=tmp_path, max_bytes=1024)
+    run_id = uuid4()
+    writer = buffer.open_writer(run_id=run_id)
+    writer.write(stream="stdout", data=b"done\n")
+
+    path = tmp_path / "run-logs" / f"{run_id}.ndjson"
+    with path.open("ab") as handle:
+        handle.write(b'{"seq":2,"stream":"std')
+
+    tail = buffer.read(run_id=run_id)
+    assert tail is not None
+    assert [chunk.text for chunk in tail.chunks] == ["done\n"]
+
+
+def test_delete_removes_buffer(tmp_path) -> None:
+    buffer = LocalRunLogBuffer(artifacts_root=tmp_path, max_bytes=1024)
+    run_id = uuid4()
+    buffer.open_writer(run_id=run_id).close()
+
+    buffer.delete(run_id=run_id)
+
+    assert buffer.read(run_id=run_id) is None
+
+
+def test_rejects_non_positive_budget(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        LocalRunLogBuffer(artifacts_root=tmp_path, max_bytes=0)
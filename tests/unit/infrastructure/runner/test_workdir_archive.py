@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import io
+import tarfile
+import tracemalloc
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+from skriptoteket.domain.errors import DomainError, ErrorCode
+from skriptoteket.domain.scripting.models import ToolVersion, VersionState
+from skriptoteket.infrastructure.runner.docker.workdir_archive import (
+    WorkdirInputFile,
+    iter_workdir_archive,
+    normalize_workdir_input_files,
+)
+from skriptoteket.infrastructure.runner.run_input_storage import LocalRunInputStorage
+from skriptoteket.protocols.session_files import StoredInputFile
+
+
+def _make_tool_version(source_code: str = "print('test')") -> ToolVersion:
+    return ToolVersion(
+        id=uuid4(),
+        tool_id=uuid4(),
+        version_number=1,
+        state=VersionState.DRAFT,
+        entrypoint="run_tool",
+        source_code=source_code,
+        content_hash="abc123",
+        derived_from_version_id=None,
+        created_by_user_id=uuid4(),
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def _tarfile_archive(
+    *, version: ToolVersion, input_files: list[tuple[str, bytes]], memory_json: bytes
+) -> bytes:
+    """Reference implementation: the whole archive built in memory with `tarfile`."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for name, data in (
+            ("script.py", version.source_code.encode("utf-8")),
+            ("memory.json", memory_json),
+        ):
+            info = tarfile.TarInfo(name=name)
+            info.size = len(data)
+            info.mode = 0o644
+            tar.addfile(info, io.BytesIO(data))
+
+        input_dir_info = tarfile.TarInfo(name="input")
+        input_dir_info.type = tarfile.DIRTYPE
+        input_dir_info.mode = 0o755
+        tar.addfile(input_dir_info)
+
+        for name, content in input_files:
+            info = tarfile.TarInfo(name=f"input/{name}")
+            info.size = len(content)
+            info.mode = 0o644
+            tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def test_iter_workdir_archive_matches_tarfile_output() -> None:
+    version = _make_tool_version(source_code="def run_tool(): return 'åäö'")
+    long_name = f"{'x' * 150}.csv"
+    input_files = [("data.csv", b"a,b\n1,2\n"), (long_name, b"y" * 1000), ("empty.txt", b"")]
+    workdir_files, _manifest = normalize_workdir_input_files(input_files=input_files)
+
+    streamed = b"".join(
+        iter_workdir_archive(
+            version=version,
+            input_files=workdir_files,
+            memory_json=b'{"settings":{}}',
+            chunk_bytes=256,
+        )
+    )
+
+    assert streamed == _tarfile_archive(
+        version=version, input_files=input_files, memory_json=b'{"settings":{}}'
+    )
+
+
+def test_iter_workdir_archive_includes_script_bytecode_when_given() -> None:
+    archive = b"".join(
+        iter_workdir_archive(
+            version=_make_tool_version(),
+            input_files=[],
+            memory_json=b"{}",
+            script_bytecode=b"pyc-bytes",
+        )
+    )
+
+    with tarfile.open(fileobj=io.BytesIO(archive), mode="r") as tar:
+        assert tar.getnames() == ["script.py", "memory.json", "script.pyc", "input"]
+        member = tar.extractfile("script.pyc")
+        assert member is not None
+        assert member.read() == b"pyc-bytes"
+
+
+def test_iter_workdir_archive_ends_with_run_trigger_when_requested() -> None:
+    archive = b"".join(
+        iter_workdir_archive(
+            version=_make_tool_version(),
+            input_files=[WorkdirInputFile(name="data.csv", size=3, content=b"a,b")],
+            memory_json=b"{}",
+            run_env_json=b"{}",
+            run_trigger=True,
+        )
+    )
+
+    assert len(archive) % tarfile.RECORDSIZE == 0
+    with tarfile.open(fileobj=io.BytesIO(archive), mode="r") as tar:
+        members = tar.getmembers()
+    assert members[-1].name == ".run"
+    assert members[-1].size == 0
+    assert [member.name for member in members[:-1]] == [
+        "script.py",
+        "memory.json",
+        "run_env.json",
+        "input",
+        "input/data.csv",
+    ]
+
+
+def test_iter_workdir_archive_streams_stored_files_in_bounded_chunks(tmp_path: Path) -> None:
+    content = bytes(range(256)) * 40
+    path = tmp_path / "big.bin"
+    path.write_bytes(content)
+    workdir_files, manifest = normalize_workdir_input_files(
+        input_files=[StoredInputFile(name="big.bin", path=path, bytes=len(content))]
+    )
+
+    chunks = list(
+        iter_workdir_archive(
+            version=_make_tool_version(),
+            input_files=workdir_files,
+            memory_json=b"{}",
+            chunk_bytes=1024,
+        )
+    )
+
+    assert manifest.files[0].bytes == len(content)
+    assert all(chunks)
+    assert max(len(chunk) for chunk in chunks) <= tarfile.RECORDSIZE
+    with tarfile.open(fileobj=io.BytesIO(b"".join(chunks)), mode="r") as tar:
+        member = tar.extractfile("input/big.bin")
+        assert member is not None
+        assert member.read() == content
+
+
+def test_iter_workdir_archive_fails_when_stored_file_shrinks(tmp_path: Path) -> None:
+    path = tmp_path / "input.txt"
+    path.write_bytes(b"short")
+    workdir_files = [WorkdirInputFile(name="input.txt", size=100, content=path)]
+
+    with pytest.raises(OSError, match="shrank"):
+        b"".join(
+            iter_workdir_archive(
+                version=_make_tool_version(), input_files=workdir_files, memory_json=b"{}"
+            )
+        )
+
+
+def test_normalize_workdir_input_files_rejects_collisions_across_sources(tmp_path: Path) -> None:
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"x")
+
+    with pytest.raises(DomainError) as exc_info:
+        normalize_workdir_input_files(
+            input_files=[
+                (" data.csv", b"y"),
+                StoredInputFile(name="data.csv", path=path, bytes=1),
+            ]
+        )
+
+    assert exc_info.value.code is ErrorCode.VALIDATION_ERROR
+
+
+@pytest.mark.asyncio
+async def test_stored_run_inputs_round_trip_through_streamed_archive(tmp_path: Path) -> None:
+    storage = LocalRunInputStorage(artifacts_root=tmp_path)
+    run_id = uuid4()
+    await storage.store(run_id=run_id, files=[("b.txt", b"bee"), ("a.txt", b"ay")])
+
+    stored = await storage.get_stored(run_id=run_id)
+    workdir_files, manifest = normalize_workdir_input_files(input_files=stored)
+    archive = b"".join(
+        iter_workdir_archive(
+            version=_make_tool_version(), input_files=workdir_files, memory_json=b"{}"
+        )
+    )
+
+    assert [(entry.name, entry.bytes) for entry in manifest.files] == [("a.txt", 2), ("b.txt", 3)]
+    with tarfile.open(fileobj=io.BytesIO(archive), mode="r") as tar:
+        member = tar.extractfile("input/b.txt")
+        assert member is not None
+        assert member.read() == b"bee"
+
+
+def test_benchmark_peak_memory_streamed_vs_in_memory_archive(tmp_path: Path) -> None:
+    """Peak traced allocations for a 16 MiB upload: load + tar in memory vs. stream from disk.
+
+    Run with `pdm run pytest -s <this file>` to see the numbers.
+    """
+    input_size = 16 * 1024 * 1024
+    path = tmp_path / "upload.bin"
+    with path.open("wb") as handle:
+        for _ in range(input_size // (1024 * 1024)):
+            handle.write(b"\xab" * (1024 * 1024))
+    version = _make_tool_version()
+
+    def drain(chunks: Iterable[bytes]) -> int:
+        return sum(len(chunk) for chunk in chunks)
+
+    tracemalloc.start()
+    try:
+        content = path.read_bytes()
+        in_memory = _tarfile_archive(
+            version=version, input_files=[("upload.bin", content)], memory_json=b"{}"
+        )
+        in_memory_size = len(in_memory)
+        del content, in_memory
+        _current, in_memory_peak = tracemalloc.get_traced_memory()
+
+        tracemalloc.reset_peak()
+        stored = StoredInputFile(name="upload.bin", path=path, bytes=input_size)
+        workdir_files, _manifest = normalize_workdir_input_files(input_files=[stored])
+        streamed_size = drain(
+            iter_workdir_archive(version=version, input_files=workdir_files, memory_json=b"{}")
+        )
+        _current, streamed_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    print(
+        f"\nworkdir archive peak memory ({input_size // (1024 * 1024)} MiB input): "
+        f"in-memory {in_memory_peak / 1e6:.1f} MB, streamed {streamed_peak / 1e6:.1f} MB"
+    )
+    assert streamed_size == in_memory_size
+    assert in_memory_peak > input_size
+    assert streamed_peak < 2 * 1024 * 1024
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import time
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
@@ -8,7 +11,11 @@ import pytest
 from skriptoteket.infrastructure.session_files.local_session_file_storage import (
     LocalSessionFileStorage,
 )
+from skriptoteket.infrastructure.session_files.usage_index import SessionFileUsageIndex
+from skriptoteket.infrastructure.storage.blob_store import LocalBlobStore
 from skriptoteket.protocols.clock import ClockProtocol
+from skriptoteket.protocols.session_files import StoredInputFile
+from skriptoteket.protocols.sleeper import SleeperProtocol
 
 
 class FakeClock(ClockProtocol):
@@ -50,6 +57,49 @@ async def test_store_and_get_files_updates_last_accessed_at(tmp_path) -> None:
     assert clock.now().isoformat() in meta_after
 
 
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_store_files_links_blobs_and_get_stored_files_skips_reading(tmp_path) -> None:
+    tool_id = uuid4()
+    user_id = uuid4()
+    clock = FakeClock(datetime(2025, 1, 1, tzinfo=timezone.utc))
+    usage_index = SessionFileUsageIndex(artifacts_root=tmp_path)
+    storage = LocalSessionFileStorage(
+        sessions_root=tmp_path, ttl_seconds=60, clock=clock, usage_index=usage_index
+    )
+    content = b"elev;betyg\n"
+    sha256 = hashlib.sha256(content).hexdigest()
+    spooled = tmp_path / "upload-spool" / "0000"
+    spooled.parent.mkdir()
+    spooled.write_bytes(content)
+
+    await storage.store_files(
+        tool_id=tool_id,
+        user_id=user_id,
+        context="default",
+        files=[StoredInputFile(name=" elever.csv ", path=spooled, bytes=11, sha256=sha256)],
+    )
+    spooled.unlink()
+
+    session_dir = next((tmp_path / "sessions" / str(tool_id) / str(user_id)).iterdir())
+    blob = LocalBlobStore(artifacts_root=tmp_path).blob_path(sha256=sha256)
+    assert (session_dir / "elever.csv").stat().st_ino == blob.stat().st_ino
+    assert usage_index.totals().bytes_total == 11
+
+    stored = await storage.get_stored_files(tool_id=tool_id, user_id=user_id, context="default")
+    assert stored == [
+        StoredInputFile(name="elever.csv", path=session_dir / "elever.csv", bytes=11, sha256=sha256)
+    ]
+    assert await storage.get_files(tool_id=tool_id, user_id=user_id, context="default") == [
+        ("elever.csv", content)
+    ]
+    # Touching meta.json on access keeps the digests.
+    stored_again = await storage.get_stored_files(
+        tool_id=tool_id, user_id=user_id, context="default"
+    )
+    assert stored_again == stored
+
+
 @pytest.mark.unit
 @pytest.mark.asyncio
 async def test_store_files_replaces_existing_session_files(tmp_path) -> None:
@@ -163,11 +213,182 @@ async def test_cleanup_expired_deletes_sessions_by_last_accessed_at(tmp_path) ->
         files=[("a.txt", b"hello")],
     )
 
+    # A file written before the blob store existed has no other link; its bytes are freed.
+    session_dir = next((tmp_path / "sessions" / str(tool_id) / str(user_id)).iterdir())
+    (session_dir / "legacy.txt").write_bytes(b"old")
+
     clock.advance(timedelta(seconds=10))
     result = await storage.cleanup_expired()
     assert result.scanned_sessions == 1
     assert result.deleted_sessions == 1
-    assert result.deleted_files == 1
-    assert result.deleted_bytes == 5
+    assert result.deleted_files == 2
+    # a.txt is a hard link into the blob store; only blob GC reclaims its bytes.
+    assert result.deleted_bytes == 3
 
     assert await storage.get_files(tool_id=tool_id, user_id=user_id, context="default") == []
+
+
+class RecordingSleeper(SleeperProtocol):
+    def __init__(self) -> None:
+        self.sleeps: list[float] = []
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cleanup_expired_visits_only_expired_sessions_in_rate_limited_batches(
+    tmp_path,
+) -> None:
+    user_id = uuid4()
+    clock = FakeClock(datetime(2025, 1, 1, tzinfo=timezone.utc))
+    sleeper = RecordingSleeper()
+    storage = LocalSessionFileStorage(
+        sessions_root=tmp_path,
+        ttl_seconds=60,
+        clock=clock,
+        cleanup_batch_size=2,
+        cleanup_max_sessions_per_second=1.0,
+        sleeper=sleeper,
+    )
+    expired_tools = [uuid4() for _ in range(5)]
+    for tool_id in expired_tools:
+        await storage.store_files(
+            tool_id=tool_id, user_id=user_id, context="default", files=[("a.txt", b"abc")]
+        )
+    clock.advance(timedelta(seconds=120))
+    fresh_tools = [uuid4() for _ in range(3)]
+    for tool_id in fresh_tools:
+        await storage.store_files(
+            tool_id=tool_id, user_id=user_id, context="default", files=[("b.txt", b"b")]
+        )
+
+    result = await storage.cleanup_expired()
+
+    assert result.scanned_sessions == 5
+    assert result.deleted_sessions == 5
+    assert result.deleted_files == 5
+    assert result.deleted_bytes == 0
+    # Batches of 2, 2, 1: the two full batches are each followed by a pause (~2 s at 1/s).
+    assert len(sleeper.sleeps) == 2
+    assert all(1.5 < seconds <= 2.0 for seconds in sleeper.sleeps)
+    for tool_id in fresh_tools:
+        files = await storage.get_files(tool_id=tool_id, user_id=user_id, context="default")
+        assert files == [("b.txt", b"b")]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cleanup_expired_trusts_meta_json_when_the_index_is_stale(tmp_path) -> None:
+    tool_id = uuid4()
+    user_id = uuid4()
+    clock = FakeClock(datetime(2025, 1, 1, tzinfo=timezone.utc))
+    storage = LocalSessionFileStorage(sessions_root=tmp_path, ttl_seconds=60, clock=clock)
+    await storage.store_files(
+        tool_id=tool_id, user_id=user_id, context="default", files=[("a.txt", b"a")]
+    )
+
+    # Simulate a lost index update: meta.json is fresh, the index still has the old time.
+    clock.advance(timedelta(seconds=120))
+    session_dir = next((tmp_path / "sessions" / str(tool_id) / str(user_id)).iterdir())
+    meta_path = session_dir / "meta.json"
+    meta = json.loads(meta_path.read_text("utf-8"))
+    meta["last_accessed_at"] = clock.now().isoformat()
+    meta_path.write_text(json.dumps(meta), "utf-8")
+
+    first = await storage.cleanup_expired()
+    second = await storage.cleanup_expired()
+
+    assert (first.scanned_sessions, first.deleted_sessions) == (1, 0)
+    assert (second.scanned_sessions, second.deleted_sessions) == (0, 0)
+    files = await storage.get_files(tool_id=tool_id, user_id=user_id, context="default")
+    assert files == [("a.txt", b"a")]
+
+
+class ReadOnlyUsageIndex(SessionFileUsageIndex):
+    def touch_session(self, **_kwargs: object) -> bool:
+        return False
+
+    def remove_sessions(self, **_kwargs: object) -> bool:
+        return False
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cleanup_expired_stops_when_the_index_cannot_be_updated(tmp_path) -> None:
+    user_id = uuid4()
+    clock = FakeClock(datetime(2025, 1, 1, tzinfo=timezone.utc))
+    storage = LocalSessionFileStorage(
+        sessions_root=tmp_path,
+        ttl_seconds=60,
+        clock=clock,
+        usage_index=ReadOnlyUsageIndex(artifacts_root=tmp_path),
+        cleanup_batch_size=2,
+    )
+    for _ in range(3):
+        await storage.store_files(
+            tool_id=uuid4(), user_id=user_id, context="default", files=[("a.txt", b"a")]
+        )
+    clock.advance(timedelta(seconds=120))
+
+    result = await storage.cleanup_expired()
+
+    assert (result.scanned_sessions, result.deleted_sessions) == (2, 2)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_benchmark_indexed_cleanup_vs_meta_json_walk(tmp_path) -> None:
+    """Expire 1% of 100k synthetic sessions: index range scan vs. reading every meta.json.
+
+    Run with `pdm run pytest -m slow -s <this file>` to see the numbers.
+    """
+    session_count = 100_000
+    expired_count = session_count // 100
+    now = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    stale = (now - timedelta(days=1)).isoformat()
+    fresh = now.isoformat()
+    tool_ids = [uuid4() for _ in range(100)]
+    for index in range(session_count):
+        session_dir = (
+            tmp_path / "sessions" / str(tool_ids[index % 100]) / str(uuid4()) / f"{index:064x}"
+        )
+        session_dir.mkdir(parents=True)
+        (session_dir / "input.txt").write_bytes(b"x")
+        last_accessed_at = stale if index % 100 == 0 else fresh
+        (session_dir / "meta.json").write_text(
+            json.dumps({"last_accessed_at": last_accessed_at}), "utf-8"
+        )
+
+    clock = FakeClock(now)
+    storage = LocalSessionFileStorage(sessions_root=tmp_path, ttl_seconds=3600, clock=clock)
+    SessionFileUsageIndex(artifacts_root=tmp_path).totals()  # one-time build from disk
+
+    def walk_meta_json() -> int:
+        expired = 0
+        for tool_dir in (tmp_path / "sessions").iterdir():
+            for user_dir in tool_dir.iterdir():
+                for context_dir in user_dir.iterdir():
+                    meta = json.loads((context_dir / "meta.json").read_text("utf-8"))
+                    age = now - datetime.fromisoformat(meta["last_accessed_at"])
+                    if age.total_seconds() > 3600:
+                        expired += 1
+        return expired
+
+    started = time.perf_counter()
+    assert walk_meta_json() == expired_count
+    walk_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = await storage.cleanup_expired()
+    indexed_seconds = time.perf_counter() - started
+
+    print(
+        f"\n{session_count} sessions, {expired_count} expired: meta.json walk (find only) "
+        f"{walk_seconds * 1000:.0f} ms, indexed cleanup (find + delete) "
+        f"{indexed_seconds * 1000:.0f} ms ({walk_seconds / indexed_seconds:.1f}x)"
+    )
+    assert result.scanned_sessions == expired_count
+    assert result.deleted_sessions == expired_count
+    assert indexed_seconds < walk_seconds
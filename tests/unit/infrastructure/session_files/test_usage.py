@@ -1,14 +1,23 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import shutil
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 import pytest
 
+from skriptoteket.infrastructure.session_files import usage_index
 from skriptoteket.infrastructure.session_files.local_session_file_storage import (
     LocalSessionFileStorage,
 )
-from skriptoteket.infrastructure.session_files.usage import get_session_file_usage
+from skriptoteket.infrastructure.session_files.usage import (
+    SessionFileUsage,
+    get_session_file_usage,
+)
+from skriptoteket.infrastructure.session_files.usage_index import (
+    USAGE_INDEX_FILENAME,
+    SessionFileUsageIndex,
+)
 from skriptoteket.protocols.clock import ClockProtocol
 
 
@@ -19,6 +28,9 @@ class FakeClock(ClockProtocol):
     def now(self) -> datetime:
         return self._now
 
+    def advance(self, delta: timedelta) -> None:
+        self._now = self._now + delta
+
 
 @pytest.mark.unit
 @pytest.mark.asyncio
@@ -43,3 +55,108 @@ async def test_get_session_file_usage_counts_bytes_and_files_excluding_meta_json
     assert usage.sessions == 2
     assert usage.files == 2
     assert usage.bytes_total == 3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_usage_index_tracks_store_clear_and_expiry_without_walking(tmp_path) -> None:
+    clock = FakeClock(datetime(2025, 1, 1, tzinfo=timezone.utc))
+    index = SessionFileUsageIndex(artifacts_root=tmp_path)
+    storage = LocalSessionFileStorage(
+        sessions_root=tmp_path, ttl_seconds=60, clock=clock, usage_index=index
+    )
+    tool_id = uuid4()
+    teacher = uuid4()
+    other = uuid4()
+
+    await storage.store_files(
+        tool_id=tool_id, user_id=teacher, context="default", files=[("a.txt", b"a")]
+    )
+    await storage.store_files(
+        tool_id=tool_id,
+        user_id=teacher,
+        context="default",
+        files=[("b.txt", b"bb"), ("c.txt", b"c")],
+    )
+    await storage.store_files(
+        tool_id=tool_id, user_id=other, context="default", files=[("d.txt", b"dddd")]
+    )
+    await storage.store_files(
+        tool_id=uuid4(), user_id=teacher, context="step-2", files=[("e.txt", b"eeeee")]
+    )
+
+    assert index.totals() == SessionFileUsage(sessions=3, files=4, bytes_total=12)
+    assert index.totals() == get_session_file_usage(artifacts_root=tmp_path)
+    assert index.usage_by_tool()[tool_id] == SessionFileUsage(sessions=2, files=3, bytes_total=7)
+    assert index.usage_by_user()[teacher] == SessionFileUsage(sessions=2, files=3, bytes_total=8)
+
+    await storage.clear_session(tool_id=tool_id, user_id=other, context="default")
+    assert index.totals() == SessionFileUsage(sessions=2, files=3, bytes_total=8)
+
+    clock.advance(timedelta(seconds=120))
+    await storage.cleanup_expired()
+    assert index.totals() == SessionFileUsage(sessions=0, files=0, bytes_total=0)
+
+    await storage.store_files(
+        tool_id=tool_id, user_id=teacher, context="default", files=[("f.txt", b"f")]
+    )
+    await storage.clear_all()
+    assert index.totals() == SessionFileUsage(sessions=0, files=0, bytes_total=0)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_usage_index_is_built_from_existing_sessions_and_reconciles_drift(tmp_path) -> None:
+    clock = FakeClock(datetime(2025, 1, 1, tzinfo=timezone.utc))
+    storage = LocalSessionFileStorage(sessions_root=tmp_path, ttl_seconds=60, clock=clock)
+    tool_id = uuid4()
+    user_id = uuid4()
+    await storage.store_files(
+        tool_id=tool_id, user_id=user_id, context="default", files=[("a.txt", b"abc")]
+    )
+    await storage.store_files(
+        tool_id=tool_id, user_id=user_id, context="other", files=[("b.txt", b"b")]
+    )
+
+    # A deployment that predates the index: the first open builds it from disk.
+    (tmp_path / USAGE_INDEX_FILENAME).unlink()
+    index = SessionFileUsageIndex(artifacts_root=tmp_path)
+    assert index.totals() == SessionFileUsage(sessions=2, files=2, bytes_total=4)
+
+    # Files removed behind the storage's back drift until reconciled.
+    session_dir = next((tmp_path / "sessions" / str(tool_id) / str(user_id)).iterdir())
+    shutil.rmtree(session_dir)
+    before, after = index.reconcile()
+
+    assert before == SessionFileUsage(sessions=2, files=2, bytes_total=4)
+    assert after == get_session_file_usage(artifacts_root=tmp_path)
+    assert index.totals() == after
+    assert after.sessions == 1
+
+
+@pytest.mark.unit
+def test_reconcile_walks_outside_the_lock_and_keeps_rows_written_meanwhile(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    index = SessionFileUsageIndex(artifacts_root=tmp_path)
+    index.totals()  # build the (empty) index
+    concurrent = uuid4()
+
+    def scan_while_another_process_stores(*, artifacts_root):
+        # Would block for the busy timeout if the walk ran inside the write transaction.
+        index.record_session(
+            tool_id=concurrent,
+            user_id=uuid4(),
+            context_key="k",
+            files=1,
+            bytes_total=7,
+            last_accessed_at=datetime.now(timezone.utc),
+        )
+        return []
+
+    monkeypatch.setattr(usage_index, "scan_session_usage", scan_while_another_process_stores)
+
+    _before, after = index.reconcile()
+
+    assert after == SessionFileUsage(sessions=1, files=1, bytes_total=7)
+    assert set(index.usage_by_tool()) == {concurrent}
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+from skriptoteket.infrastructure.runner.run_input_storage import LocalRunInputStorage
+from skriptoteket.infrastructure.storage.blob_store import LocalBlobStore
+from skriptoteket.protocols.session_files import StoredInputFile
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@pytest.mark.unit
+def test_put_and_link_store_identical_content_once(tmp_path: Path) -> None:
+    store = LocalBlobStore(artifacts_root=tmp_path)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+
+    first = store.link(item=("elever.csv", b"elev;betyg\n"), target=tmp_path / "a" / "elever.csv")
+    second = store.link(item=("kopia.csv", b"elev;betyg\n"), target=tmp_path / "b" / "kopia.csv")
+
+    assert first.path == second.path
+    assert first.sha256 == hashlib.sha256(b"elev;betyg\n").hexdigest()
+    assert first.path.stat().st_nlink == 3
+    assert (tmp_path / "b" / "kopia.csv").read_bytes() == b"elev;betyg\n"
+
+
+@pytest.mark.unit
+def test_put_with_known_digest_neither_reads_nor_writes(tmp_path: Path) -> None:
+    store = LocalBlobStore(artifacts_root=tmp_path)
+    blob = store.put(item=("elever.csv", b"x" * 1024))
+    blob_stat = blob.path.stat()
+
+    again = store.put(
+        item=StoredInputFile(
+            name="elever.csv",
+            path=tmp_path / "does-not-exist",
+            bytes=1024,
+            sha256=blob.sha256,
+        )
+    )
+
+    assert again.path == blob.path
+    assert again.path.stat().st_ino == blob_stat.st_ino
+
+
+@pytest.mark.unit
+def test_put_links_stored_file_without_digest_into_store(tmp_path: Path) -> None:
+    store = LocalBlobStore(artifacts_root=tmp_path)
+    source = tmp_path / "upload.bin"
+    source.write_bytes(b"data")
+
+    blob = store.put(item=StoredInputFile(name="upload.bin", path=source, bytes=4))
+
+    assert blob.sha256 == hashlib.sha256(b"data").hexdigest()
+    assert blob.path.stat().st_ino == source.stat().st_ino
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_collect_garbage_deletes_only_unreferenced_blobs(tmp_path: Path) -> None:
+    store = LocalBlobStore(artifacts_root=tmp_path)
+    inputs = LocalRunInputStorage(artifacts_root=tmp_path, blob_store=store)
+    kept_run, deleted_run = uuid4(), uuid4()
+    await inputs.store(run_id=kept_run, files=[("kept.txt", b"kept")])
+    await inputs.store(run_id=deleted_run, files=[("gone.txt", b"gone!")])
+    await inputs.delete(run_id=deleted_run)
+    stale_tmp = tmp_path / "blobs" / "tmp" / "crashed"
+    stale_tmp.write_bytes(b"partial")
+    old = (_now() - timedelta(hours=2)).timestamp()
+    for path in (tmp_path / "blobs").rglob("*"):
+        if path.is_file():
+            os.utime(path, (old, old))
+
+    result = store.collect_garbage(now=_now())
+
+    assert (result.scanned_blobs, result.deleted_blobs, result.deleted_bytes) == (2, 1, 5)
+    assert not store.blob_path(sha256=hashlib.sha256(b"gone!").hexdigest()).exists()
+    assert not stale_tmp.exists()
+    assert await inputs.get(run_id=kept_run) == [("kept.txt", b"kept")]
+
+
+@pytest.mark.unit
+def test_collect_garbage_keeps_recently_used_blobs(tmp_path: Path) -> None:
+    store = LocalBlobStore(artifacts_root=tmp_path)
+    store.put(item=("fresh.txt", b"fresh"))
+
+    result = store.collect_garbage(now=_now())
+
+    assert (result.scanned_blobs, result.deleted_blobs) == (1, 0)
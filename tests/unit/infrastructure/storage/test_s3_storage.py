@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import tarfile
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+from uuid import uuid4
+
+import pytest
+
+from skriptoteket.domain.errors import DomainError
+from skriptoteket.infrastructure.runner.artifact_manager import FilesystemArtifactManager
+from skriptoteket.infrastructure.runner.retention import LocalRunStoragePurger
+from skriptoteket.infrastructure.runner.s3_artifact_manager import S3ArtifactManager
+from skriptoteket.infrastructure.runner.s3_retention import S3RunStoragePurger
+from skriptoteket.infrastructure.runner.s3_run_input_storage import S3RunInputStorage
+from skriptoteket.infrastructure.session_files.s3_session_file_storage import (
+    S3SessionFileStorage,
+)
+from skriptoteket.infrastructure.storage.s3 import (
+    MIN_MULTIPART_PART_BYTES,
+    S3DeleteError,
+    S3ObjectStore,
+    s3_client_factory,
+)
+from skriptoteket.protocols.clock import ClockProtocol
+from skriptoteket.protocols.session_files import StoredInputFile
+
+moto = pytest.importorskip("moto")
+
+_BUCKET = "skriptoteket-test"
+
+
+class FakeClock(ClockProtocol):
+    def __init__(self, now: datetime) -> None:
+        self._now = now
+
+    def now(self) -> datetime:
+        return self._now
+
+    def advance(self, delta: timedelta) -> None:
+        self._now = self._now + delta
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> Iterator[S3ObjectStore]:
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        factory = s3_client_factory(
+            endpoint_url=None, region="eu-north-1", access_key_id=None, secret_access_key=None
+        )
+        factory().create_bucket(
+            Bucket=_BUCKET,
+            CreateBucketConfiguration={"LocationConstraint": "eu-north-1"},
+        )
+        yield S3ObjectStore(
+            client_factory=factory,
+            bucket=_BUCKET,
+            prefix="skriptoteket",
+            part_size_bytes=MIN_MULTIPART_PART_BYTES,
+        )
+
+
+def _build_tar_bytes(*, members: list[tuple[str, bytes]]) -> bytes:
+    tar_buffer = io.BytesIO()
+    with tarfile.open(fileobj=tar_buffer, mode="w") as tar:
+        for name, data in members:
+            info = tarfile.TarInfo(name=name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return tar_buffer.getvalue()
+
+
+def _chunked(data: bytes, size: int) -> Iterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.mark.unit
+def test_upload_stream_uses_multipart_for_large_objects(store: S3ObjectStore) -> None:
+    data = os.urandom(2 * MIN_MULTIPART_PART_BYTES + 1234)
+
+    size = store.upload_stream(key="big.bin", chunks=_chunked(data, 256 * 1024))
+    small = store.upload_stream(key="small.bin", chunks=[b"liten"])
+
+    assert size == len(data)
+    assert small == 5
+    assert store.get_bytes(key="big.bin") == data
+    assert b"".join(store.iter_bytes(key="small.bin")) == b"liten"
+    head = store._s3().head_object(Bucket=_BUCKET, Key="skriptoteket/big.bin")
+    assert head["ETag"].strip('"').endswith("-3")  # three parts
+
+
+@pytest.mark.unit
+def test_upload_stream_aborts_multipart_upload_on_failure(store: S3ObjectStore) -> None:
+    def failing_chunks() -> Iterator[bytes]:
+        yield os.urandom(MIN_MULTIPART_PART_BYTES)
+        raise RuntimeError("container went away")
+
+    with pytest.raises(RuntimeError):
+        store.upload_stream(key="partial.bin", chunks=failing_chunks())
+
+    assert not store.exists(key="partial.bin")
+    uploads = store._s3().list_multipart_uploads(Bucket=_BUCKET)
+    assert uploads.get("Uploads", []) == []
+
+
+class _DenyDeletesClient:
+    """Real (moto) client whose `DeleteObjects` reports every key as failed, like a bucket policy
+    that denies deletes."""
+
+    def __init__(self, client: object) -> None:
+        self._client = client
+
+    def __getattr__(self, name: str) -> object:
+        return getattr(self._client, name)
+
+    def delete_objects(self, *, Bucket: str, Delete: dict[str, list[dict[str, str]]]) -> dict:
+        return {
+            "Errors": [
+                {"Key": item["Key"], "Code": "AccessDenied", "Message": "Access Denied"}
+                for item in Delete["Objects"]
+            ]
+        }
+
+
+@pytest.mark.unit
+def test_delete_keys_raises_when_objects_are_not_deleted(store: S3ObjectStore) -> None:
+    store.put_bytes(key="sessions/a.txt", data=b"a")
+    denied = S3ObjectStore(
+        client_factory=lambda: _DenyDeletesClient(store._s3()),
+        bucket=_BUCKET,
+        prefix="skriptoteket",
+    )
+
+    with pytest.raises(S3DeleteError) as exc_info:
+        denied.delete_prefix(prefix="sessions/")
+
+    assert exc_info.value.failed_keys == ["sessions/a.txt"]
+    assert store.exists(key="sessions/a.txt")
+
+
+@pytest.mark.unit
+def test_artifact_manager_uploads_members_and_is_idempotent(
+    store: S3ObjectStore, tmp_path: Path
+) -> None:
+    run_id = uuid4()
+    manager = S3ArtifactManager(
+        store=store,
+        local=FilesystemArtifactManager(artifacts_root=tmp_path),
+        presigned_url_ttl_seconds=60,
+    )
+    tar_bytes = _build_tar_bytes(
+        members=[("output/b.txt", b"second"), ("output/a/rapport.csv", b"elev;betyg\n")]
+    )
+
+    manifest = manager.store_output_archive(
+        run_id=run_id, output_archive=[tar_bytes], reported_artifacts=[]
+    )
+    again = manager.store_output_archive(
+        run_id=run_id,
+        output_archive=[_build_tar_bytes(members=[("output/other.txt", b"x")])],
+        reported_artifacts=[],
+    )
+
+    assert again == manifest
+    assert [artifact.path for artifact in manifest.artifacts] == [
+        "output/a/rapport.csv",
+        "output/b.txt",
+    ]
+    report = manifest.artifacts[0]
+    assert report.sha256 == hashlib.sha256(b"elev;betyg\n").hexdigest()
+    assert b"".join(manager.open_artifact(run_id=run_id, artifact=report) or []) == (
+        b"elev;betyg\n"
+    )
+    assert not (tmp_path / str(run_id)).exists()
+
+    url = manager.download_url(run_id=run_id, artifact=report)
+    assert url is not None
+    query = parse_qs(urlsplit(url).query)
+    assert urlsplit(url).path == f"/{_BUCKET}/skriptoteket/artifacts/{run_id}/output/a/rapport.csv"
+    assert query["response-content-disposition"] == ['attachment; filename="rapport.csv"']
+    assert query["X-Amz-Expires"] == ["60"]
+
+
+@pytest.mark.unit
+def test_artifact_manager_falls_back_to_local_files(store: S3ObjectStore, tmp_path: Path) -> None:
+    run_id = uuid4()
+    local = FilesystemArtifactManager(artifacts_root=tmp_path)
+    manifest = local.store_output_archive(
+        run_id=run_id,
+        output_archive=[_build_tar_bytes(members=[("output/app.html", b"<p>hej</p>")])],
+        reported_artifacts=[],
+    )
+    manager = S3ArtifactManager(store=store, local=local, presigned_url_ttl_seconds=60)
+
+    artifact = manifest.artifacts[0]
+    assert manager.download_url(run_id=run_id, artifact=artifact) is None
+    assert b"".join(manager.open_artifact(run_id=run_id, artifact=artifact) or []) == (
+        b"<p>hej</p>"
+    )
+
+
+@pytest.mark.unit
+def test_artifact_manager_rejects_path_traversal(store: S3ObjectStore, tmp_path: Path) -> None:
+    manager = S3ArtifactManager(
+        store=store,
+        local=FilesystemArtifactManager(artifacts_root=tmp_path),
+        presigned_url_ttl_seconds=60,
+    )
+
+    with pytest.raises(DomainError):
+        manager.store_output_archive(
+            run_id=uuid4(),
+            output_archive=[_build_tar_bytes(members=[("../evil.txt", b"nope")])],
+            reported_artifacts=[],
+        )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_run_input_storage_round_trips_and_spools_to_disk(
+    store: S3ObjectStore, tmp_path: Path
+) -> None:
+    run_id = uuid4()
+    storage = S3RunInputStorage(store=store, spool_root=tmp_path)
+
+    await storage.store(run_id=run_id, files=[("b.txt", b"b"), ("a.txt", b"aa")])
+    spooled = tmp_path / "upload-spool" / "0000"
+    spooled.parent.mkdir()
+    spooled.write_bytes(b"aaa")
+    await storage.store(
+        run_id=run_id, files=[StoredInputFile(name=" a.txt", path=spooled, bytes=3)]
+    )
+
+    assert await storage.get(run_id=run_id) == [("a.txt", b"aaa")]
+    stored = await storage.get_stored(run_id=run_id)
+    assert [(item.name, item.bytes, item.path.read_bytes()) for item in stored] == [
+        ("a.txt", 3, b"aaa")
+    ]
+
+    await storage.delete(run_id=run_id)
+
+    assert await storage.get(run_id=run_id) == []
+    assert not stored[0].path.exists()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_run_storage_purger_deletes_run_objects_and_local_copies(
+    store: S3ObjectStore, tmp_path: Path
+) -> None:
+    run_id = uuid4()
+    other_run_id = uuid4()
+    manager = S3ArtifactManager(
+        store=store,
+        local=FilesystemArtifactManager(artifacts_root=tmp_path),
+        presigned_url_ttl_seconds=60,
+    )
+    for target in (run_id, other_run_id):
+        manager.store_output_archive(
+            run_id=target,
+            output_archive=[_build_tar_bytes(members=[("output/a.txt", b"12345")])],
+            reported_artifacts=[],
+        )
+    inputs = S3RunInputStorage(store=store, spool_root=tmp_path)
+    await inputs.store(run_id=run_id, files=[("in.txt", b"abc")])
+    await inputs.get_stored(run_id=run_id)  # spools a local copy
+
+    manifest_bytes = store.list_objects(prefix=f"artifacts/{run_id}/manifest.json")[0].bytes
+    purger = S3RunStoragePurger(store=store, local=LocalRunStoragePurger(artifacts_root=tmp_path))
+
+    assert purger.purge_run(run_id=run_id) == 5 + manifest_bytes + 3 + 3
+    assert store.list_objects(prefix=f"artifacts/{run_id}/") == []
+    assert store.list_objects(prefix=f"run-inputs/{run_id}/") == []
+    assert not (tmp_path / "run-inputs" / str(run_id)).exists()
+    assert store.exists(key=f"artifacts/{other_run_id}/output/a.txt")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_session_file_storage_round_trips_and_cleans_up_expired(
+    store: S3ObjectStore,
+) -> None:
+    tool_id = uuid4()
+    user_id = uuid4()
+    clock = FakeClock(datetime(2025, 1, 1, tzinfo=timezone.utc))
+    storage = S3SessionFileStorage(store=store, ttl_seconds=60, clock=clock)
+
+    await storage.store_files(
+        tool_id=tool_id, user_id=user_id, context="default", files=[("old.txt", b"x")]
+    )
+    await storage.store_files(
+        tool_id=tool_id, user_id=user_id, context="default", files=[("input.txt", b"hello")]
+    )
+    await storage.store_files(
+        tool_id=tool_id, user_id=user_id, context="other", files=[("keep.txt", b"kvar")]
+    )
+
+    clock.advance(timedelta(seconds=50))
+    files = await storage.get_files(tool_id=tool_id, user_id=user_id, context="default")
+    listed = await storage.list_files(tool_id=tool_id, user_id=user_id, context="other")
+    assert files == [("input.txt", b"hello")]
+    assert [(item.name, item.bytes) for item in listed] == [("keep.txt", 4)]
+
+    # Only "default" is accessed again after the TTL has passed; the other two sessions expire.
+    await storage.store_files(
+        tool_id=uuid4(), user_id=user_id, context="default", files=[("stale.txt", b"gammal")]
+    )
+    clock.advance(timedelta(seconds=100))
+    await storage.get_files(tool_id=tool_id, user_id=user_id, context="default")
+    store.put_bytes(key=f"artifacts/{uuid4()}/output/a.txt", data=b"not a session")
+    result = await storage.cleanup_expired()
+
+    assert result.scanned_sessions == 3
+    assert result.deleted_sessions == 2
+    assert result.deleted_files == 2
+    assert result.deleted_bytes == len(b"kvar") + len(b"gammal")
+    assert await storage.get_files(tool_id=tool_id, user_id=user_id, context="default") == [
+        ("input.txt", b"hello")
+    ]
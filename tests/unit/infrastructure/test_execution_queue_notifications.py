@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from skriptoteket.domain.scripting.tool_run_jobs import execution_queue_channel
+from skriptoteket.infrastructure.execution_queue_notifications import (
+    PostgresExecutionQueueListener,
+    asyncpg_dsn,
+)
+
+
+class _FakeConnection:
+    def __init__(self) -> None:
+        self.listeners: dict[str, Callable[..., Any]] = {}
+        self.termination_listeners: list[Callable[..., Any]] = []
+        self.closed = False
+
+    async def add_listener(self, channel: str, callback: Callable[..., Any]) -> None:
+        self.listeners[channel] = callback
+
+    def add_termination_listener(self, callback: Callable[..., Any]) -> None:
+        self.termination_listeners.append(callback)
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def notify(self, channel: str, payload: str) -> None:
+        self.listeners[channel](self, 123, channel, payload)
+
+    def terminate(self) -> None:
+        self.closed = True
+        for callback in self.termination_listeners:
+            callback(self)
+
+
+class _FakeConnector:
+    def __init__(self) -> None:
+        self.connections: list[_FakeConnection] = []
+        self.fail = False
+
+    async def __call__(self, dsn: str) -> _FakeConnection:
+        if self.fail:
+            raise OSError("connection refused")
+        connection = _FakeConnection()
+        self.connections.append(connection)
+        return connection
+
+
+def test_execution_queue_channel_is_per_queue_and_fits_identifier_limit() -> None:
+    assert execution_queue_channel("default") == "skriptoteket_run_jobs_default"
+    assert execution_queue_channel("  ") == "skriptoteket_run_jobs_default"
+
+    long_channel = execution_queue_channel("q" * 80)
+    assert len(long_channel) <= 63
+    assert long_channel != execution_queue_channel("q" * 81)
+
+
+def test_asyncpg_dsn_strips_sqlalchemy_driver() -> None:
+    dsn = asyncpg_dsn("postgresql+asyncpg://user:secret@db:5432/skriptoteket")
+
+    assert dsn == "postgresql://user:secret@db:5432/skriptoteket"
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_on_notification() -> None:
+    connector = _FakeConnector()
+    listener = PostgresExecutionQueueListener(dsn="postgresql://db", connect=connector)
+
+    assert await listener.listen(queue="default") is True
+    assert listener.is_listening
+
+    waiter = asyncio.create_task(listener.wait())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    connector.connections[0].notify("skriptoteket_run_jobs_default", "job-1")
+    await asyncio.wait_for(waiter, timeout=1)
+
+    await listener.close()
+    assert connector.connections[0].closed
+
+
+@pytest.mark.asyncio
+async def test_notification_before_wait_is_not_lost() -> None:
+    connector = _FakeConnector()
+    listener = PostgresExecutionQueueListener(dsn="postgresql://db", connect=connector)
+    await listener.listen(queue="default")
+
+    connector.connections[0].notify("skriptoteket_run_jobs_default", "job-1")
+
+    await asyncio.wait_for(listener.wait(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_lost_connection_wakes_waiter_and_reconnects_on_next_wait() -> None:
+    connector = _FakeConnector()
+    listener = PostgresExecutionQueueListener(dsn="postgresql://db", connect=connector)
+    await listener.listen(queue="default")
+
+    waiter = asyncio.create_task(listener.wait())
+    await asyncio.sleep(0)
+    connector.connections[0].terminate()
+    await asyncio.wait_for(waiter, timeout=1)
+    assert not listener.is_listening
+
+    await asyncio.wait_for(listener.wait(), timeout=1)
+
+    assert listener.is_listening
+    assert len(connector.connections) == 2
+
+
+@pytest.mark.asyncio
+async def test_listen_failure_falls_back_to_polling() -> None:
+    connector = _FakeConnector()
+    connector.fail = True
+    listener = PostgresExecutionQueueListener(dsn="postgresql://db", connect=connector)
+
+    assert await listener.listen(queue="default") is False
+    assert not listener.is_listening
+
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(listener.wait(), timeout=0.05)
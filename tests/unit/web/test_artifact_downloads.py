@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import os
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from skriptoteket.domain.scripting.artifacts import StoredArtifact
+from skriptoteket.infrastructure.artifacts.precompression import precompressed_artifact_path
+from skriptoteket.web.artifact_downloads import (
+    artifact_file_response,
+    artifact_zip_entry_name,
+    iter_artifacts_zip,
+)
+
+_CONTENT = b"%PDF-1.7 " + bytes(range(256)) * 40
+
+
+def _client(*, run_dir: Path, artifact: StoredArtifact) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/artifact")
+    async def download(request: Request) -> Response:
+        return artifact_file_response(
+            request=request,
+            run_dir=run_dir,
+            file_path=run_dir / artifact.path,
+            artifact=artifact,
+        )
+
+    return TestClient(app)
+
+
+def _store(run_dir: Path, path: str, content: bytes) -> StoredArtifact:
+    file_path = run_dir / path
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_bytes(content)
+    return StoredArtifact(
+        artifact_id="artifact",
+        path=path,
+        bytes=len(content),
+        sha256=hashlib.sha256(content).hexdigest(),
+    )
+
+
+def _iter_file(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := file.read(64 * 1024):
+            yield chunk
+
+
+@pytest.mark.unit
+def test_download_sets_media_type_and_content_etag_and_revalidates(tmp_path: Path) -> None:
+    artifact = _store(tmp_path, "output/report.pdf", _CONTENT)
+    client = _client(run_dir=tmp_path, artifact=artifact)
+
+    response = client.get("/artifact")
+
+    assert response.status_code == 200
+    assert response.content == _CONTENT
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["etag"] == f'"{artifact.sha256}"'
+    assert response.headers["accept-ranges"] == "bytes"
+    assert 'attachment; filename="report.pdf"' == response.headers["content-disposition"]
+
+    not_modified = client.get("/artifact", headers={"If-None-Match": f'W/"{artifact.sha256}"'})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    by_date = client.get(
+        "/artifact", headers={"If-Modified-Since": response.headers["last-modified"]}
+    )
+    assert by_date.status_code == 304
+
+    changed = client.get("/artifact", headers={"If-None-Match": '"something-else"'})
+    assert changed.status_code == 200
+
+
+@pytest.mark.unit
+def test_download_resumes_with_byte_range_guarded_by_if_range(tmp_path: Path) -> None:
+    artifact = _store(tmp_path, "output/report.pdf", _CONTENT)
+    client = _client(run_dir=tmp_path, artifact=artifact)
+    etag = f'"{artifact.sha256}"'
+
+    resumed = client.get("/artifact", headers={"Range": "bytes=100-", "If-Range": etag})
+    assert resumed.status_code == 206
+    assert resumed.content == _CONTENT[100:]
+    assert resumed.headers["content-range"] == f"bytes 100-{len(_CONTENT) - 1}/{len(_CONTENT)}"
+
+    stale = client.get("/artifact", headers={"Range": "bytes=100-", "If-Range": '"old"'})
+    assert stale.status_code == 200
+    assert stale.content == _CONTENT
+
+
+@pytest.mark.unit
+def test_download_serves_precompressed_sidecar_to_accepting_clients(tmp_path: Path) -> None:
+    content = b"elev;betyg\n" * 1000
+    artifact = _store(tmp_path, "output/grades.csv", content)
+    sidecar = precompressed_artifact_path(
+        run_dir=tmp_path, artifact_path=artifact.path, encoding="gzip"
+    )
+    sidecar.parent.mkdir(parents=True)
+    sidecar.write_bytes(gzip.compress(content, mtime=0))
+    client = _client(run_dir=tmp_path, artifact=artifact)
+
+    compressed = client.get("/artifact", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/artifact", headers={"Accept-Encoding": "gzip;q=0, identity"})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["content-type"].startswith("text/csv")
+    assert compressed.headers["etag"] == f'"{artifact.sha256}-gzip"'
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert int(compressed.headers["content-length"]) < len(content)
+    assert compressed.content == content  # decoded by the client
+    assert "content-encoding" not in identity.headers
+    assert identity.content == content
+
+
+@pytest.mark.unit
+def test_artifacts_zip_streams_in_bounded_chunks_and_stores_compressed_formats(
+    tmp_path: Path,
+) -> None:
+    report = _store(tmp_path, "output/elev/rapport.docx", os.urandom(1024 * 1024))
+    notes = _store(tmp_path, "output/notes.txt", b"anteckningar\n" * 10_000)
+    entries = [
+        (artifact_zip_entry_name(artifact), artifact.bytes, _iter_file(tmp_path / artifact.path))
+        for artifact in (report, notes)
+    ]
+
+    chunks = list(iter_artifacts_zip(entries))
+
+    assert max(len(chunk) for chunk in chunks) < 2 * 64 * 1024
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None
+        docx, txt = archive.infolist()
+        assert docx.filename == "elev/rapport.docx"
+        assert docx.compress_type == zipfile.ZIP_STORED
+        assert txt.compress_type == zipfile.ZIP_DEFLATED
+        assert txt.compress_size < txt.file_size
+        assert archive.read("notes.txt") == (tmp_path / notes.path).read_bytes()
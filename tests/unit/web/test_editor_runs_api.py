@@ -7,7 +7,7 @@ from uuid import UUID, uuid4
 import pytest
 
 from skriptoteket.config import Settings
-from skriptoteket.domain.errors import DomainError
+from skriptoteket.domain.errors import DomainError, ErrorCode
 from skriptoteket.domain.identity.models import Role
 from skriptoteket.domain.scripting.input_files import InputManifest
 from skriptoteket.domain.scripting.models import (
@@ -19,6 +19,7 @@ from skriptoteket.domain.scripting.models import (
 from skriptoteket.domain.scripting.tool_runs import ToolRun
 from skriptoteket.protocols.scripting import ToolRunRepositoryProtocol
 from skriptoteket.web.api.v1.editor import runs as editor_runs
+from skriptoteket.web.error_mapping import error_to_status
 from tests.unit.web.admin_scripting_test_support import _user
 
 
@@ -148,3 +149,49 @@ async def test_get_run_admin_can_access_other_users_run() -> None:
 
     assert result.run_id == run.id
     assert result.stdout == "ok"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_expired_run_lists_artifacts_but_download_raises_artifacts_expired() -> None:
+    runs = AsyncMock(spec=ToolRunRepositoryProtocol)
+    user = _user(role=Role.CONTRIBUTOR)
+    expired_at = datetime.now(timezone.utc)
+    run = _finished_run(requested_by_user_id=user.id, stdout="ok", stderr=None).model_copy(
+        update={
+            "artifacts_manifest": {
+                "artifacts": [
+                    {
+                        "artifact_id": "output_report_csv",
+                        "path": "output/report.csv",
+                        "bytes": 12,
+                        "sha256": "0" * 64,
+                    }
+                ]
+            },
+            "artifacts_expired_at": expired_at,
+        }
+    )
+    runs.get_by_id.return_value = run
+
+    details = await _unwrap_dishka(editor_runs.get_run)(
+        run_id=run.id,
+        runs=runs,
+        settings=Settings(),
+        user=user,
+    )
+    with pytest.raises(DomainError) as exc_info:
+        await _unwrap_dishka(editor_runs.download_artifact)(
+            request=AsyncMock(),
+            run_id=run.id,
+            artifact_id="output_report_csv",
+            settings=Settings(),
+            runs=runs,
+            artifacts=AsyncMock(),
+            user=user,
+        )
+
+    assert details.artifacts_expired_at == expired_at
+    assert [artifact.path for artifact in details.artifacts] == ["output/report.csv"]
+    assert exc_info.value.code is ErrorCode.ARTIFACTS_EXPIRED
+    assert error_to_status(exc_info.value.code) == 410
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+from skriptoteket.application.scripting.interactive_tools import (
+    RunOutputDoneData,
+    RunOutputDoneEvent,
+    RunOutputStreamEvent,
+)
+from skriptoteket.domain.scripting.models import RunStatus
+from skriptoteket.web.routes import interactive_tools
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_with_keepalive_writes_comments_while_idle() -> None:
+    release = asyncio.Event()
+
+    async def events() -> AsyncIterator[RunOutputStreamEvent]:
+        await release.wait()
+        yield RunOutputDoneEvent(data=RunOutputDoneData(status=RunStatus.SUCCEEDED))
+
+    chunks: list[bytes] = []
+    async for chunk in interactive_tools._with_keepalive(events(), interval=0.01):
+        chunks.append(chunk)
+        if len(chunks) == 2:
+            release.set()
+
+    assert chunks[:2] == [b": keepalive\n\n", b": keepalive\n\n"]
+    assert chunks[-1].startswith(b"event: done\ndata: ")
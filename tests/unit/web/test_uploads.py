@@ -1,34 +1,93 @@
 from __future__ import annotations
 
+import hashlib
 from io import BytesIO
+from pathlib import Path
 
 import pytest
 from fastapi import UploadFile
 
-from skriptoteket.web.uploads import read_upload_files
+from skriptoteket.domain.errors import DomainError
+from skriptoteket.web.uploads import UPLOAD_SPOOL_DIRNAME, spool_upload_files
 
 
 @pytest.mark.unit
 @pytest.mark.asyncio
-async def test_read_upload_files_allows_action_json_filename() -> None:
-    input_files = await read_upload_files(
+async def test_spool_upload_files_allows_action_json_filename(tmp_path: Path) -> None:
+    async with spool_upload_files(
         files=[UploadFile(BytesIO(b"{}"), filename="action.json")],
+        spool_root=tmp_path,
         max_files=10,
         max_file_bytes=10,
         max_total_bytes=10,
-    )
-
-    assert input_files == [("action.json", b"{}")]
+    ) as input_files:
+        assert [(item.name, item.path.read_bytes()) for item in input_files] == [
+            ("action.json", b"{}")
+        ]
 
 
 @pytest.mark.unit
 @pytest.mark.asyncio
-async def test_read_upload_files_allows_action_json_even_with_whitespace() -> None:
-    input_files = await read_upload_files(
+async def test_spool_upload_files_allows_action_json_even_with_whitespace(tmp_path: Path) -> None:
+    async with spool_upload_files(
         files=[UploadFile(BytesIO(b"{}"), filename=" action.json ")],
+        spool_root=tmp_path,
         max_files=10,
         max_file_bytes=10,
         max_total_bytes=10,
-    )
+    ) as input_files:
+        assert [item.name for item in input_files] == [" action.json "]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_spool_upload_files_records_size_and_sha256_and_cleans_up(tmp_path: Path) -> None:
+    content = b"elev;betyg\n" * 200_000  # spans several read chunks
+
+    async with spool_upload_files(
+        files=[
+            UploadFile(BytesIO(content), filename="elever.csv"),
+            UploadFile(BytesIO(b"x"), filename=None),
+        ],
+        spool_root=tmp_path,
+        max_files=10,
+        max_file_bytes=len(content),
+        max_total_bytes=len(content) + 1,
+    ) as input_files:
+        assert [(item.name, item.bytes) for item in input_files] == [
+            ("elever.csv", len(content)),
+            ("input.bin", 1),
+        ]
+        assert input_files[0].sha256 == hashlib.sha256(content).hexdigest()
+        assert input_files[0].path.read_bytes() == content
+
+    assert not any((tmp_path / UPLOAD_SPOOL_DIRNAME).iterdir())
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("max_file_bytes", "max_total_bytes", "message"),
+    [
+        (4, 100, "Uploaded file is too large."),
+        (100, 6, "Total upload size exceeded."),
+    ],
+)
+async def test_spool_upload_files_enforces_limits_while_streaming(
+    tmp_path: Path, max_file_bytes: int, max_total_bytes: int, message: str
+) -> None:
+    with pytest.raises(DomainError) as exc_info:
+        async with spool_upload_files(
+            files=[
+                UploadFile(BytesIO(b"abcd"), filename="a.txt"),
+                UploadFile(BytesIO(b"efghij"), filename="b.txt"),
+            ],
+            spool_root=tmp_path,
+            max_files=10,
+            max_file_bytes=max_file_bytes,
+            max_total_bytes=max_total_bytes,
+        ):
+            pytest.fail("limits should be enforced before the block runs")
 
-    assert input_files == [(" action.json ", b"{}")]
+    assert exc_info.value.message == message
+    assert not any((tmp_path / UPLOAD_SPOOL_DIRNAME).iterdir())